@@ -0,0 +1,79 @@
+"""Time ``cj2md dedup``: the streaming pass, MinHash signatures and LSH.
+
+Every tenth conversation is an exact copy of the one before, and every
+tenth a retry with one more message, so the groups found can be checked against the export.
+
+Usage: python benchmarks/bench_dedup.py [n_conversations] [n_messages]
+"""
+
+import copy
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import make_conversation
+
+from claude_json2md import dedup
+from claude_json2md.reader import iter_json_array, open_export
+
+
+def main():
+    n_conv = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_msgs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    logging.getLogger("converter_app").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "export.json"
+        with export.open("w") as f:
+            f.write("[")
+            for i in range(n_conv):
+                conv = make_conversation(i, n_msgs)
+                if i % 10 == 1:
+                    conv = copy.deepcopy(previous)
+                    conv["uuid"] = f"copy-{i}"
+                elif i % 10 == 2:
+                    conv = copy.deepcopy(previous)
+                    conv["uuid"] = f"retry-{i}"
+                    conv["chat_messages"].append(
+                        {"sender": "assistant", "text": "A retried answer."}
+                    )
+                previous = conv
+                if i:
+                    f.write(",")
+                json.dump(conv, f)
+            f.write("]")
+        size_mb = export.stat().st_size / 1024 / 1024
+
+        start = time.perf_counter()
+        with open_export(export) as stream:
+            for element in iter_json_array(stream):
+                dedup.normalized_text(element.value)
+        text_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        exact = dedup.find_duplicates(export, near=False)
+        exact_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = dedup.find_duplicates(export)
+        near_time = time.perf_counter() - start
+
+    summary = report.to_dict()
+    print(
+        f"{report.conversations} conversations, {size_mb:.0f} MiB; "
+        f"{summary['exact_duplicates']} exact and {summary['near_duplicates']} "
+        f"near duplicates in {summary['groups']} groups"
+    )
+    print(f"parse + normalize text: {text_time:6.2f}s")
+    print(f"exact only:             {exact_time:6.2f}s ({len(exact.groups)} groups)")
+    print(
+        f"exact + near:           {near_time:6.2f}s "
+        f"({near_time - exact_time:.2f}s for MinHash and LSH)"
+    )
+
+
+if __name__ == "__main__":
+    main()
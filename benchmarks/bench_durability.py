@@ -0,0 +1,57 @@
+"""Time the per-file cost of each write durability mode.
+
+Writes the same small Markdown document many times to a directory on each
+given filesystem (default: /dev/shm for tmpfs and the system temp directory,
+usually a real disk).
+
+Usage: python benchmarks/bench_durability.py [n_files] [dir ...]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from claude_json2md.converter import write_markdown_file
+from claude_json2md.output import Durability, OutputOptions
+
+LINES = ["# Conversation", ""] + [f"Message {i} " + "text " * 40 for i in range(60)]
+
+
+def run(directory: Path, n_files: int, output: OutputOptions) -> float:
+    syncer = output.batch_sync(directory)
+    start = time.perf_counter()
+    for i in range(n_files):
+        path = directory / f"{i}.md"
+        write_markdown_file(path, LINES, "Bench", str(i), output)
+        if syncer is not None:
+            syncer.add(path)
+    if syncer is not None:
+        syncer.sync()
+    return (time.perf_counter() - start) / n_files
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    roots = [Path(arg) for arg in sys.argv[2:]] or [
+        Path("/dev/shm"),
+        Path(tempfile.gettempdir()),
+    ]
+    modes = [
+        ("none", OutputOptions()),
+        ("file", OutputOptions(durability=Durability.file)),
+        ("batch 32", OutputOptions(durability=Durability.batch, sync_every=32)),
+        ("batch 256", OutputOptions(durability=Durability.batch, sync_every=256)),
+    ]
+    print(f"{n_files} files of {len(chr(10).join(LINES))} bytes")
+    for root in roots:
+        if not root.is_dir():
+            continue
+        for label, output in modes:
+            with tempfile.TemporaryDirectory(dir=root) as tmp:
+                per_file = run(Path(tmp), n_files, output)
+            print(f"{str(root):12s} {label:10s} {per_file * 1e6:10.1f} us/file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Compare `cj2md inspect` estimates with a real conversion: the time each
+takes, and the estimated against the actual output size and run time.
+
+Usage: python benchmarks/bench_estimate.py [n_conversations] [n_messages]
+"""
+
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import make_conversation
+
+from claude_json2md.converter import json_to_markdown
+from claude_json2md.estimate import inspect_export
+
+
+def main():
+    n_conv = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    n_msgs = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    logging.getLogger("converter_app").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "export.json"
+        with export.open("w") as f:
+            f.write("[")
+            for i in range(n_conv):
+                conv = make_conversation(i, n_msgs, n_empty_leading=i % 3)
+                if i % 100 == 0:
+                    conv["name"] = ""
+                if i % 100 == 1:
+                    conv["chat_messages"] = conv["chat_messages"][:0]
+                if i:
+                    f.write(",")
+                json.dump(conv, f)
+            f.write("]")
+        size_mb = export.stat().st_size / 1024 / 1024
+
+        start = time.perf_counter()
+        report = inspect_export(export)
+        inspect_time = time.perf_counter() - start
+
+        output_dir = Path(tmp) / "out"
+        start = time.perf_counter()
+        json_to_markdown(export, output_dir, manifest=False)
+        convert_time = time.perf_counter() - start
+        written = sum(path.stat().st_size for path in output_dir.iterdir())
+        converted = sum(1 for _ in output_dir.iterdir())
+
+    print(f"{n_conv} conversations, {size_mb:.0f} MiB")
+    print(f"inspect:   {inspect_time:7.2f} s  ({report.sampled} sampled)")
+    print(f"convert:   {convert_time:7.2f} s")
+    print(f"processed: {report.processed} estimated, {converted} converted")
+    print(
+        f"output:    {report.estimated_output_bytes / 1024 / 1024:7.1f} MiB "
+        f"estimated, {written / 1024 / 1024:.1f} MiB written"
+    )
+    print(
+        f"time:      {report.estimated_seconds:7.2f} s estimated, "
+        f"{convert_time:.2f} s actual"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Compare rendering three formats in separate runs and from a single walk.
+
+Separate runs decode each conversation once per format, as running a tool
+per format does; the fan-out decodes and walks it once.
+
+Usage: python benchmarks/bench_formats.py [n_conversations] [n_messages]
+"""
+
+import json
+import sys
+import timeit
+from itertools import chain
+
+from synthetic import make_export
+
+from claude_json2md.converter import iter_format_blocks, split_formats
+from claude_json2md.renderers import OutputFormat
+
+FORMATS = (OutputFormat.markdown, OutputFormat.html, OutputFormat.text)
+
+
+def separate(raw):
+    for fmt in FORMATS:
+        for conv in json.loads(raw):
+            walk = iter_format_blocks(conv, conv["name"], formats=(fmt,))
+            "\n".join(chain.from_iterable(split_formats(walk, 1)[0]))
+
+
+def fan_out(raw):
+    for conv in json.loads(raw):
+        walk = iter_format_blocks(conv, conv["name"], formats=FORMATS)
+        for blocks in split_formats(walk, len(FORMATS)):
+            "\n".join(chain.from_iterable(blocks))
+
+
+def main():
+    n_conv = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    n_msgs = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    raw = json.dumps(make_export(n_conv, n_msgs))
+    print(f"{n_conv} conversations x {n_msgs} messages, {len(FORMATS)} formats")
+    t_separate = min(timeit.repeat(lambda: separate(raw), number=1, repeat=5))
+    t_fan_out = min(timeit.repeat(lambda: fan_out(raw), number=1, repeat=5))
+    print(
+        f"separate runs {t_separate * 1000:8.1f} ms   "
+        f"single walk {t_fan_out * 1000:8.1f} ms   ({t_separate / t_fan_out:4.2f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Time single-conversation rendering through the sidecar index against a
+full parse of the export.
+
+Usage: python benchmarks/bench_get.py [n_conversations] [n_messages]
+"""
+
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import make_conversation
+
+from claude_json2md.converter import convert_conversation, convert_iter
+from claude_json2md.export_index import build_index, open_index, read_conversations
+from claude_json2md.renderers import RenderOptions
+
+
+def main():
+    n_conv = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_msgs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    logging.getLogger("converter_app").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "export.json"
+        with export.open("w") as f:
+            f.write("[")
+            for i in range(n_conv):
+                if i:
+                    f.write(",")
+                json.dump(make_conversation(i, n_msgs), f)
+            f.write("]")
+        size_mb = export.stat().st_size / 1024 / 1024
+        target = make_conversation(n_conv * 3 // 4, n_msgs)["uuid"]
+
+        start = time.perf_counter()
+        for record in convert_iter(export):
+            if record.uuid == target:
+                full_text = record.text()
+                break
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_index(export).close()
+        index_time = time.perf_counter() - start
+
+        runs = 100
+        start = time.perf_counter()
+        for _ in range(runs):
+            with open_index(export) as index:
+                entries = index.select(target)
+            ((entry, conv),) = read_conversations(export, entries)
+            text = convert_conversation(conv, RenderOptions(), entry.position).text()
+        get_time = (time.perf_counter() - start) / runs
+        assert text == full_text
+
+    print(f"{n_conv} conversations, {size_mb:.0f} MiB")
+    print(f"full parse up to the conversation: {full_time * 1000:8.1f} ms")
+    print(f"one-time index:                    {index_time * 1000:8.1f} ms")
+    print(f"indexed get:                       {get_time * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
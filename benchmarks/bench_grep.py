@@ -0,0 +1,95 @@
+"""Time `cj2md grep` against converting the export and searching the
+Markdown, for a rare literal and a regex, streamed and indexed.
+
+Usage: python benchmarks/bench_grep.py [n_conversations] [n_messages] [workers]
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import make_conversation
+
+from claude_json2md.converter import convert_iter
+from claude_json2md.export_index import build_index
+from claude_json2md.grep import Matcher, grep_export
+
+NEEDLE = "zanzibar"
+
+
+def _timed(label: str, fn) -> float:
+    start = time.perf_counter()
+    found = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed * 1000:9.1f} ms  ({found} conversations)")
+    return elapsed
+
+
+def _grep_count(export: Path, matcher: Matcher, workers: int) -> int:
+    matches = grep_export(export, matcher, workers=workers, max_count=1)
+    return len({match.uuid for match in matches})
+
+
+def main():
+    n_conv = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    n_msgs = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 1
+    logging.getLogger("converter_app").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "export.json"
+        with export.open("w") as f:
+            f.write("[")
+            for i in range(n_conv):
+                conv = make_conversation(i, n_msgs)
+                if i % 500 == 0:
+                    conv["chat_messages"][-1]["content"].append(
+                        {"type": "text", "text": f"Off to {NEEDLE}."}
+                    )
+                if i:
+                    f.write(",")
+                json.dump(conv, f)
+            f.write("]")
+        size_mb = export.stat().st_size / 1024 / 1024
+        print(f"{n_conv} conversations, {size_mb:.0f} MiB, {workers} workers")
+
+        literal = Matcher(NEEDLE)
+        regex = Matcher(r"zanz\w+")
+        pattern = re.compile(NEEDLE)
+
+        def convert_and_search() -> int:
+            return sum(
+                1 for record in convert_iter(export) if pattern.search(record.text())
+            )
+
+        _timed("convert, then search the Markdown", convert_and_search)
+        _timed("grep literal, streamed", lambda: _grep_count(export, literal, 1))
+        _timed("grep regex, streamed", lambda: _grep_count(export, regex, 1))
+
+        def index() -> int:
+            with build_index(export) as built:
+                return len(built)
+
+        _timed("one-time index", index)
+        _timed(
+            "grep literal, indexed, 1 worker", lambda: _grep_count(export, literal, 1)
+        )
+        _timed("grep regex, indexed, 1 worker", lambda: _grep_count(export, regex, 1))
+        _timed(
+            f"grep regex, indexed, {workers} workers",
+            lambda: _grep_count(export, regex, workers),
+        )
+
+        start = time.perf_counter()
+        next(grep_export(export, regex, workers=workers))
+        elapsed = time.perf_counter() - start
+        print(f"{'first regex match, indexed':<36} {elapsed * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
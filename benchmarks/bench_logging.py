@@ -0,0 +1,144 @@
+"""Measure what logging costs the conversion hot path.
+
+1. A per-conversation debug call while the logger is at INFO: an eagerly
+   built f-string against deferred %-formatting.
+2. Caller-side time to emit DEBUG records to a file, with the file handler
+   called synchronously against behind a QueueHandler/QueueListener, on the
+   local disk and on a simulated slow disk (a sleep after every flush).
+3. A full conversion with the logger at INFO against logging disabled.
+
+Usage: python benchmarks/bench_logging.py [n_conversations] [n_messages]
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+from synthetic import make_export
+
+from claude_json2md.converter import json_to_markdown
+
+N_CALLS = 200_000
+SLOW_DISK_LATENCY = 0.0002  # Seconds per flush
+
+
+class _SlowDiskHandler(logging.FileHandler):
+    def flush(self):
+        super().flush()
+        time.sleep(SLOW_DISK_LATENCY)
+
+
+def bench_message_formatting(logger: logging.Logger) -> None:
+    logger.setLevel(logging.INFO)
+    name, uuid, path = "Conversation", "0000-1111", Path("/tmp/out.md")
+    eager = min(
+        timeit.repeat(
+            lambda: logger.debug(
+                f"Preparing to write Markdown for '{name}' (UUID: {uuid}) to {path}"
+            ),
+            number=N_CALLS,
+            repeat=3,
+        )
+    )
+    lazy = min(
+        timeit.repeat(
+            lambda: logger.debug(
+                "Preparing to write Markdown for '%s' (UUID: %s) to %s",
+                name,
+                uuid,
+                path,
+            ),
+            number=N_CALLS,
+            repeat=3,
+        )
+    )
+    print("debug call at INFO level (per call)")
+    print(f"  f-string   {eager / N_CALLS * 1e9:8.0f} ns")
+    print(f"  deferred   {lazy / N_CALLS * 1e9:8.0f} ns")
+
+
+def _time_records(
+    logger: logging.Logger, handler: logging.Handler, n: int, queued: bool
+) -> float:
+    """Seconds per record spent in the logging call itself."""
+    handler.setFormatter(
+        logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s"
+        )
+    )
+    listener = None
+    if queued:
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, handler)
+        attached: logging.Handler = logging.handlers.QueueHandler(log_queue)
+        listener.start()
+    else:
+        attached = handler
+    logger.addHandler(attached)
+    start = time.perf_counter()
+    for i in range(n):
+        logger.debug("Successfully wrote: %s (UUID: %s)", "file.md", i)
+    elapsed = time.perf_counter() - start
+    logger.removeHandler(attached)
+    if listener is not None:
+        listener.stop()
+    handler.close()
+    return elapsed / n
+
+
+def bench_file_handler(logger: logging.Logger, tmp: Path) -> None:
+    logger.setLevel(logging.DEBUG)
+    print("DEBUG records to a file (caller time per record)")
+    for label, handler_cls, n in (
+        ("local disk", logging.FileHandler, N_CALLS // 4),
+        ("slow disk", _SlowDiskHandler, 2_000),
+    ):
+        sync = _time_records(logger, handler_cls(tmp / "sync.log"), n, queued=False)
+        queued = _time_records(logger, handler_cls(tmp / "queued.log"), n, queued=True)
+        print(
+            f"  {label:10s}  synchronous {sync * 1e9:8.0f} ns   "
+            f"queued {queued * 1e9:8.0f} ns"
+        )
+
+
+def bench_conversion(logger: logging.Logger, tmp: Path, n_conv: int, n_msgs: int):
+    export = tmp / "export.json"
+    export.write_text(json.dumps(make_export(n_conv, n_msgs)))
+    output_dir = tmp / "out"
+    json_to_markdown(export, output_dir)
+
+    logger.setLevel(logging.INFO)
+    at_info = min(
+        timeit.repeat(lambda: json_to_markdown(export, output_dir), number=1, repeat=5)
+    )
+    logging.disable(logging.CRITICAL)
+    disabled = min(
+        timeit.repeat(lambda: json_to_markdown(export, output_dir), number=1, repeat=5)
+    )
+    logging.disable(logging.NOTSET)
+    print(f"conversion of {n_conv} conversations x {n_msgs} messages")
+    print(f"  logger at INFO    {at_info * 1000:8.1f} ms")
+    print(f"  logging disabled  {disabled * 1000:8.1f} ms")
+
+
+def main():
+    n_conv = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_msgs = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    logger = logging.getLogger("converter_app")
+    logger.propagate = False  # Keep the benchmark output on stdout only
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        bench_message_formatting(logger)
+        bench_file_handler(logger, tmp)
+        bench_conversion(logger, tmp, n_conv, n_msgs)
+
+
+if __name__ == "__main__":
+    main()
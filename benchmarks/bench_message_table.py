@@ -0,0 +1,47 @@
+"""Time the message table export and check that memory stays flat.
+
+Reports rows/s and the peak traced memory for growing exports; the peak
+should not grow with the export size.
+
+Usage: python benchmarks/bench_message_table.py [format] [batch_rows]
+"""
+
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from synthetic import make_export
+
+from claude_json2md.message_table import TableFormat, write_message_table
+
+
+def main():
+    fmt = TableFormat(sys.argv[1]) if len(sys.argv) > 1 else TableFormat.auto
+    batch_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 65536
+    logging.getLogger("converter_app").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for n_conv in (1000, 4000, 16000):
+            export = tmp / "export.json"
+            with export.open("w") as f:
+                json.dump(make_export(n_conv, 20), f)
+            table = tmp / "messages"
+            tracemalloc.start()
+            start = time.perf_counter()
+            rows = write_message_table(export, table, fmt, batch_rows)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"{n_conv:6d} conversations {rows:8d} rows "
+                f"{rows / elapsed:10.0f} rows/s  peak {peak / 1024 / 1024:6.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
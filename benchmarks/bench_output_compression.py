@@ -0,0 +1,61 @@
+"""Time writing plain and gzip-compressed Markdown, in-process and on a
+worker pool, and report the output size.
+
+Usage: python benchmarks/bench_output_compression.py [n_conversations] [n_messages] [workers]
+"""
+
+import json
+import logging
+import shutil
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from synthetic import make_export
+
+from claude_json2md.batch import batch_to_markdown
+from claude_json2md.converter import json_to_markdown
+from claude_json2md.output import OutputOptions
+
+
+def main():
+    n_conv = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_msgs = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    logging.getLogger("converter_app").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        export = tmp / "export.json"
+        export.write_text(json.dumps(make_export(n_conv, n_msgs)))
+        output_dir = tmp / "out"
+
+        def size() -> int:
+            return sum(p.stat().st_size for p in output_dir.glob("*.md*"))
+
+        print(f"{n_conv} conversations x {n_msgs} messages, {workers} workers")
+        for label, output in [
+            ("plain", OutputOptions()),
+            ("gzip -1", OutputOptions("gzip", 1)),
+            ("gzip -6", OutputOptions("gzip")),
+        ]:
+            for mode, run in [
+                ("1 process", lambda: json_to_markdown(export, output_dir, output=output)),
+                (
+                    f"{workers} workers",
+                    lambda: batch_to_markdown(
+                        [export], output_dir, workers=workers, output=output
+                    ),
+                ),
+            ]:
+                shutil.rmtree(output_dir, ignore_errors=True)
+                best = min(timeit.repeat(run, number=1, repeat=3))
+                print(
+                    f"{label:8s} {mode:10s} {best * 1000:8.1f} ms "
+                    f"{size() / 1024 / 1024:8.1f} MiB"
+                )
+
+
+if __name__ == "__main__":
+    main()
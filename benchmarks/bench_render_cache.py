@@ -0,0 +1,53 @@
+"""Time a conversion without the render cache, with a cold cache and with a
+warm one.
+
+Usage: python benchmarks/bench_render_cache.py [n_conversations] [n_messages]
+"""
+
+import json
+import logging
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from synthetic import make_export
+
+from claude_json2md.cache import RenderCache
+from claude_json2md.converter import json_to_markdown
+
+
+def main():
+    n_conv = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_msgs = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    logging.getLogger("converter_app").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        export = tmp / "export.json"
+        export.write_text(json.dumps(make_export(n_conv, n_msgs)))
+        output_dir = tmp / "out"
+        json_to_markdown(export, output_dir)  # Create the output files once
+
+        def run(cache=None):
+            json_to_markdown(export, output_dir, cache=cache)
+
+        def cold():
+            cache = RenderCache(tmp / "cache")
+            cache.clear()
+            run(cache)
+
+        warm_cache = RenderCache(tmp / "cache")
+        timings = {
+            "no cache": lambda: run(),
+            "cold cache": cold,
+            "warm cache": lambda: run(warm_cache),
+        }
+        print(f"{n_conv} conversations x {n_msgs} messages")
+        for label, fn in timings.items():
+            best = min(timeit.repeat(fn, number=1, repeat=5))
+            print(f"{label:12s} {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
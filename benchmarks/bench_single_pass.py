@@ -0,0 +1,89 @@
+"""Compare the two-pass (check, then render) and single-pass render paths.
+
+The two-pass path checks ``has_meaningful_content`` and then builds the
+whole document with ``generate_markdown_content``; the single pass writes
+``iter_markdown_blocks(skip_empty=True)`` block by block, never holding
+the whole document. Both are timed, then the peak memory of writing the
+largest conversation is measured with tracemalloc.
+
+Usage: python benchmarks/bench_single_pass.py [n_conversations] [n_messages]
+"""
+
+import gc
+import io
+import sys
+import timeit
+import tracemalloc
+
+from synthetic import make_export
+
+from claude_json2md.converter import (
+    generate_markdown_content,
+    has_meaningful_content,
+    iter_markdown_blocks,
+)
+
+
+class _NullWriter(io.TextIOBase):
+    """Discards what is written, like a file that isn't kept in memory."""
+
+    def write(self, text):
+        return len(text)
+
+
+def two_pass(conversations, out):
+    for conv in conversations:
+        if has_meaningful_content(conv["chat_messages"]):
+            out.write("\n".join(generate_markdown_content(conv, conv["name"])))
+
+
+def single_pass(conversations, out):
+    for conv in conversations:
+        blocks = iter_markdown_blocks(conv, conv["name"], skip_empty=True)
+        first = next(blocks, None)
+        if first is not None:
+            out.write("\n".join(first))
+            for block in blocks:
+                out.write("\n" + "\n".join(block))
+
+
+def _peak_kib(path, conversations) -> float:
+    gc.collect()
+    tracemalloc.start()
+    path(conversations, _NullWriter())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    n_conv = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    n_msgs = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    scenarios = {
+        "content from first message": make_export(n_conv, n_msgs),
+        "half the messages empty": make_export(
+            n_conv, n_msgs, n_empty_leading=n_msgs // 2
+        ),
+        "all messages empty": make_export(n_conv, n_msgs, n_empty_leading=n_msgs),
+    }
+    out = _NullWriter()
+    print(f"{n_conv} conversations x {n_msgs} messages")
+    for label, conversations in scenarios.items():
+        # Interleave the runs so that both paths see the same machine load
+        t_two = t_one = float("inf")
+        for _ in range(9):
+            t = timeit.timeit(lambda: two_pass(conversations, out), number=1)
+            t_two = min(t_two, t)
+            t = timeit.timeit(lambda: single_pass(conversations, out), number=1)
+            t_one = min(t_one, t)
+        largest = [max(conversations, key=lambda c: len(c["chat_messages"]))]
+        m_two = _peak_kib(two_pass, largest)
+        m_one = _peak_kib(single_pass, largest)
+        print(
+            f"{label:28s} two-pass {t_two * 1000:7.1f} ms {m_two:7.0f} KiB   "
+            f"single-pass {t_one * 1000:7.1f} ms {m_one:7.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Time the SQLite backend: raw upserts of pre-rendered conversations (first
+load and an unchanged refresh) and a full conversion.
+
+Usage: python benchmarks/bench_sqlite.py [n_conversations] [n_messages] [batch_size]
+"""
+
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import make_export
+
+from claude_json2md.converter import convert_iter, json_to_sqlite
+from claude_json2md.sqlite_store import SqliteWriter
+
+
+def main():
+    n_conv = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    n_msgs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    logging.getLogger("converter_app").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory(dir=Path.cwd()) as tmp:
+        tmp = Path(tmp)
+        export = tmp / "export.json"
+        export.write_text(json.dumps(make_export(n_conv, n_msgs)))
+        rendered = [
+            (r.conversation, r.text(), r.filename, r.digest)
+            for r in convert_iter(export, with_digest=True)
+            if r.lines is not None
+        ]
+        db_path = tmp / "conversations.db"
+        print(
+            f"{len(rendered)} conversations x {n_msgs} messages, "
+            f"batches of {batch_size}"
+        )
+        for label in ("first load", "unchanged refresh"):
+            start = time.perf_counter()
+            with SqliteWriter(db_path, batch_size) as writer:
+                for args in rendered:
+                    writer.add(*args)
+            elapsed = time.perf_counter() - start
+            print(f"{label:18s} {len(rendered) / elapsed:10.0f} conversations/s")
+
+        db_path.unlink()
+        start = time.perf_counter()
+        json_to_sqlite(export, db_path, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{'end to end':18s} {len(rendered) / elapsed:10.0f} conversations/s")
+
+
+if __name__ == "__main__":
+    main()
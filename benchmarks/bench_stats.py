@@ -0,0 +1,68 @@
+"""Time ``cj2md stats``: the streaming pass (parsing and feature
+extraction) and the vectorized summary.
+
+Usage: python benchmarks/bench_stats.py [n_conversations] [n_messages]
+"""
+
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from synthetic import make_conversation
+
+from claude_json2md import stats
+from claude_json2md.reader import iter_json_array, open_export
+
+
+def main():
+    n_conv = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_msgs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    logging.getLogger("converter_app").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "export.json"
+        with export.open("w") as f:
+            f.write("[")
+            for i in range(n_conv):
+                if i:
+                    f.write(",")
+                json.dump(make_conversation(i, n_msgs), f)
+            f.write("]")
+        size_mb = export.stat().st_size / 1024 / 1024
+
+        start = time.perf_counter()
+        with open_export(export) as stream:
+            for _ in iter_json_array(stream):
+                pass
+        parse_time = time.perf_counter() - start
+
+        summary_time = 0.0
+        summarize = stats._summarize
+
+        def timed_summarize(*args):
+            nonlocal summary_time
+            start = time.perf_counter()
+            result = summarize(*args)
+            summary_time = time.perf_counter() - start
+            return result
+
+        with mock.patch.object(stats, "_summarize", timed_summarize):
+            start = time.perf_counter()
+            report = stats.collect_stats(export)
+            total = time.perf_counter() - start
+
+    print(
+        f"{report['conversations']} conversations, "
+        f"{report['messages']} messages, {size_mb:.0f} MiB"
+    )
+    print(f"parse only      {parse_time:8.2f} s")
+    print(f"streaming pass  {total - summary_time:8.2f} s")
+    print(f"summary         {summary_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
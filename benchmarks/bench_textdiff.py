@@ -0,0 +1,39 @@
+"""Time unified diffs of tool edits, from typical to pathological.
+
+Each case reports how long rendering the diff took and whether it stayed
+within the budget or fell back to the truncated listing.
+
+Usage: python benchmarks/bench_textdiff.py
+"""
+
+import random
+import timeit
+
+from claude_json2md.textdiff import unified_diff
+
+
+def _lines(rng, n):
+    return [f"line {rng.randrange(10**6)} " + "x" * rng.randrange(60) for _ in range(n)]
+
+
+def main():
+    rng = random.Random(0)
+    base = _lines(rng, 10_000)
+    edited = list(base)
+    for i in [12] + rng.sample(range(len(base)), 19):
+        edited[i] = "changed"
+    cases = {
+        "small str_replace": ("\n".join(base[:30]), "\n".join(edited[:30])),
+        "20 edits in 10k lines": ("\n".join(base), "\n".join(edited)),
+        "rewrite of 5k lines": ("\n".join(base[:5000]), "\n".join(_lines(rng, 5000))),
+        "3 MB replacement": ("\n".join(base * 3), "\n".join(_lines(rng, 60_000))),
+    }
+    for label, (old, new) in cases.items():
+        diff = unified_diff(old, new)
+        elapsed = min(timeit.repeat(lambda: unified_diff(old, new), number=1, repeat=3))
+        outcome = "fallback" if diff is None else f"{len(diff)} diff lines"
+        print(f"{label:24s} {elapsed * 1000:8.1f} ms   {outcome}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Load test for `cj2md serve`: throughput and latency percentiles.
+
+Start the server first (e.g. `cj2md serve --workers 4`), then run:
+
+    python benchmarks/loadtest_server.py --requests 200 --concurrency 8
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from synthetic import make_export
+
+
+def post(url: str, body: bytes) -> tuple[float, int, int]:
+    """Sends one upload; returns (latency, status, response line count)."""
+    parts = urlsplit(url)
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=300)
+    try:
+        conn.request("POST", parts.path + (f"?{parts.query}" if parts.query else ""), body)
+        response = conn.getresponse()
+        data = response.read()
+    finally:
+        conn.close()
+    return time.perf_counter() - started, response.status, data.count(b"\n")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8765/convert")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=50)
+    args = parser.parse_args()
+
+    body = json.dumps(make_export(args.conversations, args.messages)).encode()
+    print(
+        f"{args.requests} requests x {len(body) / 1e6:.2f} MB "
+        f"({args.conversations} conversations), concurrency {args.concurrency}"
+    )
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(lambda _: post(args.url, body), range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, status, _ in results if status == 200]
+    failures = sum(1 for _, status, _ in results if status != 200)
+    conversations = sum(lines for _, status, lines in results if status == 200)
+    if not latencies:
+        print(f"All {failures} requests failed.")
+        return
+    print(f"elapsed        {elapsed:8.2f} s   failures {failures}")
+    print(f"throughput     {len(latencies) / elapsed:8.1f} req/s")
+    print(f"               {conversations / elapsed:8.1f} conversations/s")
+    print(f"               {len(body) * len(latencies) / elapsed / 1e6:8.1f} MB/s in")
+    print(f"latency p50    {statistics.median(latencies) * 1000:8.1f} ms")
+    print(f"latency p99    {percentile(latencies, 99) * 1000:8.1f} ms")
+    print(f"latency max    {max(latencies) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Synthetic Claude export data for benchmarks."""
+
+import random
+
+_WORDS = (
+    "python markdown export claude conversation render message thinking tool "
+    "search artifact citation summary stream buffer parse token output index"
+).split()
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n_words)).capitalize() + "."
+
+
+def make_message(rng: random.Random, idx: int, empty: bool = False) -> dict:
+    """Build one chat message with a mix of content types."""
+    sender = "human" if idx % 2 == 0 else "assistant"
+    if empty:
+        return {"sender": sender, "created_at": "N/A", "text": "", "content": []}
+    content = [{"type": "text", "text": _sentence(rng, rng.randint(20, 80))}]
+    if sender == "assistant":
+        if rng.random() < 0.3:
+            content.insert(0, {"type": "thinking", "thinking": _sentence(rng, 40)})
+        if rng.random() < 0.2:
+            content.append(
+                {
+                    "type": "tool_use",
+                    "name": "web_search",
+                    "input": {"query": _sentence(rng, 4)},
+                }
+            )
+            content.append(
+                {"type": "tool_result", "name": "web_search", "content": "ok"}
+            )
+        if rng.random() < 0.2:
+            content[-1]["citations"] = [{"url": f"https://example.com/{idx}"}]
+    return {
+        "uuid": f"msg-{idx}",
+        "sender": sender,
+        "created_at": f"2024-01-01T10:{idx % 60:02d}:00Z",
+        "text": "",
+        "content": content,
+    }
+
+
+def make_conversation(
+    seed: int, n_messages: int = 200, n_empty_leading: int = 0
+) -> dict:
+    """Build one conversation, optionally starting with empty messages."""
+    rng = random.Random(seed)
+    messages = [make_message(rng, i, empty=True) for i in range(n_empty_leading)]
+    messages += [
+        make_message(rng, i) for i in range(n_empty_leading, n_messages)
+    ]
+    month = seed % 12 + 1
+    return {
+        "uuid": f"{seed:08x}-0000-4000-8000-{seed:012x}",
+        "name": f"Synthetic conversation {seed}",
+        "created_at": f"2024-{month:02d}-01T10:00:00Z",
+        "updated_at": f"2024-{month:02d}-02T10:00:00Z",
+        "summary": _sentence(rng, 30),
+        "chat_messages": messages,
+    }
+
+
+def make_export(n_conversations: int, n_messages: int = 200, **kwargs) -> list:
+    """Build a list of synthetic conversations."""
+    return [
+        make_conversation(i, n_messages, **kwargs) for i in range(n_conversations)
+    ]
@@ -0,0 +1,14 @@
+"""Convert Claude conversation exports to Markdown."""
+
+from .converter import ConversionRecord, convert_iter, json_to_markdown
+from .reader import ExportFormatError
+from .renderers import OutputFormat, RenderOptions
+
+__all__ = [
+    "ConversionRecord",
+    "ExportFormatError",
+    "OutputFormat",
+    "RenderOptions",
+    "convert_iter",
+    "json_to_markdown",
+]
@@ -0,0 +1,443 @@
+"""Batch conversion of several exports with cross-file uuid deduplication.
+
+Exports taken over time repeat most conversations. A first streaming pass
+indexes every conversation as uuid -> (source, updated_at, byte offset) and
+keeps only the newest version of each; the second pass renders just those,
+once each, on a shared worker pool. Workers read uncompressed exports
+directly at the indexed byte offsets, so the main process does not parse
+them a second time.
+"""
+
+import json
+import logging
+import os
+from array import array
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from datetime import datetime
+from hashlib import blake2b
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional, Sequence
+
+from .cache import RenderCache
+from .converter import (
+    STATUS_CONVERTED,
+    STATUS_SKIPPED_EMPTY_NAME,
+    STATUS_SKIPPED_NO_CONTENT,
+    STATUS_SKIPPED_OVERSIZED,
+    convert_conversation,
+    skip_slow_record,
+    write_conversation_files,
+)
+from .guards import (
+    ConversationLimits,
+    OversizedEntry,
+    RenderTimeout,
+    write_oversized_report,
+)
+from .index_pages import update_index_pages
+from .manifest import ManifestEntry, ManifestWriter
+from .output import OutputOptions
+from .progress import ProgressReporter
+from .reader import DIGEST_SIZE, iter_json_array, is_plain_file, open_export
+from .renderers import RenderOptions
+
+logger = logging.getLogger("converter_app")
+
+_KEY_BYTES = 12  # 96-bit uuid digests; collisions are negligible at 10^7 uuids
+
+
+def uuid_key(uuid: str) -> bytes:
+    """Compact fixed-size dictionary key for a conversation uuid."""
+    return blake2b(uuid.encode("utf-8"), digest_size=_KEY_BYTES).digest()
+
+
+def parse_timestamp(value) -> int:
+    """Converts an ISO 8601 timestamp to epoch microseconds (0 if invalid)."""
+    if not isinstance(value, str) or not value:
+        return 0
+    try:
+        # Python < 3.11 does not accept a trailing "Z"
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return 0
+    return int(parsed.timestamp() * 1_000_000)
+
+
+class ConversationIndex:
+    """uuid -> (source, updated_at, byte offset) index of the newest versions.
+
+    Entries live in parallel typed arrays (30 bytes each) plus a dict from a
+    12-byte uuid digest to the entry's slot, roughly 150 bytes per uuid in
+    total, so millions of uuids fit comfortably in memory.
+    """
+
+    def __init__(self):
+        self._slots: dict[bytes, int] = {}
+        self.sources = array("H")
+        self.updated = array("q")
+        self.offsets = array("q")
+        self.lengths = array("q")
+        self.positions = array("I")  # Element index within its export
+        self.seen = 0  # Conversations added, including superseded versions
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def add(
+        self,
+        uuid: Optional[str],
+        source: int,
+        updated_at,
+        offset: int,
+        length: int,
+        position: int,
+    ) -> None:
+        """Records a conversation, keeping it only if it is the newest version.
+
+        On equal ``updated_at`` the later source wins. Conversations without
+        a uuid can't be matched and are always kept.
+        """
+        self.seen += 1
+        key = uuid_key(uuid if uuid else f"\0{source}:{position}")
+        timestamp = parse_timestamp(updated_at)
+        slot = self._slots.get(key)
+        if slot is None:
+            self._slots[key] = len(self.sources)
+            self.sources.append(source)
+            self.updated.append(timestamp)
+            self.offsets.append(offset)
+            self.lengths.append(length)
+            self.positions.append(position)
+        elif timestamp >= self.updated[slot]:
+            self.sources[slot] = source
+            self.updated[slot] = timestamp
+            self.offsets[slot] = offset
+            self.lengths[slot] = length
+            self.positions[slot] = position
+
+    def entries_for(self, source: int) -> list[tuple[int, int, int]]:
+        """(offset, length, position) of the kept entries of one source, in
+        file order."""
+        return sorted(
+            (self.offsets[slot], self.lengths[slot], self.positions[slot])
+            for slot in range(len(self.sources))
+            if self.sources[slot] == source
+        )
+
+
+def build_index(sources: Sequence[Path]) -> ConversationIndex:
+    """First pass: streams every export and indexes its conversations."""
+    index = ConversationIndex()
+    for source_id, path in enumerate(sources):
+        with open_export(path) as stream:
+            for position, element in enumerate(iter_json_array(stream)):
+                conv = element.value
+                uuid = conv.get("uuid") if isinstance(conv, dict) else None
+                updated_at = conv.get("updated_at") if isinstance(conv, dict) else None
+                index.add(
+                    uuid,
+                    source_id,
+                    updated_at,
+                    element.offset,
+                    element.length,
+                    position,
+                )
+        logger.debug(f"Indexed {path} ({index.seen} conversations so far)")
+    return index
+
+
+@dataclass
+class _RenderTask:
+    """One conversation to render: either read from ``path`` at ``offset``
+    by the worker, or already decoded into ``conversation``."""
+
+    path: str
+    offset: int
+    length: int
+    position: int
+    conversation: Optional[dict] = None
+    digest: Optional[bytes] = None
+
+
+# Render cache of the current worker process, set up by _init_worker
+_worker_cache: Optional[RenderCache] = None
+
+
+def _init_worker(cache_dir: Optional[Path], cache_max_bytes: int) -> None:
+    global _worker_cache
+    _worker_cache = RenderCache(cache_dir, cache_max_bytes) if cache_dir else None
+
+
+class _TaskResult(NamedTuple):
+    status: str
+    written: bool
+    cache_hits: int
+    cache_misses: int
+    manifest_entry: Optional[ManifestEntry]
+    paths: tuple[str, ...] = ()  # Written files, relative to the output directory
+    oversized: Optional[OversizedEntry] = None  # Skipped or truncated by the limits
+
+
+def _render_task(
+    task: _RenderTask,
+    output_dir: Path,
+    options: RenderOptions,
+    output: OutputOptions,
+    limits: Optional[ConversationLimits] = None,
+) -> _TaskResult:
+    """Worker: loads, renders and writes one conversation within ``limits``."""
+    conv = task.conversation
+    digest = task.digest
+    if conv is None:
+        with open(task.path, "rb") as f:
+            f.seek(task.offset)
+            raw = f.read(task.length)
+        conv = json.loads(raw)
+        digest = blake2b(raw, digest_size=DIGEST_SIZE).digest()
+    cache = _worker_cache
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    record = convert_conversation(
+        conv,
+        options,
+        task.position,
+        digest=digest,
+        cache=cache,
+        formats=output.formats,
+        length=task.length,
+        limits=limits,
+    )
+    paths = []
+    entry = None
+    if record.status == STATUS_CONVERTED:
+        try:
+            paths = write_conversation_files(output_dir, record, output, options)
+        except RenderTimeout:
+            skip_slow_record(record)
+        if paths:
+            entry = ManifestEntry.for_conversation(
+                conv,
+                paths[0].name,
+                sum(path.stat().st_size for path in paths),
+                digest,
+            )
+    if cache is not None:
+        hits, misses = cache.hits - hits, cache.misses - misses
+    return _TaskResult(
+        record.status,
+        bool(paths),
+        hits,
+        misses,
+        entry,
+        tuple(path.name for path in paths),
+        record.oversized,
+    )
+
+
+def _iter_tasks(
+    sources: Sequence[Path], index: ConversationIndex
+) -> Iterator[_RenderTask]:
+    """Second pass: yields the kept conversations, source by source."""
+    for source_id, path in enumerate(sources):
+        entries = index.entries_for(source_id)
+        if not entries:
+            continue
+        if is_plain_file(path):
+            for offset, length, position in entries:
+                yield _RenderTask(str(path), offset, length, position)
+            continue
+        # Compressed exports can't be seeked into; stream them again and
+        # pick out the kept conversations by offset.
+        wanted = {offset for offset, _, _ in entries}
+        with open_export(path) as stream:
+            elements = iter_json_array(stream, with_digest=True)
+            for position, element in enumerate(elements):
+                if element.offset in wanted:
+                    yield _RenderTask(
+                        str(path),
+                        element.offset,
+                        element.length,
+                        position,
+                        conversation=element.value,
+                        digest=element.digest,
+                    )
+
+
+class _InlineExecutor(Executor):
+    """Runs tasks immediately in the calling process (``--workers 1``)."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def batch_to_markdown(
+    sources: Sequence[Path],
+    output_dir: Path,
+    limit: Optional[int] = None,
+    options: Optional[RenderOptions] = None,
+    workers: Optional[int] = None,
+    cache: Optional[RenderCache] = None,
+    progress: Optional[ProgressReporter] = None,
+    manifest: bool = True,
+    index_pages: bool = False,
+    output: Optional[OutputOptions] = None,
+    limits: Optional[ConversationLimits] = None,
+) -> None:
+    """
+    Converts several exports into one output directory, rendering only the
+    newest version of each conversation (by ``updated_at``) exactly once.
+    ``workers`` sets the size of the render pool (default: CPU count); each
+    worker opens its own handle on the ``cache`` directory, if given.
+    ``progress`` follows the render pass, measured in conversations.
+    Written files are recorded in the manifest unless ``manifest`` is False;
+    ``index_pages`` then also refreshes the navigation pages. Rendering and
+    the compression selected by ``output`` both run in the workers, as do
+    the ``limits`` checks; oversized conversations are listed in
+    ``oversized.jsonl``.
+    """
+    if options is None:
+        options = RenderOptions()
+    if output is None:
+        output = OutputOptions()
+    workers = workers or os.cpu_count() or 1
+    logger.info(
+        f"Starting batch conversion of {len(sources)} exports. Output dir: '{output_dir}', Workers: {workers}, Limit: {limit}"
+    )
+    try:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.exception(f"Error creating output directory {output_dir}: {e}")
+        return
+
+    try:
+        index = build_index(sources)
+    except (OSError, ValueError, EOFError) as e:
+        # ValueError covers JSONDecodeError and ExportFormatError
+        logger.error(f"Error: Could not index exports: {e}")
+        return
+    duplicate_count = index.seen - len(index)
+    logger.info(
+        f"Indexed {index.seen} conversations, {len(index)} unique ({duplicate_count} older duplicates)."
+    )
+
+    counts = {
+        STATUS_CONVERTED: 0,
+        STATUS_SKIPPED_EMPTY_NAME: 0,
+        STATUS_SKIPPED_NO_CONTENT: 0,
+        STATUS_SKIPPED_OVERSIZED: 0,
+    }
+    oversized: list[OversizedEntry] = []
+    truncated_count = 0
+    failed_write_count = 0
+    cache_hits = cache_misses = 0
+    done_count = bytes_done = 0
+    max_in_flight = 4 * workers
+    if progress is not None:
+        progress.total_conversations = (
+            len(index) if limit is None else min(limit, len(index))
+        )
+
+    init_args = (cache.directory, cache.max_bytes) if cache else (None, 0)
+    if workers == 1:
+        _init_worker(*init_args)
+        executor = _InlineExecutor()
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=init_args
+        )
+    with ExitStack() as stack:
+        stack.enter_context(executor)
+        if progress is not None:
+            stack.callback(progress.stop)
+        syncer = output.batch_sync(output_dir)
+        if syncer is not None:
+            stack.callback(syncer.sync)
+        manifest_writer = None
+        if manifest:
+            try:
+                manifest_writer = stack.enter_context(ManifestWriter(output_dir))
+            except OSError as e:
+                logger.warning(f"Could not open the manifest in {output_dir}: {e}")
+        pending: deque[tuple[Future, int]] = deque()
+
+        def skipped() -> int:
+            return (
+                counts[STATUS_SKIPPED_EMPTY_NAME]
+                + counts[STATUS_SKIPPED_NO_CONTENT]
+                + counts[STATUS_SKIPPED_OVERSIZED]
+            )
+
+        def collect(item: tuple[Future, int]) -> None:
+            nonlocal failed_write_count, truncated_count, cache_hits, cache_misses
+            nonlocal done_count, bytes_done
+            future, length = item
+            result: _TaskResult = future.result()
+            counts[result.status] += 1
+            if result.status == STATUS_CONVERTED and not result.written:
+                failed_write_count += 1
+            elif result.oversized is not None:
+                oversized.append(result.oversized)
+                if result.status == STATUS_CONVERTED:
+                    truncated_count += 1
+            cache_hits += result.cache_hits
+            cache_misses += result.cache_misses
+            if syncer is not None:
+                for path in result.paths:
+                    syncer.add(output_dir / path)
+            if manifest_writer is not None and result.manifest_entry is not None:
+                manifest_writer.add(result.manifest_entry)
+            done_count += 1
+            bytes_done += length
+            if progress is not None:
+                progress.update(done_count, bytes_done, skipped(), failed_write_count)
+
+        tasks = _iter_tasks(sources, index)
+        try:
+            for submitted, task in enumerate(tasks):
+                if limit is not None and submitted >= limit:
+                    break
+                future = executor.submit(
+                    _render_task, task, output_dir, options, output, limits
+                )
+                pending.append((future, task.length))
+                if len(pending) >= max_in_flight:
+                    collect(pending.popleft())
+            while pending:
+                collect(pending.popleft())
+        except (OSError, ValueError, EOFError) as e:
+            logger.error(f"Error: Could not read exports during rendering: {e}")
+            for future, _ in pending:
+                future.cancel()
+            return
+        if progress is not None:
+            progress.close(done_count, bytes_done, skipped(), failed_write_count)
+
+    if index_pages and manifest_writer is not None:
+        update_index_pages(
+            output_dir, manifest_writer.previous, manifest_writer.entries
+        )
+
+    processed_count = counts[STATUS_CONVERTED] - failed_write_count
+    summary_msg = (
+        f"Finished processing. Processed: {processed_count}. "
+        f"Skipped (empty name): {counts[STATUS_SKIPPED_EMPTY_NAME]}. "
+        f"Skipped (no content): {counts[STATUS_SKIPPED_NO_CONTENT]}. "
+        f"Skipped (older duplicate): {duplicate_count}. "
+    )
+    if limits is not None:
+        summary_msg += (
+            f"Skipped (oversized): {counts[STATUS_SKIPPED_OVERSIZED]}. "
+            f"Truncated: {truncated_count}. "
+        )
+        write_oversized_report(output_dir, oversized)
+    summary_msg += f"Failed writes: {failed_write_count}."
+    if cache is not None:
+        summary_msg += f" Cache hits: {cache_hits}. Cache misses: {cache_misses}."
+    logger.info(summary_msg)
@@ -0,0 +1,199 @@
+"""On-disk cache of rendered Markdown.
+
+Entries are keyed by the conversation's content digest, a fingerprint of the
+``RenderOptions`` and the converter version, so rerunning an export with the
+same flags reuses earlier renders while any change to the conversation, the
+flags or the converter renders afresh. The cache is bounded in size; the
+least recently used entries are evicted first.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict, astuple, dataclass
+from hashlib import blake2b
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from platformdirs import user_cache_dir
+
+from .log_setup import APP_AUTHOR, APP_NAME
+from .renderers import RenderOptions
+
+logger = logging.getLogger("converter_app")
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CACHE_FORMAT = 1  # Bump when the entry layout changes
+_ENTRY_SUFFIX = ".md"
+
+
+def default_cache_dir() -> Path:
+    return Path(user_cache_dir(APP_NAME, appauthor=APP_AUTHOR)) / "render-cache"
+
+
+def _converter_version() -> str:
+    try:
+        return version("claude-json-to-markdown")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def options_fingerprint(options: RenderOptions) -> bytes:
+    """Stable digest of the render options and the converter version."""
+    payload = json.dumps(
+        {
+            "options": asdict(options),
+            "version": _converter_version(),
+            "format": CACHE_FORMAT,
+        },
+        sort_keys=True,
+    )
+    return blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+
+@dataclass
+class CacheStats:
+    directory: Path
+    entries: int
+    total_bytes: int
+    max_bytes: int
+
+
+class RenderCache:
+    """Size-bounded LRU store of rendered Markdown documents.
+
+    Each entry is one file named after its key. Reads refresh the file's
+    modification time, which serves as the LRU clock, and writes go through
+    a temporary file and ``os.replace`` so concurrent runs never see partial
+    entries.
+    """
+
+    def __init__(
+        self, directory: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._sizes: Optional[dict[Path, int]] = None  # Loaded on first write
+        self._total_bytes = 0
+        self._fingerprints: dict[tuple, bytes] = {}
+
+    def key(self, digest: bytes, options: RenderOptions) -> str:
+        """Cache key of a conversation (by content digest) rendered with
+        ``options``."""
+        options_key = astuple(options)
+        fingerprint = self._fingerprints.get(options_key)
+        if fingerprint is None:
+            fingerprint = self._fingerprints[options_key] = options_fingerprint(options)
+        return blake2b(digest + fingerprint, digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / (key + _ENTRY_SUFFIX)
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached document for ``key``, counting a hit or miss."""
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except OSError as e:
+            logger.warning(f"Could not read cache entry {path}: {e}")
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # Evicted concurrently; the text is still valid
+        self.hits += 1
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Stores a document, evicting old entries beyond ``max_bytes``."""
+        path = self._path(key)
+        data = text.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        tmp_name = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {path}: {e}")
+            if tmp_name is not None:
+                Path(tmp_name).unlink(missing_ok=True)
+            return
+        sizes = self._load_sizes()
+        self._total_bytes += len(data) - sizes.get(path, 0)
+        sizes[path] = len(data)
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def record_blocks(
+        self, key: str, blocks: Iterable[list[str]]
+    ) -> Iterator[list[str]]:
+        """Passes ``blocks`` of lines through and stores the document once
+        they have all been consumed."""
+        seen = []
+        for block in blocks:
+            seen.extend(block)
+            yield block
+        self.put(key, "\n".join(seen))
+
+    def _entries(self) -> Iterator[os.DirEntry]:
+        if not self.directory.is_dir():
+            return
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(_ENTRY_SUFFIX):
+                    yield entry
+
+    def _load_sizes(self) -> dict[Path, int]:
+        if self._sizes is None:
+            self._sizes = {}
+            for entry in self._entries():
+                self._sizes[Path(entry.path)] = entry.stat().st_size
+            self._total_bytes = sum(self._sizes.values())
+        return self._sizes
+
+    def _evict(self) -> None:
+        """Deletes least recently used entries down to 90% of the bound."""
+        target = self.max_bytes * 9 // 10
+        by_age = []
+        for path in list(self._sizes):
+            try:
+                by_age.append((path.stat().st_mtime, path))
+            except FileNotFoundError:  # Removed by another run
+                self._total_bytes -= self._sizes.pop(path)
+        by_age.sort()
+        evicted = 0
+        for _, path in by_age:
+            if self._total_bytes <= target:
+                break
+            path.unlink(missing_ok=True)
+            self._total_bytes -= self._sizes.pop(path)
+            evicted += 1
+        logger.debug(f"Evicted {evicted} render cache entries.")
+
+    def stats(self) -> CacheStats:
+        sizes = [entry.stat().st_size for entry in self._entries()]
+        return CacheStats(self.directory, len(sizes), sum(sizes), self.max_bytes)
+
+    def clear(self) -> int:
+        """Deletes every entry and returns how many were removed."""
+        removed = 0
+        for entry in list(self._entries()):
+            Path(entry.path).unlink(missing_ok=True)
+            removed += 1
+        self._sizes = None
+        self._total_bytes = 0
+        return removed
@@ -1,43 +1,58 @@
+import glob
+import json
 import typer
+from typer.core import TyperGroup
 from pathlib import Path
 from typing import Optional
 import logging
+import os
+import re
+import sqlite3
+import sys
 
 from .log_setup import setup_logging, DEFAULT_LOG_FILENAME
-from .converter import json_to_markdown
-from .renderers import RenderOptions
+from .batch import batch_to_markdown
+from .cache import DEFAULT_MAX_BYTES, RenderCache
+from .converter import json_to_markdown, json_to_sqlite, json_to_stream
+from .dedup import DEFAULT_THRESHOLD, DuplicateMode
+from .guards import OVERSIZED_FILENAME, ConversationLimits, OversizedAction
+from .manifest import MANIFEST_FILENAME
+from .message_table import DEFAULT_BATCH_ROWS, TableFormat, write_message_table
+from .output import (
+    DEFAULT_SYNC_EVERY,
+    Durability,
+    OutputCompression,
+    OutputOptions,
+)
+from .progress import DEFAULT_INTERVAL, ProgressMode, create_progress
+from .renderers import OutputFormat, RenderOptions
+from .sqlite_store import DEFAULT_BATCH_SIZE
 
-app = typer.Typer()
+
+class DefaultCommandGroup(TyperGroup):
+    """Command group that falls back to ``convert`` when no subcommand is named.
+
+    Keeps the original ``cj2md JSON_INPUT_FILE [OUTPUT_DIR]`` usage working
+    alongside subcommands such as ``cj2md serve``.
+    """
+
+    default_command = "convert"
+
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands:
+            group_opts = {opt for param in self.get_params(ctx) for opt in param.opts}
+            if args[0] not in group_opts:
+                args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+app = typer.Typer(cls=DefaultCommandGroup, no_args_is_help=True)
 
 logger = logging.getLogger("converter_app")  # Or a more specific name like "cli_app"
 
 
-@app.command()
-def main(
-    json_input_file: Path = typer.Argument(
-        ...,
-        help="Path to the input JSON file.",
-        exists=True,
-        file_okay=True,
-        dir_okay=False,
-        readable=True,
-    ),
-    markdown_output_directory: Path = typer.Argument(
-        Path("markdown_conversations"),  # Default output directory
-        help="Directory to save the output Markdown files.",
-        file_okay=False,
-        dir_okay=True,
-        writable=True,
-        resolve_path=True,
-    ),
-    limit: Optional[int] = typer.Option(
-        None,
-        "--limit",
-        "-l",
-        help="Limit the number of conversations to process. Processes all by default.",
-        min=0,  # Ensure limit is non-negative if provided
-    ),
-    log_path: Optional[Path] = typer.Option(
+def _log_path_option():
+    return typer.Option(
         None,
         "--log-path",
         help=(
@@ -49,45 +64,457 @@ def main(
         dir_okay=True,
         writable=True,
         resolve_path=True,
-    ),
-    no_summary: bool = typer.Option(
+    )
+
+
+def _cache_dir_option():
+    return typer.Option(
+        None,
+        "--cache-dir",
+        help="Render cache directory (implies --cache). Defaults to a standard user cache directory.",
+        file_okay=False,
+        resolve_path=True,
+    )
+
+
+DEFAULT_OUTPUT_DIR = Path("markdown_conversations")
+_GLOB_CHARS = set("*?[")
+
+
+def _no_summary_option():
+    return typer.Option(
         False,
         "--no-summary",
         help="Omit conversation summary from header.",
-    ),
-    no_thinking: bool = typer.Option(
+    )
+
+
+def _no_thinking_option():
+    return typer.Option(
         False,
         "--no-thinking",
         help="Omit Claude's thinking blocks from output.",
-    ),
-    no_citations: bool = typer.Option(
+    )
+
+
+def _no_citations_option():
+    return typer.Option(
         False,
         "--no-citations",
         help="Omit the References section with citation URLs.",
-    ),
-    no_tools: bool = typer.Option(
+    )
+
+
+def _no_tools_option():
+    return typer.Option(
         False,
         "--no-tools",
         help="Omit all tool usage information (web_search, artifacts, etc.).",
-    ),
-    verbose_tools: bool = typer.Option(
+    )
+
+
+def _verbose_tools_option():
+    return typer.Option(
         False,
         "--verbose-tools",
         help="Show full tool inputs and outputs (artifact content, search results, etc.).",
+    )
+
+
+def _render_options(
+    no_summary: bool,
+    no_thinking: bool,
+    no_citations: bool,
+    no_tools: bool,
+    verbose_tools: bool,
+) -> RenderOptions:
+    """Render options from the CLI flags shared by the rendering commands."""
+    return RenderOptions(
+        include_summary=not no_summary,
+        include_thinking=not no_thinking,
+        include_citations=not no_citations,
+        include_tools=not no_tools,
+        verbose_tools=verbose_tools,
+    )
+
+
+def _split_paths(
+    paths: list[str], output_dir: Optional[Path]
+) -> tuple[list[Path], Path]:
+    """Splits the positional paths into input exports and the output directory.
+
+    Without ``--output-dir``, a trailing path that is neither an existing file
+    nor a glob pattern is taken as the output directory, so the original
+    ``cj2md export.json out/`` usage keeps working.
+    """
+    if (
+        output_dir is None
+        and len(paths) >= 2
+        and not _GLOB_CHARS.intersection(paths[-1])
+        and not Path(paths[-1]).is_file()
+    ):
+        output_dir = Path(paths[-1])
+        paths = paths[:-1]
+    if output_dir is None:
+        output_dir = DEFAULT_OUTPUT_DIR
+
+    inputs: list[Path] = []
+    for raw in paths:
+        if raw == "-":
+            inputs.append(Path(raw))
+        elif _GLOB_CHARS.intersection(raw):
+            matches = sorted(glob.glob(raw))
+            if not matches:
+                raise typer.BadParameter(
+                    f"Pattern '{raw}' does not match any file.",
+                    param_hint="'JSON_INPUT_FILE'",
+                )
+            inputs.extend(Path(match) for match in matches)
+        else:
+            inputs.append(Path(raw))
+
+    for path in inputs:
+        if str(path) == "-":
+            continue
+        if not path.exists():
+            raise typer.BadParameter(
+                f"File '{path}' does not exist.", param_hint="'JSON_INPUT_FILE'"
+            )
+        if not path.is_file():
+            raise typer.BadParameter(
+                f"File '{path}' is a directory.", param_hint="'JSON_INPUT_FILE'"
+            )
+    if len(inputs) > 1 and any(str(path) == "-" for path in inputs):
+        raise typer.BadParameter(
+            "'-' (stdin) can't be combined with other input files.",
+            param_hint="'JSON_INPUT_FILE'",
+        )
+    if str(output_dir) != "-":
+        output_dir = output_dir.resolve()
+    return inputs, output_dir
+
+
+def _check_threshold(value: float) -> float:
+    """Rejects similarity thresholds outside (0, 1], which typer ranges can't
+    express."""
+    if not 0 < value <= 1:
+        raise typer.BadParameter(f"{value} is not in the range 0<x<=1.")
+    return value
+
+
+@app.command("convert")
+def main(
+    paths: list[str] = typer.Argument(
+        ...,
+        metavar="JSON_INPUT_FILE... [MARKDOWN_OUTPUT_DIRECTORY]",
+        help=(
+            "Input JSON export(s) (may be gzip/bz2/xz/zstd compressed; globs allowed), "
+            "or '-' for stdin, optionally followed by the output directory "
+            "('-' streams the Markdown to stdout)."
+        ),
+        show_default=False,
+    ),
+    output_dir: Optional[Path] = typer.Option(
+        None,
+        "--output-dir",
+        "-o",
+        help="Directory to save the output Markdown files (default: markdown_conversations).",
+        show_default=False,
+    ),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        help=(
+            "Render worker processes (default: CPU count with several exports; "
+            "a single export is rendered in-process unless this is above 1)."
+        ),
+        min=1,
+    ),
+    limit: Optional[int] = typer.Option(
+        None,
+        "--limit",
+        "-l",
+        help="Limit the number of conversations to process. Processes all by default.",
+        min=0,  # Ensure limit is non-negative if provided
+    ),
+    log_path: Optional[Path] = _log_path_option(),
+    no_summary: bool = _no_summary_option(),
+    no_thinking: bool = _no_thinking_option(),
+    no_citations: bool = _no_citations_option(),
+    no_tools: bool = _no_tools_option(),
+    verbose_tools: bool = _verbose_tools_option(),
+    use_cache: bool = typer.Option(
+        False,
+        "--cache",
+        help="Reuse Markdown rendered by earlier runs with the same flags.",
+    ),
+    cache_dir: Optional[Path] = _cache_dir_option(),
+    cache_max_mb: int = typer.Option(
+        DEFAULT_MAX_BYTES // (1024 * 1024),
+        "--cache-max-mb",
+        help="Size bound of the render cache; least recently used entries are evicted.",
+        min=1,
+    ),
+    no_manifest: bool = typer.Option(
+        False,
+        "--no-manifest",
+        help=f"Don't record written files in {MANIFEST_FILENAME} in the output directory.",
+    ),
+    index_pages: bool = typer.Option(
+        False,
+        "--index-pages",
+        help="Also write index.md navigation pages grouped by year and month.",
+    ),
+    compress: OutputCompression = typer.Option(
+        OutputCompression.none,
+        "--compress",
+        help="Write .md.gz or .md.zst files instead of plain Markdown.",
+        case_sensitive=False,
+    ),
+    compress_level: Optional[int] = typer.Option(
+        None,
+        "--compress-level",
+        help="Compression level (gzip 0-9, default 6; zstd 1-22, default 3).",
+        show_default=False,
+    ),
+    durability: Durability = typer.Option(
+        Durability.none,
+        "--durability",
+        help=(
+            "When written files are fsynced: none (left to the OS), file "
+            "(each file) or batch (every --sync-every files)."
+        ),
+        case_sensitive=False,
+    ),
+    sync_every: int = typer.Option(
+        DEFAULT_SYNC_EVERY,
+        "--sync-every",
+        help="Files per fsync batch with --durability batch.",
+        min=1,
+    ),
+    max_file_bytes: Optional[int] = typer.Option(
+        None,
+        "--max-file-bytes",
+        help=(
+            "Split conversations larger than this into linked _partNNN.md pages, "
+            "at message boundaries."
+        ),
+        min=1,
+        show_default=False,
+    ),
+    formats: list[OutputFormat] = typer.Option(
+        [OutputFormat.markdown],
+        "--format",
+        help=(
+            "Document format to write; repeat for several (e.g. --format "
+            "markdown --format html). All are rendered in one pass."
+        ),
+        case_sensitive=False,
+    ),
+    max_conversation_bytes: Optional[int] = typer.Option(
+        None,
+        "--max-conversation-bytes",
+        help="Conversations whose JSON is larger than this are oversized.",
+        min=1,
+        show_default=False,
+    ),
+    max_messages: Optional[int] = typer.Option(
+        None,
+        "--max-messages",
+        help="Conversations with more messages than this are oversized.",
+        min=1,
+        show_default=False,
+    ),
+    max_render_seconds: Optional[float] = typer.Option(
+        None,
+        "--max-render-seconds",
+        help=(
+            "Skip conversations that take longer than this to render and write. "
+            "Checked between message blocks, so one slow message runs to its end."
+        ),
+        min=0.001,
+        show_default=False,
+    ),
+    oversized: OversizedAction = typer.Option(
+        OversizedAction.skip,
+        "--oversized",
+        help=(
+            "Skip oversized conversations, or truncate them to the leading "
+            f"messages within the limits. They are listed in {OVERSIZED_FILENAME}."
+        ),
+        case_sensitive=False,
+    ),
+    sqlite_db: Optional[Path] = typer.Option(
+        None,
+        "--sqlite",
+        help=(
+            "Upsert conversations and their messages into this SQLite database "
+            "instead of writing Markdown files."
+        ),
+        dir_okay=False,
+        show_default=False,
+    ),
+    sqlite_batch_size: int = typer.Option(
+        DEFAULT_BATCH_SIZE,
+        "--sqlite-batch-size",
+        help="Conversations per SQLite transaction.",
+        min=1,
+    ),
+    duplicate_mode: DuplicateMode = typer.Option(
+        DuplicateMode.keep,
+        "--duplicates",
+        help=(
+            "Exact and near-duplicate conversations: keep them all, skip all but "
+            "one of each group, or link them to each other (a single export file)."
+        ),
+        case_sensitive=False,
+    ),
+    duplicate_threshold: float = typer.Option(
+        DEFAULT_THRESHOLD,
+        "--duplicate-threshold",
+        help="Similarity (0-1] from which conversations count as near duplicates.",
+        callback=_check_threshold,
+    ),
+    progress_mode: ProgressMode = typer.Option(
+        ProgressMode.auto,
+        "--progress",
+        help="Live progress: a bar on a terminal, JSON lines on stderr otherwise (auto).",
+        case_sensitive=False,
+    ),
+    progress_interval: float = typer.Option(
+        DEFAULT_INTERVAL,
+        "--progress-interval",
+        help="Seconds between progress reports.",
+        min=0.01,
+    ),
+    dry_run: bool = typer.Option(
+        False,
+        "--dry-run",
+        help=(
+            "Only estimate the counts, output size and time, as `cj2md inspect` "
+            "does; write nothing."
+        ),
     ),
 ):
     """
-    Converts conversations from a JSON file to individual Markdown files.
+    Converts conversations from JSON exports to individual Markdown files.
+
+    This is the default command: `cj2md export.json out/` runs it. Given
+    several exports, each conversation is written once, from the export
+    holding its newest version.
     """
-    setup_logging(log_path_override=log_path)  # Call setup_logging early
+    inputs, markdown_output_directory = _split_paths(paths, output_dir)
+    to_stdout = str(markdown_output_directory) == "-"
+    if index_pages and no_manifest:
+        raise typer.BadParameter(
+            "Index pages are built from the manifest; drop --no-manifest.",
+            param_hint="'--index-pages'",
+        )
+    try:
+        output = OutputOptions(
+            compress,
+            compress_level,
+            durability,
+            sync_every,
+            max_file_bytes,
+            tuple(formats),
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="'--compress'")
+    if sqlite_db is not None and (
+        to_stdout or markdown_output_directory != DEFAULT_OUTPUT_DIR.resolve()
+    ):
+        raise typer.BadParameter(
+            "--sqlite writes no Markdown files; drop the output directory.",
+            param_hint="'--sqlite'",
+        )
+    if output.formats != (OutputFormat.markdown,) and (
+        to_stdout or sqlite_db is not None
+    ):
+        raise typer.BadParameter(
+            "Only Markdown can be streamed to stdout or stored in SQLite.",
+            param_hint="'--format'",
+        )
+    if duplicate_mode != DuplicateMode.keep and (
+        len(inputs) > 1 or str(inputs[0]) == "-" or to_stdout or sqlite_db is not None
+    ):
+        raise typer.BadParameter(
+            "Duplicates are found in a single export file written as Markdown files.",
+            param_hint="'--duplicates'",
+        )
+    if to_stdout and len(inputs) > 1:
+        raise typer.BadParameter(
+            "Streaming to stdout supports a single input file.",
+            param_hint="'MARKDOWN_OUTPUT_DIRECTORY'",
+        )
+    limits = None
+    if (max_conversation_bytes, max_messages, max_render_seconds) != (None,) * 3:
+        limits = ConversationLimits(
+            max_conversation_bytes, max_messages, max_render_seconds, oversized
+        )
+    # Keep stdout clean for the Markdown stream or the dry-run report
+    setup_logging(log_path_override=log_path, console_stderr=to_stdout or dry_run)
 
+    input_desc = ", ".join(f"'{path}'" for path in inputs)
     logger.info(
-        f"Application started. Input: '{json_input_file}', Output dir: '{markdown_output_directory}', Limit: {limit}, LogPath: {log_path if log_path else 'Default'}"
+        f"Application started. Input: {input_desc}, Output dir: '{markdown_output_directory}', Limit: {limit}, LogPath: {log_path if log_path else 'Default'}"
+    )
+
+    options = _render_options(
+        no_summary, no_thinking, no_citations, no_tools, verbose_tools
     )
+    if dry_run:
+        for source in inputs:
+            if len(inputs) > 1:
+                typer.echo(f"{source}:")
+            _echo_inspect_report(source, limit, options, output, limits)
+        return
 
-    # markdown_output_directory is already resolved by Typer, but ensuring it exists is good practice.
-    # Typer's writable=True for a directory argument doesn't create it; resolve_path=True resolves it.
-    # We still need to create it if it doesn't exist.
+    cache = None
+    if use_cache or cache_dir is not None:
+        cache = RenderCache(cache_dir, max_bytes=cache_max_mb * 1024 * 1024)
+        logger.debug(f"Using render cache at {cache.directory}")
+    progress = create_progress(progress_mode, interval=progress_interval)
+
+    if sqlite_db is not None:
+        # Exports are upserted in turn; the newest version of each
+        # conversation wins whatever the order.
+        for source in inputs:
+            json_to_sqlite(
+                source,
+                sqlite_db,
+                limit=limit,
+                options=options,
+                cache=cache,
+                progress=progress,
+                batch_size=sqlite_batch_size,
+                limits=limits,
+            )
+            progress = create_progress(progress_mode, interval=progress_interval)
+        logger.info("Application finished.")
+        return
+
+    if to_stdout:
+        try:
+            json_to_stream(
+                inputs[0],
+                sys.stdout,
+                limit=limit,
+                options=options,
+                cache=cache,
+                progress=progress,
+                limits=limits,
+            )
+        except BrokenPipeError:
+            # The reader went away (e.g. `| head`); stop quietly.
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            return
+        logger.info("Application finished.")
+        return
+
+    # The output directory path is resolved but may not exist yet.
     try:
         markdown_output_directory.mkdir(parents=True, exist_ok=True)
         logger.debug(f"Output directory ready: {markdown_output_directory.resolve()}")
@@ -98,19 +525,675 @@ def main(
         # Depending on desired behavior, you might want to raise typer.Exit(code=1) here
         return  # Exit if directory cannot be created
 
-    # Build render options from CLI flags
-    options = RenderOptions(
-        include_summary=not no_summary,
-        include_thinking=not no_thinking,
-        include_citations=not no_citations,
-        include_tools=not no_tools,
-        verbose_tools=verbose_tools,
+    duplicates = None
+    if duplicate_mode != DuplicateMode.keep:
+        from .dedup import find_duplicates
+
+        try:
+            duplicates = find_duplicates(
+                inputs[0], threshold=duplicate_threshold, limit=limit
+            )
+        except (OSError, ValueError, EOFError, RuntimeError) as e:
+            # RuntimeError: NumPy is not installed
+            logger.error(f"Error: Could not look for duplicates: {e}")
+            raise typer.Exit(code=1)
+
+    # Duplicates are handled by the in-process conversion
+    if duplicates is None and (
+        len(inputs) > 1 or ((workers or 1) > 1 and str(inputs[0]) != "-")
+    ):
+        batch_to_markdown(
+            inputs,
+            markdown_output_directory,
+            limit=limit,
+            options=options,
+            workers=workers,
+            cache=cache,
+            progress=progress,
+            manifest=not no_manifest,
+            index_pages=index_pages,
+            output=output,
+            limits=limits,
+        )
+    else:
+        json_to_markdown(
+            inputs[0],
+            markdown_output_directory,
+            limit=limit,
+            options=options,
+            cache=cache,
+            progress=progress,
+            manifest=not no_manifest,
+            index_pages=index_pages,
+            output=output,
+            duplicates=duplicates,
+            duplicate_mode=duplicate_mode,
+            limits=limits,
+        )
+    logger.info("Application finished.")
+
+
+@app.command("diff")
+def diff_command(
+    old_export: Path = typer.Argument(
+        ...,
+        help="The earlier export (may be compressed).",
+        exists=True,
+        dir_okay=False,
+        readable=True,
+    ),
+    new_export: Path = typer.Argument(
+        ...,
+        help="The later export (may be compressed).",
+        exists=True,
+        dir_okay=False,
+        readable=True,
+    ),
+    render: Optional[Path] = typer.Option(
+        None,
+        "--render",
+        help="Write Markdown for the added and modified conversations to this directory.",
+        file_okay=False,
+        resolve_path=True,
+    ),
+    json_output: bool = typer.Option(
+        False,
+        "--json",
+        help="Print one JSON object per changed conversation instead of text.",
+    ),
+    no_summary: bool = _no_summary_option(),
+    no_thinking: bool = _no_thinking_option(),
+    no_citations: bool = _no_citations_option(),
+    no_tools: bool = _no_tools_option(),
+    verbose_tools: bool = _verbose_tools_option(),
+    log_path: Optional[Path] = _log_path_option(),
+):
+    """
+    Reports conversations added, removed or modified between two exports.
+
+    The render options apply to the files written with --render.
+    """
+    from .diff import diff_exports, render_changed
+
+    # The report goes to stdout
+    setup_logging(log_path_override=log_path, console_stderr=True)
+
+    try:
+        result = diff_exports(old_export, new_export)
+    except (OSError, ValueError, EOFError) as e:
+        # ValueError covers JSONDecodeError and ExportFormatError
+        logger.error(f"Error: Could not compare exports: {e}")
+        raise typer.Exit(code=1)
+
+    for entry in result.entries():
+        if json_output:
+            typer.echo(json.dumps(entry.to_dict(), ensure_ascii=False))
+        else:
+            typer.echo(f"{entry.status:<8}  {entry.uuid}  {entry.name}")
+    logger.info(f"Compared exports. {result.summary()}")
+
+    if render is not None:
+        options = _render_options(
+            no_summary, no_thinking, no_citations, no_tools, verbose_tools
+        )
+        try:
+            written = render_changed(
+                new_export, result.changed_uuids, render, options
+            )
+        except (OSError, ValueError, EOFError) as e:
+            logger.error(f"Error: Could not render changed conversations: {e}")
+            raise typer.Exit(code=1)
+        logger.info(f"Wrote {written} changed conversations to {render}.")
+
+
+def _index_option():
+    return typer.Option(
+        None,
+        "--index",
+        help="Index file (default: next to the export, with a .cj2md-index suffix).",
+        dir_okay=False,
+        show_default=False,
+    )
+
+
+@app.command("index")
+def index_command(
+    json_input: Path = typer.Argument(
+        ...,
+        help="The export (may be compressed).",
+        exists=True,
+        dir_okay=False,
+        readable=True,
+    ),
+    index_path: Optional[Path] = _index_option(),
+    log_path: Optional[Path] = _log_path_option(),
+):
+    """
+    Indexes an export once so that `cj2md get` can read single conversations from it.
+    """
+    from .export_index import build_index
+
+    setup_logging(log_path_override=log_path)
+    try:
+        index = build_index(json_input, index_path)
+    except (OSError, ValueError, EOFError, sqlite3.Error) as e:
+        logger.error(f"Error: Could not index {json_input}: {e}")
+        raise typer.Exit(code=1)
+    with index:
+        typer.echo(f"Indexed {len(index)} conversations in {index.path}.")
+
+
+@app.command("get")
+def get_command(
+    json_input: Path = typer.Argument(
+        ...,
+        help="The export (may be compressed).",
+        exists=True,
+        dir_okay=False,
+        readable=True,
+    ),
+    uuids: Optional[list[str]] = typer.Argument(
+        None,
+        help="Conversation uuids, or their leading part as in file names.",
+        show_default=False,
+    ),
+    name: Optional[str] = typer.Option(
+        None, "--name", help="Conversations whose name contains this text."
+    ),
+    since: Optional[str] = typer.Option(
+        None, "--since", help="Conversations created on or after this date (YYYY-MM-DD)."
+    ),
+    until: Optional[str] = typer.Option(
+        None, "--until", help="Conversations created on or before this date (YYYY-MM-DD)."
+    ),
+    output_dir: Optional[Path] = typer.Option(
+        None,
+        "--output-dir",
+        "-o",
+        help="Write Markdown files to this directory instead of stdout.",
+        file_okay=False,
+        resolve_path=True,
+    ),
+    raw: bool = typer.Option(
+        False, "--raw", help="Print the conversations' JSON instead of Markdown."
+    ),
+    no_summary: bool = _no_summary_option(),
+    no_thinking: bool = _no_thinking_option(),
+    no_citations: bool = _no_citations_option(),
+    no_tools: bool = _no_tools_option(),
+    verbose_tools: bool = _verbose_tools_option(),
+    index_path: Optional[Path] = _index_option(),
+    log_path: Optional[Path] = _log_path_option(),
+):
+    """
+    Renders single conversations from an export, reading only their part of it.
+
+    The render flags are those of `convert`, so a conversation comes out as
+    `convert` wrote it. The export is indexed on first use (see `cj2md index`),
+    and again when it changes.
+    """
+    from .converter import (
+        STATUS_CONVERTED,
+        convert_conversation,
+        write_conversation_files,
+        write_markdown_stream,
     )
+    from .export_index import open_index, read_conversations
+
+    if not uuids and name is None and since is None and until is None:
+        raise typer.BadParameter(
+            "Give conversation uuids, or select with --name, --since or --until.",
+            param_hint="'UUIDS'",
+        )
+    # The conversations go to stdout
+    setup_logging(log_path_override=log_path, console_stderr=output_dir is None)
 
-    json_to_markdown(
-        json_input_file, markdown_output_directory, limit=limit, options=options
+    try:
+        with open_index(json_input, index_path) as index:
+            selected = {}
+            for uuid in uuids or [None]:
+                matches = index.select(uuid, name, since, until)
+                if not matches and uuid is not None:
+                    logger.warning(f"No matching conversation {uuid} in {json_input}.")
+                selected.update((entry.position, entry) for entry in matches)
+        entries = list(selected.values())
+        if not entries:
+            logger.error("Error: No conversations matched.")
+            raise typer.Exit(code=1)
+        conversations = list(read_conversations(json_input, entries))
+    except (OSError, ValueError, EOFError, sqlite3.Error) as e:
+        logger.error(f"Error: Could not read from {json_input}: {e}")
+        raise typer.Exit(code=1)
+
+    options = _render_options(
+        no_summary, no_thinking, no_citations, no_tools, verbose_tools
     )
-    logger.info("Application finished.")
+    output = OutputOptions()
+    for entry, conv in conversations:
+        if raw:
+            typer.echo(json.dumps(conv, indent=2, ensure_ascii=False))
+            continue
+        record = convert_conversation(conv, options, entry.position)
+        if record.status != STATUS_CONVERTED:
+            logger.warning(
+                f"Conversation {record.uuid} has no name or content; skipped."
+            )
+        elif output_dir is not None:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            paths = write_conversation_files(output_dir, record, output, options)
+            for path in paths:
+                typer.echo(str(path))
+        elif len(conversations) > 1:
+            write_markdown_stream(sys.stdout, record.lines, record.filename)
+        else:
+            typer.echo(record.text())
+
+
+@app.command("grep")
+def grep_command(
+    pattern: str = typer.Argument(..., help="Regular expression to look for."),
+    json_input: str = typer.Argument(
+        ...,
+        metavar="JSON_INPUT_FILE",
+        help="The export (may be compressed), or '-' for stdin.",
+    ),
+    ignore_case: bool = typer.Option(
+        False, "--ignore-case", "-i", help="Ignore case distinctions."
+    ),
+    fixed_strings: bool = typer.Option(
+        False,
+        "--fixed-strings",
+        "-F",
+        help="Treat the pattern as a literal string.",
+    ),
+    files_with_matches: bool = typer.Option(
+        False,
+        "--files-with-matches",
+        "-l",
+        help="Only list the matching conversations.",
+    ),
+    max_count: Optional[int] = typer.Option(
+        None,
+        "--max-count",
+        "-m",
+        help="Show at most this many matches per conversation.",
+        min=1,
+        show_default=False,
+    ),
+    json_output: bool = typer.Option(
+        False,
+        "--json",
+        help="Print one JSON object per match instead of text.",
+    ),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        help=(
+            "Search processes for an export indexed with `cj2md index` "
+            "(default: CPU count). Ignored without an index."
+        ),
+        min=1,
+    ),
+    limit: Optional[int] = typer.Option(
+        None,
+        "--limit",
+        help="Limit the number of conversations searched.",
+        min=0,
+    ),
+    index_path: Optional[Path] = _index_option(),
+    log_path: Optional[Path] = _log_path_option(),
+):
+    """
+    Lists the conversations whose messages, thinking or tool calls match a pattern.
+
+    Exits with 1 if nothing matched and 2 on errors, as grep does.
+
+    Parallel search needs a current index: run `cj2md index` on the export
+    first. Without one, the export is streamed and searched in a single
+    process, whatever --workers says.
+    """
+    from .grep import Matcher, grep_export
+
+    try:
+        matcher = Matcher(pattern, fixed_strings=fixed_strings, ignore_case=ignore_case)
+    except (ValueError, re.error) as e:
+        raise typer.BadParameter(str(e), param_hint="'PATTERN'")
+    if files_with_matches:
+        max_count = 1
+    # The matches go to stdout
+    setup_logging(log_path_override=log_path, console_stderr=True)
+
+    found = 0
+    try:
+        matches = grep_export(
+            json_input,
+            matcher,
+            workers=workers,
+            limit=limit,
+            max_count=max_count,
+            index_path=index_path,
+        )
+        for match in matches:
+            found += 1
+            date = match.created_at[:10] or "N/A"
+            if json_output:
+                typer.echo(json.dumps(match._asdict(), ensure_ascii=False))
+            elif files_with_matches:
+                typer.echo(f"{match.uuid}  {date}  {match.name}")
+            else:
+                typer.echo(
+                    f"{match.uuid}  {date}  {match.name}  "
+                    f"[{match.sender} {match.field}] {match.snippet}"
+                )
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return
+    except (OSError, ValueError, EOFError, sqlite3.Error) as e:
+        # ValueError covers JSONDecodeError and ExportFormatError
+        logger.error(f"Error: Could not search {json_input}: {e}")
+        raise typer.Exit(code=2)
+    if not found:
+        raise typer.Exit(code=1)
+
+
+def _echo_inspect_report(
+    source,
+    limit: Optional[int],
+    options: RenderOptions,
+    output: OutputOptions,
+    limits: Optional[ConversationLimits],
+    json_output: bool = False,
+) -> None:
+    from .estimate import inspect_export, render_inspect_text
+
+    try:
+        report = inspect_export(source, limit, options, output, limits)
+    except (OSError, ValueError, EOFError) as e:
+        # ValueError covers JSONDecodeError and ExportFormatError
+        logger.error(f"Error: Could not inspect {source}: {e}")
+        raise typer.Exit(code=1)
+    if json_output:
+        typer.echo(json.dumps(report.to_dict(), indent=2))
+    else:
+        typer.echo(render_inspect_text(report))
+
+
+@app.command("inspect")
+def inspect_command(
+    json_input: str = typer.Argument(
+        ...,
+        metavar="JSON_INPUT_FILE",
+        help="The export (may be compressed), or '-' for stdin.",
+    ),
+    json_output: bool = typer.Option(
+        False,
+        "--json",
+        help="Print the report as JSON instead of text.",
+    ),
+    limit: Optional[int] = typer.Option(
+        None,
+        "--limit",
+        "-l",
+        help="Limit the number of conversations read.",
+        min=0,
+    ),
+    log_path: Optional[Path] = _log_path_option(),
+):
+    """
+    Estimates what converting an export would produce and how long it would take.
+
+    Use `cj2md convert --dry-run` to estimate with the conversion's own flags.
+    """
+    # The report goes to stdout
+    setup_logging(log_path_override=log_path, console_stderr=True)
+    _echo_inspect_report(
+        json_input, limit, RenderOptions(), OutputOptions(), None, json_output
+    )
+
+
+@app.command("messages")
+def messages_command(
+    json_input: Path = typer.Argument(
+        ...,
+        help="The export (may be compressed).",
+        exists=True,
+        dir_okay=False,
+        readable=True,
+    ),
+    table_path: Path = typer.Argument(
+        ...,
+        help="The table to write, e.g. messages.parquet or messages.csv.",
+        dir_okay=False,
+    ),
+    table_format: TableFormat = typer.Option(
+        TableFormat.auto,
+        "--format",
+        help="Table format (auto: by suffix, else Parquet if pyarrow is installed).",
+        case_sensitive=False,
+    ),
+    batch_rows: int = typer.Option(
+        DEFAULT_BATCH_ROWS,
+        "--batch-rows",
+        help="Rows per written batch (Parquet row group).",
+        min=1,
+    ),
+    limit: Optional[int] = typer.Option(
+        None,
+        "--limit",
+        "-l",
+        help="Limit the number of conversations read.",
+        min=0,
+    ),
+    log_path: Optional[Path] = _log_path_option(),
+):
+    """
+    Writes one row per message content item as a Parquet or CSV table.
+    """
+    setup_logging(log_path_override=log_path)
+    try:
+        rows = write_message_table(
+            json_input, table_path, table_format, batch_rows, limit
+        )
+    except (OSError, ValueError, EOFError) as e:
+        # ValueError covers JSONDecodeError, ExportFormatError and a missing pyarrow
+        logger.error(f"Error: Could not write the message table: {e}")
+        raise typer.Exit(code=1)
+    logger.info(f"Wrote {rows} message rows to {table_path}.")
+
+
+@app.command("stats")
+def stats_command(
+    json_input: Path = typer.Argument(
+        ...,
+        help="The export (may be compressed).",
+        exists=True,
+        dir_okay=False,
+        readable=True,
+    ),
+    json_output: bool = typer.Option(
+        False,
+        "--json",
+        help="Print the report as JSON instead of Markdown.",
+    ),
+    output_dir: Optional[Path] = typer.Option(
+        None,
+        "--output-dir",
+        "-o",
+        help="Also write stats.json and stats.md to this directory.",
+        file_okay=False,
+        resolve_path=True,
+    ),
+    limit: Optional[int] = typer.Option(
+        None,
+        "--limit",
+        "-l",
+        help="Limit the number of conversations read.",
+        min=0,
+    ),
+    log_path: Optional[Path] = _log_path_option(),
+):
+    """
+    Reports what an export contains: message sizes, thinking, tool calls, volume per month and sender.
+    """
+    from .stats import collect_stats, render_stats_markdown
+
+    # The report goes to stdout
+    setup_logging(log_path_override=log_path, console_stderr=True)
+
+    try:
+        report = collect_stats(json_input, limit=limit)
+    except (OSError, ValueError, EOFError, RuntimeError) as e:
+        # RuntimeError: NumPy is not installed
+        logger.error(f"Error: Could not collect statistics: {e}")
+        raise typer.Exit(code=1)
+    report_json = json.dumps(report, indent=2, ensure_ascii=False)
+    report_markdown = render_stats_markdown(report)
+    typer.echo(report_json if json_output else report_markdown)
+
+    if output_dir is not None:
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            (output_dir / "stats.json").write_text(report_json + "\n", encoding="utf-8")
+            (output_dir / "stats.md").write_text(report_markdown, encoding="utf-8")
+        except OSError as e:
+            logger.error(f"Error: Could not write the report to {output_dir}: {e}")
+            raise typer.Exit(code=1)
+        logger.info(f"Wrote stats.json and stats.md to {output_dir}.")
+
+
+@app.command("dedup")
+def dedup_command(
+    json_input: Path = typer.Argument(
+        ...,
+        help="The export (may be compressed).",
+        exists=True,
+        dir_okay=False,
+        readable=True,
+    ),
+    threshold: float = typer.Option(
+        DEFAULT_THRESHOLD,
+        "--threshold",
+        help="Similarity (0-1] from which conversations count as near duplicates.",
+        callback=_check_threshold,
+    ),
+    exact_only: bool = typer.Option(
+        False,
+        "--exact-only",
+        help="Only look for exact copies (no NumPy needed).",
+    ),
+    json_output: bool = typer.Option(
+        False,
+        "--json",
+        help="Print the report as JSON instead of Markdown.",
+    ),
+    output_dir: Optional[Path] = typer.Option(
+        None,
+        "--output-dir",
+        "-o",
+        help="Also write duplicates.json and duplicates.md to this directory.",
+        file_okay=False,
+        resolve_path=True,
+    ),
+    limit: Optional[int] = typer.Option(
+        None,
+        "--limit",
+        "-l",
+        help="Limit the number of conversations read.",
+        min=0,
+    ),
+    log_path: Optional[Path] = _log_path_option(),
+):
+    """
+    Reports exact and near-duplicate conversations (retried prompts, forked chats) in an export.
+    """
+    from .dedup import find_duplicates, render_dedup_markdown
+
+    # The report goes to stdout
+    setup_logging(log_path_override=log_path, console_stderr=True)
+
+    try:
+        report = find_duplicates(
+            json_input, threshold=threshold, near=not exact_only, limit=limit
+        )
+    except (OSError, ValueError, EOFError, RuntimeError) as e:
+        # RuntimeError: NumPy is not installed
+        logger.error(f"Error: Could not look for duplicates: {e}")
+        raise typer.Exit(code=1)
+    report_json = json.dumps(report.to_dict(), indent=2, ensure_ascii=False)
+    report_markdown = render_dedup_markdown(report)
+    typer.echo(report_json if json_output else report_markdown)
+
+    if output_dir is not None:
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            (output_dir / "duplicates.json").write_text(
+                report_json + "\n", encoding="utf-8"
+            )
+            (output_dir / "duplicates.md").write_text(report_markdown, encoding="utf-8")
+        except OSError as e:
+            logger.error(f"Error: Could not write the report to {output_dir}: {e}")
+            raise typer.Exit(code=1)
+        logger.info(f"Wrote duplicates.json and duplicates.md to {output_dir}.")
+
+
+@app.command()
+def serve(
+    host: str = typer.Option(
+        "127.0.0.1", "--host", help="Interface to listen on."
+    ),
+    port: int = typer.Option(8765, "--port", "-p", help="Port to listen on."),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        help="Render worker processes (default: CPU count; 0 renders in threads).",
+        min=0,
+    ),
+    max_concurrency: int = typer.Option(
+        4,
+        "--max-concurrency",
+        help="Maximum number of uploads converted at once; others wait.",
+        min=1,
+    ),
+    log_path: Optional[Path] = _log_path_option(),
+):
+    """
+    Runs a local HTTP service: POST an export to /convert to stream back Markdown.
+    """
+    from .server import serve as run_server
+
+    setup_logging(log_path_override=log_path)
+    run_server(host, port, workers=workers, max_concurrency=max_concurrency)
+
+
+cache_app = typer.Typer(help="Inspect or empty the render cache.", no_args_is_help=True)
+app.add_typer(cache_app, name="cache")
+
+
+@cache_app.command("stats")
+def cache_stats(cache_dir: Optional[Path] = _cache_dir_option()):
+    """
+    Shows the number of cached documents and their total size.
+    """
+    stats = RenderCache(cache_dir).stats()
+    typer.echo(f"Directory: {stats.directory}")
+    typer.echo(f"Entries: {stats.entries}")
+    typer.echo(
+        f"Size: {stats.total_bytes} bytes ({stats.total_bytes / (1024 * 1024):.1f} MiB)"
+    )
+
+
+@cache_app.command("clear")
+def cache_clear(cache_dir: Optional[Path] = _cache_dir_option()):
+    """
+    Deletes every cached document.
+    """
+    cache = RenderCache(cache_dir)
+    removed = cache.clear()
+    typer.echo(f"Removed {removed} cached documents from {cache.directory}.")
 
 
 if __name__ == "__main__":
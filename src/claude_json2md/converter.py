@@ -1,14 +1,89 @@
 import json
+import lzma
+import os
+import sqlite3
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from itertools import chain, tee
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional, Sequence, TextIO, Union
 import re
 import logging
 
-from .renderers import RenderOptions, CitationCollector, render_content_item
+from .cache import RenderCache
+from .dedup import DedupReport, DuplicateMode, duplicate_notes
+from .guards import (
+    REASON_RENDER_TIME,
+    ConversationLimits,
+    OversizedEntry,
+    RenderTimeout,
+    apply_limits,
+    truncation_notice,
+    with_deadline,
+    write_oversized_report,
+)
+from .index_pages import update_index_pages
+from .manifest import ManifestEntry, ManifestWriter
+from .paging import Pager, part_filename
+from .output import (
+    OutputCompression,
+    OutputOptions,
+    fsync_dir,
+    iter_joined,
+    temp_path,
+)
+from .progress import ProgressReporter
+from .reader import (
+    STDIN_SOURCE,
+    ExportFormatError,
+    ExportSource,
+    iter_json_array,
+    open_export,
+)
+from .renderers import (
+    FORMAT_RENDERERS,
+    CitationCollector,
+    FormatRenderer,
+    MarkdownRenderer,
+    OutputFormat,
+    RenderOptions,
+    as_text,
+    format_filename,
+)
+from .sqlite_store import DEFAULT_BATCH_SIZE, SqliteWriter
 
 logger = logging.getLogger("converter_app")
 
 
+def _item_is_meaningful(item: dict) -> bool:
+    """Check whether a single content item counts as meaningful content."""
+    item_type = item.get("type", "text")
+
+    if item_type in ("text", "voice_note"):
+        return bool(as_text(item.get("text")).strip())
+    if item_type == "thinking":
+        return bool(as_text(item.get("thinking")).strip())
+    # Tool usage counts as meaningful content
+    return item_type in ("tool_use", "tool_result")
+
+
+def _message_is_meaningful(msg: dict) -> bool:
+    """Check whether a single message has non-empty meaningful content."""
+    # Check msg.text fallback
+    if as_text(msg.get("text")).strip():
+        return True
+
+    # Check content items
+    content_list = msg.get("content", [])
+    if not isinstance(content_list, list):
+        return False
+
+    for item in content_list:
+        if isinstance(item, dict) and _item_is_meaningful(item):
+            return True
+    return False
+
+
 def has_meaningful_content(chat_messages: list) -> bool:
     """Check if any message has non-empty meaningful content.
 
@@ -16,38 +91,8 @@ def has_meaningful_content(chat_messages: list) -> bool:
     Used to skip conversations where all messages are empty.
     """
     for msg in chat_messages:
-        if not isinstance(msg, dict):
-            continue
-
-        # Check msg.text fallback
-        msg_text = msg.get("text", "")
-        if msg_text and msg_text.strip():
+        if isinstance(msg, dict) and _message_is_meaningful(msg):
             return True
-
-        # Check content items
-        content_list = msg.get("content", [])
-        if not isinstance(content_list, list):
-            continue
-
-        for item in content_list:
-            if not isinstance(item, dict):
-                continue
-
-            item_type = item.get("type", "text")
-
-            if item_type == "text":
-                if item.get("text", "").strip():
-                    return True
-            elif item_type == "voice_note":
-                if item.get("text", "").strip():
-                    return True
-            elif item_type == "thinking":
-                if item.get("thinking", "").strip():
-                    return True
-            elif item_type in ("tool_use", "tool_result"):
-                # Tool usage counts as meaningful content
-                return True
-
     return False
 
 
@@ -81,8 +126,8 @@ def load_and_validate_conversations(json_file_path: Path) -> Optional[list]:
 
 def generate_filename(conversation_data: dict, conv_name: str) -> str:
     """Generates a unique filename for the Markdown file."""
-    conv_uuid = conversation_data.get("uuid", "unknown_uuid")
-    conv_created_at = conversation_data.get("created_at", "N/A")
+    conv_uuid = as_text(conversation_data.get("uuid"), "unknown_uuid")
+    conv_created_at = as_text(conversation_data.get("created_at"), "N/A")
 
     iso_date = "unknown-date"
     if conv_created_at != "N/A" and "T" in conv_created_at:
@@ -95,117 +140,237 @@ def generate_filename(conversation_data: dict, conv_name: str) -> str:
     return md_filename
 
 
-def generate_markdown_content(
+_MARKDOWN = MarkdownRenderer()
+
+
+def render_message_block(
+    msg: dict, options: RenderOptions, citations: CitationCollector
+) -> list[str]:
+    """Renders a single chat message, starting with its `---` separator."""
+    return _MARKDOWN.message(msg, options, citations)
+
+
+class _FanOut:
+    """Renders each step in several formats, as a tuple of blocks."""
+
+    def __init__(self, renderers: Sequence[FormatRenderer]):
+        self.renderers = renderers
+
+    def header(
+        self, conversation: dict, conv_name: str, options: RenderOptions
+    ) -> tuple[list[str], ...]:
+        renderers = self.renderers
+        return tuple(r.header(conversation, conv_name, options) for r in renderers)
+
+    def message(
+        self, msg: dict, options: RenderOptions, citations: CitationCollector
+    ) -> tuple[list[str], ...]:
+        return tuple(r.message(msg, options, citations) for r in self.renderers)
+
+    def notice(self, text: str) -> tuple[list[str], ...]:
+        return tuple(r.notice(text) for r in self.renderers)
+
+    def footer(
+        self, citations: CitationCollector, options: RenderOptions
+    ) -> tuple[list[str], ...]:
+        return tuple(r.footer(citations, options) for r in self.renderers)
+
+
+def _iter_blocks(
+    renderer: Union[FormatRenderer, _FanOut],
+    conversation_data: dict,
+    conv_name: str,
+    options: RenderOptions,
+    skip_empty: bool,
+    notice: Optional[str],
+) -> Iterator:
+    """The walk behind ``iter_markdown_blocks`` and ``iter_format_blocks``,
+    yielding what ``renderer`` returns for each step."""
+    conv_uuid = conversation_data.get("uuid", "unknown_uuid")
+    chat_messages = conversation_data.get("chat_messages", [])
+    message = renderer.message
+    # Every format adds the same URLs in the same order, so they can share
+    # the numbering
+    citations = CitationCollector()
+
+    if skip_empty and not has_meaningful_content(chat_messages):
+        return
+
+    yield renderer.header(conversation_data, conv_name, options)
+    for msg_idx, msg in enumerate(chat_messages):
+        if isinstance(msg, dict):
+            yield message(msg, options, citations)
+        else:
+            _warn_malformed_message(msg_idx, conv_uuid)
+
+    if notice:
+        yield renderer.notice(notice)
+
+    # References section and closing markup at the end
+    footer = renderer.footer(citations, options)
+    if footer:
+        yield footer
+
+
+def iter_format_blocks(
     conversation_data: dict,
     conv_name: str,
     options: Optional[RenderOptions] = None,
-) -> list[str]:
-    """Generates the Markdown content for a single conversation."""
+    formats: Sequence[OutputFormat] = (OutputFormat.markdown,),
+    skip_empty: bool = False,
+    notice: Optional[str] = None,
+) -> Iterator[tuple[list[str], ...]]:
+    """Yields a conversation in several formats from a single walk.
+
+    Each step renders the same part of the document (the header, a message,
+    the footer) in every format, and yields the blocks in the order of
+    ``formats``; a format's block may be empty where it has nothing to show,
+    such as a Markdown footer without references.
+
+    With ``skip_empty``, a conversation without meaningful content (see
+    ``has_meaningful_content``) yields nothing and is never rendered. The
+    check stops at the first meaningful message, so only the empty messages
+    before it are looked at twice: once checked, once rendered.
+
+    A ``notice`` is shown after the last message.
+    """
     if options is None:
         options = RenderOptions()
+    renderer = _FanOut([FORMAT_RENDERERS[OutputFormat(fmt)]() for fmt in formats])
+    return _iter_blocks(
+        renderer, conversation_data, conv_name, options, skip_empty, notice
+    )
 
-    conv_uuid = conversation_data.get("uuid", "unknown_uuid")
-    conv_created_at = conversation_data.get("created_at", "N/A")
-    conv_updated_at = conversation_data.get("updated_at", "N/A")
-    conv_summary = conversation_data.get("summary")
-    chat_messages = conversation_data.get("chat_messages", [])
 
-    citations = CitationCollector()
-    md_content_lines = []
-
-    # Header
-    md_content_lines.append(f"# Conversation: {conv_name}\n")
-    md_content_lines.append(f"**UUID:** {conv_uuid}")
-    md_content_lines.append(f"**Created At:** {conv_created_at}")
-    md_content_lines.append(f"**Updated At:** {conv_updated_at}")
-
-    # Summary (if present and enabled)
-    if options.include_summary and conv_summary and conv_summary.strip():
-        md_content_lines.append("")
-        md_content_lines.append("**Summary:**")
-        # Format as blockquote, handling multi-line summaries
-        summary_lines = conv_summary.strip().split("\n")
-        for line in summary_lines:
-            md_content_lines.append(f"> {line}")
-
-    md_content_lines.append("")
-    md_content_lines.append("## Messages\n")
+def _format_stream(
+    walk: Iterable[tuple[list[str], ...]], position: int
+) -> Iterator[list[str]]:
+    for blocks in walk:
+        block = blocks[position]
+        if block:
+            yield block
 
-    for msg_idx, msg in enumerate(chat_messages):
-        if not isinstance(msg, dict):
-            logger.warning(
-                f"Skipping malformed message at index {msg_idx} for conversation {conv_uuid} during MD generation."
-            )
-            continue
-
-        md_content_lines.append("---")
-        sender = msg.get("sender", "Unknown Sender")
-        msg_created_at = msg.get("created_at", "N/A")
-
-        md_content_lines.append(f"**Sender:** {sender.capitalize()}")
-        md_content_lines.append(f"**Timestamp:** {msg_created_at}")
-
-        # Attachments
-        files = msg.get("files", [])
-        if files and isinstance(files, list):
-            file_names = [
-                f.get("file_name", "unknown_file")
-                for f in files
-                if isinstance(f, dict) and "file_name" in f
-            ]
-            if file_names:
-                md_content_lines.append(f"**Attachments:** {', '.join(file_names)}")
-
-        md_content_lines.append("")  # Blank line before content
-
-        # Process ALL content items (not just first)
-        content_list = msg.get("content", [])
-        msg_text_outer = msg.get("text", "")
-
-        has_rendered_content = False
-        if isinstance(content_list, list) and len(content_list) > 0:
-            for content_item in content_list:
-                if isinstance(content_item, dict):
-                    rendered = render_content_item(content_item, options, citations)
-                    if rendered:
-                        md_content_lines.extend(rendered)
-                        has_rendered_content = True
-
-        # Fallback to msg.text if no content items rendered
-        if not has_rendered_content and msg_text_outer:
-            md_content_lines.append(msg_text_outer.strip())
-            md_content_lines.append("")
-        elif not has_rendered_content:
-            md_content_lines.append("")  # Empty message placeholder
-
-    # References section at end (if citations collected and enabled)
-    if options.include_citations:
-        references = citations.render_references_section()
-        md_content_lines.extend(references)
 
+def split_formats(
+    walk: Iterator[tuple[list[str], ...]], count: int
+) -> list[Iterator[list[str]]]:
+    """Splits the walk of ``iter_format_blocks`` into one block iterator per
+    format.
+
+    The iterators share the walk: blocks rendered for one format while
+    another is being consumed are kept until their own iterator reaches them.
+    """
+    if count == 1:
+        return [_format_stream(walk, 0)]
+    return [_format_stream(stream, i) for i, stream in enumerate(tee(walk, count))]
+
+
+def iter_markdown_blocks(
+    conversation_data: dict,
+    conv_name: str,
+    options: Optional[RenderOptions] = None,
+    skip_empty: bool = False,
+) -> Iterator[list[str]]:
+    """Yields the Markdown for a single conversation as blocks of lines.
+
+    The header is the first block, followed by one block per message and
+    finally the References section (if any). ``skip_empty`` works as in
+    ``iter_format_blocks``.
+    """
+    if options is None:
+        options = RenderOptions()
+    return _iter_blocks(
+        _MARKDOWN, conversation_data, conv_name, options, skip_empty, notice=None
+    )
+
+
+def _warn_malformed_message(msg_idx: int, conv_uuid: str) -> None:
+    logger.warning(
+        "Skipping malformed message at index %d for conversation %s during MD generation.",
+        msg_idx,
+        conv_uuid,
+    )
+
+
+def generate_markdown_content(
+    conversation_data: dict,
+    conv_name: str,
+    options: Optional[RenderOptions] = None,
+) -> list[str]:
+    """Generates the Markdown content for a single conversation.
+
+    Builds the list directly rather than through ``iter_markdown_blocks``,
+    which costs a generator step per message.
+    """
+    if options is None:
+        options = RenderOptions()
+    conv_uuid = conversation_data.get("uuid", "unknown_uuid")
+    citations = CitationCollector()
+    md_content_lines = _MARKDOWN.header(conversation_data, conv_name, options)
+    message = _MARKDOWN.message
+    for msg_idx, msg in enumerate(conversation_data.get("chat_messages", [])):
+        if isinstance(msg, dict):
+            md_content_lines.extend(message(msg, options, citations))
+        else:
+            _warn_malformed_message(msg_idx, conv_uuid)
+    md_content_lines.extend(_MARKDOWN.footer(citations, options))
     return md_content_lines
 
 
 def write_markdown_file(
-    filepath: Path, content_lines: list[str], conv_name: str, conv_uuid: str
+    filepath: Path,
+    content_lines: Iterable[str],
+    conv_name: str,
+    conv_uuid: str,
+    output: Optional[OutputOptions] = None,
 ) -> bool:
-    """Writes the Markdown content to a file."""
+    """Writes the Markdown content to a file, compressed as set by ``output``.
+
+    The content goes to a temporary file that replaces ``filepath`` once
+    complete, so an interrupted write never leaves a truncated file.
+    Compressed files are written line by line as ``content_lines`` yields
+    them.
+    """
+    # Called once per conversation: let logging format only enabled messages
     logger.debug(
-        f"Preparing to write Markdown for '{conv_name}' (UUID: {conv_uuid}) to {filepath}"
+        "Preparing to write Markdown for '%s' (UUID: %s) to %s",
+        conv_name,
+        conv_uuid,
+        filepath,
     )
+    fsync = output is not None and output.fsync_files
+    tmp_path = temp_path(filepath)
     try:
-        with filepath.open("w", encoding="utf-8") as md_file:
-            md_file.write("\n".join(content_lines))
-        logger.debug(f"Successfully wrote: {filepath.name} (UUID: {conv_uuid})")
+        if output is None or output.compression == OutputCompression.none:
+            with tmp_path.open("w", encoding="utf-8") as md_file:
+                md_file.write("\n".join(content_lines))
+                if fsync:
+                    md_file.flush()
+                    os.fsync(md_file.fileno())
+        else:
+            with output.open(tmp_path, fsync=fsync) as md_file:
+                md_file.writelines(iter_joined(content_lines))
+        os.replace(tmp_path, filepath)
+        if fsync:
+            fsync_dir(filepath.parent)
+        logger.debug("Successfully wrote: %s (UUID: %s)", filepath.name, conv_uuid)
         return True
+    except RenderTimeout:
+        tmp_path.unlink(missing_ok=True)
+        raise
     except IOError as e:
-        logger.error(f"Error writing Markdown file {filepath} (UUID: {conv_uuid}): {e}")
-        return False
+        logger.error(
+            "Error writing Markdown file %s (UUID: %s): %s", filepath, conv_uuid, e
+        )
     except Exception as e:
         logger.exception(
-            f"An unexpected error occurred while writing {filepath} (UUID: {conv_uuid}): {e}"
+            "An unexpected error occurred while writing %s (UUID: %s): %s",
+            filepath,
+            conv_uuid,
+            e,
         )
-        return False
+    tmp_path.unlink(missing_ok=True)
+    return False
 
 
 def create_slug(text: str, max_length: int = 50) -> str:
@@ -235,19 +400,584 @@ def create_slug(text: str, max_length: int = 50) -> str:
     return slug
 
 
+# Conversion outcomes reported by convert_iter
+STATUS_CONVERTED = "converted"
+STATUS_SKIPPED_EMPTY_NAME = "skipped_empty_name"
+STATUS_SKIPPED_NO_CONTENT = "skipped_no_content"
+STATUS_SKIPPED_OVERSIZED = "skipped_oversized"
+
+
+@dataclass
+class ConversionRecord:
+    """The outcome of converting one conversation, as yielded by ``convert_iter``.
+
+    For converted conversations ``lines`` lazily renders the Markdown; it can
+    be consumed once, either directly or through ``text()``. ``blocks``
+    renders the same document as blocks of lines (header, messages,
+    references), and is consumed instead of ``lines``, not as well. Skipped
+    conversations have no filename and no lines.
+
+    When several ``formats`` are rendered, ``documents`` holds the blocks of
+    each, in the order requested, and ``blocks``/``lines`` are those of the
+    first format. ``filename`` is always the Markdown file name (see
+    ``format_filename``).
+
+    ``oversized`` describes the limit a skipped or truncated conversation
+    hit (see ``guards``). With a render time limit, consuming the blocks
+    raises ``RenderTimeout`` once it is exceeded.
+    """
+
+    uuid: str
+    name: Optional[str]
+    status: str
+    filename: Optional[str] = None
+    lines: Optional[Iterator[str]] = field(default=None, repr=False)
+    blocks: Optional[Iterator[list[str]]] = field(default=None, repr=False)
+    documents: dict[OutputFormat, Iterator[list[str]]] = field(
+        default_factory=dict, repr=False
+    )
+    offset: int = 0  # Byte range of the conversation in the export
+    length: int = 0
+    conversation: dict = field(default_factory=dict, repr=False)
+    cached: bool = False  # Markdown came from the render cache
+    oversized: Optional[OversizedEntry] = field(default=None, repr=False)
+    digest: Optional[bytes] = field(default=None, repr=False)  # Of the JSON text
+
+    def text(self) -> str:
+        """Renders the whole Markdown document as a single string."""
+        if self.lines is None:
+            return ""
+        return "\n".join(self.lines)
+
+
+def convert_iter(
+    source: ExportSource,
+    options: Optional[RenderOptions] = None,
+    limit: Optional[int] = None,
+    cache: Optional[RenderCache] = None,
+    with_digest: bool = False,
+    formats: Sequence[OutputFormat] = (OutputFormat.markdown,),
+    limits: Optional[ConversationLimits] = None,
+) -> Iterator[ConversionRecord]:
+    """Converts the conversations of an export, one record at a time.
+
+    ``source`` may be a path, the raw bytes of an export or a binary stream.
+    The export is read incrementally and nothing is written to disk; each
+    conversation is rendered only when its record's ``lines`` are consumed.
+    At most ``limit`` conversations are read when a limit is given. With a
+    ``cache``, unchanged conversations are served from earlier renders.
+    ``with_digest`` fills in each record's content digest. Each conversation
+    is rendered in all ``formats`` from a single walk, within the given
+    ``limits``.
+
+    Raises ``json.JSONDecodeError`` or ``ExportFormatError`` if the export is
+    malformed, as soon as iteration reaches the offending data.
+    """
+    if options is None:
+        options = RenderOptions()
+    if limit is not None and limit <= 0:
+        return
+
+    with open_export(source) as stream:
+        elements = iter_json_array(
+            stream, with_digest=with_digest or cache is not None
+        )
+        for i, element in enumerate(elements):
+            if limit is not None and i >= limit:
+                break
+            yield convert_conversation(
+                element.value,
+                options,
+                i,
+                element.offset,
+                element.length,
+                digest=element.digest,
+                cache=cache,
+                formats=formats,
+                limits=limits,
+            )
+
+
+def convert_conversation(
+    conv: dict,
+    options: RenderOptions,
+    index: int = 0,
+    offset: int = 0,
+    length: int = 0,
+    digest: Optional[bytes] = None,
+    cache: Optional[RenderCache] = None,
+    formats: Sequence[OutputFormat] = (OutputFormat.markdown,),
+    limits: Optional[ConversationLimits] = None,
+) -> ConversionRecord:
+    """Applies the skip rules to one conversation and prepares its record.
+
+    ``index``, ``offset`` and ``length`` locate the conversation in its
+    export; the index only serves as a fallback uuid. Given the content
+    ``digest`` of the conversation, ``cache`` is consulted before rendering
+    the Markdown and filled afterwards; other formats are always rendered.
+    A conversation over the ``limits`` is skipped or truncated, and a
+    truncated one bypasses the cache.
+    """
+    conv_uuid = conv.get("uuid", f"unknown_uuid_{index}")
+    original_conv_name = conv.get("name")
+    record = ConversionRecord(
+        uuid=conv_uuid,
+        name=original_conv_name,
+        status=STATUS_SKIPPED_EMPTY_NAME,
+        offset=offset,
+        length=length,
+        conversation=conv,
+        digest=digest,
+    )
+
+    # Condition 1: Skip if conversation name is empty or None
+    if not original_conv_name:
+        logger.debug("Skipping conversation (UUID: %s) due to empty name.", conv_uuid)
+        return record
+
+    conv_name = original_conv_name  # Will be truthy here
+
+    # Condition 2: Skip if all messages are empty or no messages exist
+    record.status = STATUS_SKIPPED_NO_CONTENT
+    chat_messages = conv.get("chat_messages", [])
+    if not chat_messages:  # No messages at all
+        logger.warning(
+            "Skipping conversation '%s' (UUID: %s) due to no messages.",
+            conv_name,
+            conv_uuid,
+        )
+        return record
+
+    to_convert = conv
+    notice = None
+    if limits is not None:
+        to_convert, record.oversized = apply_limits(conv, limits, length)
+        if to_convert is None:
+            record.status = STATUS_SKIPPED_OVERSIZED
+            logger.warning(
+                "Skipping conversation '%s' (UUID: %s): over the %s limit.",
+                conv_name,
+                conv_uuid,
+                record.oversized.reason,
+            )
+            return record
+        if record.oversized is not None:
+            notice = truncation_notice(record.oversized)
+            cache = None
+
+    formats = [OutputFormat(fmt) for fmt in formats]
+    to_render = formats
+    documents = {}
+    cache_key = None
+    if cache is not None and digest is not None and OutputFormat.markdown in formats:
+        cache_key = cache.key(digest, options)
+        cached_text = cache.get(cache_key)
+        if cached_text is not None:
+            # Only converted conversations are cached
+            documents[OutputFormat.markdown] = iter(([cached_text],))
+            to_render = [fmt for fmt in formats if fmt != OutputFormat.markdown]
+            cache_key = None
+            record.cached = True
+
+    if to_render:
+        # The walk yields nothing when all messages are empty
+        if len(to_render) == 1:
+            # One format needs no tuples to split
+            renderer = FORMAT_RENDERERS[to_render[0]]()
+            walk = _iter_blocks(renderer, to_convert, conv_name, options, True, notice)
+        else:
+            walk = iter_format_blocks(
+                to_convert,
+                conv_name,
+                options,
+                to_render,
+                skip_empty=True,
+                notice=notice,
+            )
+        if limits is not None and limits.render_seconds is not None:
+            walk = with_deadline(walk, limits.render_seconds)
+        try:
+            first_blocks = next(walk, None)
+        except RenderTimeout:
+            skip_slow_record(record)
+            return record
+        if first_blocks is None:
+            logger.warning(
+                "Skipping conversation '%s' (UUID: %s) because all messages are empty.",
+                conv_name,
+                conv_uuid,
+            )
+            return record
+        walk = chain((first_blocks,), walk)
+        if len(to_render) == 1:
+            streams = [walk]
+        else:
+            streams = split_formats(walk, len(to_render))
+        documents.update(zip(to_render, streams))
+        if cache_key is not None:
+            documents[OutputFormat.markdown] = cache.record_blocks(
+                cache_key, documents[OutputFormat.markdown]
+            )
+
+    record.status = STATUS_CONVERTED
+    record.filename = generate_filename(conv, conv_name)
+    record.documents = {fmt: documents[fmt] for fmt in formats}
+    record.blocks = record.documents[formats[0]]
+    record.lines = chain.from_iterable(record.blocks)
+    return record
+
+
+def skip_slow_record(record: ConversionRecord) -> None:
+    """Marks a record whose rendering ran out of time as skipped."""
+    messages = record.conversation.get("chat_messages")
+    record.status = STATUS_SKIPPED_OVERSIZED
+    record.oversized = OversizedEntry(
+        uuid=record.uuid,
+        name=record.name,
+        reason=REASON_RENDER_TIME,
+        action="skipped",
+        messages=len(messages) if isinstance(messages, list) else 0,
+        kept_messages=0,
+    )
+    logger.warning(
+        "Skipping conversation '%s' (UUID: %s): rendering took too long.",
+        record.name,
+        record.uuid,
+    )
+
+
+def _document_size(lines: list[str]) -> int:
+    return sum(len(line.encode("utf-8")) + 1 for line in lines)
+
+
+def write_conversation_files(
+    output_dir: Path,
+    record: ConversionRecord,
+    output: OutputOptions,
+    options: Optional[RenderOptions] = None,
+    preamble: Iterable[str] = (),
+) -> list[Path]:
+    """Writes a converted record to ``output_dir``, in each of its formats.
+
+    The Markdown document gets the ``preamble`` lines on top. With
+    ``output.max_file_bytes``, a larger Markdown document is paged into
+    ``..._partNNN.md`` files (see ``paging``), and pages left over from an
+    earlier, longer version are removed; other formats are written whole.
+    Returns the files written, those of the first format first (first page
+    first), or an empty list if writing failed. If rendering runs out of
+    time, the files written so far are removed and ``RenderTimeout`` is
+    raised.
+    """
+    documents = record.documents or {OutputFormat.markdown: record.blocks}
+    paths = []
+    try:
+        for fmt, blocks in documents.items():
+            if fmt == OutputFormat.markdown:
+                written = _write_markdown_files(
+                    output_dir, record, blocks, output, options, preamble, paths
+                )
+            else:
+                path = output_dir / output.filename(
+                    format_filename(record.filename, fmt)
+                )
+                lines = chain.from_iterable(blocks)
+                ok = write_markdown_file(path, lines, record.name, record.uuid, output)
+                written = [path] if ok else []
+                paths.extend(written)
+            if not written:
+                return []
+    except RenderTimeout:
+        for path in paths:
+            path.unlink(missing_ok=True)
+        raise
+    return paths
+
+
+def _write_markdown_files(
+    output_dir: Path,
+    record: ConversionRecord,
+    blocks: Iterator[list[str]],
+    output: OutputOptions,
+    options: Optional[RenderOptions],
+    preamble: Iterable[str],
+    written: list[Path],
+) -> list[Path]:
+    """Writes the Markdown document, adding each file to ``written`` as it
+    is completed."""
+    filename = output.filename(record.filename)
+    if output.max_file_bytes is None:
+        md_filepath = output_dir / filename
+        lines = chain.from_iterable(blocks)
+        if preamble:
+            lines = chain(preamble, lines)
+        if write_markdown_file(md_filepath, lines, record.name, record.uuid, output):
+            written.append(md_filepath)
+            return [md_filepath]
+        return []
+
+    if record.cached:
+        # A cached document is one block; render it again to page it
+        block = next(blocks)
+        if _document_size(block) > output.max_file_bytes:
+            blocks = iter_markdown_blocks(
+                record.conversation, record.name, options, skip_empty=True
+            )
+        else:
+            blocks = iter((block,))
+    if preamble:
+        blocks = chain((list(preamble),), blocks)
+
+    def page_filename(number: int) -> str:
+        return output.filename(part_filename(record.filename, number))
+
+    pager = Pager(
+        blocks, output.max_file_bytes, f"Conversation: {record.name}", page_filename
+    )
+    paths = []
+    while not pager.done:
+        page_path = output_dir / page_filename(pager.page_count + 1)
+        if not write_markdown_file(
+            page_path, pager.page(), record.name, record.uuid, output
+        ):
+            return []
+        paths.append(page_path)
+        written.append(page_path)
+
+    stale = []
+    if len(paths) == 1:
+        try:
+            os.replace(paths[0], output_dir / filename)
+        except OSError as e:
+            logger.error(f"Error moving {paths[0]} to {filename}: {e}")
+            return []
+        paths = [output_dir / filename]
+    else:
+        stale.append(output_dir / filename)
+    number = max(len(paths), 1) + 1
+    while (output_dir / page_filename(number)).exists():
+        stale.append(output_dir / page_filename(number))
+        number += 1
+    for path in stale:
+        path.unlink(missing_ok=True)
+    if output.fsync_files:
+        fsync_dir(output_dir)
+    if len(paths) > 1:
+        logger.debug("Paged %s into %d files.", filename, len(paths))
+    return paths
+
+
+STREAM_SEPARATOR = "<!-- cj2md: {filename} -->"
+
+
+def write_markdown_stream(
+    out: TextIO, content_lines: Iterable[str], filename: str
+) -> None:
+    """Writes one Markdown document to a text stream, preceded by a separator
+    line naming the file it would have been written to."""
+    out.write(STREAM_SEPARATOR.format(filename=filename) + "\n")
+    for line in content_lines:
+        out.write(line)
+        out.write("\n")
+    out.flush()
+
+
+def _is_path_source(source: ExportSource) -> bool:
+    return isinstance(source, (str, Path)) and str(source) != STDIN_SOURCE
+
+
+def _run_conversion(
+    json_source: ExportSource,
+    limit: Optional[int],
+    options: RenderOptions,
+    write_record: Callable[[ConversionRecord], bool],
+    cache: Optional[RenderCache] = None,
+    progress: Optional[ProgressReporter] = None,
+    with_digest: bool = False,
+    skip_uuids: Optional[set[str]] = None,
+    formats: Sequence[OutputFormat] = (OutputFormat.markdown,),
+    limits: Optional[ConversationLimits] = None,
+) -> list[OversizedEntry]:
+    """Feeds converted records to ``write_record`` and logs the run summary.
+
+    ``write_record`` returns False when a record could not be written.
+    Conversations in ``skip_uuids`` are counted as duplicates and never
+    rendered. Records carry a document for each of the ``formats``.
+    Conversations over the ``limits`` are skipped or truncated; returns
+    their report entries.
+    """
+    oversized: list[OversizedEntry] = []
+    if limit is not None and limit >= 0:
+        if limit == 0:
+            logger.info("Processing limit is 0, no conversations will be processed.")
+            return oversized
+        logger.info(f"Processing at most {limit} conversations (limit applied).")
+
+    read_count = 0
+    processed_count = 0
+    skipped_empty_name_count = 0
+    skipped_no_content_count = 0
+    skipped_duplicate_count = 0
+    skipped_oversized_count = 0
+    truncated_count = 0
+    failed_write_count = 0
+    bytes_read = 0
+    try:
+        with ExitStack() as stack:
+            source = json_source
+            raw_file = None
+            if progress is not None:
+                stack.callback(progress.stop)
+                if _is_path_source(json_source):
+                    # Read through our own handle so progress can follow the
+                    # position in the (possibly compressed) input file.
+                    raw_file = stack.enter_context(open(json_source, "rb"))
+                    progress.total_bytes = os.fstat(raw_file.fileno()).st_size
+                    source = raw_file
+
+            records = convert_iter(
+                source,
+                options,
+                limit=limit,
+                cache=cache,
+                with_digest=with_digest,
+                formats=formats,
+                limits=limits,
+            )
+            for record in records:
+                read_count += 1
+                if record.status == STATUS_SKIPPED_EMPTY_NAME:
+                    skipped_empty_name_count += 1
+                elif record.status == STATUS_SKIPPED_NO_CONTENT:
+                    skipped_no_content_count += 1
+                elif record.status == STATUS_SKIPPED_OVERSIZED:
+                    skipped_oversized_count += 1
+                    oversized.append(record.oversized)
+                elif skip_uuids and record.uuid in skip_uuids:
+                    skipped_duplicate_count += 1
+                else:
+                    try:
+                        written = write_record(record)
+                    except RenderTimeout:
+                        skip_slow_record(record)
+                        skipped_oversized_count += 1
+                        oversized.append(record.oversized)
+                    else:
+                        if not written:
+                            failed_write_count += 1
+                        else:
+                            processed_count += 1
+                            if record.oversized is not None:
+                                truncated_count += 1
+                                oversized.append(record.oversized)
+
+                if progress is not None:
+                    bytes_read = (
+                        raw_file.tell() if raw_file else record.offset + record.length
+                    )
+                    progress.update(
+                        read_count,
+                        bytes_read,
+                        skipped_empty_name_count
+                        + skipped_no_content_count
+                        + skipped_duplicate_count
+                        + skipped_oversized_count,
+                        failed_write_count,
+                    )
+            if progress is not None:
+                progress.close(
+                    read_count,
+                    bytes_read,
+                    skipped_empty_name_count
+                    + skipped_no_content_count
+                    + skipped_duplicate_count
+                    + skipped_oversized_count,
+                    failed_write_count,
+                )
+    except FileNotFoundError:
+        logger.error(f"Error: Input JSON file not found at {json_source}")
+        return oversized
+    except json.JSONDecodeError:
+        logger.error(
+            f"Error: Could not decode JSON from {json_source}. Please ensure it's valid JSON."
+        )
+        return oversized
+    except (ExportFormatError, EOFError, lzma.LZMAError) as e:
+        # EOFError/LZMAError: truncated or corrupt compressed input
+        logger.error(f"Error: Could not read {json_source}: {e}")
+        return oversized
+    except OSError as e:
+        logger.exception(f"An unexpected error occurred while reading {json_source}: {e}")
+        return oversized
+
+    if read_count == 0:
+        logger.info("No conversations to process.")
+        return oversized
+    logger.info(f"Read {read_count} conversations from the JSON file.")
+
+    summary_msg = (
+        f"Finished processing. Processed: {processed_count}. "
+        f"Skipped (empty name): {skipped_empty_name_count}. "
+        f"Skipped (no content): {skipped_no_content_count}. "
+    )
+    if skip_uuids is not None:
+        summary_msg += f"Skipped (duplicate): {skipped_duplicate_count}. "
+    if limits is not None:
+        summary_msg += (
+            f"Skipped (oversized): {skipped_oversized_count}. "
+            f"Truncated: {truncated_count}. "
+        )
+    summary_msg += f"Failed writes: {failed_write_count}."
+    if cache is not None:
+        summary_msg += f" Cache hits: {cache.hits}. Cache misses: {cache.misses}."
+    logger.info(summary_msg)
+    return oversized
+
+
 def json_to_markdown(
-    json_file_path: Path,
+    json_file_path: ExportSource,
     output_dir: Path,
     limit: Optional[int] = None,
     options: Optional[RenderOptions] = None,
+    cache: Optional[RenderCache] = None,
+    progress: Optional[ProgressReporter] = None,
+    manifest: bool = True,
+    index_pages: bool = False,
+    output: Optional[OutputOptions] = None,
+    duplicates: Optional[DedupReport] = None,
+    duplicate_mode: DuplicateMode = DuplicateMode.keep,
+    limits: Optional[ConversationLimits] = None,
 ):
     """
     Reads a JSON file containing a list of conversations, extracts relevant information,
     and writes each conversation to a separate Markdown file in the output directory.
-    Can limit the number of conversations processed.
+    Can limit the number of conversations processed, reuse earlier renders
+    from a ``cache`` and report live ``progress``. Unless ``manifest`` is
+    False, every written file is also recorded in the directory's manifest,
+    from which ``index_pages`` builds the year/month navigation pages.
+    ``output`` selects compressed files and the formats written, all
+    rendered from one walk over each conversation. Given the ``duplicates`` found in
+    the export, ``duplicate_mode`` skips them or links them to each other.
+    Conversations over the ``limits`` are skipped or truncated and listed
+    in ``oversized.jsonl``.
     """
     if options is None:
         options = RenderOptions()
+    if output is None:
+        output = OutputOptions()
+    skip_uuids = None
+    notes: dict[str, str] = {}
+    if duplicates is not None and duplicate_mode == DuplicateMode.skip:
+        skip_uuids = duplicates.duplicate_uuids()
+    elif duplicates is not None and duplicate_mode == DuplicateMode.link:
+        notes = duplicate_notes(
+            duplicates,
+            lambda ref: output.filename(
+                generate_filename(
+                    {"uuid": ref.uuid, "created_at": ref.created_at or "N/A"},
+                    ref.name,
+                )
+            ),
+        )
     logger.info(
         f"Starting Markdown conversion process. Input: '{json_file_path}', Output dir: '{output_dir}', Limit: {limit}"
     )
@@ -261,86 +991,153 @@ def json_to_markdown(
             logger.exception(f"Error creating output directory {output_dir}: {e}")
             return
 
-    conversations = load_and_validate_conversations(json_file_path)
-    if conversations is None:
-        return  # Errors already logged by the helper function
-
-    original_total_conversations = len(conversations)
-    logger.info(f"Found {original_total_conversations} conversations in the JSON file.")
-    if limit is not None and limit >= 0:
-        conversations_to_process = conversations[:limit]
-        if limit == 0:
-            logger.info("Processing limit is 0, no conversations will be processed.")
-            return
-        # This print is still useful to show context before progress bar starts
-        logger.info(
-            f"Processing {len(conversations_to_process)} of {original_total_conversations} total conversations (limit applied)."
-        )
-    else:
-        conversations_to_process = conversations
-        # logger.info(f"Processing all {len(conversations_to_process)} conversations.") # Already logged above
-
-    if not conversations_to_process:
-        logger.info("No conversations to process.")
-        return
+    with ExitStack() as stack:
+        syncer = output.batch_sync(output_dir)
+        if syncer is not None:
+            # Registered first, so it runs last, after the manifest is compacted
+            stack.callback(syncer.sync)
+        manifest_writer = None
+        if manifest:
+            try:
+                manifest_writer = stack.enter_context(ManifestWriter(output_dir))
+            except OSError as e:
+                logger.warning(f"Could not open the manifest in {output_dir}: {e}")
 
-    processed_count = 0
-    skipped_empty_name_count = 0
-    skipped_no_content_count = 0
-    failed_write_count = 0
-    # Removed Progress wrapper
-    for i, conv in enumerate(conversations_to_process):
-        conv_uuid = conv.get("uuid", f"unknown_uuid_{i}")
-        original_conv_name = conv.get("name")
-
-        # Condition 1: Skip if conversation name is empty or None
-        if not original_conv_name:
-            logger.debug(
-                f"Skipping conversation (UUID: {conv_uuid}) due to empty name."
+        def write_record(record: ConversionRecord) -> bool:
+            note = notes.get(record.uuid)
+            paths = write_conversation_files(
+                output_dir,
+                record,
+                output,
+                options,
+                preamble=(note, "") if note is not None else (),
             )
-            skipped_empty_name_count += 1
-            continue
+            if paths and syncer is not None:
+                for path in paths:
+                    syncer.add(path)
+            if paths and manifest_writer is not None:
+                manifest_writer.add(
+                    ManifestEntry.for_conversation(
+                        record.conversation,
+                        paths[0].name,
+                        sum(path.stat().st_size for path in paths),
+                        record.digest,
+                    )
+                )
+            return bool(paths)
 
-        # Use the original name if present, otherwise default (though we just checked it's not empty)
-        conv_name = original_conv_name  # Will be truthy here
+        oversized = _run_conversion(
+            json_file_path,
+            limit,
+            options,
+            write_record,
+            cache,
+            progress,
+            with_digest=manifest_writer is not None,
+            skip_uuids=skip_uuids,
+            formats=output.formats,
+            limits=limits,
+        )
+        if limits is not None:
+            write_oversized_report(output_dir, oversized)
 
-        # Condition 2: Skip if all messages are empty or no messages exist
-        chat_messages = conv.get("chat_messages", [])
-        if not chat_messages:  # No messages at all
-            logger.warning(
-                f"Skipping conversation '{conv_name}' (UUID: {conv_uuid}) due to no messages."
-            )
-            skipped_no_content_count += 1
-            continue
+    if index_pages and manifest_writer is not None:
+        update_index_pages(
+            output_dir, manifest_writer.previous, manifest_writer.entries
+        )
 
-        if not has_meaningful_content(chat_messages):
-            logger.warning(
-                f"Skipping conversation '{conv_name}' (UUID: {conv_uuid}) because all messages are empty."
-            )
-            skipped_no_content_count += 1
-            continue
 
-        # Proceed with Markdown generation if checks passed
-        # conv_created_at = conv.get('created_at', 'N/A') # Moved to generate_filename
-        # conv_updated_at = conv.get('updated_at', 'N/A') # Will be used by generate_markdown_content
+def json_to_stream(
+    json_source: ExportSource,
+    out: TextIO,
+    limit: Optional[int] = None,
+    options: Optional[RenderOptions] = None,
+    cache: Optional[RenderCache] = None,
+    progress: Optional[ProgressReporter] = None,
+    limits: Optional[ConversationLimits] = None,
+):
+    """
+    Like json_to_markdown, but streams every converted conversation to ``out``
+    (e.g. stdout), each preceded by a STREAM_SEPARATOR line. Oversized
+    conversations are only logged.
+    """
+    if options is None:
+        options = RenderOptions()
+    logger.info(
+        f"Starting Markdown conversion process. Input: '{json_source}', Output: stream, Limit: {limit}"
+    )
 
-        md_filename = generate_filename(conv, conv_name)
+    def write_record(record: ConversionRecord) -> bool:
+        lines = record.lines
+        if limits is not None and limits.render_seconds is not None:
+            # Render before writing, so a timeout leaves no partial document
+            lines = list(lines)
+        write_markdown_stream(out, lines, record.filename)
+        return True
 
-        md_content_lines = generate_markdown_content(conv, conv_name, options)
+    _run_conversion(
+        json_source, limit, options, write_record, cache, progress, limits=limits
+    )
 
-        md_filepath = output_dir / md_filename
 
-        # logger.debug(f"Preparing to write Markdown for '{conv_name}' (UUID: {conv_uuid}) to {md_filepath}") # Moved to write_markdown_file
+def json_to_sqlite(
+    json_source: ExportSource,
+    db_path: Path,
+    limit: Optional[int] = None,
+    options: Optional[RenderOptions] = None,
+    cache: Optional[RenderCache] = None,
+    progress: Optional[ProgressReporter] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    limits: Optional[ConversationLimits] = None,
+):
+    """
+    Like json_to_markdown, but upserts every converted conversation, with its
+    rendered Markdown and its messages, into the SQLite database at
+    ``db_path``, committing every ``batch_size`` conversations. Oversized
+    conversations are only logged.
+    """
+    if options is None:
+        options = RenderOptions()
+    logger.info(
+        f"Starting SQLite conversion process. Input: '{json_source}', Database: '{db_path}', Limit: {limit}"
+    )
+    try:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        writer = SqliteWriter(db_path, batch_size)
+        with writer:
 
-        if write_markdown_file(md_filepath, md_content_lines, conv_name, conv_uuid):
-            processed_count += 1
-        else:
-            failed_write_count += 1
+            def write_record(record: ConversionRecord) -> bool:
+                try:
+                    writer.add(
+                        record.conversation,
+                        record.text(),
+                        record.filename,
+                        record.digest,
+                    )
+                except sqlite3.Error as e:
+                    logger.error(
+                        "Error writing conversation %s to %s: %s",
+                        record.uuid,
+                        db_path,
+                        e,
+                    )
+                    return False
+                return True
 
-    summary_msg = (
-        f"Finished processing. Processed: {processed_count}. "
-        f"Skipped (empty name): {skipped_empty_name_count}. "
-        f"Skipped (no content): {skipped_no_content_count}. "
-        f"Failed writes: {failed_write_count}."
+            _run_conversion(
+                json_source,
+                limit,
+                options,
+                write_record,
+                cache,
+                progress,
+                with_digest=True,
+                limits=limits,
+            )
+    except (OSError, sqlite3.Error) as e:
+        logger.error(f"Error: Could not write the database {db_path}: {e}")
+        return
+    logger.info(
+        f"Database {db_path}: {writer.written} conversations written, "
+        f"{writer.unchanged} already up to date."
     )
-    logger.info(summary_msg)
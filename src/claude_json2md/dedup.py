@@ -0,0 +1,436 @@
+"""Exact and near-duplicate conversations in an export.
+
+Conversations are compared by the text of their messages, lowercased and with
+whitespace collapsed. Identical texts are exact duplicates and are found by
+digest. Near duplicates (retried prompts, forked chats) are found with
+MinHash: every text is cut into overlapping ``SHINGLE_BYTES``-byte shingles,
+which are hashed and reduced to a signature of ``NUM_PERM`` minimums by
+one-permutation hashing. Texts are processed in chunks of ``CHUNK_BYTES``
+with vectorized NumPy operations, so there is no Python loop per shingle.
+Signatures are cut into ``BANDS`` bands for locality-sensitive hashing, and
+only conversations that share a band are compared.
+
+Only named conversations with some text are considered, as the others are
+never converted. NumPy is needed for near duplicates (``pip install
+"claude-json-to-markdown[dedup]"``).
+"""
+
+import logging
+from dataclasses import dataclass, field
+from enum import Enum
+from hashlib import blake2b
+from typing import Callable, NamedTuple, Optional
+
+from .reader import ExportSource, iter_json_array, open_export
+from .sqlite_store import message_text
+
+logger = logging.getLogger("converter_app")
+
+DEFAULT_THRESHOLD = 0.8  # Estimated Jaccard similarity of near duplicates
+NUM_PERM = 128  # Signature length; a power of two
+BANDS = 16  # LSH bands of NUM_PERM // BANDS values each
+SHINGLE_BYTES = 8
+CHUNK_BYTES = 1 << 22  # Text hashed per vectorized step
+
+EXACT = "exact"
+NEAR = "near"
+
+_BIN_SHIFT = 64 - (NUM_PERM.bit_length() - 1)  # Top bits pick the bin
+_DIGEST_BYTES = 16
+
+
+class DuplicateMode(str, Enum):
+    keep = "keep"  # Write every conversation
+    skip = "skip"  # Write only the kept conversation of each group
+    link = "link"  # Write every conversation, with links between duplicates
+
+
+class ConversationRef(NamedTuple):
+    uuid: str
+    name: str
+    created_at: Optional[str]
+    updated_at: Optional[str]
+    message_count: int
+
+
+class Duplicate(NamedTuple):
+    conversation: ConversationRef
+    kind: str  # EXACT or NEAR
+    similarity: float  # Estimated Jaccard similarity to the kept conversation
+
+
+@dataclass
+class DuplicateGroup:
+    """A conversation kept as the original and its duplicates.
+
+    The kept conversation is the one with the most messages, then the most
+    recently updated, then the first in the export.
+    """
+
+    kept: ConversationRef
+    duplicates: list[Duplicate] = field(default_factory=list)
+
+
+@dataclass
+class DedupReport:
+    conversations: int  # Conversations compared
+    threshold: float
+    near: bool  # Whether near duplicates were searched for
+    groups: list[DuplicateGroup] = field(default_factory=list)
+
+    def duplicate_uuids(self) -> set[str]:
+        """The conversations that duplicate a kept one."""
+        return {
+            duplicate.conversation.uuid
+            for group in self.groups
+            for duplicate in group.duplicates
+        }
+
+    def to_dict(self) -> dict:
+        duplicates = [d for group in self.groups for d in group.duplicates]
+        return {
+            "conversations": self.conversations,
+            "threshold": self.threshold,
+            "near": self.near,
+            "groups": len(self.groups),
+            "duplicates": len(duplicates),
+            "exact_duplicates": sum(d.kind == EXACT for d in duplicates),
+            "near_duplicates": sum(d.kind == NEAR for d in duplicates),
+            "duplicate_groups": [
+                {
+                    "kept": group.kept._asdict(),
+                    "duplicates": [
+                        {
+                            **d.conversation._asdict(),
+                            "kind": d.kind,
+                            "similarity": round(d.similarity, 3),
+                        }
+                        for d in group.duplicates
+                    ],
+                }
+                for group in self.groups
+            ],
+        }
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError(
+            "Near-duplicate detection needs NumPy; install it with "
+            'pip install "claude-json-to-markdown[dedup]", or compare exact '
+            "copies only."
+        )
+    return numpy
+
+
+def normalized_text(conv: dict) -> str:
+    """The message text of a conversation, lowercased, with whitespace
+    collapsed."""
+    messages = conv.get("chat_messages")
+    if not isinstance(messages, list):
+        return ""
+    text = "\n".join(message_text(msg) for msg in messages if isinstance(msg, dict))
+    return " ".join(text.lower().split())
+
+
+class _Signatures:
+    """MinHash signatures of texts, computed a chunk of texts at a time."""
+
+    def __init__(self, np):
+        self._np = np
+        self._pending: list[bytes] = []
+        self._pending_bytes = 0
+        self._chunks: list = []
+        self.count = 0
+
+    def add(self, data: bytes) -> None:
+        if len(data) < SHINGLE_BYTES:
+            data = data.ljust(SHINGLE_BYTES, b"\0")
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+        self.count += 1
+        if self._pending_bytes >= CHUNK_BYTES:
+            self._flush()
+
+    def matrix(self):
+        """One row of ``NUM_PERM`` uint32 values per text, in order added."""
+        np = self._np
+        self._flush()
+        if not self._chunks:
+            return np.empty((0, NUM_PERM), dtype=np.uint32)
+        return np.concatenate(self._chunks)
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        np = self._np
+        texts = self._pending
+        self._pending = []
+        self._pending_bytes = 0
+
+        data = b"".join(texts)
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+        ends = np.cumsum(lengths)
+        # Every shingle as a little-endian uint64: overlapping, unaligned
+        # views into the joined text, without copying it
+        windows = np.ndarray(
+            (len(data) - SHINGLE_BYTES + 1,), dtype="<u8", buffer=data, strides=(1,)
+        )
+        doc = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        doc = doc[: len(windows)]
+        # Drop the shingles that run into the next text
+        valid = np.ones(len(windows), dtype=bool)
+        straddling = (ends[:, None] - np.arange(1, SHINGLE_BYTES)).ravel()
+        valid[straddling[straddling < len(windows)]] = False
+
+        hashes = _mix(np, windows[valid])
+        doc = doc[valid]
+        # One-permutation hashing: the top bits of a hash pick one of the
+        # NUM_PERM bins, and each bin keeps its minimum
+        bins = (hashes >> np.uint64(_BIN_SHIFT)).astype(np.int64)
+        values = (hashes >> np.uint64(_BIN_SHIFT - 32)).astype(np.uint32)
+        empty = np.iinfo(np.uint32).max
+        signatures = np.full((len(texts), NUM_PERM), empty, dtype=np.uint32)
+        np.minimum.at(signatures.ravel(), doc * NUM_PERM + bins, values)
+        self._chunks.append(_densify(np, signatures, signatures == empty))
+
+
+def _mix(np, x):
+    """The splitmix64 finalizer, applied to every element."""
+    x = x * np.uint64(0x9E3779B97F4A7C15)
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return x
+
+
+def _densify(np, signatures, empty):
+    """Fills empty bins from the next non-empty bin to the right (wrapping
+    around), offset by the distance, so that short texts still compare
+    well."""
+    if not empty.any():
+        return signatures
+    columns = np.arange(2 * NUM_PERM)
+    filled = np.where(np.tile(~empty, 2), columns, 2 * NUM_PERM)
+    nearest = np.minimum.accumulate(filled[:, ::-1], axis=1)[:, ::-1][:, :NUM_PERM]
+    distance = (nearest - columns[:NUM_PERM]).astype(np.uint32)
+    borrowed = np.take_along_axis(signatures, nearest % NUM_PERM, axis=1)
+    return borrowed + distance * np.uint32(0x9E3779B9)
+
+
+def _similarity(np, signatures, first, second):
+    """Estimated Jaccard similarity of the rows ``first`` and ``second``."""
+    return (signatures[first] == signatures[second]).mean(axis=-1)
+
+
+def _candidate_pairs(np, signatures):
+    """Pairs of rows that share at least one band."""
+    rows = NUM_PERM // BANDS
+    n = len(signatures)
+    bands = signatures.reshape(n, BANDS, rows).astype(np.uint64)
+    # Polynomial hash of each band's values
+    keys = np.zeros((n, BANDS), dtype=np.uint64)
+    for i in range(rows):
+        keys = keys * np.uint64(0x100000001B3) + bands[:, :, i]
+    pairs = []
+    for band in range(BANDS):
+        order = np.argsort(keys[:, band], kind="stable")
+        sorted_keys = keys[order, band]
+        same = np.flatnonzero(sorted_keys[1:] == sorted_keys[:-1])
+        if not len(same):
+            continue
+        # Neighbours in a bucket, and every member with the bucket's first
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        first = starts[np.searchsorted(starts, same + 1, side="right") - 1]
+        pairs.append(np.stack([order[same], order[same + 1]], axis=1))
+        pairs.append(np.stack([order[first], order[same + 1]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.concatenate(pairs)
+    pairs.sort(axis=1)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    return np.unique(pairs, axis=0)
+
+
+def _find(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_duplicates(
+    source: ExportSource,
+    threshold: float = DEFAULT_THRESHOLD,
+    near: bool = True,
+    limit: Optional[int] = None,
+) -> DedupReport:
+    """Groups the exact (and, with ``near``, near) duplicate conversations of
+    an export.
+
+    Near duplicates are conversations whose estimated Jaccard similarity to
+    another member of their group is at least ``threshold``. At most
+    ``limit`` conversations are read when a limit is given. Raises
+    ``RuntimeError`` for near duplicates without NumPy, ``ValueError`` for a
+    threshold outside (0, 1], and the reader's errors if the export is
+    malformed.
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError("The similarity threshold must be in (0, 1].")
+    np = _numpy() if near else None
+
+    refs: list[ConversationRef] = []
+    text_ids: list[int] = []  # Per conversation, the index of its distinct text
+    digest_ids: dict[bytes, int] = {}
+    signatures = _Signatures(np) if near else None
+    with open_export(source) as stream:
+        for position, element in enumerate(iter_json_array(stream)):
+            if limit is not None and position >= limit:
+                break
+            conv = element.value
+            if not isinstance(conv, dict) or not conv.get("name"):
+                continue
+            text = normalized_text(conv)
+            if not text:
+                continue
+            messages = conv.get("chat_messages")
+            created_at = conv.get("created_at")
+            updated_at = conv.get("updated_at")
+            refs.append(
+                ConversationRef(
+                    conv.get("uuid", f"unknown_uuid_{position}"),
+                    conv["name"],
+                    created_at if isinstance(created_at, str) else None,
+                    updated_at if isinstance(updated_at, str) else None,
+                    len(messages),
+                )
+            )
+            data = text.encode("utf-8")
+            digest = blake2b(data, digest_size=_DIGEST_BYTES).digest()
+            text_id = digest_ids.get(digest)
+            if text_id is None:
+                text_id = digest_ids[digest] = len(digest_ids)
+                if signatures is not None:
+                    signatures.add(data)
+            text_ids.append(text_id)
+
+    # Union-find over distinct texts: exact copies share one from the start
+    parent = list(range(len(digest_ids)))
+    matrix = None
+    if signatures is not None:
+        matrix = signatures.matrix()
+        pairs = _candidate_pairs(np, matrix)
+        if len(pairs):
+            similar = _similarity(np, matrix, pairs[:, 0], pairs[:, 1]) >= threshold
+            for first, second in pairs[similar].tolist():
+                root_first, root_second = _find(parent, first), _find(parent, second)
+                if root_first != root_second:
+                    parent[root_second] = root_first
+        logger.debug(
+            "Compared %d candidate pairs of %d distinct texts.",
+            len(pairs),
+            len(matrix),
+        )
+
+    members: dict[int, list[int]] = {}
+    for index, text_id in enumerate(text_ids):
+        members.setdefault(_find(parent, text_id), []).append(index)
+
+    groups = []
+    for indexes in members.values():
+        if len(indexes) < 2:
+            continue
+        kept = max(
+            indexes,
+            key=lambda i: (refs[i].message_count, refs[i].updated_at or "", -i),
+        )
+        group = DuplicateGroup(refs[kept])
+        for index in indexes:
+            if index == kept:
+                continue
+            if text_ids[index] == text_ids[kept]:
+                group.duplicates.append(Duplicate(refs[index], EXACT, 1.0))
+            else:
+                similarity = float(
+                    _similarity(np, matrix, text_ids[index], text_ids[kept])
+                )
+                group.duplicates.append(Duplicate(refs[index], NEAR, similarity))
+        group.duplicates.sort(key=lambda d: (-d.similarity, d.conversation.uuid))
+        groups.append(group)
+    groups.sort(key=lambda group: (group.kept.created_at or "", group.kept.uuid))
+
+    report = DedupReport(len(refs), threshold, near, groups)
+    logger.info(
+        f"Compared {len(refs)} conversations: {len(report.duplicate_uuids())} "
+        f"duplicates in {len(groups)} groups."
+    )
+    return report
+
+
+def _describe(duplicate: Duplicate) -> str:
+    if duplicate.kind == EXACT:
+        return "exact copy"
+    return f"{duplicate.similarity:.0%} similar"
+
+
+def duplicate_notes(
+    report: DedupReport, filename_for: Callable[[ConversationRef], str]
+) -> dict[str, str]:
+    """A Markdown note per grouped conversation, linking it to the rest of
+    its group; ``filename_for`` gives the file a conversation is written to."""
+
+    def link(ref: ConversationRef) -> str:
+        name = ref.name.replace("[", "\\[").replace("]", "\\]")
+        return f"[{name}]({filename_for(ref)})"
+
+    notes = {}
+    for group in report.groups:
+        copies = ", ".join(
+            f"{link(d.conversation)} ({_describe(d)})" for d in group.duplicates
+        )
+        notes[group.kept.uuid] = f"> **Duplicates:** {copies}"
+        for duplicate in group.duplicates:
+            notes[duplicate.conversation.uuid] = (
+                f"> **Duplicate of:** {link(group.kept)} ({_describe(duplicate)})"
+            )
+    return notes
+
+
+def render_dedup_markdown(report: DedupReport) -> str:
+    summary = report.to_dict()
+    matching = "exact copies" if not report.near else (
+        f"exact copies and near duplicates (similarity >= {report.threshold:g})"
+    )
+    lines = [
+        "# Duplicate Conversations",
+        "",
+        f"Compared {report.conversations} conversations for {matching}: "
+        f"{summary['duplicates']} duplicates in {summary['groups']} groups "
+        f"({summary['exact_duplicates']} exact, {summary['near_duplicates']} near).",
+    ]
+    for group in report.groups:
+        kept = group.kept
+        lines.extend(
+            [
+                "",
+                f"## {kept.name}",
+                "",
+                f"Kept: `{kept.uuid}` ({(kept.created_at or 'undated')[:10]}, "
+                f"{kept.message_count} messages)",
+                "",
+                "| Duplicate | UUID | Created | Messages | Match |",
+                "|-----------|------|---------|----------|-------|",
+            ]
+        )
+        for duplicate in group.duplicates:
+            ref = duplicate.conversation
+            name = ref.name.replace("|", "\\|")
+            lines.append(
+                f"| {name} | `{ref.uuid}` | {(ref.created_at or '-')[:10]} | "
+                f"{ref.message_count} | {_describe(duplicate)} |"
+            )
+    return "\n".join(lines) + "\n"
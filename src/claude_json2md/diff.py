@@ -0,0 +1,179 @@
+"""Compare two exports and report which conversations changed.
+
+Both exports are streamed and reduced to compact uuid -> (updated_at,
+content digest) maps, which are then compared. Time is linear in the export
+sizes, and memory grows with the number of uuids rather than with their
+content.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+from .converter import STATUS_CONVERTED, convert_conversation, write_markdown_file
+from .manifest import ManifestEntry, ManifestWriter
+from .reader import ExportSource, iter_json_array, open_export
+from .renderers import RenderOptions
+
+logger = logging.getLogger("converter_app")
+
+_DIGEST_BYTES = 16
+
+DIFF_ADDED = "added"
+DIFF_REMOVED = "removed"
+DIFF_MODIFIED = "modified"
+
+
+def content_digest(conversation) -> bytes:
+    """Digest of a conversation's canonical JSON, so that exports differing
+    only in key order or whitespace compare equal."""
+    canonical = json.dumps(
+        conversation, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return blake2b(canonical.encode("utf-8"), digest_size=_DIGEST_BYTES).digest()
+
+
+class ConversationDigest(NamedTuple):
+    """What the diff remembers about one conversation."""
+
+    name: str
+    updated_at: str
+    digest: bytes
+
+
+def iter_digests(source: ExportSource) -> Iterator[tuple[str, ConversationDigest]]:
+    """Yields (uuid, digest) for every conversation with a uuid in an export.
+
+    Conversations without a uuid can't be matched across exports and are
+    skipped with a warning.
+    """
+    with open_export(source) as stream:
+        for position, element in enumerate(iter_json_array(stream)):
+            conv = element.value
+            uuid = conv.get("uuid") if isinstance(conv, dict) else None
+            if not uuid:
+                logger.warning(
+                    "Conversation at index %d has no uuid; it can't be compared.",
+                    position,
+                )
+                continue
+            yield uuid, ConversationDigest(
+                conv.get("name") or "",
+                conv.get("updated_at") or "",
+                content_digest(conv),
+            )
+
+
+class DiffEntry(NamedTuple):
+    """One added, removed or modified conversation."""
+
+    status: str
+    uuid: str
+    name: str
+    old_updated_at: Optional[str]
+    new_updated_at: Optional[str]
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+@dataclass
+class ExportDiff:
+    """Result of comparing two exports."""
+
+    added: list[DiffEntry] = field(default_factory=list)
+    removed: list[DiffEntry] = field(default_factory=list)
+    modified: list[DiffEntry] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def changed_uuids(self) -> set[str]:
+        """uuids present in the new export that are new or differ."""
+        return {entry.uuid for entry in self.added + self.modified}
+
+    def entries(self) -> list[DiffEntry]:
+        return self.added + self.removed + self.modified
+
+    def summary(self) -> str:
+        return (
+            f"Added: {len(self.added)}. Removed: {len(self.removed)}. "
+            f"Modified: {len(self.modified)}. Unchanged: {self.unchanged}."
+        )
+
+
+def diff_exports(old: ExportSource, new: ExportSource) -> ExportDiff:
+    """Compares two exports by uuid and content digest.
+
+    A conversation is modified when its content differs, whether or not its
+    ``updated_at`` moved. Duplicate uuids within one export keep the last
+    occurrence.
+    """
+    old_digests = dict(iter_digests(old))
+    result = ExportDiff()
+    for uuid, current in dict(iter_digests(new)).items():
+        previous = old_digests.pop(uuid, None)
+        if previous is None:
+            result.added.append(
+                DiffEntry(DIFF_ADDED, uuid, current.name, None, current.updated_at)
+            )
+        elif previous.digest != current.digest:
+            result.modified.append(
+                DiffEntry(
+                    DIFF_MODIFIED,
+                    uuid,
+                    current.name,
+                    previous.updated_at,
+                    current.updated_at,
+                )
+            )
+        else:
+            result.unchanged += 1
+    for uuid, previous in old_digests.items():
+        result.removed.append(
+            DiffEntry(DIFF_REMOVED, uuid, previous.name, previous.updated_at, None)
+        )
+    return result
+
+
+def render_changed(
+    new: ExportSource,
+    changed_uuids: set[str],
+    output_dir: Path,
+    options: Optional[RenderOptions] = None,
+) -> int:
+    """Writes Markdown for the given uuids of the new export.
+
+    Returns the number of files written. A uuid repeated within the export
+    is written once per occurrence, so the last one wins, as in the diff.
+    The files are listed in the directory's manifest.
+    """
+    if options is None:
+        options = RenderOptions()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written_count = 0
+    with open_export(new) as stream, ManifestWriter(output_dir) as manifest:
+        elements = iter_json_array(stream, with_digest=True)
+        for position, element in enumerate(elements):
+            conv = element.value
+            uuid = conv.get("uuid") if isinstance(conv, dict) else None
+            if uuid not in changed_uuids:
+                continue
+            record = convert_conversation(
+                conv, options, position, element.offset, element.length
+            )
+            if record.status != STATUS_CONVERTED:
+                continue
+            md_filepath = output_dir / record.filename
+            if write_markdown_file(
+                md_filepath, record.lines, record.name, record.uuid
+            ):
+                written_count += 1
+                manifest.add(
+                    ManifestEntry.for_conversation(
+                        conv, record.filename, md_filepath.stat().st_size, element.digest
+                    )
+                )
+    return written_count
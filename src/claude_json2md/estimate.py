@@ -0,0 +1,212 @@
+"""Dry-run estimates of a conversion.
+
+``inspect_export`` streams an export once and applies the same skip rules
+as ``convert_conversation`` from cheap probes: the conversation's name, its
+number of messages, and its messages only up to the first with meaningful
+content, which is usually the first. Nothing is rendered except a sample
+of the conversations that would be converted (the first ``SAMPLE_FIRST``,
+then one in ``SAMPLE_EVERY``). The sample is written to a temporary
+directory with the run's output options, compression and fsyncs included,
+which calibrates the output size and the render and write time per byte
+of JSON. Those costs are applied to the JSON size of every conversation
+that would be converted.
+
+The projected time is the measured parse time plus the calibrated render
+and write time, for a single process. The temporary directory may be on a
+faster or slower disk than the real output.
+"""
+
+import logging
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from .converter import (
+    STATUS_CONVERTED,
+    convert_conversation,
+    has_meaningful_content,
+    write_conversation_files,
+)
+from .guards import ConversationLimits, RenderTimeout, apply_limits
+from .output import OutputOptions
+from .reader import ExportSource, iter_json_array, open_export
+from .renderers import RenderOptions
+
+logger = logging.getLogger("converter_app")
+
+SAMPLE_FIRST = 20
+SAMPLE_EVERY = 50
+
+
+@dataclass
+class InspectReport:
+    conversations: int = 0  # Read from the export
+    processed: int = 0  # Would be converted
+    skipped_empty_name: int = 0
+    skipped_no_content: int = 0
+    skipped_oversized: int = 0
+    input_bytes: int = 0  # JSON text of the conversations read
+    converted_input_bytes: int = 0  # ... of those that would be converted
+    sampled: int = 0  # Conversations rendered to calibrate the estimates
+    sampled_input_bytes: int = 0
+    sampled_output_bytes: int = 0  # As written, compressed if enabled
+    sampled_render_seconds: float = 0.0  # Rendering and writing
+    scan_seconds: float = 0.0  # Reading and parsing, without the sample
+
+    @property
+    def output_bytes_per_input_byte(self) -> float:
+        if not self.sampled_input_bytes:
+            return 0.0
+        return self.sampled_output_bytes / self.sampled_input_bytes
+
+    @property
+    def render_seconds_per_byte(self) -> float:
+        if not self.sampled_input_bytes:
+            return 0.0
+        return self.sampled_render_seconds / self.sampled_input_bytes
+
+    @property
+    def estimated_output_bytes(self) -> int:
+        return round(self.converted_input_bytes * self.output_bytes_per_input_byte)
+
+    @property
+    def estimated_seconds(self) -> float:
+        render = self.converted_input_bytes * self.render_seconds_per_byte
+        return self.scan_seconds + render
+
+    def to_dict(self) -> dict:
+        report = asdict(self)
+        report["estimated_output_bytes"] = self.estimated_output_bytes
+        report["estimated_seconds"] = round(self.estimated_seconds, 3)
+        report["scan_seconds"] = round(self.scan_seconds, 3)
+        report["sampled_render_seconds"] = round(self.sampled_render_seconds, 3)
+        return report
+
+
+def _sample(
+    report: InspectReport,
+    conv: dict,
+    index: int,
+    length: int,
+    options: RenderOptions,
+    output: OutputOptions,
+    limits: Optional[ConversationLimits],
+    sample_dir: Path,
+) -> None:
+    """Renders and writes one conversation to ``sample_dir``, timing it."""
+    start = time.perf_counter()
+    record = convert_conversation(
+        conv, options, index, length=length, formats=output.formats, limits=limits
+    )
+    output_bytes = 0
+    if record.status == STATUS_CONVERTED:
+        try:
+            paths = write_conversation_files(sample_dir, record, output, options)
+        except RenderTimeout:
+            paths = []
+        for path in paths:
+            output_bytes += path.stat().st_size
+            path.unlink()
+    report.sampled_render_seconds += time.perf_counter() - start
+    report.sampled += 1
+    report.sampled_input_bytes += length
+    report.sampled_output_bytes += output_bytes
+
+
+def inspect_export(
+    source: ExportSource,
+    limit: Optional[int] = None,
+    options: Optional[RenderOptions] = None,
+    output: Optional[OutputOptions] = None,
+    limits: Optional[ConversationLimits] = None,
+) -> InspectReport:
+    """Estimates what ``json_to_markdown`` would do with an export, writing
+    only a sample to a temporary directory.
+
+    ``limit``, ``options``, ``output`` and ``limits`` are those of the
+    conversion. Raises the reader's errors if the export is malformed.
+    """
+    if options is None:
+        options = RenderOptions()
+    if output is None:
+        output = OutputOptions()
+    report = InspectReport()
+    if limit is not None and limit <= 0:
+        return report
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp, open_export(source) as stream:
+        sample_dir = Path(tmp)
+        for index, element in enumerate(iter_json_array(stream)):
+            if limit is not None and index >= limit:
+                break
+            conv = element.value
+            report.conversations += 1
+            report.input_bytes += element.length
+            if not isinstance(conv, dict) or not conv.get("name"):
+                report.skipped_empty_name += 1
+                continue
+            messages = conv.get("chat_messages")
+            if not messages:
+                report.skipped_no_content += 1
+                continue
+            if limits is not None:
+                kept, _ = apply_limits(conv, limits, element.length)
+                if kept is None:
+                    report.skipped_oversized += 1
+                    continue
+                messages = kept["chat_messages"]
+            if not isinstance(messages, list) or not has_meaningful_content(messages):
+                report.skipped_no_content += 1
+                continue
+            if report.processed < SAMPLE_FIRST or report.processed % SAMPLE_EVERY == 0:
+                _sample(
+                    report,
+                    conv,
+                    index,
+                    element.length,
+                    options,
+                    output,
+                    limits,
+                    sample_dir,
+                )
+            report.processed += 1
+            report.converted_input_bytes += element.length
+    report.scan_seconds = time.perf_counter() - start - report.sampled_render_seconds
+    logger.debug(
+        "Calibrated on %d conversations: %.3f output bytes and %.1f ns per input byte.",
+        report.sampled,
+        report.output_bytes_per_input_byte,
+        report.render_seconds_per_byte * 1e9,
+    )
+    return report
+
+
+def _size(n: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+def render_inspect_text(report: InspectReport) -> str:
+    """The report as a few lines of text."""
+    lines = [
+        f"Conversations: {report.conversations}",
+        f"  Processed: {report.processed}",
+        f"  Skipped (empty name): {report.skipped_empty_name}",
+        f"  Skipped (no content): {report.skipped_no_content}",
+    ]
+    if report.skipped_oversized:
+        lines.append(f"  Skipped (oversized): {report.skipped_oversized}")
+    lines += [
+        f"Input: {_size(report.input_bytes)} "
+        f"({_size(report.converted_input_bytes)} to convert)",
+        f"Estimated output: {_size(report.estimated_output_bytes)}",
+        f"Estimated time: {report.estimated_seconds:.1f} s "
+        f"(parsing {report.scan_seconds:.1f} s, measured; writing calibrated "
+        f"on {report.sampled} conversations)",
+    ]
+    return "\n".join(lines)
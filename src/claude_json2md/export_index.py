@@ -0,0 +1,303 @@
+"""Sidecar index of an export, for random access to single conversations.
+
+One streaming pass records every conversation's uuid, name, timestamps and
+byte range in a small SQLite database next to the export
+(``export.json.cj2md-index``). Later lookups by uuid, name or date read the
+index and then parse only the matching slices of the export, instead of the
+whole file.
+
+The index remembers the export's size, modification time and digest. An
+export whose size and mtime still match is trusted as is; one whose mtime
+changed is re-hashed, and the index is rebuilt only if the content changed.
+
+Offsets count bytes of the decompressed export, so slices of a plain export
+are read by seeking, while a compressed export is decompressed up to the
+last slice without being parsed.
+"""
+
+import io
+import json
+import logging
+import os
+import sqlite3
+from hashlib import blake2b
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Optional
+
+from .output import temp_path
+from .reader import is_plain_file, iter_json_array, open_export
+
+logger = logging.getLogger("converter_app")
+
+INDEX_SUFFIX = ".cj2md-index"
+INDEX_VERSION = 1
+
+_HASH_CHUNK = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID;
+CREATE TABLE conversations (
+    position INTEGER PRIMARY KEY,
+    uuid TEXT,
+    name TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX conversations_uuid ON conversations (uuid);
+"""
+_COLUMNS = "uuid, name, created_at, updated_at, position, offset, length"
+
+
+class IndexEntry(NamedTuple):
+    uuid: Optional[str]
+    name: Optional[str]
+    created_at: Optional[str]
+    updated_at: Optional[str]
+    position: int  # Element index within the export
+    offset: int  # Byte range within the (decompressed) export
+    length: int
+
+
+def index_path_for(export: Path) -> Path:
+    return export.with_name(export.name + INDEX_SUFFIX)
+
+
+class _HashingReader(io.RawIOBase):
+    """Passes a file's bytes through while hashing them."""
+
+    def __init__(self, raw: BinaryIO):
+        self._raw = raw
+        self.hash = blake2b()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(len(buffer))
+        self.hash.update(data)
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def file_digest(path: Path) -> str:
+    digest = blake2b()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _row(position: int, conv, offset: int, length: int) -> tuple:
+    if not isinstance(conv, dict):
+        return (None, None, None, None, position, offset, length)
+    fields = (conv.get(key) for key in ("uuid", "name", "created_at", "updated_at"))
+    return (
+        *(value if isinstance(value, str) else None for value in fields),
+        position,
+        offset,
+        length,
+    )
+
+
+def build_index(export: Path, index_path: Optional[Path] = None) -> "ExportIndex":
+    """Indexes ``export`` in one streaming pass and returns the open index.
+
+    The index is written to a temporary file and moved into place, so an
+    interrupted pass leaves any previous index untouched. Raises the
+    reader's errors if the export is malformed.
+    """
+    export = Path(export)
+    index_path = index_path or index_path_for(export)
+    tmp_path = temp_path(index_path)
+    tmp_path.unlink(missing_ok=True)
+    stat = os.stat(export)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        with open(export, "rb") as raw:
+            hashing = _HashingReader(raw)
+            with open_export(io.BufferedReader(hashing, _HASH_CHUNK)) as stream:
+                rows = (
+                    _row(position, element.value, element.offset, element.length)
+                    for position, element in enumerate(iter_json_array(stream))
+                )
+                conn.executemany(
+                    f"INSERT INTO conversations ({_COLUMNS}) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            # Hash what the reader left unread, such as trailing whitespace
+            while chunk := raw.read(_HASH_CHUNK):
+                hashing.hash.update(chunk)
+        conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)",
+            [
+                ("version", INDEX_VERSION),
+                ("size", stat.st_size),
+                ("mtime_ns", stat.st_mtime_ns),
+                ("digest", hashing.hash.hexdigest()),
+            ],
+        )
+        conn.commit()
+    except BaseException:
+        conn.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(tmp_path, index_path)
+    index = ExportIndex(export, index_path)
+    logger.info(f"Indexed {len(index)} conversations of {export} in {index_path}.")
+    return index
+
+
+def open_index(
+    export: Path, index_path: Optional[Path] = None, rebuild: bool = True
+) -> Optional["ExportIndex"]:
+    """The index of ``export``, (re)built first if missing or stale.
+
+    With ``rebuild`` False, returns None instead of building.
+    """
+    export = Path(export)
+    index_path = index_path or index_path_for(export)
+    if index_path.exists():
+        try:
+            index = ExportIndex(export, index_path)
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"Ignoring unreadable index {index_path}: {e}")
+        else:
+            if index.is_current():
+                return index
+            index.close()
+            logger.info(f"The index of {export} is out of date.")
+    if not rebuild:
+        return None
+    return build_index(export, index_path)
+
+
+class ExportIndex:
+    """An open sidecar index; see ``build_index`` and ``open_index``."""
+
+    def __init__(self, export: Path, index_path: Path):
+        self.export = Path(export)
+        self.path = index_path
+        self._conn = sqlite3.connect(index_path)
+        try:
+            self.meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+            if self.meta.get("version") != INDEX_VERSION:
+                raise sqlite3.DatabaseError(
+                    f"unsupported index version {self.meta.get('version')}"
+                )
+        except sqlite3.DatabaseError:
+            self._conn.close()
+            raise
+
+    def __enter__(self) -> "ExportIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT count(*) FROM conversations").fetchone()[0]
+
+    def is_current(self) -> bool:
+        """Whether the export is unchanged since it was indexed.
+
+        Only an export whose mtime changed at the same size is hashed again;
+        if its content is unchanged, the new mtime is recorded.
+        """
+        try:
+            stat = os.stat(self.export)
+        except OSError:
+            return False
+        if stat.st_size != self.meta["size"]:
+            return False
+        if stat.st_mtime_ns == self.meta["mtime_ns"]:
+            return True
+        if file_digest(self.export) != self.meta["digest"]:
+            return False
+        try:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE meta SET value = ? WHERE key = 'mtime_ns'",
+                    (stat.st_mtime_ns,),
+                )
+        except sqlite3.Error as e:
+            # Still valid; it will just be hashed again next time
+            logger.debug("Could not update the index mtime: %s", e)
+        self.meta["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    def select(
+        self,
+        uuid: Optional[str] = None,
+        name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> list[IndexEntry]:
+        """Entries in export order, optionally only those whose uuid is or
+        starts with ``uuid`` (as in file names), whose name contains
+        ``name`` (ignoring ASCII case), and that were created within
+        [``since``, ``until``] (ISO 8601 dates or timestamps)."""
+        clauses, params = [], []
+        if uuid is not None:
+            clauses.append("uuid >= ? AND uuid < ?")
+            params.extend([uuid, uuid + "\uffff"])
+        if name is not None:
+            clauses.append("instr(lower(name), lower(?)) > 0")
+            params.append(name)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            # Compared as prefixes, so all of the day ``until`` is included
+            clauses.append("substr(created_at, 1, length(?)) <= ?")
+            params.extend([until, until])
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM conversations {where}ORDER BY position", params
+        )
+        return [IndexEntry(*row) for row in rows]
+
+
+def read_slices(
+    export: Path, entries: Iterable[IndexEntry]
+) -> Iterator[tuple[IndexEntry, bytes]]:
+    """Reads the JSON text of the conversations of ``entries`` out of
+    ``export``, in file order, without parsing it."""
+    entries = sorted(entries, key=lambda entry: entry.offset)
+    if not entries:
+        return
+    if is_plain_file(export):
+        with open(export, "rb") as f:
+            for entry in entries:
+                f.seek(entry.offset)
+                yield entry, f.read(entry.length)
+        return
+    with open_export(export) as stream:
+        position = 0
+        for entry in entries:
+            while position < entry.offset:
+                skipped = stream.read(min(_HASH_CHUNK, entry.offset - position))
+                if not skipped:
+                    raise EOFError(f"{export} is shorter than its index.")
+                position += len(skipped)
+            raw = stream.read(entry.length)
+            if len(raw) < entry.length:
+                raise EOFError(f"{export} is shorter than its index.")
+            position += len(raw)
+            yield entry, raw
+
+
+def read_conversations(
+    export: Path, entries: Iterable[IndexEntry]
+) -> Iterator[tuple[IndexEntry, dict]]:
+    """Parses the conversations of ``entries`` out of ``export``, in file
+    order."""
+    for entry, raw in read_slices(export, entries):
+        yield entry, json.loads(raw)
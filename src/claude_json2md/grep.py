@@ -0,0 +1,284 @@
+"""Searching the messages of an export without converting it.
+
+Decoding the JSON costs far more than searching the decoded text, so the
+search avoids decoding where it can. A literal pattern is first looked for
+in the raw JSON text of each conversation, and only conversations that may
+contain it are decoded and searched field by field.
+
+With a current sidecar index (see ``export_index``), the main process only
+reads the conversations' byte ranges and a pool of workers does the
+decoding and searching, batch by batch. Without one, the export is
+streamed and searched in-process, since finding the conversations in it
+already means decoding them. Either way, matches are yielded in export
+order as soon as the conversations before them have been searched.
+"""
+
+import json
+import logging
+import os
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from .export_index import IndexEntry, open_index, read_slices
+from .reader import STDIN_SOURCE, ExportSource, iter_json_array, open_export
+
+logger = logging.getLogger("converter_app")
+
+SNIPPET_CONTEXT = 40  # Characters shown on each side of a match
+BATCH_CONVERSATIONS = 64
+BATCH_BYTES = 4 * 1024 * 1024
+
+# Searched fields of a message
+FIELD_TEXT = "text"
+FIELD_THINKING = "thinking"
+FIELD_TOOL_USE = "tool_use"
+FIELD_TOOL_RESULT = "tool_result"
+
+_REGEX_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+# Characters a JSON encoder may escape; a literal without them appears
+# verbatim in the raw JSON text of any string containing it
+_JSON_ESCAPED = frozenset('"\\/')
+
+
+class GrepMatch(NamedTuple):
+    uuid: str
+    name: str
+    created_at: str
+    position: int  # Element index within the export
+    message_index: int
+    sender: str
+    field: str  # FIELD_*
+    snippet: str
+
+
+class Matcher:
+    """A compiled search pattern.
+
+    A pattern without regex metacharacters, or any pattern with
+    ``fixed_strings``, is a literal: it is found with ``str.find`` and
+    pre-checked against the raw JSON text. Ignoring case, an ASCII literal
+    only folds ASCII letters.
+    """
+
+    def __init__(
+        self, pattern: str, fixed_strings: bool = False, ignore_case: bool = False
+    ):
+        if not pattern:
+            raise ValueError("The pattern is empty.")
+        self.pattern = pattern
+        literal = fixed_strings or not _REGEX_METACHARACTERS.intersection(pattern)
+        self.literal = pattern if literal and not ignore_case else None
+        flags = re.IGNORECASE if ignore_case else 0
+        if literal and pattern.isascii():
+            flags |= re.ASCII
+        self.regex = re.compile(re.escape(pattern) if literal else pattern, flags)
+        self._raw = None
+        if (
+            literal
+            and pattern.isascii()
+            and pattern.isprintable()
+            and not _JSON_ESCAPED.intersection(pattern)
+        ):
+            # Exports may escape non-ASCII text, so only ASCII is pre-checked
+            self._raw = re.compile(re.escape(pattern.encode("ascii")), flags)
+
+    def search(self, text: str) -> Optional[tuple[int, int]]:
+        """Start and end of the first match in ``text``, if any."""
+        if self.literal is not None:
+            start = text.find(self.literal)
+            return (start, start + len(self.literal)) if start >= 0 else None
+        found = self.regex.search(text)
+        return found.span() if found else None
+
+    def may_match_raw(self, raw: bytes) -> bool:
+        """False only if the JSON text ``raw`` can't contain a match."""
+        return self._raw is None or self._raw.search(raw) is not None
+
+
+def snippet(text: str, start: int, end: int, context: int = SNIPPET_CONTEXT) -> str:
+    """The match at ``start:end`` with some context, on one line."""
+    first = max(start - context, 0)
+    last = min(end + context, len(text))
+    shown = " ".join(text[first:last].split())
+    return ("…" if first else "") + shown + ("…" if last < len(text) else "")
+
+
+def _strings(value) -> Iterator[str]:
+    """The strings in a JSON value, such as a tool's input, in order."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for child in value.values():
+            yield from _strings(child)
+    elif isinstance(value, list):
+        for child in value:
+            yield from _strings(child)
+
+
+def _item_texts(item: dict) -> Iterator[tuple[str, str]]:
+    """The searched (field, text) pairs of one content item."""
+    item_type = item.get("type", "text")
+    if item_type == "thinking":
+        text = item.get("thinking")
+        field = FIELD_THINKING
+    elif item_type == "tool_use":
+        text = "\n".join(_strings(item.get("input")))
+        field = FIELD_TOOL_USE
+    elif item_type == "tool_result":
+        text = item.get("content")
+        if isinstance(text, list):
+            text = "\n".join(
+                part.get("text") or "" for part in text if isinstance(part, dict)
+            )
+        field = FIELD_TOOL_RESULT
+    else:
+        text = item.get("text")
+        field = FIELD_TEXT
+    if isinstance(text, str) and text:
+        yield field, text
+
+
+def search_conversation(
+    conv: dict, matcher: Matcher, position: int = 0, max_count: Optional[int] = None
+) -> list[GrepMatch]:
+    """The first match in each searched field of ``conv``, at most
+    ``max_count`` of them."""
+    messages = conv.get("chat_messages") if isinstance(conv, dict) else None
+    if not isinstance(messages, list):
+        return []
+    matches = []
+    for message_index, msg in enumerate(messages):
+        if not isinstance(msg, dict):
+            continue
+        content = msg.get("content")
+        items = []
+        if isinstance(content, list):
+            items = [item for item in content if isinstance(item, dict)]
+        if items:
+            texts = (pair for item in items for pair in _item_texts(item))
+        else:
+            texts = _item_texts({"text": msg.get("text")})
+        for field, text in texts:
+            span = matcher.search(text)
+            if span is None:
+                continue
+            matches.append(
+                GrepMatch(
+                    uuid=str(conv.get("uuid") or f"unknown_uuid_{position}"),
+                    name=str(conv.get("name") or ""),
+                    created_at=str(conv.get("created_at") or ""),
+                    position=position,
+                    message_index=message_index,
+                    sender=str(msg.get("sender") or ""),
+                    field=field,
+                    snippet=snippet(text, *span),
+                )
+            )
+            if max_count is not None and len(matches) >= max_count:
+                return matches
+    return matches
+
+
+def _search_batch(
+    batch: list[tuple[int, bytes]], matcher: Matcher, max_count: Optional[int]
+) -> list[GrepMatch]:
+    """Worker: searches the raw JSON texts of a batch of conversations."""
+    matches = []
+    for position, raw in batch:
+        if matcher.may_match_raw(raw):
+            conv = json.loads(raw)
+            matches.extend(search_conversation(conv, matcher, position, max_count))
+    return matches
+
+
+def _iter_batches(
+    export: Path, entries: Iterable[IndexEntry]
+) -> Iterator[list[tuple[int, bytes]]]:
+    batch = []
+    size = 0
+    for entry, raw in read_slices(export, entries):
+        batch.append((entry.position, raw))
+        size += len(raw)
+        if len(batch) >= BATCH_CONVERSATIONS or size >= BATCH_BYTES:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+
+def _grep_indexed(
+    export: Path,
+    entries: list[IndexEntry],
+    matcher: Matcher,
+    workers: int,
+    max_count: Optional[int],
+) -> Iterator[GrepMatch]:
+    batches = _iter_batches(export, entries)
+    if workers == 1:
+        for batch in batches:
+            yield from _search_batch(batch, matcher, max_count)
+        return
+    pending: deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            for batch in batches:
+                future = executor.submit(_search_batch, batch, matcher, max_count)
+                pending.append(future)
+                # Hand over finished batches in order while the rest run
+                while pending and (pending[0].done() or len(pending) >= 4 * workers):
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def grep_export(
+    source: ExportSource,
+    matcher: Matcher,
+    workers: Optional[int] = None,
+    limit: Optional[int] = None,
+    max_count: Optional[int] = None,
+    index_path: Optional[Path] = None,
+) -> Iterator[GrepMatch]:
+    """Yields the matches of ``matcher`` in an export, in export order.
+
+    At most ``limit`` conversations are searched, with at most
+    ``max_count`` matches each. An export with a current sidecar index is
+    searched by ``workers`` processes (default: CPU count); others are
+    streamed and searched in-process.
+
+    Raises the reader's errors if the export is malformed.
+    """
+    index = None
+    if isinstance(source, (str, Path)) and str(source) != STDIN_SOURCE:
+        index = open_index(Path(source), index_path, rebuild=False)
+    if index is not None:
+        with index:
+            entries = index.select()
+        if limit is not None:
+            entries = entries[:limit]
+        workers = workers or os.cpu_count() or 1
+        logger.debug(
+            f"Searching {len(entries)} indexed conversations with {workers} workers."
+        )
+        yield from _grep_indexed(Path(source), entries, matcher, workers, max_count)
+        return
+
+    if workers is not None and workers > 1:
+        logger.info(
+            "The export has no current index; searching it in-process. "
+            "Run `cj2md index` first to search it in parallel."
+        )
+    if limit == 0:
+        return
+    with open_export(source) as stream:
+        for position, element in enumerate(iter_json_array(stream)):
+            yield from search_conversation(element.value, matcher, position, max_count)
+            if limit is not None and position + 1 >= limit:
+                break
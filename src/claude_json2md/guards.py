@@ -0,0 +1,175 @@
+"""Guards against pathological conversations.
+
+A single conversation with a huge tool result or a very long thread can
+stall a whole run. ``ConversationLimits`` caps the size of a conversation's
+JSON, its number of messages and the time spent rendering it. A
+conversation over the size or message limit is skipped or truncated to the
+messages that fit, as set by ``OversizedAction``; one that takes too long
+to render is always skipped. Oversized conversations are listed in
+``oversized.jsonl`` in the output directory.
+"""
+
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, TypeVar
+
+logger = logging.getLogger("converter_app")
+
+OVERSIZED_FILENAME = "oversized.jsonl"
+
+# Why a conversation was oversized
+REASON_BYTES = "bytes"
+REASON_MESSAGES = "messages"
+REASON_RENDER_TIME = "render_time"
+
+T = TypeVar("T")
+
+
+class OversizedAction(str, Enum):
+    skip = "skip"  # Write nothing for the conversation
+    truncate = "truncate"  # Write the leading messages that fit the limits
+
+
+class RenderTimeout(Exception):
+    """Rendering a conversation took longer than its time limit."""
+
+
+@dataclass
+class ConversationLimits:
+    max_bytes: Optional[int] = None  # Of the conversation's JSON text
+    max_messages: Optional[int] = None
+    render_seconds: Optional[float] = None
+    action: OversizedAction = OversizedAction.skip
+
+    def __post_init__(self):
+        self.action = OversizedAction(self.action)
+        for name in ("max_bytes", "max_messages", "render_seconds"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be positive.")
+
+
+@dataclass
+class OversizedEntry:
+    uuid: str
+    name: Optional[str]
+    reason: str  # REASON_*
+    action: str  # "skipped" or "truncated"
+    messages: int  # In the export
+    kept_messages: int  # Written
+
+
+def json_size(value, budget: int) -> int:
+    """Estimated size of ``value`` as JSON text, counted until it passes
+    ``budget`` so that a huge value is not walked in full."""
+    size = 0
+    stack = [value]
+    while stack and size <= budget:
+        item = stack.pop()
+        if isinstance(item, str):
+            size += len(item) + 2
+        elif isinstance(item, dict):
+            size += 2
+            for key, child in item.items():
+                size += len(key) + 4
+                stack.append(child)
+        elif isinstance(item, list):
+            size += 2 + len(item)
+            stack.extend(item)
+        else:
+            size += len(json.dumps(item))
+    return size
+
+
+def apply_limits(
+    conv: dict, limits: ConversationLimits, length: int = 0
+) -> tuple[Optional[dict], Optional[OversizedEntry]]:
+    """Checks a conversation against the size and message limits.
+
+    ``length`` is the size of its JSON text in the export, if known. Returns
+    the conversation to render (``conv`` itself, a truncated copy, or None
+    to skip it) and, when a limit was hit, its report entry.
+    """
+    messages = conv.get("chat_messages")
+    if not isinstance(messages, list):
+        return conv, None
+    reason = None
+    keep = len(messages)
+    if limits.max_messages is not None and keep > limits.max_messages:
+        reason = REASON_MESSAGES
+        keep = limits.max_messages
+    if limits.max_bytes is not None:
+        size = length or json_size(conv, limits.max_bytes)
+        if size > limits.max_bytes:
+            reason = REASON_BYTES
+            # Keep the leading messages that fit in the budget
+            budget = limits.max_bytes
+            fitting = 0
+            for msg in messages[:keep]:
+                budget -= json_size(msg, budget)
+                if budget < 0:
+                    break
+                fitting += 1
+            keep = fitting
+    if reason is None:
+        return conv, None
+
+    truncate = limits.action == OversizedAction.truncate and keep > 0
+    if truncate and keep == len(messages):
+        # Over the size limit through the conversation's own fields only;
+        # every message fits, so there is nothing to truncate
+        return conv, None
+    entry = OversizedEntry(
+        uuid=conv.get("uuid", ""),
+        name=conv.get("name"),
+        reason=reason,
+        action="truncated" if truncate else "skipped",
+        messages=len(messages),
+        kept_messages=keep if truncate else 0,
+    )
+    if not truncate:
+        return None, entry
+    truncated = dict(conv)
+    truncated["chat_messages"] = messages[:keep]
+    return truncated, entry
+
+
+def truncation_notice(entry: OversizedEntry) -> str:
+    limit = "size" if entry.reason == REASON_BYTES else "message"
+    return (
+        f"Truncated: showing {entry.kept_messages} of {entry.messages} messages "
+        f"(conversation over the {limit} limit)."
+    )
+
+
+def with_deadline(items: Iterable[T], seconds: float) -> Iterator[T]:
+    """Passes ``items`` through, raising ``RenderTimeout`` once producing
+    them has taken more than ``seconds`` since the first was asked for.
+
+    The limit is cooperative: it is checked between items, so a single
+    block that is slow to render (a message with a huge tool result, say)
+    is finished before the limit is noticed."""
+    deadline = time.monotonic() + seconds
+    for item in items:
+        if time.monotonic() > deadline:
+            raise RenderTimeout(f"rendering took longer than {seconds:g}s")
+        yield item
+
+
+def write_oversized_report(output_dir: Path, entries: list[OversizedEntry]) -> None:
+    """Lists this run's oversized conversations in ``oversized.jsonl``; a
+    run without any removes the list left by an earlier run."""
+    path = output_dir / OVERSIZED_FILENAME
+    try:
+        if not entries:
+            path.unlink(missing_ok=True)
+            return
+        with path.open("w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning(f"Could not write {path}: {e}")
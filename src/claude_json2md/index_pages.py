@@ -0,0 +1,146 @@
+"""Browsable ``index.md`` navigation pages for an output directory.
+
+The top-level ``index.md`` lists years and months; ``index/YYYY-MM.md`` lists
+the conversations of one month with their date and message count. Pages are
+built from the manifest entries collected while converting, so the Markdown
+files are never read back, and only months whose listing changed since the
+previous run are rewritten.
+"""
+
+import calendar
+import logging
+import re
+from collections import defaultdict
+from itertools import groupby
+from pathlib import Path
+
+logger = logging.getLogger("converter_app")
+
+INDEX_FILENAME = "index.md"
+INDEX_DIR = "index"
+UNDATED = "undated"
+
+_MONTH_RE = re.compile(r"^(\d{4})-(\d{2})")
+_ESCAPE_RE = re.compile(r"([\\|\[\]])")
+
+# One listing row: (date, name, path, message_count)
+Row = tuple[str, str, str, int]
+
+
+def month_key(entry: dict) -> str:
+    """``YYYY-MM`` of an entry's creation date, or ``undated``."""
+    match = _MONTH_RE.match(entry.get("created_at") or "")
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        return UNDATED
+    return match.group(0)
+
+
+def month_title(key: str) -> str:
+    if key == UNDATED:
+        return "Undated"
+    year, month = key.split("-")
+    return f"{calendar.month_name[int(month)]} {year}"
+
+
+def group_by_month(entries: dict[str, dict]) -> dict[str, list[Row]]:
+    """Sorted listing rows per month."""
+    months: dict[str, list[Row]] = defaultdict(list)
+    for entry in entries.values():
+        months[month_key(entry)].append(
+            (
+                (entry.get("created_at") or "")[:10],
+                entry.get("name") or "",
+                entry["path"],
+                entry.get("message_count", 0),
+            )
+        )
+    for rows in months.values():
+        rows.sort()
+    return dict(months)
+
+
+def _escape(text: str) -> str:
+    return _ESCAPE_RE.sub(r"\\\1", text)
+
+
+def render_month_page(key: str, rows: list[Row]) -> str:
+    lines = [
+        f"# {month_title(key)}",
+        "",
+        f"[All conversations](../{INDEX_FILENAME})",
+        "",
+        "| Date | Conversation | Messages |",
+        "|------|--------------|----------|",
+    ]
+    for date, name, path, message_count in rows:
+        lines.append(
+            f"| {date or '-'} | [{_escape(name)}](../{path}) | {message_count} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def render_top_index(months: dict[str, list[Row]]) -> str:
+    lines = ["# Conversations", ""]
+    dated = sorted((key for key in months if key != UNDATED), reverse=True)
+    for year, keys in groupby(dated, key=lambda key: key[:4]):
+        lines.extend([f"## {year}", ""])
+        for key in keys:
+            lines.append(
+                f"- [{month_title(key)}]({INDEX_DIR}/{key}.md) ({len(months[key])} conversations)"
+            )
+        lines.append("")
+    if UNDATED in months:
+        lines.extend(["## Undated", ""])
+        lines.append(
+            f"- [Undated]({INDEX_DIR}/{UNDATED}.md) ({len(months[UNDATED])} conversations)"
+        )
+        lines.append("")
+    return "\n".join(lines)
+
+
+def update_index_pages(
+    output_dir: Path, previous: dict[str, dict], entries: dict[str, dict]
+) -> int:
+    """Brings the index pages in line with ``entries``.
+
+    ``previous`` are the manifest entries the pages were last built from.
+    Only months whose listing differs (or whose page is missing) are
+    rewritten, and pages of months that no longer have conversations are
+    removed. Returns the number of pages written.
+    """
+    try:
+        return _write_pages(output_dir, previous, entries)
+    except OSError as e:
+        logger.error(f"Error writing index pages in {output_dir}: {e}")
+        return 0
+
+
+def _write_pages(
+    output_dir: Path, previous: dict[str, dict], entries: dict[str, dict]
+) -> int:
+    old_months = group_by_month(previous)
+    new_months = group_by_month(entries)
+    index_dir = output_dir / INDEX_DIR
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    written = 0
+    for key, rows in new_months.items():
+        page = index_dir / f"{key}.md"
+        if old_months.get(key) != rows or not page.exists():
+            page.write_text(render_month_page(key, rows), encoding="utf-8")
+            written += 1
+    stale = old_months.keys() - new_months.keys()
+    for key in stale:
+        (index_dir / f"{key}.md").unlink(missing_ok=True)
+    logger.debug(
+        "Index pages: %d months rewritten, %d removed, %d unchanged.",
+        written,
+        len(stale),
+        len(new_months) - written,
+    )
+
+    top_page = output_dir / INDEX_FILENAME
+    if written or stale or not top_page.exists():
+        top_page.write_text(render_top_index(new_months), encoding="utf-8")
+        written += 1
+    return written
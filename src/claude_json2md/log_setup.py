@@ -1,19 +1,120 @@
+import atexit
 import json
 import logging
 import logging.config
+import logging.handlers
+import os
+import queue
 from pathlib import Path
 from typing import Optional
 from platformdirs import user_log_dir
+from rich.console import Console
+from rich.logging import RichHandler
 
 # --- Constants for Logging ---
 APP_NAME = "JSONToMarkdownConverter"
 APP_AUTHOR = "antisimplistic"
 DEFAULT_LOG_FILENAME = "converter.log"
 
+# Writes file log records on a background thread; see _queue_file_handlers
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+def _stop_queue_listener() -> None:
+    """Flushes pending records to the file, stops the background thread and
+    closes the file handlers.
+
+    The file handlers are no longer on the root logger, so logging.shutdown()
+    would not close them.
+    """
+    global _queue_listener, _queue_handler
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+        _queue_listener.handlers = ()
+        _queue_listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler.close()
+        _queue_handler = None
+
+
+def _queue_file_handlers(root: logging.Logger) -> None:
+    """Moves file handlers behind a QueueHandler/QueueListener pair.
+
+    Callers then only enqueue records; formatting for the file and the disk
+    I/O run on the listener's thread, so a slow disk does not stall
+    conversion.
+    """
+    global _queue_listener, _queue_handler
+    _stop_queue_listener()
+    file_handlers = [
+        handler for handler in root.handlers if isinstance(handler, logging.FileHandler)
+    ]
+    if not file_handlers:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # The QueueHandler must accept everything the file handlers might want
+    queue_handler.setLevel(min(handler.level for handler in file_handlers))
+    for handler in file_handlers:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    _queue_handler = queue_handler
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, *file_handlers, respect_handler_level=True
+    )
+    _queue_listener.start()
+
+
+def _pause_before_fork() -> None:
+    """Stops the listener thread so that the process forks single-threaded.
+
+    Forking while another thread runs can leave the child holding a lock
+    it will never get back (Python 3.12+ warns about it). Records logged
+    meanwhile wait in the queue.
+    """
+    if _queue_listener is not None:
+        _queue_listener.stop()
+
+
+def _resume_after_fork() -> None:
+    if _queue_listener is not None:
+        _queue_listener.start()
+
+
+def _unqueue_in_child() -> None:
+    """Forked workers have no listener thread; log to the files directly."""
+    global _queue_listener, _queue_handler
+    if _queue_listener is None:
+        return
+    root = logging.getLogger()
+    root.removeHandler(_queue_handler)
+    for handler in _queue_listener.handlers:
+        root.addHandler(handler)
+    _queue_listener = _queue_handler = None
+
+
+atexit.register(_stop_queue_listener)
+if hasattr(os, "register_at_fork"):  # Not available on Windows
+    os.register_at_fork(
+        before=_pause_before_fork,
+        after_in_parent=_resume_after_fork,
+        after_in_child=_unqueue_in_child,
+    )
+
 
 # --- Logging Setup ---
-def setup_logging(log_path_override: Optional[Path] = None):
-    """Loads logging configuration and sets up log file path."""
+def setup_logging(
+    log_path_override: Optional[Path] = None, console_stderr: bool = False
+):
+    """Loads logging configuration and sets up log file path.
+
+    With ``console_stderr``, console logging goes to stderr instead of stdout
+    (used when stdout carries the converted output).
+    """
 
     config_file = Path(__file__).parent / "logging_config.json"
 
@@ -78,7 +179,13 @@ def setup_logging(log_path_override: Optional[Path] = None):
         )
 
     try:
+        _stop_queue_listener()  # Flush records queued by an earlier setup
         logging.config.dictConfig(config)
+        _queue_file_handlers(logging.getLogger())
+        if console_stderr:
+            for handler in logging.getLogger().handlers:
+                if isinstance(handler, RichHandler):
+                    handler.console = Console(stderr=True)
         # Now the main logger is configured. Get it and log the path.
         configured_logger = logging.getLogger("converter_app")
         if is_custom_path:
@@ -0,0 +1,126 @@
+"""Manifest of the Markdown files in an output directory.
+
+``manifest.jsonl`` maps each conversation uuid to its output file and basic
+metadata, so downstream tools can look conversations up without parsing
+filenames or opening files. It is a JSON Lines file: entries are appended
+and flushed as files are written, so an interrupted run leaves a usable
+manifest behind. Later lines win over earlier ones for the same uuid; a
+completed run rewrites the file with one line per uuid.
+"""
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger("converter_app")
+
+MANIFEST_FILENAME = "manifest.jsonl"
+
+
+@dataclass
+class ManifestEntry:
+    uuid: str
+    name: str
+    created_at: Optional[str]
+    updated_at: Optional[str]
+    message_count: int
+    bytes: int  # Size of the written (possibly compressed) files: all pages and formats
+    digest: Optional[str]  # Hex digest of the conversation's JSON text
+    path: str  # Relative to the output directory; the first format's first page
+
+    @classmethod
+    def for_conversation(
+        cls,
+        conv: dict,
+        path: str,
+        size: int,
+        digest: Optional[bytes] = None,
+    ) -> "ManifestEntry":
+        return cls(
+            uuid=conv.get("uuid", ""),
+            name=conv.get("name") or "",
+            created_at=conv.get("created_at"),
+            updated_at=conv.get("updated_at"),
+            message_count=len(conv.get("chat_messages") or ()),
+            bytes=size,
+            digest=digest.hex() if digest is not None else None,
+            path=path,
+        )
+
+
+def read_manifest(output_dir: Path) -> dict[str, dict]:
+    """Loads a manifest as uuid -> entry, the last line for a uuid winning.
+
+    Lines that don't parse, such as one cut short by an interrupted run, are
+    skipped.
+    """
+    entries: dict[str, dict] = {}
+    try:
+        with open(output_dir / MANIFEST_FILENAME, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(entry, dict) and "uuid" in entry:
+                    entries[entry["uuid"]] = entry
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+class ManifestWriter:
+    """Appends entries to an output directory's manifest as files are written.
+
+    ``previous`` holds the manifest as it was before this run and
+    ``entries`` the merged result, both as uuid -> entry.
+    """
+
+    def __init__(self, output_dir: Path):
+        self.path = output_dir / MANIFEST_FILENAME
+        self.previous: dict[str, dict] = {}
+        self.entries: dict[str, dict] = {}
+        self._file = None
+
+    def __enter__(self) -> "ManifestWriter":
+        self.previous = read_manifest(self.path.parent)
+        self.entries = dict(self.previous)
+        self._file = open(self.path, "a", encoding="utf-8")
+        # A previous run may have died mid-line; start on a fresh one
+        if self._file.tell() > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._file.close()
+        self._file = None
+        if exc_type is None:
+            self.compact()
+
+    def add(self, entry: ManifestEntry) -> None:
+        data = asdict(entry)
+        self.entries[entry.uuid] = data
+        try:
+            self._file.write(json.dumps(data, ensure_ascii=False) + "\n")
+            self._file.flush()
+        except OSError as e:
+            # The Markdown file itself was written; don't fail the run
+            logger.warning(f"Could not add {entry.uuid} to manifest {self.path}: {e}")
+
+    def compact(self) -> None:
+        """Rewrites the manifest with one line per uuid, atomically."""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not compact manifest {self.path}: {e}")
+            tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,220 @@
+"""Flat, columnar table of every message content item in an export.
+
+One row per content item (or per message, for messages with only a
+``text`` field), with the columns in ``COLUMNS``, for loading into pandas,
+duckdb and the like. The export is streamed and rows are written in batches
+of ``batch_rows``, so memory stays flat however large the export is. Output
+is Parquet when pyarrow is installed and CSV otherwise.
+"""
+
+import csv
+import json
+import logging
+from enum import Enum
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .reader import ExportSource, iter_json_array, open_export
+
+logger = logging.getLogger("converter_app")
+
+DEFAULT_BATCH_ROWS = 65536
+
+COLUMNS = (
+    "conversation_uuid",
+    "message_index",
+    "item_index",
+    "sender",
+    "created_at",
+    "content_type",
+    "text_length",
+    "tool_name",
+    "is_error",
+    "citation_count",
+)
+
+
+class TableFormat(str, Enum):
+    auto = "auto"  # From the file suffix, else Parquet if pyarrow is installed
+    parquet = "parquet"
+    csv = "csv"
+
+
+def pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_format(fmt: TableFormat, path: Path) -> TableFormat:
+    """Picks the concrete format of an ``auto`` table written to ``path``."""
+    fmt = TableFormat(fmt)
+    if fmt == TableFormat.auto:
+        suffix = path.suffix.lower()
+        if suffix == ".csv":
+            return TableFormat.csv
+        if suffix == ".parquet" or pyarrow_available():
+            return TableFormat.parquet
+        return TableFormat.csv
+    return fmt
+
+
+def _text_length(item: dict) -> int:
+    item_type = item.get("type", "text")
+    if item_type == "thinking":
+        text = item.get("thinking")
+    elif item_type == "tool_use":
+        tool_input = item.get("input")
+        return len(json.dumps(tool_input, ensure_ascii=False)) if tool_input else 0
+    elif item_type == "tool_result":
+        text = item.get("content")
+        if isinstance(text, list):
+            text = "".join(
+                part.get("text") or "" for part in text if isinstance(part, dict)
+            )
+    else:
+        text = item.get("text")
+    return len(text) if isinstance(text, str) else 0
+
+
+def iter_message_rows(conv: dict) -> Iterator[tuple]:
+    """Yields one row (ordered as ``COLUMNS``) per content item of ``conv``."""
+    conv_uuid = conv.get("uuid")
+    messages = conv.get("chat_messages")
+    if not isinstance(messages, list):
+        return
+    for message_index, msg in enumerate(messages):
+        if not isinstance(msg, dict):
+            continue
+        sender = msg.get("sender")
+        created_at = msg.get("created_at")
+        content = msg.get("content")
+        items = []
+        if isinstance(content, list):
+            items = [item for item in content if isinstance(item, dict)]
+        if not items:
+            text = msg.get("text")
+            length = len(text) if isinstance(text, str) else 0
+            yield (
+                conv_uuid,
+                message_index,
+                0,
+                sender,
+                created_at,
+                "text",
+                length,
+                None,
+                None,
+                0,
+            )
+            continue
+        for item_index, item in enumerate(items):
+            item_type = item.get("type", "text")
+            is_tool = item_type in ("tool_use", "tool_result")
+            citations = item.get("citations")
+            yield (
+                conv_uuid,
+                message_index,
+                item_index,
+                sender,
+                created_at,
+                item_type,
+                _text_length(item),
+                item.get("name") if is_tool else None,
+                bool(item.get("is_error")) if item_type == "tool_result" else None,
+                len(citations) if isinstance(citations, list) else 0,
+            )
+
+
+class _CsvTable:
+    def __init__(self, path: Path):
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, rows: list[tuple]) -> None:
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetTable:
+    def __init__(self, path: Path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("conversation_uuid", pa.string()),
+                ("message_index", pa.int32()),
+                ("item_index", pa.int32()),
+                ("sender", pa.string()),
+                ("created_at", pa.string()),
+                ("content_type", pa.string()),
+                ("text_length", pa.int64()),
+                ("tool_name", pa.string()),
+                ("is_error", pa.bool_()),
+                ("citation_count", pa.int32()),
+            ]
+        )
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows: list[tuple]) -> None:
+        batch = self._pa.RecordBatch.from_arrays(
+            [
+                self._pa.array(column, type=field.type)
+                for column, field in zip(zip(*rows), self._schema)
+            ],
+            schema=self._schema,
+        )
+        self._writer.write_batch(batch)
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def write_message_table(
+    source: ExportSource,
+    path: Path,
+    fmt: TableFormat = TableFormat.auto,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    limit: Optional[int] = None,
+) -> int:
+    """Writes the message table of an export to ``path``; returns the row count.
+
+    At most ``limit`` conversations are read when a limit is given. Raises
+    ``ValueError`` if Parquet is requested without pyarrow, and the reader's
+    errors if the export is malformed.
+    """
+    fmt = resolve_format(fmt, path)
+    if fmt == TableFormat.parquet and not pyarrow_available():
+        raise ValueError(
+            "Parquet output needs pyarrow; install it with "
+            'pip install "claude-json-to-markdown[parquet]" or write CSV.'
+        )
+    table = _ParquetTable(path) if fmt == TableFormat.parquet else _CsvTable(path)
+    row_count = 0
+    rows: list[tuple] = []
+    try:
+        with open_export(source) as stream:
+            for position, element in enumerate(iter_json_array(stream)):
+                if limit is not None and position >= limit:
+                    break
+                if not isinstance(element.value, dict):
+                    continue
+                rows.extend(iter_message_rows(element.value))
+                while len(rows) >= batch_rows:
+                    table.write(rows[:batch_rows])
+                    row_count += batch_rows
+                    del rows[:batch_rows]
+        if rows:
+            table.write(rows)
+            row_count += len(rows)
+    finally:
+        table.close()
+    logger.debug("Wrote %d message rows to %s (%s).", row_count, path, fmt.value)
+    return row_count
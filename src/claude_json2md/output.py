@@ -0,0 +1,228 @@
+"""How Markdown files are written to disk.
+
+Files are written as plain ``.md`` or compressed ``.md.gz`` / ``.md.zst``.
+Compressed files are encoded and compressed line by line as the renderer
+produces them, so a document is never held in memory as one string.
+
+Besides Markdown, each conversation can also be written as HTML and plain
+text (``formats``), compressed the same way.
+
+Every file is written to a temporary name and moved into place with
+``os.replace``, so readers and crashes never see a truncated file. How soon
+the data reaches the disk is set by the ``Durability`` mode.
+"""
+
+import gzip
+import io
+import logging
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional, TextIO
+
+from .renderers import OutputFormat
+
+logger = logging.getLogger("converter_app")
+
+
+class OutputCompression(str, Enum):
+    none = "none"
+    gzip = "gzip"
+    zstd = "zstd"
+
+
+class Durability(str, Enum):
+    none = "none"  # Leave flushing to the OS
+    file = "file"  # fsync each file and its directory before moving on
+    batch = "batch"  # fsync files and the directory every ``sync_every`` files
+
+
+DEFAULT_SYNC_EVERY = 256
+
+
+SUFFIXES = {
+    OutputCompression.none: "",
+    OutputCompression.gzip: ".gz",
+    OutputCompression.zstd: ".zst",
+}
+DEFAULT_LEVELS = {OutputCompression.gzip: 6, OutputCompression.zstd: 3}
+LEVEL_RANGES = {OutputCompression.gzip: (0, 9), OutputCompression.zstd: (1, 22)}
+
+
+def zstd_available() -> bool:
+    try:
+        from compression import zstd  # noqa: F401  Python 3.14+
+    except ImportError:
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            return False
+    return True
+
+
+@dataclass
+class OutputOptions:
+    """Configuration for the documents written to disk."""
+
+    compression: OutputCompression = OutputCompression.none
+    level: Optional[int] = None  # Compression level; None for the default
+    durability: Durability = Durability.none
+    sync_every: int = DEFAULT_SYNC_EVERY  # Files per sync with Durability.batch
+    max_file_bytes: Optional[int] = None  # Page larger documents; None for no limit
+    # Documents written per conversation; only Markdown is paged
+    formats: tuple[OutputFormat, ...] = (OutputFormat.markdown,)
+
+    def __post_init__(self):
+        self.compression = OutputCompression(self.compression)
+        self.durability = Durability(self.durability)
+        self.formats = tuple(dict.fromkeys(OutputFormat(f) for f in self.formats))
+        if not self.formats:
+            raise ValueError("At least one output format is needed.")
+        if self.sync_every < 1:
+            raise ValueError("sync_every must be at least 1.")
+        if self.max_file_bytes is not None and self.max_file_bytes < 1:
+            raise ValueError("max_file_bytes must be at least 1.")
+        if self.compression == OutputCompression.none:
+            return
+        if self.compression == OutputCompression.zstd and not zstd_available():
+            raise ValueError(
+                "zstd output needs the 'zstandard' package (or Python 3.14+)."
+            )
+        if self.level is not None:
+            low, high = LEVEL_RANGES[self.compression]
+            if not low <= self.level <= high:
+                raise ValueError(
+                    f"{self.compression.value} level must be between {low} and {high}."
+                )
+
+    @property
+    def suffix(self) -> str:
+        return SUFFIXES[self.compression]
+
+    @property
+    def fsync_files(self) -> bool:
+        return self.durability == Durability.file
+
+    def batch_sync(self, directory: Path) -> Optional["BatchSync"]:
+        """The syncer for files written to ``directory``, with
+        ``Durability.batch``."""
+        if self.durability != Durability.batch:
+            return None
+        return BatchSync(directory, self.sync_every)
+
+    def filename(self, md_filename: str) -> str:
+        """The on-disk name of the file ``md_filename`` (of any format)."""
+        return md_filename + self.suffix
+
+    @contextmanager
+    def open(self, path: Path, fsync: bool = False) -> Iterator[TextIO]:
+        """Opens ``path`` for writing text through the configured compressor.
+
+        With ``fsync``, the file's data is flushed to disk before it is
+        closed.
+        """
+        with open(path, "wb") as raw:
+            with self._compressor(raw) as compressed, io.TextIOWrapper(
+                compressed, encoding="utf-8"
+            ) as text:
+                yield text
+            if fsync:
+                raw.flush()
+                os.fsync(raw.fileno())
+
+    def _compressor(self, raw: BinaryIO) -> BinaryIO:
+        """A compressing writer over ``raw`` that leaves it open when closed."""
+        level = self.level
+        if level is None:
+            level = DEFAULT_LEVELS[self.compression]
+        if self.compression == OutputCompression.gzip:
+            # No name and mtime=0 keep the output identical across runs
+            return gzip.GzipFile(
+                filename="", mode="wb", fileobj=raw, compresslevel=level, mtime=0
+            )
+        if self.compression == OutputCompression.zstd:
+            try:
+                from compression import zstd  # Python 3.14+
+
+                return zstd.ZstdFile(raw, "w", level=level)
+            except ImportError:
+                pass
+            import zstandard
+
+            return zstandard.ZstdCompressor(level=level).stream_writer(
+                raw, closefd=False
+            )
+        raise ValueError("Plain Markdown is written without a compressor.")
+
+
+def temp_path(path: Path) -> Path:
+    """Where ``path`` is written before being moved into place.
+
+    The name is hidden, unique per process and outside ``*.md`` globs.
+    """
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+
+def fsync_path(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_dir(directory: Path) -> None:
+    """Makes renames in ``directory`` durable (a no-op where directories
+    can't be opened, as on Windows)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class BatchSync:
+    """Makes files written to one directory durable in groups.
+
+    Files are synced ``every`` at a time, followed by a single sync of the
+    directory, so a crash loses at most the last unsynced group. ``sync``
+    must be called once more when writing ends.
+    """
+
+    def __init__(self, directory: Path, every: int = DEFAULT_SYNC_EVERY):
+        self.directory = directory
+        self.every = every
+        self.syncs = 0
+        self._pending: list[Path] = []
+
+    def add(self, path: Path) -> None:
+        self._pending.append(path)
+        if len(self._pending) >= self.every:
+            self.sync()
+
+    def sync(self) -> None:
+        try:
+            for path in self._pending:
+                try:
+                    fsync_path(path)
+                except FileNotFoundError:
+                    pass  # Replaced or removed since; nothing to sync
+            fsync_dir(self.directory)
+        except OSError as e:
+            logger.warning(f"Could not sync files in {self.directory}: {e}")
+        self._pending.clear()
+        self.syncs += 1
+
+
+def iter_joined(lines: Iterable[str]) -> Iterator[str]:
+    """Yields ``lines`` with newlines between them, like ``"\\n".join``."""
+    lines = iter(lines)
+    for line in lines:
+        yield line
+        break
+    for line in lines:
+        yield "\n" + line
@@ -0,0 +1,95 @@
+"""Paging of conversations too large for a single Markdown file.
+
+A document is split between its blocks (the header, one block per message
+and the References section), so a page never ends inside a message. Pages
+are named ``..._part001.md``, ``..._part002.md`` and so on, and link to
+their neighbours. The header stays on the first page and the References on
+the last.
+
+Pages are produced one at a time from the streaming renderer, and each is
+written out before the next is started, so only the block being placed is
+held in memory.
+"""
+
+from typing import Callable, Iterable, Iterator, Optional
+
+PART_TEMPLATE = "{stem}_part{number:03d}.md"
+
+
+def part_filename(md_filename: str, number: int) -> str:
+    """The name of page ``number`` (from 1) of the document ``md_filename``."""
+    stem = md_filename[: -len(".md")] if md_filename.endswith(".md") else md_filename
+    return PART_TEMPLATE.format(stem=stem, number=number)
+
+
+def _byte_size(line: str) -> int:
+    """UTF-8 size of ``line`` and its newline."""
+    if line.isascii():
+        return len(line) + 1
+    return len(line.encode("utf-8")) + 1
+
+
+def _nav_line(number: int, has_next: bool, filename_for: Callable[[int], str]) -> str:
+    links = []
+    if number > 1:
+        links.append(f"[← Part {number - 1}]({filename_for(number - 1)})")
+    if has_next:
+        links.append(f"[Part {number + 1} →]({filename_for(number + 1)})")
+    return " · ".join(links)
+
+
+class Pager:
+    """Splits the blocks of one document into pages of about ``max_bytes``.
+
+    Call ``page()`` and consume its lines until ``done``. A page is filled
+    with blocks until the next one would take it over ``max_bytes`` (of
+    UTF-8 text); a block larger than that gets a page of its own. The
+    navigation lines come on top of the limit. ``filename_for`` names the
+    file of a page number, for the links.
+    """
+
+    def __init__(
+        self,
+        blocks: Iterable[list[str]],
+        max_bytes: int,
+        title: str,
+        filename_for: Callable[[int], str],
+    ):
+        self.max_bytes = max_bytes
+        self.title = title
+        self.filename_for = filename_for
+        self.page_count = 0
+        self.done = False
+        self._blocks = iter(blocks)
+        self._pending: Optional[list[str]] = None
+
+    def page(self) -> Iterator[str]:
+        """Yields the lines of the next page."""
+        self.page_count += 1
+        number = self.page_count
+        if number > 1:
+            yield f"# {self.title} (part {number})\n"
+            yield _nav_line(number, False, self.filename_for)
+            yield ""
+
+        size = 0
+        placed = 0
+        block = self._pending
+        if block is None:
+            block = next(self._blocks, None)
+        self._pending = None
+        while block is not None:
+            block_size = sum(map(_byte_size, block))
+            if placed and size + block_size > self.max_bytes:
+                self._pending = block
+                break
+            yield from block
+            size += block_size
+            placed += 1
+            block = next(self._blocks, None)
+        else:
+            self.done = True
+
+        if number > 1 or not self.done:
+            nav = _nav_line(number, not self.done, self.filename_for)
+            yield from ("", "---", "", nav)
@@ -0,0 +1,185 @@
+"""Live progress reporting for long conversions.
+
+On a terminal the progress is drawn as a rich progress bar; otherwise it is
+written to stderr as newline-delimited JSON, one object per update, for
+orchestrators to consume. Updates are rate-limited: between reports a call to
+``update`` costs one clock read.
+"""
+
+import json
+import logging
+import sys
+import time
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Optional, TextIO
+
+from rich.console import Console
+from rich.logging import RichHandler
+from rich.progress import BarColumn, Progress, TextColumn, TimeRemainingColumn
+
+DEFAULT_INTERVAL = 1.0  # Seconds between reports
+
+_MB = 1024 * 1024
+
+
+class ProgressMode(str, Enum):
+    auto = "auto"  # bar on a terminal, JSON otherwise
+    bar = "bar"
+    json = "json"
+    none = "none"
+
+
+class ProgressReporter(ABC):
+    """Tracks throughput and reports it at most once per ``interval``.
+
+    ``total_bytes`` (input size) or ``total_conversations`` enable the ETA;
+    either may be set once known.
+    """
+
+    def __init__(
+        self,
+        total_bytes: Optional[int] = None,
+        total_conversations: Optional[int] = None,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        self.total_bytes = total_bytes
+        self.total_conversations = total_conversations
+        self.interval = interval
+        self._start = time.monotonic()
+        self._next_report = self._start + interval
+
+    def update(
+        self, conversations: int, bytes_read: int, skipped: int = 0, failed: int = 0
+    ) -> None:
+        """Reports progress if the last report is at least ``interval`` old."""
+        now = time.monotonic()
+        if now < self._next_report:
+            return
+        self._next_report = now + self.interval
+        self._report(self.snapshot(now, conversations, bytes_read, skipped, failed))
+
+    def close(
+        self, conversations: int, bytes_read: int, skipped: int = 0, failed: int = 0
+    ) -> None:
+        """Reports the final figures."""
+        snapshot = self.snapshot(
+            time.monotonic(), conversations, bytes_read, skipped, failed
+        )
+        snapshot["event"] = "done"
+        snapshot["eta_s"] = 0.0
+        self._report(snapshot)
+
+    def stop(self) -> None:
+        """Releases the display; safe to call more than once."""
+
+    def snapshot(
+        self,
+        now: float,
+        conversations: int,
+        bytes_read: int,
+        skipped: int,
+        failed: int,
+    ) -> dict:
+        elapsed = max(now - self._start, 1e-9)
+        conv_rate = conversations / elapsed
+        byte_rate = bytes_read / elapsed
+        eta = None
+        if self.total_bytes and byte_rate > 0:
+            eta = max(self.total_bytes - bytes_read, 0) / byte_rate
+        elif self.total_conversations and conv_rate > 0:
+            eta = max(self.total_conversations - conversations, 0) / conv_rate
+        return {
+            "event": "progress",
+            "elapsed_s": round(elapsed, 3),
+            "conversations": conversations,
+            "total_conversations": self.total_conversations,
+            "skipped": skipped,
+            "failed": failed,
+            "bytes_read": bytes_read,
+            "total_bytes": self.total_bytes,
+            "conversations_per_s": round(conv_rate, 1),
+            "mb_per_s": round(byte_rate / _MB, 2),
+            "eta_s": None if eta is None else round(eta, 1),
+        }
+
+    @abstractmethod
+    def _report(self, snapshot: dict) -> None:
+        """Shows one snapshot."""
+
+
+class JsonProgress(ProgressReporter):
+    """Writes each report as one JSON line (stderr by default)."""
+
+    def __init__(self, *args, out: Optional[TextIO] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.out = out if out is not None else sys.stderr
+
+    def _report(self, snapshot: dict) -> None:
+        self.out.write(json.dumps(snapshot) + "\n")
+        self.out.flush()
+
+
+def _log_console() -> Console:
+    """The console the rich log handler draws on, so log lines print above
+    the bar instead of through it."""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, RichHandler):
+            return handler.console
+    return Console(stderr=True)
+
+
+class BarProgress(ProgressReporter):
+    """Draws a rich progress bar over the input bytes (or conversations)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._progress = Progress(
+            TextColumn("{task.description}"),
+            BarColumn(),
+            TextColumn("{task.percentage:>3.0f}%"),
+            TimeRemainingColumn(),
+            console=_log_console(),
+            transient=True,
+        )
+        self._task = self._progress.add_task("Converting", total=None)
+        self._started = False
+
+    def _report(self, snapshot: dict) -> None:
+        if not self._started:  # Draw nothing for runs shorter than one interval
+            self._progress.start()
+            self._started = True
+        if self.total_bytes:
+            total, completed = self.total_bytes, snapshot["bytes_read"]
+        else:
+            total, completed = self.total_conversations, snapshot["conversations"]
+        description = (
+            f"{snapshot['conversations']} conversations "
+            f"({snapshot['conversations_per_s']:.0f}/s, {snapshot['mb_per_s']:.1f} MB/s), "
+            f"skipped {snapshot['skipped']}, failed {snapshot['failed']}"
+        )
+        self._progress.update(
+            self._task, total=total, completed=completed, description=description
+        )
+
+    def stop(self) -> None:
+        if self._started:
+            self._progress.stop()
+            self._started = False
+
+
+def create_progress(
+    mode: ProgressMode = ProgressMode.auto,
+    total_bytes: Optional[int] = None,
+    total_conversations: Optional[int] = None,
+    interval: float = DEFAULT_INTERVAL,
+) -> Optional[ProgressReporter]:
+    """Creates the reporter for ``mode``; None when progress is off."""
+    if mode == ProgressMode.auto:
+        mode = ProgressMode.bar if sys.stderr.isatty() else ProgressMode.json
+    if mode == ProgressMode.bar:
+        # A bar redraws quickly; the throttle only spares the hot loop
+        return BarProgress(total_bytes, total_conversations, interval=min(interval, 0.1))
+    if mode == ProgressMode.json:
+        return JsonProgress(total_bytes, total_conversations, interval=interval)
+    return None
@@ -0,0 +1,280 @@
+"""Streaming reader for Claude export files.
+
+Exports are a single JSON array of conversations. Rather than loading the
+whole array with ``json.load``, the reader decodes one element at a time from
+a binary stream, so memory stays proportional to the largest conversation and
+callers can stop early (e.g. with ``--limit``).
+
+gzip, bzip2, xz and zstd compressed exports are detected by their magic bytes
+and decompressed on the fly; ``-`` reads the export from stdin.
+"""
+
+import bz2
+import codecs
+import gzip
+import io
+import json
+import lzma
+import sys
+from contextlib import contextmanager
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, NamedTuple, Optional, Union
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1 MiB
+DIGEST_SIZE = 16
+
+_WHITESPACE = " \t\n\r"
+
+# Anything convert_iter and friends accept as an export
+ExportSource = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+STDIN_SOURCE = "-"
+
+# Magic bytes of the supported compression formats
+GZIP_MAGIC = b"\x1f\x8b"
+BZIP2_MAGIC = b"BZh"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_MAGIC_BYTES = max(len(GZIP_MAGIC), len(BZIP2_MAGIC), len(XZ_MAGIC), len(ZSTD_MAGIC))
+
+
+class ExportFormatError(ValueError):
+    """Raised when an export is valid JSON but not a list of conversations."""
+
+
+class JsonElement(NamedTuple):
+    """A decoded top-level array element and its location in the stream."""
+
+    offset: int  # Byte offset of the element's first character
+    length: int  # Length of the element's JSON text in bytes
+    value: Any
+    digest: Optional[bytes] = None  # Digest of the JSON text, if requested
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Replays bytes already read from an unseekable stream before the rest."""
+
+    def __init__(self, prefix: bytes, stream: BinaryIO):
+        self._prefix = prefix
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            n = min(len(buffer), len(self._prefix))
+            buffer[:n] = self._prefix[:n]
+            self._prefix = self._prefix[n:]
+            return n
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _open_zstd(stream: BinaryIO) -> BinaryIO:
+    try:
+        from compression import zstd  # Python 3.14+
+
+        return zstd.ZstdFile(stream)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ExportFormatError(
+            "The export is zstd-compressed; install the 'zstandard' package "
+            "(or use Python 3.14+) to read it."
+        )
+    return zstandard.ZstdDecompressor().stream_reader(stream, read_across_frames=True)
+
+
+def detect_compression(magic: bytes) -> Optional[str]:
+    """Names the compression format starting with ``magic``, if any."""
+    if magic.startswith(GZIP_MAGIC):
+        return "gzip"
+    if magic.startswith(BZIP2_MAGIC):
+        return "bz2"
+    if magic.startswith(XZ_MAGIC):
+        return "xz"
+    if magic.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def is_plain_file(path: Union[str, Path]) -> bool:
+    """True if ``path`` is an uncompressed regular file, so byte offsets
+    reported by the reader can be used to seek directly into it."""
+    path = Path(path)
+    if str(path) == STDIN_SOURCE or not path.is_file():
+        return False
+    with open(path, "rb") as f:
+        return detect_compression(f.read(_MAGIC_BYTES)) is None
+
+
+def decompress_stream(stream: BinaryIO) -> BinaryIO:
+    """Wraps ``stream`` in a streaming decompressor if it starts with a known
+    compression magic number, otherwise returns an equivalent plain stream."""
+    if getattr(stream, "seekable", lambda: False)():
+        start = stream.tell()
+        magic = stream.read(_MAGIC_BYTES)
+        stream.seek(start)
+    else:
+        magic = stream.read(_MAGIC_BYTES)
+        stream = io.BufferedReader(_PrefixedReader(magic, stream))
+
+    compression = detect_compression(magic)
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    if compression == "bz2":
+        return bz2.BZ2File(stream)
+    if compression == "xz":
+        return lzma.LZMAFile(stream)
+    if compression == "zstd":
+        return _open_zstd(stream)
+    return stream
+
+
+def _byte_length(text: str) -> int:
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def _may_be_truncated(error: json.JSONDecodeError, buffered: int) -> bool:
+    """Tells an element cut off by the buffer edge from genuinely bad JSON."""
+    # Errors for incomplete input point at (or just before) the end of the
+    # buffer, except for unterminated strings which point at their start.
+    return error.pos >= buffered - 6 or error.msg.startswith("Unterminated string")
+
+
+@contextmanager
+def open_export(source: ExportSource) -> Iterator[BinaryIO]:
+    """Opens an export given as a path, raw bytes or a binary stream.
+
+    ``-`` means stdin. Compressed exports are decompressed transparently.
+    Paths are opened (and closed) here; streams passed in by the caller,
+    including stdin, are left open.
+    """
+    if isinstance(source, (str, Path)) and str(source) == STDIN_SOURCE:
+        yield decompress_stream(sys.stdin.buffer)
+    elif isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            yield decompress_stream(f)
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield decompress_stream(io.BytesIO(source))
+    elif hasattr(source, "read"):
+        yield decompress_stream(source)
+    else:
+        raise TypeError(
+            f"Unsupported export source of type {type(source).__name__}; "
+            "expected a path, bytes or a binary stream."
+        )
+
+
+def iter_json_array(
+    stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE, with_digest: bool = False
+) -> Iterator[JsonElement]:
+    """Yields the elements of a top-level JSON array read from ``stream``.
+
+    With ``with_digest``, each element carries a blake2b digest of its raw
+    JSON text, which is much cheaper than hashing a re-serialization.
+
+    Raises ``json.JSONDecodeError`` for malformed JSON and
+    ``ExportFormatError`` if the top-level value is not an array. Errors in
+    later elements surface only when iteration reaches them.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0  # Index of the next unconsumed character in buf
+    pos_offset = 0  # Byte offset of buf[pos] in the stream
+    eof = False
+
+    def read_more() -> bool:
+        """Appends at least one more chunk to buf; False once at EOF."""
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        # Grow geometrically while a single element spans several chunks so
+        # that re-decoding a huge conversation stays linear overall.
+        chunk = stream.read(max(chunk_size, len(buf) - pos))
+        text = utf8.decode(chunk, final=not chunk)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + text
+        pos = 0
+        return bool(text) or not eof
+
+    def skip_whitespace() -> str:
+        """Advances past whitespace and returns the next character ('' at EOF)."""
+        nonlocal pos, pos_offset
+        while True:
+            start = pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            pos_offset += pos - start  # Whitespace is always one byte
+            if pos < len(buf):
+                return buf[pos]
+            if not read_more():
+                return ""
+
+    def fail(msg: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(msg, buf, pos)
+
+    while not buf and read_more():
+        pass
+    if buf.startswith("\ufeff"):  # Tolerate a UTF-8 byte order mark
+        pos = 1
+        pos_offset = 3
+
+    first = skip_whitespace()
+    if first != "[":
+        if first == "":
+            raise fail("Expecting value")
+        raise ExportFormatError(
+            "The JSON file's top-level structure is not a list of conversations."
+        )
+    pos += 1
+    pos_offset += 1
+
+    if skip_whitespace() == "]":
+        return
+
+    while True:
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if _may_be_truncated(e, len(buf)) and read_more():
+                    continue
+                raise
+            # A value ending exactly at the buffer edge may be a truncated
+            # number or literal; decode again once more data is available.
+            if end == len(buf) and read_more():
+                continue
+            break
+
+        text = buf[pos:end]
+        if with_digest:
+            raw = text.encode("utf-8")
+            length = len(raw)
+            digest = blake2b(raw, digest_size=DIGEST_SIZE).digest()
+        else:
+            length = _byte_length(text)
+            digest = None
+        yield JsonElement(pos_offset, length, value, digest)
+        pos = end
+        pos_offset += length
+
+        sep = skip_whitespace()
+        if sep == "]":
+            break
+        if sep != ",":
+            raise fail("Expecting ',' delimiter")
+        pos += 1
+        pos_offset += 1
+        skip_whitespace()
+
+    pos += 1
+    if skip_whitespace() != "":
+        raise fail("Extra data")
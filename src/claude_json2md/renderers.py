@@ -1,8 +1,40 @@
-"""Content type renderers for markdown output."""
-
-from dataclasses import dataclass
-from typing import Callable
+"""Content type renderers for Markdown, HTML and plain text output.
+
+The module-level ``render_*`` functions render content items as Markdown.
+Each output format has a ``FormatRenderer`` that renders whole blocks (the
+header, a message, the footer); the HTML and plain text renderers bring
+their own content item renderers and share what a tool call shows through
+``ToolView``.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import Enum
+from html import escape
+from typing import Any, Callable, Iterator, Optional
 import json
+import textwrap
+
+from .textdiff import unified_diff
+
+
+class OutputFormat(str, Enum):
+    markdown = "markdown"
+    html = "html"
+    text = "text"
+
+
+FORMAT_SUFFIXES = {
+    OutputFormat.markdown: ".md",
+    OutputFormat.html: ".html",
+    OutputFormat.text: ".txt",
+}
+
+
+def format_filename(md_filename: str, fmt: OutputFormat) -> str:
+    """The name of the ``fmt`` document for the Markdown file ``md_filename``."""
+    stem = md_filename[: -len(".md")] if md_filename.endswith(".md") else md_filename
+    return stem + FORMAT_SUFFIXES[OutputFormat(fmt)]
 
 
 @dataclass
@@ -30,6 +62,11 @@ class CitationCollector:
             self._citations[url] = len(self._ordered)
         return self._citations[url]
 
+    @property
+    def urls(self) -> list[str]:
+        """The collected URLs, in reference number order."""
+        return self._ordered
+
     def render_references_section(self) -> list[str]:
         """Render the References section at end of document."""
         if not self._ordered:
@@ -40,24 +77,56 @@ class CitationCollector:
         return lines
 
 
+def as_text(value: Any, default: str = "") -> str:
+    """``value`` if it is a string, else ``default``; exports may hold
+    ``null`` or other types where text is expected."""
+    return value if isinstance(value, str) else default
+
+
+def _cited_urls(item: dict) -> Iterator[str]:
+    """The URLs cited by a text content item."""
+    item_citations = item.get("citations")
+    if not isinstance(item_citations, list):
+        return
+    for cit in item_citations:
+        if isinstance(cit, dict):
+            url = cit.get("url")
+            if not url:
+                details = cit.get("details")
+                url = details.get("url") if isinstance(details, dict) else None
+            if url and isinstance(url, str):
+                yield url
+
+
+def _attachment_names(msg: dict) -> list[str]:
+    """The file names of a message's attachments."""
+    files = msg.get("files", [])
+    if not files or not isinstance(files, list):
+        return []
+    return [
+        str(f["file_name"])
+        for f in files
+        if isinstance(f, dict) and "file_name" in f
+    ]
+
+
 def render_text(
     item: dict, options: RenderOptions, citations: CitationCollector
 ) -> list[str]:
     """Render a text content item."""
-    text = item.get("text", "").strip()
+    text = item.get("text")
+    if not isinstance(text, str):
+        return []
+    text = text.strip()
     if not text:
         return []
 
     lines = [text, ""]
 
     # Collect citations if present
-    if options.include_citations:
-        item_citations = item.get("citations", [])
-        for cit in item_citations:
-            if isinstance(cit, dict):
-                url = cit.get("url") or cit.get("details", {}).get("url")
-                if url:
-                    citations.add(url)
+    if options.include_citations and item.get("citations"):
+        for url in _cited_urls(item):
+            citations.add(url)
 
     return lines
 
@@ -69,7 +138,7 @@ def render_thinking(
     if not options.include_thinking:
         return []
 
-    thinking_text = item.get("thinking", "").strip()
+    thinking_text = as_text(item.get("thinking")).strip()
     if not thinking_text:
         return []
 
@@ -89,8 +158,8 @@ def render_voice_note(
     item: dict, options: RenderOptions, citations: CitationCollector
 ) -> list[str]:
     """Render a voice note content item."""
-    title = item.get("title", "Voice Note")
-    text = item.get("text", "").strip()
+    title = as_text(item.get("title"), "Voice Note")
+    text = as_text(item.get("text")).strip()
     if not text:
         return []
 
@@ -98,150 +167,168 @@ def render_voice_note(
     return lines
 
 
-def render_tool_use(
-    item: dict, options: RenderOptions, citations: CitationCollector
-) -> list[str]:
-    """Render a tool_use content item."""
-    if not options.include_tools:
-        return []
-
-    tool_name = item.get("name", "unknown_tool")
-    tool_input = item.get("input", {})
-
-    lines = [f"**Tool: {tool_name}**"]
+@dataclass
+class ToolView:
+    """What a tool_use or tool_result item shows, independent of the format."""
+
+    heading: str
+    fields: list[tuple[str, Any, bool]] = field(default_factory=list)  # As code?
+    code: Optional[tuple[str, list[str]]] = None  # Language and lines
+
+
+def _edit_diff(old_str: str, new_str: str, label: str, max_lines: int) -> list[str]:
+    """A unified diff of an edit; over the diff budget, the first
+    ``max_lines`` lines of each side instead."""
+    diff = unified_diff(old_str, new_str, label)
+    if diff is not None:
+        return diff
+    diff = []
+    if old_str:
+        for line in old_str.split("\n")[:max_lines]:
+            diff.append(f"- {line}")
+    if new_str:
+        for line in new_str.split("\n")[:max_lines]:
+            diff.append(f"+ {line}")
+    return diff
+
+
+def tool_use_view(item: dict, options: RenderOptions) -> ToolView:
+    """Select what a tool_use item shows."""
+    tool_name = as_text(item.get("name"), "unknown_tool")
+    tool_input = item.get("input")
+    if not isinstance(tool_input, dict):
+        tool_input = {}
+
+    view = ToolView(f"Tool: {tool_name}")
+    fields = view.fields
 
     if tool_name == "web_search":
-        query = tool_input.get("query", "")
-        lines.append(f"- Query: `{query}`")
+        fields.append(("Query", tool_input.get("query", ""), True))
 
     elif tool_name == "artifacts":
         command = tool_input.get("command", "")
         artifact_id = tool_input.get("id", "")
         title = tool_input.get("title", "")
         artifact_type = tool_input.get("type", "")
-        language = tool_input.get("language", "")
+        language = as_text(tool_input.get("language"))
 
-        lines.append(f"- Command: `{command}`")
+        fields.append(("Command", command, True))
         if artifact_id:
-            lines.append(f"- ID: `{artifact_id}`")
+            fields.append(("ID", artifact_id, True))
         if title:
-            lines.append(f"- Title: {title}")
+            fields.append(("Title", title, False))
         if artifact_type:
-            lines.append(f"- Type: {artifact_type}")
+            fields.append(("Type", artifact_type, False))
         if language:
-            lines.append(f"- Language: {language}")
+            fields.append(("Language", language, False))
 
         # Show content for create/rewrite if verbose
         if options.verbose_tools and command in ("create", "rewrite"):
-            content = tool_input.get("content", "")
+            content = as_text(tool_input.get("content"))
             if content:
-                lang_hint = language or ""
-                lines.append("")
-                lines.append(f"```{lang_hint}")
-                lines.append(content)
-                lines.append("```")
+                view.code = (language or "", [content])
 
         # Show update diff if verbose
         if options.verbose_tools and command == "update":
-            old_str = tool_input.get("old_str", "")
-            new_str = tool_input.get("new_str", "")
+            old_str = as_text(tool_input.get("old_str"))
+            new_str = as_text(tool_input.get("new_str"))
             if old_str or new_str:
-                lines.append("")
-                lines.append("```diff")
-                if old_str:
-                    for line in old_str.split("\n")[:10]:
-                        lines.append(f"- {line}")
-                if new_str:
-                    for line in new_str.split("\n")[:10]:
-                        lines.append(f"+ {line}")
-                lines.append("```")
+                view.code = ("diff", _edit_diff(old_str, new_str, artifact_id, 10))
 
     elif tool_name in ("create_file", "file_create"):
         path = tool_input.get("path", "")
         description = tool_input.get("description", "")
-        lines.append(f"- Path: `{path}`")
+        fields.append(("Path", path, True))
         if description:
-            lines.append(f"- Description: {description}")
+            fields.append(("Description", description, False))
         if options.verbose_tools:
-            content = tool_input.get("file_text") or tool_input.get("content", "")
+            content = as_text(tool_input.get("file_text")) or as_text(
+                tool_input.get("content")
+            )
             if content:
-                lines.append("")
-                lines.append("```")
-                lines.append(content[:2000])
+                code = [content[:2000]]
                 if len(content) > 2000:
-                    lines.append("... (truncated)")
-                lines.append("```")
+                    code.append("... (truncated)")
+                view.code = ("", code)
 
     elif tool_name == "str_replace":
         path = tool_input.get("path", "")
-        lines.append(f"- Path: `{path}`")
+        fields.append(("Path", path, True))
         if options.verbose_tools:
-            old_str = tool_input.get("old_str", "")
-            new_str = tool_input.get("new_str", "")
-            lines.append("")
-            lines.append("```diff")
-            if old_str:
-                for line in old_str.split("\n")[:5]:
-                    lines.append(f"- {line}")
-            if new_str:
-                for line in new_str.split("\n")[:5]:
-                    lines.append(f"+ {line}")
-            lines.append("```")
+            old_str = as_text(tool_input.get("old_str"))
+            new_str = as_text(tool_input.get("new_str"))
+            view.code = ("diff", _edit_diff(old_str, new_str, path, 5))
 
     else:
         # Generic tool display
         if options.verbose_tools and tool_input:
-            lines.append("")
-            lines.append("```json")
-            lines.append(json.dumps(tool_input, indent=2)[:1000])
-            lines.append("```")
+            view.code = ("json", [json.dumps(tool_input, indent=2)[:1000]])
         elif tool_input:
             # Show first few key-value pairs
             for key, value in list(tool_input.items())[:3]:
                 val_str = str(value)
                 if len(val_str) > 50:
                     val_str = val_str[:50] + "..."
-                lines.append(f"- {key}: {val_str}")
+                fields.append((key, val_str, False))
 
-    lines.append("")
-    return lines
+    return view
 
 
-def render_tool_result(
-    item: dict, options: RenderOptions, citations: CitationCollector
-) -> list[str]:
-    """Render a tool_result content item."""
-    if not options.include_tools:
-        return []
-
-    tool_name = item.get("name", "unknown_tool")
+def tool_result_view(item: dict, options: RenderOptions) -> ToolView:
+    """Select what a tool_result item shows."""
+    tool_name = as_text(item.get("name"), "unknown_tool")
     is_error = item.get("is_error", False)
     content = item.get("content", "")
 
     status = "Error" if is_error else "Result"
-    lines = [f"**Tool {status}: {tool_name}**"]
+    view = ToolView(f"Tool {status}: {tool_name}")
 
     # Only show content for errors or if verbose
     if is_error and content:
         content_str = str(content)[:500] if content else ""
         if content_str:
-            lines.append("")
-            lines.append("```")
-            lines.append(content_str)
-            lines.append("```")
+            view.code = ("", [content_str])
     elif options.verbose_tools and content:
         content_str = str(content)
         if len(content_str) > 2000:
             content_str = content_str[:2000] + "\n... (truncated)"
+        view.code = ("", [content_str])
+
+    return view
+
+
+def _markdown_tool(view: ToolView) -> list[str]:
+    lines = [f"**{view.heading}**"]
+    for label, value, as_code in view.fields:
+        lines.append(f"- {label}: `{value}`" if as_code else f"- {label}: {value}")
+    if view.code is not None:
+        language, code = view.code
         lines.append("")
+        lines.append(f"```{language}")
+        lines.extend(code)
         lines.append("```")
-        lines.append(content_str)
-        lines.append("```")
-
     lines.append("")
     return lines
 
 
+def render_tool_use(
+    item: dict, options: RenderOptions, citations: CitationCollector
+) -> list[str]:
+    """Render a tool_use content item."""
+    if not options.include_tools:
+        return []
+    return _markdown_tool(tool_use_view(item, options))
+
+
+def render_tool_result(
+    item: dict, options: RenderOptions, citations: CitationCollector
+) -> list[str]:
+    """Render a tool_result content item."""
+    if not options.include_tools:
+        return []
+    return _markdown_tool(tool_result_view(item, options))
+
+
 # Dispatcher mapping content types to renderers
 CONTENT_RENDERERS: dict[str, Callable] = {
     "text": render_text,
@@ -259,3 +346,431 @@ def render_content_item(
     content_type = item.get("type", "text")
     renderer = CONTENT_RENDERERS.get(content_type, render_text)
     return renderer(item, options, citations)
+
+
+class FormatRenderer(ABC):
+    """Renders the blocks of a conversation in one output format.
+
+    A message block is opened by ``message_start``, followed by its content
+    items, each dispatched through ``content_renderers`` (unknown types are
+    rendered as text), and closed by ``message_end``. A message whose items
+    render nothing shows its ``text`` through ``message_text`` instead.
+    """
+
+    format: OutputFormat
+    content_renderers: dict[str, Callable]
+
+    @abstractmethod
+    def header(
+        self, conversation: dict, conv_name: str, options: RenderOptions
+    ) -> list[str]:
+        """The start of the document, up to the first message."""
+
+    @abstractmethod
+    def message_start(self, msg: dict) -> list[str]:
+        """Opens a message block with its sender, time and attachments."""
+
+    @abstractmethod
+    def message_text(self, text: str) -> list[str]:
+        """A message's ``text``, shown when none of its items render."""
+
+    def message_end(self) -> list[str]:
+        return []
+
+    @abstractmethod
+    def notice(self, text: str) -> list[str]:
+        """A note after the messages, such as a truncation warning."""
+
+    @abstractmethod
+    def footer(self, citations: CitationCollector, options: RenderOptions) -> list[str]:
+        """The end of the document; may be empty."""
+
+    def message(
+        self, msg: dict, options: RenderOptions, citations: CitationCollector
+    ) -> list[str]:
+        block = self.message_start(msg)
+        renderers = self.content_renderers
+        default = renderers["text"]
+        has_rendered_content = False
+        content_list = msg.get("content", [])
+        if isinstance(content_list, list):
+            for item in content_list:
+                if not isinstance(item, dict):
+                    continue
+                renderer = renderers.get(item.get("type", "text"), default)
+                rendered = renderer(item, options, citations)
+                if rendered:
+                    block.extend(rendered)
+                    has_rendered_content = True
+        if not has_rendered_content:
+            block.extend(self.message_text(as_text(msg.get("text"))))
+        block.extend(self.message_end())
+        return block
+
+
+class MarkdownRenderer(FormatRenderer):
+    format = OutputFormat.markdown
+    content_renderers = CONTENT_RENDERERS
+
+    def header(
+        self, conversation: dict, conv_name: str, options: RenderOptions
+    ) -> list[str]:
+        """Renders the conversation header up to the Messages heading."""
+        conv_summary = as_text(conversation.get("summary"))
+
+        header = [
+            f"# Conversation: {conv_name}\n",
+            f"**UUID:** {conversation.get('uuid', 'unknown_uuid')}",
+            f"**Created At:** {conversation.get('created_at', 'N/A')}",
+            f"**Updated At:** {conversation.get('updated_at', 'N/A')}",
+        ]
+
+        # Summary (if present and enabled)
+        if options.include_summary and conv_summary.strip():
+            header.append("")
+            header.append("**Summary:**")
+            # Format as blockquote, handling multi-line summaries
+            summary_lines = conv_summary.strip().split("\n")
+            for line in summary_lines:
+                header.append(f"> {line}")
+
+        header.append("")
+        header.append("## Messages\n")
+        return header
+
+    def message_start(self, msg: dict) -> list[str]:
+        sender = as_text(msg.get("sender"), "Unknown Sender").capitalize()
+        block = [
+            "---",
+            f"**Sender:** {sender}",
+            f"**Timestamp:** {msg.get('created_at', 'N/A')}",
+        ]
+        if msg.get("files"):
+            file_names = _attachment_names(msg)
+            if file_names:
+                block.append(f"**Attachments:** {', '.join(file_names)}")
+        block.append("")  # Blank line before content
+        return block
+
+    def message_text(self, text: str) -> list[str]:
+        if text:
+            return [text.strip(), ""]
+        return [""]  # Empty message placeholder
+
+    def message(
+        self, msg: dict, options: RenderOptions, citations: CitationCollector
+    ) -> list[str]:
+        # Same as FormatRenderer.message, without the calls that do nothing
+        # for Markdown; this is the hot path of a conversion.
+        block = self.message_start(msg)
+        has_rendered_content = False
+        content_list = msg.get("content")
+        if isinstance(content_list, list):
+            get_renderer = CONTENT_RENDERERS.get
+            for item in content_list:
+                if not isinstance(item, dict):
+                    continue
+                renderer = get_renderer(item.get("type", "text"), render_text)
+                rendered = renderer(item, options, citations)
+                if rendered:
+                    block.extend(rendered)
+                    has_rendered_content = True
+        if not has_rendered_content:
+            block.extend(self.message_text(as_text(msg.get("text"))))
+        return block
+
+    def notice(self, text: str) -> list[str]:
+        return ["---", f"> **Note:** {text}", ""]
+
+    def footer(self, citations: CitationCollector, options: RenderOptions) -> list[str]:
+        if not options.include_citations:
+            return []
+        return citations.render_references_section()
+
+
+_HTML_STYLE = (
+    "body { max-width: 50rem; margin: 2rem auto; font-family: sans-serif; } "
+    ".text { white-space: pre-wrap; } "
+    "section.message { border-top: 1px solid #ccc; padding-top: 0.5rem; } "
+    "pre { background: #f4f4f4; padding: 0.5rem; overflow-x: auto; }"
+)
+
+
+def _html_text(text: str) -> str:
+    return f'<div class="text">{escape(text)}</div>'
+
+
+def _html_tool(view: ToolView) -> list[str]:
+    lines = ['<div class="tool">', f"<p><strong>{escape(view.heading)}</strong></p>"]
+    if view.fields:
+        lines.append("<ul>")
+        for label, value, as_code in view.fields:
+            value = escape(str(value))
+            if as_code:
+                value = f"<code>{value}</code>"
+            lines.append(f"<li>{escape(str(label))}: {value}</li>")
+        lines.append("</ul>")
+    if view.code is not None:
+        language, code = view.code
+        css_class = f' class="language-{escape(language)}"' if language else ""
+        lines.append(f"<pre><code{css_class}>{escape(chr(10).join(code))}</code></pre>")
+    lines.append("</div>")
+    return lines
+
+
+def _html_link(url: str) -> str:
+    if url.startswith(("http://", "https://")):
+        return f'<a href="{escape(url)}">{escape(url)}</a>'
+    return escape(url)
+
+
+class HtmlRenderer(FormatRenderer):
+    """A standalone HTML page; thinking is collapsible and all text is
+    escaped, code included."""
+
+    format = OutputFormat.html
+
+    def __init__(self):
+        self.content_renderers = {
+            "text": self.render_text,
+            "thinking": self.render_thinking,
+            "voice_note": self.render_voice_note,
+            "tool_use": self.render_tool_use,
+            "tool_result": self.render_tool_result,
+        }
+
+    def header(
+        self, conversation: dict, conv_name: str, options: RenderOptions
+    ) -> list[str]:
+        name = escape(conv_name)
+        uuid = conversation.get("uuid", "unknown_uuid")
+        created_at = conversation.get("created_at", "N/A")
+        updated_at = conversation.get("updated_at", "N/A")
+        header = [
+            "<!DOCTYPE html>",
+            '<html lang="en">',
+            "<head>",
+            '<meta charset="utf-8">',
+            f"<title>{name}</title>",
+            f"<style>{_HTML_STYLE}</style>",
+            "</head>",
+            "<body>",
+            f"<h1>Conversation: {name}</h1>",
+            f"<p><strong>UUID:</strong> {escape(str(uuid))}</p>",
+            f"<p><strong>Created At:</strong> {escape(str(created_at))}</p>",
+            f"<p><strong>Updated At:</strong> {escape(str(updated_at))}</p>",
+        ]
+        summary = as_text(conversation.get("summary")).strip()
+        if options.include_summary and summary:
+            header.append("<p><strong>Summary:</strong></p>")
+            header.append(f"<blockquote>{_html_text(summary)}</blockquote>")
+        header.append("<h2>Messages</h2>")
+        return header
+
+    def message_start(self, msg: dict) -> list[str]:
+        sender = as_text(msg.get("sender"), "Unknown Sender").capitalize()
+        created_at = msg.get("created_at", "N/A")
+        block = [
+            '<section class="message">',
+            f"<p><strong>Sender:</strong> {escape(sender)}<br>",
+            f"<strong>Timestamp:</strong> {escape(str(created_at))}</p>",
+        ]
+        file_names = _attachment_names(msg)
+        if file_names:
+            names = escape(", ".join(file_names))
+            block.append(f"<p><strong>Attachments:</strong> {names}</p>")
+        return block
+
+    def message_text(self, text: str) -> list[str]:
+        text = text.strip()
+        return [_html_text(text)] if text else []
+
+    def message_end(self) -> list[str]:
+        return ["</section>"]
+
+    def notice(self, text: str) -> list[str]:
+        return [f'<p class="notice"><strong>Note:</strong> {escape(text)}</p>']
+
+    def footer(self, citations: CitationCollector, options: RenderOptions) -> list[str]:
+        lines = []
+        if options.include_citations and citations.urls:
+            lines.append("<h2>References</h2>")
+            lines.append("<ol>")
+            for url in citations.urls:
+                lines.append(f"<li>{_html_link(url)}</li>")
+            lines.append("</ol>")
+        lines.extend(["</body>", "</html>"])
+        return lines
+
+    def render_text(
+        self, item: dict, options: RenderOptions, citations: CitationCollector
+    ) -> list[str]:
+        text = as_text(item.get("text")).strip()
+        if not text:
+            return []
+        if options.include_citations:
+            for url in _cited_urls(item):
+                citations.add(url)
+        return [_html_text(text)]
+
+    def render_thinking(
+        self, item: dict, options: RenderOptions, citations: CitationCollector
+    ) -> list[str]:
+        thinking_text = as_text(item.get("thinking")).strip()
+        if not options.include_thinking or not thinking_text:
+            return []
+        return [
+            '<details class="thinking">',
+            "<summary>Thinking</summary>",
+            _html_text(thinking_text),
+            "</details>",
+        ]
+
+    def render_voice_note(
+        self, item: dict, options: RenderOptions, citations: CitationCollector
+    ) -> list[str]:
+        text = as_text(item.get("text")).strip()
+        if not text:
+            return []
+        title = as_text(item.get("title"), "Voice Note")
+        return [
+            f"<p><strong>[Voice Note: {escape(title)}]</strong></p>",
+            _html_text(text),
+        ]
+
+    def render_tool_use(
+        self, item: dict, options: RenderOptions, citations: CitationCollector
+    ) -> list[str]:
+        if not options.include_tools:
+            return []
+        return _html_tool(tool_use_view(item, options))
+
+    def render_tool_result(
+        self, item: dict, options: RenderOptions, citations: CitationCollector
+    ) -> list[str]:
+        if not options.include_tools:
+            return []
+        return _html_tool(tool_result_view(item, options))
+
+
+def _text_tool(view: ToolView) -> list[str]:
+    lines = [view.heading]
+    for label, value, _ in view.fields:
+        lines.append(f"- {label}: {value}")
+    if view.code is not None:
+        lines.append("")
+        lines.append(textwrap.indent("\n".join(view.code[1]), "    "))
+    lines.append("")
+    return lines
+
+
+class TextRenderer(FormatRenderer):
+    """Plain text: no markup, with code and thinking indented."""
+
+    format = OutputFormat.text
+
+    def __init__(self):
+        self.content_renderers = {
+            "text": self.render_text,
+            "thinking": self.render_thinking,
+            "voice_note": self.render_voice_note,
+            "tool_use": self.render_tool_use,
+            "tool_result": self.render_tool_result,
+        }
+
+    def header(
+        self, conversation: dict, conv_name: str, options: RenderOptions
+    ) -> list[str]:
+        title = f"Conversation: {conv_name}"
+        header = [
+            title,
+            "=" * len(title),
+            "",
+            f"UUID: {conversation.get('uuid', 'unknown_uuid')}",
+            f"Created At: {conversation.get('created_at', 'N/A')}",
+            f"Updated At: {conversation.get('updated_at', 'N/A')}",
+        ]
+        summary = as_text(conversation.get("summary")).strip()
+        if options.include_summary and summary:
+            header.append("")
+            header.append("Summary:")
+            header.append(textwrap.indent(summary, "  "))
+        header.append("")
+        return header
+
+    def message_start(self, msg: dict) -> list[str]:
+        sender = as_text(msg.get("sender"), "Unknown Sender").capitalize()
+        block = [
+            "-" * 40,
+            f"Sender: {sender}",
+            f"Timestamp: {msg.get('created_at', 'N/A')}",
+        ]
+        file_names = _attachment_names(msg)
+        if file_names:
+            block.append(f"Attachments: {', '.join(file_names)}")
+        block.append("")
+        return block
+
+    def message_text(self, text: str) -> list[str]:
+        text = text.strip()
+        return [text, ""] if text else []
+
+    def notice(self, text: str) -> list[str]:
+        return ["-" * 40, f"Note: {text}", ""]
+
+    def footer(self, citations: CitationCollector, options: RenderOptions) -> list[str]:
+        if not options.include_citations or not citations.urls:
+            return []
+        lines = ["-" * 40, "References", ""]
+        for i, url in enumerate(citations.urls, 1):
+            lines.append(f"{i}. {url}")
+        return lines
+
+    def render_text(
+        self, item: dict, options: RenderOptions, citations: CitationCollector
+    ) -> list[str]:
+        text = as_text(item.get("text")).strip()
+        if not text:
+            return []
+        if options.include_citations:
+            for url in _cited_urls(item):
+                citations.add(url)
+        return [text, ""]
+
+    def render_thinking(
+        self, item: dict, options: RenderOptions, citations: CitationCollector
+    ) -> list[str]:
+        thinking_text = as_text(item.get("thinking")).strip()
+        if not options.include_thinking or not thinking_text:
+            return []
+        return ["Thinking:", textwrap.indent(thinking_text, "    "), ""]
+
+    def render_voice_note(
+        self, item: dict, options: RenderOptions, citations: CitationCollector
+    ) -> list[str]:
+        text = as_text(item.get("text")).strip()
+        if not text:
+            return []
+        title = as_text(item.get("title"), "Voice Note")
+        return [f"[Voice Note: {title}]", "", text, ""]
+
+    def render_tool_use(
+        self, item: dict, options: RenderOptions, citations: CitationCollector
+    ) -> list[str]:
+        if not options.include_tools:
+            return []
+        return _text_tool(tool_use_view(item, options))
+
+    def render_tool_result(
+        self, item: dict, options: RenderOptions, citations: CitationCollector
+    ) -> list[str]:
+        if not options.include_tools:
+            return []
+        return _text_tool(tool_result_view(item, options))
+
+
+FORMAT_RENDERERS: dict[OutputFormat, type[FormatRenderer]] = {
+    OutputFormat.markdown: MarkdownRenderer,
+    OutputFormat.html: HtmlRenderer,
+    OutputFormat.text: TextRenderer,
+}
@@ -0,0 +1,462 @@
+"""Local HTTP conversion service (``cj2md serve``).
+
+POST an export (the JSON file, possibly compressed, or the zip archive
+Anthropic emails) to ``/convert`` and the rendered conversations are streamed
+back as they finish, as JSON Lines by default or as a zip archive with
+``?format=zip``. Rendering runs in a worker pool and the number of uploads
+converted at once is capped; further requests wait for a free slot.
+
+Render options can be set per request with the CLI flag names as query
+parameters, e.g. ``/convert?no_thinking=1&verbose_tools=1``.
+"""
+
+import asyncio
+import json
+import logging
+import lzma
+import os
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import BinaryIO, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .converter import STATUS_CONVERTED, convert_conversation
+from .reader import ExportFormatError, decompress_stream, iter_json_array
+from .renderers import RenderOptions
+
+logger = logging.getLogger("converter_app")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_CONCURRENCY = 4
+SPOOL_MEMORY_BYTES = 8 * 1024 * 1024  # Larger uploads are spooled to disk
+READ_CHUNK_BYTES = 256 * 1024
+ZIP_MAGIC = b"PK\x03\x04"
+EXPORT_MEMBER_NAME = "conversations.json"
+
+# Query parameters switching off RenderOptions fields, as the CLI flags do
+_DISABLE_PARAMS = {
+    "no_summary": "include_summary",
+    "no_thinking": "include_thinking",
+    "no_citations": "include_citations",
+    "no_tools": "include_tools",
+}
+_TRUE_VALUES = ("", "1", "true", "yes", "on")
+
+# Raised while reading a malformed upload: invalid JSON or export structure
+# (ValueError), and truncated or corrupt compressed data
+_UPLOAD_ERRORS = (ValueError, OSError, EOFError, lzma.LZMAError, zlib.error)
+
+
+class HttpError(Exception):
+    """An error answered with a plain-text HTTP response."""
+
+    def __init__(self, status: int, reason: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.message = message
+
+
+def render_conversation(conv: dict, index: int, options: RenderOptions) -> dict:
+    """Converts one conversation to a JSON-serialisable result.
+
+    Runs in the worker pool, so it takes and returns only picklable data.
+    """
+    if not isinstance(conv, dict):
+        raise ExportFormatError(f"Element {index} is not a conversation object.")
+    record = convert_conversation(conv, options, index)
+    return {
+        "uuid": record.uuid,
+        "name": record.name,
+        "status": record.status,
+        "filename": record.filename,
+        "markdown": record.text() if record.status == STATUS_CONVERTED else None,
+    }
+
+
+def _init_worker():
+    # Skipped conversations are reported in the response; keep workers quiet.
+    logging.getLogger("converter_app").setLevel(logging.ERROR)
+
+
+def create_executor(workers: Optional[int] = None) -> Executor:
+    """Creates the render pool: processes, or threads when ``workers`` is 0."""
+    if workers == 0:
+        return ThreadPoolExecutor(max_workers=4, thread_name_prefix="cj2md-render")
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def _options_from_query(params: dict[str, list[str]]) -> RenderOptions:
+    options = RenderOptions()
+    for param, field_name in _DISABLE_PARAMS.items():
+        if param in params and params[param][-1].lower() in _TRUE_VALUES:
+            setattr(options, field_name, False)
+    if "verbose_tools" in params:
+        options.verbose_tools = params["verbose_tools"][-1].lower() in _TRUE_VALUES
+    return options
+
+
+async def _read_request_head(
+    reader: asyncio.StreamReader,
+) -> tuple[str, str, dict[str, str]]:
+    """Reads the request line and headers."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        raise HttpError(431, "Request Header Fields Too Large", "Headers too large.")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "Bad Request", "Malformed request line.")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    return method.upper(), target, headers
+
+
+async def _read_body(
+    reader: asyncio.StreamReader, headers: dict[str, str], sink: BinaryIO
+) -> int:
+    """Copies the request body into ``sink`` chunk by chunk; returns its size."""
+    total = 0
+
+    async def copy(remaining: int):
+        nonlocal total
+        while remaining:
+            data = await reader.read(min(READ_CHUNK_BYTES, remaining))
+            if not data:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            sink.write(data)
+            remaining -= len(data)
+            total += len(data)
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size_line = await reader.readline()
+            try:
+                size = int(size_line.split(b";", 1)[0], 16)
+            except ValueError:
+                raise HttpError(400, "Bad Request", "Malformed chunked body.")
+            if size == 0:
+                # Skip optional trailers up to the terminating blank line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return total
+            await copy(size)
+            await reader.readexactly(2)
+    if "content-length" in headers:
+        try:
+            length = int(headers["content-length"])
+        except ValueError:
+            raise HttpError(400, "Bad Request", "Invalid Content-Length.")
+        await copy(length)
+        return total
+    raise HttpError(411, "Length Required", "A request body is required.")
+
+
+def _open_upload(upload: BinaryIO) -> BinaryIO:
+    """Returns a stream over the export JSON, unwrapping zip archives and
+    compressed uploads."""
+    magic = upload.read(len(ZIP_MAGIC))
+    upload.seek(0)
+    if magic != ZIP_MAGIC:
+        return decompress_stream(upload)
+    try:
+        archive = zipfile.ZipFile(upload)
+    except zipfile.BadZipFile:
+        raise HttpError(400, "Bad Request", "The upload is not a valid zip file.")
+    names = [n for n in archive.namelist() if n.endswith(".json")]
+    for name in names:
+        if name.rsplit("/", 1)[-1] == EXPORT_MEMBER_NAME:
+            return archive.open(name)
+    raise HttpError(
+        400, "Bad Request", f"The zip archive has no {EXPORT_MEMBER_NAME} file."
+    )
+
+
+async def _send_simple(
+    writer: asyncio.StreamWriter, status: int, reason: str, body: str
+) -> None:
+    data = body.encode("utf-8")
+    writer.write(
+        (
+            f"HTTP/1.1 {status} {reason}\r\n"
+            "Content-Type: text/plain; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode("latin-1")
+        + data
+    )
+    await writer.drain()
+
+
+class _ChunkedWriter:
+    """Writes an HTTP/1.1 chunked response body."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self._writer = writer
+
+    async def start(self, content_type: str) -> None:
+        self._writer.write(
+            (
+                "HTTP/1.1 200 OK\r\n"
+                f"Content-Type: {content_type}\r\n"
+                "Transfer-Encoding: chunked\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode("latin-1")
+        )
+
+    async def write(self, data: bytes) -> None:
+        if data:
+            self._writer.write(b"%x\r\n%b\r\n" % (len(data), data))
+            await self._writer.drain()
+
+    async def finish(self) -> None:
+        self._writer.write(b"0\r\n\r\n")
+        await self._writer.drain()
+
+
+class _JsonlSink:
+    content_type = "application/x-ndjson"
+
+    def __init__(self, body: _ChunkedWriter):
+        self._body = body
+
+    async def add(self, result: dict) -> None:
+        await self._body.write(json.dumps(result).encode("utf-8") + b"\n")
+
+    async def failed(self, index: int, message: str) -> None:
+        result = {"index": index, "status": "failed", "error": message}
+        await self._body.write(json.dumps(result).encode("utf-8") + b"\n")
+
+    async def error(self, message: str) -> None:
+        await self._body.write(json.dumps({"error": message}).encode("utf-8") + b"\n")
+
+    async def close(self) -> None:
+        pass
+
+
+class _ZipSink:
+    """Streams a zip archive of the converted conversations; errors are
+    listed in an ``ERROR.txt`` entry at the end."""
+
+    content_type = "application/zip"
+
+    def __init__(self, body: _ChunkedWriter):
+        self._body = body
+        self._pending: list[bytes] = []
+        self._errors: list[str] = []
+        # zipfile falls back to data descriptors on unseekable outputs, so
+        # entries can be sent as soon as they are written.
+        self._archive = zipfile.ZipFile(self, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def write(self, data: bytes) -> int:  # File protocol used by zipfile
+        self._pending.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    async def _send(self) -> None:
+        data, self._pending = b"".join(self._pending), []
+        await self._body.write(data)
+
+    async def add(self, result: dict) -> None:
+        if result["status"] != STATUS_CONVERTED:
+            return
+        await asyncio.to_thread(
+            self._archive.writestr, result["filename"], result["markdown"]
+        )
+        await self._send()
+
+    async def failed(self, index: int, message: str) -> None:
+        self._errors.append(f"Conversation {index}: {message}")
+
+    async def error(self, message: str) -> None:
+        self._errors.append(message)
+
+    async def close(self) -> None:
+        if self._errors:
+            self._archive.writestr("ERROR.txt", "\n".join(self._errors) + "\n")
+        self._archive.close()
+        await self._send()
+
+
+class ConversionServer:
+    """Handles conversion requests on an asyncio stream server."""
+
+    def __init__(
+        self,
+        executor: Executor,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_in_flight: int = 16,
+    ):
+        self._executor = executor
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._max_in_flight = max_in_flight
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            method, target, headers = await _read_request_head(reader)
+            url = urlsplit(target)
+            if url.path == "/health":
+                await _send_simple(writer, 200, "OK", "ok\n")
+                return
+            if url.path != "/convert":
+                raise HttpError(404, "Not Found", f"No such endpoint: {url.path}")
+            if method != "POST":
+                raise HttpError(405, "Method Not Allowed", "Use POST /convert.")
+
+            params = parse_qs(url.query, keep_blank_values=True)
+            fmt = params.get("format", ["jsonl"])[-1]
+            if fmt not in ("jsonl", "zip"):
+                raise HttpError(400, "Bad Request", f"Unknown format: {fmt}")
+            options = _options_from_query(params)
+
+            if headers.get("expect", "").lower() == "100-continue":
+                writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+            async with self._slots:
+                started = time.perf_counter()
+                with tempfile.SpooledTemporaryFile(SPOOL_MEMORY_BYTES) as upload:
+                    size = await _read_body(reader, headers, upload)
+                    upload.seek(0)
+                    count = await self._convert(upload, options, fmt, writer)
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"POST {target}: {size} bytes, {count} conversations in {elapsed:.2f}s"
+                )
+        except HttpError as e:
+            logger.debug(f"Request failed with {e.status}: {e.message}")
+            await _send_simple(writer, e.status, e.reason, e.message + "\n")
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.debug(f"Client connection lost: {e}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _convert(
+        self,
+        upload: BinaryIO,
+        options: RenderOptions,
+        fmt: str,
+        writer: asyncio.StreamWriter,
+    ) -> int:
+        """Renders the uploaded export and streams results; returns the count.
+
+        An upload that can't be read up to its first conversation is
+        rejected. Once the response has started, a conversation that fails
+        to render and a read error later on are reported in the body, which
+        still ends properly.
+        """
+        try:
+            stream = await asyncio.to_thread(_open_upload, upload)
+            elements = iter_json_array(stream)
+            element = await asyncio.to_thread(next, elements, None)
+        except _UPLOAD_ERRORS as e:
+            raise HttpError(400, "Bad Request", f"Invalid export: {e}")
+
+        body = _ChunkedWriter(writer)
+        sink = _ZipSink(body) if fmt == "zip" else _JsonlSink(body)
+        await body.start(sink.content_type)
+
+        loop = asyncio.get_running_loop()
+        pending: deque[tuple[int, asyncio.Future]] = deque()
+        index = 0
+        try:
+            while element is not None or pending:
+                # Keep the pool busy while reading ahead a bounded amount.
+                while element is not None and len(pending) < self._max_in_flight:
+                    future = loop.run_in_executor(
+                        self._executor,
+                        render_conversation,
+                        element.value,
+                        index,
+                        options,
+                    )
+                    pending.append((index, future))
+                    index += 1
+                    try:
+                        element = await asyncio.to_thread(next, elements, None)
+                    except _UPLOAD_ERRORS as e:
+                        # Headers are already sent; report the error in-band.
+                        await _discard(pending)
+                        await sink.error(
+                            f"Invalid export after {index} conversations: {e}"
+                        )
+                        element = None
+                if not pending:
+                    break
+                position, future = pending.popleft()
+                try:
+                    result = await future
+                except Exception as e:
+                    await sink.failed(position, f"{type(e).__name__}: {e}")
+                else:
+                    await sink.add(result)
+        finally:
+            # The client may be gone; don't leave renders running unawaited
+            await _discard(pending)
+        await sink.close()
+        await body.finish()
+        return index
+
+
+async def _discard(pending: deque) -> None:
+    """Cancels the pending renders and waits for those already running, so
+    none is left with an unretrieved result or exception."""
+    futures = [future for _, future in pending]
+    pending.clear()
+    for future in futures:
+        future.cancel()
+    await asyncio.gather(*futures, return_exceptions=True)
+
+
+async def start_server(
+    executor: Executor,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_in_flight: int = 16,
+) -> asyncio.AbstractServer:
+    """Starts listening and returns the asyncio server (port 0 picks one)."""
+    handler = ConversionServer(executor, max_concurrency, max_in_flight)
+    return await asyncio.start_server(handler.handle, host, port)
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    workers: Optional[int] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> None:
+    """Runs the conversion service until interrupted."""
+    pool_size = workers if workers else os.cpu_count() or 1
+
+    async def run():
+        with create_executor(workers) as executor:
+            server = await start_server(
+                executor, host, port, max_concurrency, max_in_flight=2 * pool_size
+            )
+            for sock in server.sockets:
+                sock_host, sock_port = sock.getsockname()[:2]
+                logger.info(f"Serving on http://{sock_host}:{sock_port}/convert")
+            async with server:
+                await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        logger.info("Server stopped.")
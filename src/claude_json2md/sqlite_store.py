@@ -0,0 +1,178 @@
+"""SQLite output: conversations and their messages in one database file.
+
+Each converted conversation is upserted by uuid into ``conversations``, with
+its metadata and rendered Markdown, and its messages into ``messages``, one
+row each. A conversation is only replaced by a version that is at least as
+recent (by ``updated_at``) and actually differs, so refreshing a database
+from a new export, or from several exports in any order, rewrites just what
+changed.
+
+The database runs in WAL mode with ``synchronous=NORMAL``, and rows are
+written in explicit transactions of ``batch_size`` conversations.
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger("converter_app")
+
+DEFAULT_BATCH_SIZE = 1000
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    uuid TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at TEXT,
+    updated_at TEXT,
+    message_count INTEGER NOT NULL,
+    digest TEXT,
+    filename TEXT,
+    markdown TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_uuid TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    uuid TEXT,
+    sender TEXT,
+    created_at TEXT,
+    text TEXT NOT NULL,
+    PRIMARY KEY (conversation_uuid, position)
+);
+"""
+
+_UPSERT_CONVERSATION = """
+INSERT INTO conversations
+    (uuid, name, created_at, updated_at, message_count, digest, filename, markdown)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (uuid) DO UPDATE SET
+    name = excluded.name,
+    created_at = excluded.created_at,
+    updated_at = excluded.updated_at,
+    message_count = excluded.message_count,
+    digest = excluded.digest,
+    filename = excluded.filename,
+    markdown = excluded.markdown
+WHERE coalesce(excluded.updated_at, '') >= coalesce(conversations.updated_at, '')
+    AND (excluded.digest IS NOT conversations.digest
+         OR excluded.markdown IS NOT conversations.markdown)
+"""
+_DELETE_MESSAGES = "DELETE FROM messages WHERE conversation_uuid = ?"
+_INSERT_MESSAGE = """
+INSERT INTO messages (conversation_uuid, position, uuid, sender, created_at, text)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def message_text(msg: dict) -> str:
+    """The plain text of a message: its text content items, or ``text``."""
+    content = msg.get("content")
+    if content and isinstance(content, list):
+        parts = [
+            item["text"]
+            for item in content
+            if isinstance(item, dict)
+            and item.get("type", "text") == "text"
+            and isinstance(item.get("text"), str)
+            and item["text"]
+        ]
+        if parts:
+            return parts[0] if len(parts) == 1 else "\n\n".join(parts)
+    text = msg.get("text")
+    return text if isinstance(text, str) else ""
+
+
+def _message_rows(conv_uuid: str, messages) -> list[tuple]:
+    return [
+        (
+            conv_uuid,
+            position,
+            msg.get("uuid"),
+            msg.get("sender"),
+            msg.get("created_at"),
+            message_text(msg),
+        )
+        for position, msg in enumerate(messages)
+        if isinstance(msg, dict)
+    ]
+
+
+class SqliteWriter:
+    """Upserts converted conversations into a SQLite database.
+
+    Used as a context manager: changes are committed every ``batch_size``
+    conversations and when the block exits normally; an exception rolls
+    back the open batch.
+    """
+
+    def __init__(self, db_path: Path, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.written = 0  # Conversations inserted or updated
+        self.unchanged = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._in_batch = 0
+
+    def __enter__(self) -> "SqliteWriter":
+        # Transactions are managed explicitly below
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute("PRAGMA cache_size = -65536")  # 64 MiB
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if self._conn.in_transaction:
+                self._conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        finally:
+            self._conn.close()
+            self._conn = None
+
+    def add(
+        self,
+        conv: dict,
+        markdown: str,
+        filename: Optional[str] = None,
+        digest: Optional[bytes] = None,
+    ) -> bool:
+        """Upserts one conversation; returns False if the stored version was
+        kept (newer, or identical)."""
+        conn = self._conn
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        conv_uuid = conv.get("uuid", "")
+        messages = conv.get("chat_messages") or ()
+        cursor = conn.execute(
+            _UPSERT_CONVERSATION,
+            (
+                conv_uuid,
+                conv.get("name") or "",
+                conv.get("created_at"),
+                conv.get("updated_at"),
+                len(messages),
+                digest.hex() if digest is not None else None,
+                filename,
+                markdown,
+            ),
+        )
+        changed = cursor.rowcount > 0
+        if changed:
+            conn.execute(_DELETE_MESSAGES, (conv_uuid,))
+            conn.executemany(_INSERT_MESSAGE, _message_rows(conv_uuid, messages))
+            self.written += 1
+        else:
+            self.unchanged += 1
+        self._in_batch += 1
+        if self._in_batch >= self.batch_size:
+            self.commit()
+        return changed
+
+    def commit(self) -> None:
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+        self._in_batch = 0
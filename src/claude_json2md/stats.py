@@ -0,0 +1,379 @@
+"""Corpus statistics of an export.
+
+The export is streamed once; per-message numeric features (sizes and counts
+of text, thinking, tool calls and citations, with the message's month and
+sender) are appended to compact typed buffers and moved into NumPy arrays in
+chunks of ``CHUNK_ROWS``. Distributions and per-month and per-sender
+aggregates are then computed with vectorized operations, so the work after
+parsing takes little time even for hundreds of thousands of conversations.
+
+NumPy is an optional dependency (``pip install
+"claude-json-to-markdown[stats]"``).
+"""
+
+import logging
+from array import array
+from collections import Counter
+from typing import Optional
+
+from .reader import ExportSource, iter_json_array, open_export
+
+logger = logging.getLogger("converter_app")
+
+CHUNK_ROWS = 65536
+CHARS_PER_TOKEN = 4  # Rough average for English text
+PERCENTILES = (50, 90, 99)
+# Message size histogram bins, in characters
+HISTOGRAM_EDGES = (0, 1, 10, 100, 1_000, 10_000, 100_000)
+SENDERS = ("human", "assistant")
+OTHER_SENDER = "other"
+
+# Per-message features, all stored as int64
+_FEATURES = (
+    "conversation",
+    "month",  # YYYYMM, 0 if unknown
+    "sender",  # Index into SENDERS, or len(SENDERS)
+    "text_chars",
+    "thinking_blocks",
+    "thinking_chars",
+    "tool_calls",
+    "tool_errors",
+    "citations",
+)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError(
+            "cj2md stats needs NumPy; install it with "
+            'pip install "claude-json-to-markdown[stats]".'
+        )
+    return numpy
+
+
+def _month_code(timestamp, cache: dict) -> int:
+    """YYYYMM of an ISO 8601 timestamp, or 0."""
+    if not isinstance(timestamp, str):
+        return 0
+    prefix = timestamp[:7]
+    code = cache.get(prefix)
+    if code is None:
+        year, _, month = prefix.partition("-")
+        if year.isdigit() and month.isdigit() and 1 <= int(month) <= 12:
+            code = int(year) * 100 + int(month)
+        else:
+            code = 0
+        cache[prefix] = code
+    return code
+
+
+class _FeatureColumns:
+    """Per-message feature rows, interleaved in one typed buffer and moved
+    into a NumPy array every ``CHUNK_ROWS`` rows."""
+
+    def __init__(self, np):
+        self._np = np
+        self._buffer = array("q")
+        self._chunks: list = []
+        self.rows = 0
+
+    def append(self, row: tuple) -> None:
+        self._buffer.extend(row)
+        self.rows += 1
+        if self.rows % CHUNK_ROWS == 0:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            # Zero-copy: the array keeps the retired buffer alive
+            chunk = self._np.frombuffer(self._buffer, dtype="int64")
+            self._chunks.append(chunk.reshape(-1, len(_FEATURES)))
+            self._buffer = array("q")
+
+    def arrays(self) -> dict:
+        """Column name -> 1-D array of every row appended."""
+        self._flush()
+        np = self._np
+        if self._chunks:
+            table = np.concatenate(self._chunks)
+        else:
+            table = np.zeros((0, len(_FEATURES)), dtype="int64")
+        # Contiguous columns make the vectorized passes faster
+        columns = np.ascontiguousarray(table.T)
+        return {name: columns[i] for i, name in enumerate(_FEATURES)}
+
+
+def _distribution(np, values) -> dict:
+    if len(values) == 0:
+        return {"mean": 0.0, "max": 0, **{f"p{p}": 0.0 for p in PERCENTILES}}
+    percentiles = np.percentile(values, PERCENTILES)
+    return {
+        "mean": round(float(values.mean()), 1),
+        "max": int(values.max()),
+        **{f"p{p}": round(float(v), 1) for p, v in zip(PERCENTILES, percentiles)},
+    }
+
+
+def _month_label(code: int) -> str:
+    return f"{code // 100:04d}-{code % 100:02d}" if code else "unknown"
+
+
+def collect_stats(source: ExportSource, limit: Optional[int] = None) -> dict:
+    """Streams an export and returns its statistics report as a JSON-ready dict.
+
+    At most ``limit`` conversations are read when a limit is given. Raises
+    ``RuntimeError`` without NumPy, and the reader's errors if the export is
+    malformed.
+    """
+    np = _numpy()
+    columns = _FeatureColumns(np)
+    tool_names: Counter = Counter()
+    conv_months = array("q")
+    months: dict = {}
+    sender_codes = {sender: code for code, sender in enumerate(SENDERS)}
+    other_code = len(SENDERS)
+
+    with open_export(source) as stream:
+        for position, element in enumerate(iter_json_array(stream)):
+            if limit is not None and position >= limit:
+                break
+            conv = element.value
+            if not isinstance(conv, dict):
+                continue
+            conv_index = len(conv_months)
+            conv_month = _month_code(conv.get("created_at"), months)
+            conv_months.append(conv_month)
+            messages = conv.get("chat_messages")
+            if not isinstance(messages, list):
+                continue
+            for msg in messages:
+                if not isinstance(msg, dict):
+                    continue
+                text_chars = thinking_blocks = thinking_chars = 0
+                tool_calls = tool_errors = citations = 0
+                content = msg.get("content")
+                if isinstance(content, list):
+                    for item in content:
+                        if not isinstance(item, dict):
+                            continue
+                        item_type = item.get("type", "text")
+                        if item_type in ("text", "voice_note"):
+                            text = item.get("text")
+                            if isinstance(text, str):
+                                text_chars += len(text)
+                            item_citations = item.get("citations")
+                            if isinstance(item_citations, list):
+                                citations += len(item_citations)
+                        elif item_type == "thinking":
+                            thinking_blocks += 1
+                            thinking = item.get("thinking")
+                            if isinstance(thinking, str):
+                                thinking_chars += len(thinking)
+                        elif item_type == "tool_use":
+                            tool_calls += 1
+                            tool_names[str(item.get("name", "unknown_tool"))] += 1
+                        elif item_type == "tool_result" and item.get("is_error"):
+                            tool_errors += 1
+                if not text_chars:
+                    text = msg.get("text")
+                    if isinstance(text, str):
+                        text_chars = len(text)
+                columns.append(
+                    (
+                        conv_index,
+                        _month_code(msg.get("created_at"), months) or conv_month,
+                        sender_codes.get(msg.get("sender"), other_code),
+                        text_chars,
+                        thinking_blocks,
+                        thinking_chars,
+                        tool_calls,
+                        tool_errors,
+                        citations,
+                    )
+                )
+
+    data = columns.arrays()
+    conversation_months = np.array(conv_months, dtype="int64")
+    report = _summarize(np, data, conversation_months, tool_names)
+    logger.debug(
+        "Collected statistics for %d conversations, %d messages.",
+        report["conversations"],
+        report["messages"],
+    )
+    return report
+
+
+def _summarize(np, data: dict, conversation_months, tool_names: Counter) -> dict:
+    """Computes the report from the per-message feature arrays."""
+    n_conversations = len(conversation_months)
+    chars = data["text_chars"] + data["thinking_chars"]
+    tokens = chars // CHARS_PER_TOKEN
+    per_conversation = np.bincount(data["conversation"], minlength=n_conversations)
+
+    upper_edges = HISTOGRAM_EDGES[1:] + (np.inf,)
+    counts, _ = np.histogram(data["text_chars"], bins=HISTOGRAM_EDGES + (np.inf,))
+    histogram = [
+        {
+            "min_chars": low,
+            "max_chars": None if high == np.inf else high - 1,
+            "messages": int(count),
+        }
+        for low, high, count in zip(HISTOGRAM_EDGES, upper_edges, counts)
+    ]
+
+    sender_labels = SENDERS + (OTHER_SENDER,)
+    n_senders = len(sender_labels)
+    sender = data["sender"]
+    by_sender = {}
+    sender_messages = np.bincount(sender, minlength=n_senders)
+    sender_chars = np.bincount(sender, weights=chars, minlength=n_senders)
+    sender_tokens = np.bincount(sender, weights=tokens, minlength=n_senders)
+    for code, label in enumerate(sender_labels):
+        if sender_messages[code]:
+            by_sender[label] = {
+                "messages": int(sender_messages[code]),
+                "chars": int(sender_chars[code]),
+                "estimated_tokens": int(sender_tokens[code]),
+            }
+
+    # Messages count in the month they were sent, conversations in the
+    # month they were created
+    month_keys, month_index = np.unique(data["month"], return_inverse=True)
+    month_totals = zip(
+        np.bincount(month_index).tolist(),
+        np.bincount(month_index, weights=chars).tolist(),
+        np.bincount(month_index, weights=tokens).tolist(),
+    )
+    message_months = dict(zip(month_keys.tolist(), month_totals))
+    conv_keys, conv_counts = np.unique(conversation_months, return_counts=True)
+    conversation_counts = dict(zip(conv_keys.tolist(), conv_counts.tolist()))
+    by_month = {}
+    for code in sorted(message_months.keys() | conversation_counts.keys()):
+        messages, month_chars, month_tokens = message_months.get(code, (0, 0, 0))
+        by_month[_month_label(code)] = {
+            "conversations": conversation_counts.get(code, 0),
+            "messages": messages,
+            "chars": int(month_chars),
+            "estimated_tokens": int(month_tokens),
+        }
+
+    return {
+        "conversations": n_conversations,
+        "messages": int(len(chars)),
+        "empty_conversations": int(np.count_nonzero(per_conversation == 0)),
+        "messages_per_conversation": _distribution(np, per_conversation),
+        "message_chars": _distribution(np, data["text_chars"]),
+        "message_chars_histogram": histogram,
+        "estimated_tokens": {
+            "total": int(tokens.sum()),
+            "chars_per_token": CHARS_PER_TOKEN,
+            **_distribution(np, tokens),
+        },
+        "thinking": {
+            "blocks": int(data["thinking_blocks"].sum()),
+            "messages_with_thinking": int(np.count_nonzero(data["thinking_blocks"])),
+            "chars": int(data["thinking_chars"].sum()),
+        },
+        "tools": {
+            "calls": int(data["tool_calls"].sum()),
+            "errors": int(data["tool_errors"].sum()),
+            "calls_by_name": dict(tool_names.most_common()),
+        },
+        "citations": int(data["citations"].sum()),
+        "by_sender": by_sender,
+        "by_month": by_month,
+    }
+
+
+def _table(header: tuple, rows: list) -> list[str]:
+    lines = [
+        "| " + " | ".join(header) + " |",
+        "|" + "|".join("---" for _ in header) + "|",
+    ]
+    lines.extend("| " + " | ".join(str(cell) for cell in row) + " |" for row in rows)
+    lines.append("")
+    return lines
+
+
+def _distribution_rows(report: dict, keys: tuple) -> list:
+    columns = ("mean",) + tuple(f"p{p}" for p in PERCENTILES) + ("max",)
+    return [
+        (label,) + tuple(report[key][column] for column in columns)
+        for label, key in keys
+    ]
+
+
+def render_stats_markdown(report: dict) -> str:
+    """Renders a report from ``collect_stats`` as a Markdown document."""
+    lines = [
+        "# Export Statistics",
+        "",
+        f"- Conversations: {report['conversations']}"
+        f" ({report['empty_conversations']} without messages)",
+        f"- Messages: {report['messages']}",
+        f"- Estimated tokens: {report['estimated_tokens']['total']}"
+        f" (~{CHARS_PER_TOKEN} characters per token)",
+        f"- Thinking blocks: {report['thinking']['blocks']}"
+        f" in {report['thinking']['messages_with_thinking']} messages",
+        f"- Tool calls: {report['tools']['calls']}"
+        f" ({report['tools']['errors']} errors)",
+        f"- Citations: {report['citations']}",
+        "",
+        "## Distributions",
+        "",
+    ]
+    header = ("", "Mean") + tuple(f"P{p}" for p in PERCENTILES) + ("Max",)
+    lines += _table(
+        header,
+        _distribution_rows(
+            report,
+            (
+                ("Messages per conversation", "messages_per_conversation"),
+                ("Characters per message", "message_chars"),
+                ("Tokens per message", "estimated_tokens"),
+            ),
+        ),
+    )
+    lines += ["## Message Sizes", ""]
+    lines += _table(
+        ("Characters", "Messages"),
+        [
+            (
+                f"{bucket['min_chars']}+"
+                if bucket["max_chars"] is None
+                else f"{bucket['min_chars']}-{bucket['max_chars']}",
+                bucket["messages"],
+            )
+            for bucket in report["message_chars_histogram"]
+        ],
+    )
+    if report["tools"]["calls_by_name"]:
+        lines += ["## Tool Calls", ""]
+        lines += _table(
+            ("Tool", "Calls"), list(report["tools"]["calls_by_name"].items())
+        )
+    lines += ["## By Sender", ""]
+    lines += _table(
+        ("Sender", "Messages", "Characters", "Est. tokens"),
+        [
+            (sender, row["messages"], row["chars"], row["estimated_tokens"])
+            for sender, row in report["by_sender"].items()
+        ],
+    )
+    lines += ["## By Month", ""]
+    lines += _table(
+        ("Month", "Conversations", "Messages", "Characters", "Est. tokens"),
+        [
+            (
+                month,
+                row["conversations"],
+                row["messages"],
+                row["chars"],
+                row["estimated_tokens"],
+            )
+            for month, row in report["by_month"].items()
+        ],
+    )
+    return "\n".join(lines)
@@ -0,0 +1,195 @@
+"""Bounded line-level unified diffs for edits shown in verbose tool output.
+
+``unified_diff`` finds the shortest edit script with Myers' algorithm after
+stripping the common prefix and suffix, which is all most ``str_replace``
+edits need. The search gives up once it has done ``max_work`` line
+comparisons or needs more than ``max_edits`` inserted and deleted lines,
+and texts over ``max_bytes`` are not diffed at all, so a multi-megabyte
+replacement costs at most a bounded amount of work. The caller then falls
+back to a cheaper rendering.
+"""
+
+from typing import Optional
+
+DEFAULT_CONTEXT = 3
+DIFF_MAX_BYTES = 1024 * 1024  # Of both texts together
+DIFF_MAX_EDITS = 400  # Inserted plus deleted lines
+DIFF_MAX_WORK = 2_000_000  # Line comparisons
+
+# Edit script tags, as in the lines of a unified diff
+_EQUAL = " "
+_DELETE = "-"
+_INSERT = "+"
+
+
+def _shortest_edit(
+    old: list[str], new: list[str], max_edits: int, max_work: int
+) -> Optional[list[str]]:
+    """Myers' greedy search; the edit script as one tag per line, or None
+    when over budget."""
+    n, m = len(old), len(new)
+    if not n or not m:
+        if n + m > max_edits:
+            return None
+        return [_DELETE] * n + [_INSERT] * m
+
+    limit = min(n + m, max_edits)
+    offset = limit + 1
+    v = [0] * (2 * limit + 3)
+    trace = []
+    work = 0
+    for d in range(limit + 1):
+        trace.append(v[offset - d - 1 : offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]  # Insertion: down from diagonal k + 1
+            else:
+                x = v[offset + k - 1] + 1  # Deletion: right from diagonal k - 1
+            y = x - k
+            start = x
+            while x < n and y < m and old[x] == new[y]:
+                x += 1
+                y += 1
+            work += x - start + 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, d, n, m)
+        if work > max_work:
+            return None
+    return None
+
+
+def _backtrack(trace: list[list[int]], d_end: int, n: int, m: int) -> list[str]:
+    """Rebuilds the edit script from the saved diagonals, back to front."""
+    script = []
+    x, y = n, m
+    for d in range(d_end, 0, -1):
+        # trace[d] holds v[-d - 1 .. d + 1] as it was before step d
+        v = trace[d]
+        k = x - y
+        base = d + 1
+        if k == -d or (k != d and v[base + k - 1] < v[base + k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[base + prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            script.append(_EQUAL)
+            x -= 1
+            y -= 1
+        script.append(_INSERT if prev_k == k + 1 else _DELETE)
+        x, y = prev_x, prev_y
+    script.extend([_EQUAL] * x)  # The snake before the first edit
+    script.reverse()
+    return script
+
+
+def _deletions_first(script: list[str]) -> list[str]:
+    """Orders each run of changes as its deletions, then its insertions."""
+    ordered = []
+    run = []
+    for tag in script:
+        if tag == _EQUAL:
+            if run:
+                ordered.extend(sorted(run, key=_INSERT.__eq__))
+                run = []
+            ordered.append(tag)
+        else:
+            run.append(tag)
+    ordered.extend(sorted(run, key=_INSERT.__eq__))
+    return ordered
+
+
+def _format_range(start: int, length: int) -> str:
+    # As in difflib: an empty range names the line before it
+    if length == 1:
+        return str(start + 1)
+    if not length:
+        return f"{start},0"
+    return f"{start + 1},{length}"
+
+
+def unified_diff(
+    old_text: str,
+    new_text: str,
+    label: str = "",
+    context: int = DEFAULT_CONTEXT,
+    max_edits: int = DIFF_MAX_EDITS,
+    max_work: int = DIFF_MAX_WORK,
+    max_bytes: int = DIFF_MAX_BYTES,
+) -> Optional[list[str]]:
+    """The unified diff between two texts, line by line, or None when it is
+    over budget.
+
+    ``label`` names the file in the ``---``/``+++`` lines, which are left
+    out without one. Identical texts give an empty diff.
+    """
+    if len(old_text) + len(new_text) > max_bytes:
+        return None
+    old = old_text.split("\n")
+    new = new_text.split("\n")
+
+    prefix = 0
+    shortest = min(len(old), len(new))
+    while prefix < shortest and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while (
+        suffix < shortest - prefix
+        and old[len(old) - 1 - suffix] == new[len(new) - 1 - suffix]
+    ):
+        suffix += 1
+
+    middle = _shortest_edit(
+        old[prefix : len(old) - suffix],
+        new[prefix : len(new) - suffix],
+        max_edits,
+        max_work,
+    )
+    if middle is None:
+        return None
+    script = [_EQUAL] * prefix + _deletions_first(middle) + [_EQUAL] * suffix
+
+    # Pair every tag with the line it shows and its position in both texts
+    rows = []
+    i = j = 0
+    for tag in script:
+        if tag == _INSERT:
+            rows.append((tag, new[j], i, j))
+            j += 1
+        elif tag == _DELETE:
+            rows.append((tag, old[i], i, j))
+            i += 1
+        else:
+            rows.append((tag, old[i], i, j))
+            i += 1
+            j += 1
+
+    changed = [pos for pos, row in enumerate(rows) if row[0] != _EQUAL]
+    if not changed:
+        return []
+
+    lines = [f"--- {label}", f"+++ {label}"] if label else []
+    hunk_start = 0
+    while hunk_start < len(changed):
+        # Changes with at most two contexts between them share a hunk
+        hunk_end = hunk_start
+        while (
+            hunk_end + 1 < len(changed)
+            and changed[hunk_end + 1] - changed[hunk_end] <= 2 * context + 1
+        ):
+            hunk_end += 1
+        first = max(changed[hunk_start] - context, 0)
+        last = min(changed[hunk_end] + context, len(rows) - 1)
+        hunk = rows[first : last + 1]
+        old_count = sum(tag != _INSERT for tag, *_ in hunk)
+        new_count = sum(tag != _DELETE for tag, *_ in hunk)
+        _, _, old_start, new_start = hunk[0]
+        lines.append(
+            f"@@ -{_format_range(old_start, old_count)} "
+            f"+{_format_range(new_start, new_count)} @@"
+        )
+        lines.extend(tag + text for tag, text, _, _ in hunk)
+        hunk_start = hunk_end + 1
+    return lines
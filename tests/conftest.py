@@ -0,0 +1,47 @@
+"""Builders for the conversations and exports the tests convert."""
+
+import json
+
+CREATED_AT = "2024-03-01T10:00:00Z"
+
+
+def conversation(
+    uuid,
+    *texts,
+    messages=None,
+    name=None,
+    created_at=CREATED_AT,
+    updated_at=None,
+    **fields,
+):
+    """A conversation as found in an export.
+
+    ``texts`` become alternating human and assistant messages, unless
+    ``messages`` gives them in full; with neither, it is a short greeting.
+    The name defaults to one made from the uuid and ``updated_at`` to
+    ``created_at``; a ``None`` date is left out. Any other ``fields`` are
+    set as given.
+    """
+    conv = {"uuid": uuid, "name": f"Conversation {uuid}" if name is None else name}
+    if updated_at is None:
+        updated_at = created_at
+    if created_at is not None:
+        conv["created_at"] = created_at
+    if updated_at is not None:
+        conv["updated_at"] = updated_at
+    if messages is None:
+        texts = texts or ("Hello", "Hi")
+        messages = [
+            {"sender": "human" if i % 2 == 0 else "assistant", "text": text}
+            for i, text in enumerate(texts)
+        ]
+    conv["chat_messages"] = messages
+    conv.update(fields)
+    return conv
+
+
+def write_export(tmp_path, convs, name="export.json", **dumps_options):
+    """Writes ``convs`` as a JSON export in ``tmp_path``; returns its path."""
+    path = tmp_path / name
+    path.write_text(json.dumps(convs, **dumps_options), encoding="utf-8")
+    return path
@@ -0,0 +1,93 @@
+"""Tests for multi-export batch conversion."""
+
+import gzip
+import json
+
+from claude_json2md.batch import ConversationIndex, batch_to_markdown, build_index
+from conftest import conversation, write_export
+
+
+class TestConversationIndex:
+    def test_newest_version_wins(self):
+        index = ConversationIndex()
+        index.add("a", 0, "2024-01-02T00:00:00Z", 10, 5, 0)
+        index.add("a", 1, "2024-01-01T00:00:00Z", 20, 5, 0)
+        assert len(index) == 1
+        assert index.seen == 2
+        assert index.entries_for(0) == [(10, 5, 0)]
+        assert index.entries_for(1) == []
+
+    def test_later_source_wins_ties(self):
+        index = ConversationIndex()
+        index.add("a", 0, "2024-01-01T00:00:00Z", 10, 5, 0)
+        index.add("a", 1, "2024-01-01T00:00:00Z", 20, 6, 3)
+        assert index.entries_for(0) == []
+        assert index.entries_for(1) == [(20, 6, 3)]
+
+    def test_conversations_without_uuid_are_kept(self):
+        index = ConversationIndex()
+        index.add(None, 0, None, 1, 1, 0)
+        index.add(None, 0, None, 5, 1, 1)
+        index.add("", 1, None, 1, 1, 0)
+        assert len(index) == 3
+
+    def test_build_index_records_byte_offsets(self, tmp_path):
+        export = write_export(tmp_path, [conversation("a")])
+        raw = export.read_bytes()
+        index = build_index([export])
+        ((offset, length, position),) = index.entries_for(0)
+        assert json.loads(raw[offset : offset + length])["uuid"] == "a"
+        assert position == 0
+
+
+def test_batch_renders_newest_version_once(tmp_path):
+    old = write_export(
+        tmp_path,
+        [conversation("shared", "stale text"), conversation("only-old", "old only")],
+        name="old.json",
+    )
+    newer = "2024-04-01T00:00:00Z"
+    new_convs = [
+        conversation("shared", "fresh text", updated_at=newer),
+        conversation("only-new", "new only", updated_at=newer),
+    ]
+    new = tmp_path / "new.json.gz"
+    new.write_bytes(gzip.compress(json.dumps(new_convs).encode()))
+    output_dir = tmp_path / "out"
+
+    batch_to_markdown([old, new], output_dir, workers=1)
+
+    files = sorted(p.name for p in output_dir.glob("*.md"))
+    assert len(files) == 3
+    shared = (output_dir / "2024-03-01_conversation-shared_shared.md").read_text()
+    assert "fresh text" in shared
+    assert "stale text" not in shared
+
+
+def test_batch_reads_plain_exports_in_worker_processes(tmp_path):
+    exports = []
+    for n in range(2):
+        updated_at = f"2024-04-0{n + 1}T00:00:00Z"
+        convs = [
+            conversation(f"c{i}", f"v{n} c{i}", updated_at=updated_at)
+            for i in range(3)
+        ]
+        exports.append(write_export(tmp_path, convs, name=f"export{n}.json"))
+    output_dir = tmp_path / "out"
+
+    batch_to_markdown(exports, output_dir, workers=2)
+
+    contents = [p.read_text() for p in sorted(output_dir.glob("*.md"))]
+    assert len(contents) == 3
+    assert all("v1 c" in c and "v0 c" not in c for c in contents)
+
+
+def test_batch_limit(tmp_path):
+    export = write_export(tmp_path, [conversation(f"c{i}") for i in range(4)])
+    other = tmp_path / "other.json"
+    other.write_text("[]")
+    output_dir = tmp_path / "out"
+
+    batch_to_markdown([export, other], output_dir, limit=2, workers=1)
+
+    assert len(list(output_dir.glob("*.md"))) == 2
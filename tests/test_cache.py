@@ -0,0 +1,122 @@
+"""Tests for the on-disk render cache."""
+
+import json
+import os
+
+from claude_json2md.batch import batch_to_markdown
+from claude_json2md.cache import RenderCache
+from claude_json2md.converter import convert_iter, json_to_markdown
+from claude_json2md.renderers import RenderOptions
+
+
+def _export(n=3):
+    return [
+        {
+            "uuid": f"uuid-{i}",
+            "name": f"Cached {i}",
+            "created_at": "2024-01-01T10:00:00Z",
+            "updated_at": "2024-01-01T11:00:00Z",
+            "chat_messages": [
+                {
+                    "sender": "assistant",
+                    "content": [
+                        {"type": "thinking", "thinking": f"Pondering {i}"},
+                        {"type": "text", "text": f"Answer {i}"},
+                    ],
+                }
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+def _read_dir(directory):
+    return {p.name: p.read_text() for p in directory.glob("*.md")}
+
+
+def test_second_run_is_served_from_cache(tmp_path):
+    export = tmp_path / "export.json"
+    export.write_text(json.dumps(_export()))
+    cache = RenderCache(tmp_path / "cache")
+
+    json_to_markdown(export, tmp_path / "first", cache=cache)
+    assert (cache.hits, cache.misses) == (0, 3)
+    json_to_markdown(export, tmp_path / "second", cache=cache)
+    assert (cache.hits, cache.misses) == (3, 3)
+
+    assert _read_dir(tmp_path / "first") == _read_dir(tmp_path / "second")
+    uncached = tmp_path / "uncached"
+    json_to_markdown(export, uncached)
+    assert _read_dir(uncached) == _read_dir(tmp_path / "second")
+
+
+def test_options_and_content_are_part_of_the_key(tmp_path):
+    data = _export(1)
+    cache = RenderCache(tmp_path / "cache")
+
+    def render(export, options):
+        (record,) = convert_iter(json.dumps(export).encode(), options, cache=cache)
+        return record.cached, record.text()
+
+    first = render(data, RenderOptions())
+    assert first[0] is False
+    assert render(data, RenderOptions()) == (True, first[1])
+    cached, text = render(data, RenderOptions(include_thinking=False))
+    assert not cached
+    assert "Pondering" not in text
+
+    data[0]["chat_messages"][0]["content"][1]["text"] = "Changed"
+    cached, text = render(data, RenderOptions())
+    assert not cached
+    assert "Changed" in text
+    assert render(data, RenderOptions())[0]
+
+
+def test_partially_consumed_records_are_not_cached(tmp_path):
+    cache = RenderCache(tmp_path / "cache")
+    source = json.dumps(_export(1)).encode()
+    (record,) = convert_iter(source, cache=cache)
+    next(record.lines)
+    (record,) = convert_iter(source, cache=cache)
+    assert not record.cached
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    cache = RenderCache(tmp_path / "cache", max_bytes=250)
+    for i in range(3):
+        cache.put(f"{i:02d}key", "x" * 80)
+    for age, key in enumerate(["00key", "01key", "02key"]):
+        os.utime(cache._path(key), (age, age))
+    cache.get("00key")  # Refreshes its modification time
+
+    cache.put("03key", "x" * 80)  # Over the bound: evicts down to 90%
+
+    assert cache.get("01key") is None
+    assert cache.get("02key") is None
+    assert cache.get("00key") is not None
+    assert cache.get("03key") is not None
+    assert cache.stats().total_bytes <= 250
+
+
+def test_stats_and_clear(tmp_path):
+    cache = RenderCache(tmp_path / "cache")
+    cache.put("aakey", "hello")
+    cache.put("bbkey", "world!")
+    stats = cache.stats()
+    assert (stats.entries, stats.total_bytes) == (2, 11)
+    assert cache.clear() == 2
+    assert cache.stats().entries == 0
+    assert cache.get("aakey") is None
+
+
+def test_batch_uses_cache(tmp_path):
+    exports = []
+    for n in range(2):
+        export = tmp_path / f"export{n}.json"
+        export.write_text(json.dumps(_export(2 + n)))
+        exports.append(export)
+    cache = RenderCache(tmp_path / "cache")
+
+    batch_to_markdown(exports, tmp_path / "warm", workers=1, cache=cache)
+    (record,) = convert_iter(json.dumps(_export(1)).encode(), cache=cache)
+    assert record.cached  # Worker digests match the streaming reader's
@@ -1,3 +1,4 @@
+import gzip
 import subprocess
 import tempfile
 import shutil
@@ -319,4 +320,77 @@ def test_cli_no_tools_flag(temp_test_env):
     assert "Here are the results." in content
 
 
+def test_stdin_to_stdout_with_compressed_input(temp_test_env):
+    """Test '-' for input and output, with gzip input detected by magic bytes."""
+    sample_data = [
+        {
+            "uuid": f"pipe-{i}",
+            "name": f"Pipe Test {i}",
+            "created_at": "2024-01-01T10:00:00Z",
+            "updated_at": "2024-01-01T11:00:00Z",
+            "chat_messages": [{"sender": "human", "text": f"Piped message {i}"}],
+        }
+        for i in range(2)
+    ]
+    compressed = gzip.compress(json.dumps(sample_data).encode())
+    log_path = temp_test_env["test_dir"] / "pipe.log"
+
+    result = subprocess.run(
+        ["cj2md", "-", "-", "--log-path", str(log_path)],
+        input=compressed,
+        capture_output=True,
+        check=False,
+    )
+    assert result.returncode == 0, f"Script failed: {result.stderr}"
+
+    stdout = result.stdout.decode()
+    assert stdout.count("<!-- cj2md: ") == 2
+    assert "<!-- cj2md: 2024-01-01_pipe-test-0_pipe.md -->" in stdout
+    assert "Piped message 0" in stdout
+    assert "Piped message 1" in stdout
+    assert "Application started" not in stdout  # Logging stays on stderr
+
+
+
+def test_multiple_exports_with_glob(temp_test_env):
+    """Test several exports (via a glob) deduplicated into one output directory."""
+    test_dir = temp_test_env["test_dir"]
+    output_dir = temp_test_env["output_dir"]
+    for month in (1, 2):
+        create_sample_json(
+            test_dir / f"export-{month}.json",
+            [
+                {
+                    "uuid": "shared",
+                    "name": "Shared Chat",
+                    "created_at": "2024-01-01T10:00:00Z",
+                    "updated_at": f"2024-0{month}-01T10:00:00Z",
+                    "chat_messages": [
+                        {"sender": "human", "text": f"Version {month}"}
+                    ],
+                }
+            ],
+        )
+
+    result = subprocess.run(
+        [
+            "cj2md",
+            str(test_dir / "export-*.json"),
+            "-o",
+            str(output_dir),
+            "--workers",
+            "1",
+            "--log-path",
+            str(test_dir / "batch.log"),
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, f"Script failed: {result.stderr}"
+
+    files = list(output_dir.glob("*.md"))
+    assert len(files) == 1
+    assert "Version 2" in files[0].read_text()
+
 # No longer need: if __name__ == '__main__': unittest.main()
@@ -1,4 +1,5 @@
 from pathlib import Path
+import io
 import json
 
 # Functions to be tested
@@ -9,7 +10,13 @@ from claude_json2md.converter import (
     generate_markdown_content,
     write_markdown_file,
     has_meaningful_content,
+    iter_markdown_blocks,
+    convert_iter,
+    STATUS_CONVERTED,
+    STATUS_SKIPPED_EMPTY_NAME,
+    STATUS_SKIPPED_NO_CONTENT,
 )
+from claude_json2md.output import temp_path
 from claude_json2md.renderers import RenderOptions
 
 # --- Tests for create_slug ---
@@ -244,6 +251,7 @@ def test_generate_markdown_content_sparse_message_data():
 def test_write_markdown_file_success(mocker):
     mock_file = mocker.mock_open()
     mocker.patch("pathlib.Path.open", mock_file)
+    mock_replace = mocker.patch("claude_json2md.converter.os.replace")
 
     filepath = Path("test_output.md")
     content_lines = ["Line1", "Second Line"]
@@ -253,6 +261,8 @@ def test_write_markdown_file_success(mocker):
     assert success is True
     mock_file.assert_called_once_with("w", encoding="utf-8")
     mock_file().write.assert_called_once_with("Line1\nSecond Line")
+    # Written to a temporary file, then moved into place
+    mock_replace.assert_called_once_with(temp_path(filepath), filepath)
 
 
 def test_write_markdown_file_io_error(mocker, caplog):
@@ -497,3 +507,106 @@ def test_generate_markdown_content_backward_compatible():
     }
     md_lines = generate_markdown_content(conv_data, "Old Format")
     assert "Old style without type field" in md_lines
+
+
+# --- Tests for iter_markdown_blocks (single-pass skip) ---
+
+
+def _flatten(blocks):
+    return [line for block in blocks for line in block]
+
+
+def test_iter_markdown_blocks_skip_empty_yields_nothing():
+    conv_data = {
+        "uuid": "conv-empty-001",
+        "chat_messages": [
+            {"sender": "human", "text": "   "},
+            {"sender": "assistant", "content": [{"type": "text", "text": " \n "}]},
+        ],
+    }
+    assert list(iter_markdown_blocks(conv_data, "Empty", skip_empty=True)) == []
+
+
+def test_iter_markdown_blocks_skip_empty_flushes_buffered_blocks():
+    """Empty leading messages are kept once later content is found."""
+    conv_data = {
+        "uuid": "conv-late-001",
+        "created_at": "2024-01-01T10:00:00Z",
+        "updated_at": "2024-01-01T11:00:00Z",
+        "chat_messages": [
+            {"sender": "human", "text": ""},
+            {"sender": "assistant", "content": []},
+            {
+                "sender": "assistant",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": "Finally",
+                        "citations": [{"url": "https://example.com"}],
+                    }
+                ],
+            },
+        ],
+    }
+    blocks = list(iter_markdown_blocks(conv_data, "Late", skip_empty=True))
+    assert _flatten(blocks) == generate_markdown_content(conv_data, "Late")
+    assert len(blocks) == 5  # header, three messages, references
+
+
+def test_iter_markdown_blocks_skip_empty_matches_has_meaningful_content():
+    """Disabled content types still count as meaningful, as before."""
+    conv_data = {
+        "uuid": "conv-hidden-001",
+        "chat_messages": [
+            {"content": [{"type": "thinking", "thinking": "Hidden thoughts"}]}
+        ],
+    }
+    options = RenderOptions(include_thinking=False)
+    blocks = list(iter_markdown_blocks(conv_data, "Hidden", options, skip_empty=True))
+    assert has_meaningful_content(conv_data["chat_messages"]) is True
+    assert blocks != []
+
+
+# --- Tests for convert_iter ---
+
+
+CONVERT_ITER_EXPORT = [
+    {
+        "uuid": "aaaa-1",
+        "name": "Kept",
+        "created_at": "2024-02-03T10:00:00Z",
+        "chat_messages": [{"sender": "human", "text": "Hello"}],
+    },
+    {"uuid": "bbbb-2", "name": "", "chat_messages": [{"text": "Hidden"}]},
+    {"uuid": "cccc-3", "name": "No Messages", "chat_messages": []},
+    {"uuid": "dddd-4", "name": "Blank", "chat_messages": [{"text": "  "}]},
+]
+
+
+def test_convert_iter_statuses_from_bytes():
+    raw = json.dumps(CONVERT_ITER_EXPORT).encode()
+    records = list(convert_iter(raw))
+    assert [r.status for r in records] == [
+        STATUS_CONVERTED,
+        STATUS_SKIPPED_EMPTY_NAME,
+        STATUS_SKIPPED_NO_CONTENT,
+        STATUS_SKIPPED_NO_CONTENT,
+    ]
+    assert records[0].filename == "2024-02-03_kept_aaaa.md"
+    assert all(r.filename is None and r.lines is None for r in records[1:])
+
+
+def test_convert_iter_text_matches_generate_markdown_content(tmp_path):
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps(CONVERT_ITER_EXPORT))
+    record = next(convert_iter(path))
+    expected = generate_markdown_content(CONVERT_ITER_EXPORT[0], "Kept")
+    assert record.text() == "\n".join(expected)
+    assert not any(tmp_path.glob("*.md"))  # No filesystem side effects
+
+
+def test_convert_iter_limit_and_stream():
+    stream = io.BytesIO(json.dumps(CONVERT_ITER_EXPORT).encode())
+    records = list(convert_iter(stream, RenderOptions(), limit=2))
+    assert [r.uuid for r in records] == ["aaaa-1", "bbbb-2"]
+    assert list(convert_iter(b"[not json", limit=0)) == []
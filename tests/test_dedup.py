@@ -0,0 +1,203 @@
+"""Tests for exact and near-duplicate conversation detection."""
+
+import json
+import random
+
+import pytest
+from typer.testing import CliRunner
+
+from claude_json2md import dedup
+from claude_json2md.cli import app
+from claude_json2md.converter import json_to_markdown
+from claude_json2md.dedup import (
+    EXACT,
+    NEAR,
+    DuplicateMode,
+    find_duplicates,
+    render_dedup_markdown,
+)
+from conftest import conversation, write_export
+
+
+def _words(seed, count=300):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        "".join(rng.choice(letters) for _ in range(rng.randint(3, 9)))
+        for _ in range(count)
+    ]
+
+
+def _export():
+    prompt = " ".join(_words(1, 40))
+    answer = " ".join(_words(2))
+    edited = _words(2)
+    edited[100:103] = ["retried", "answer", "here"]
+    return [
+        conversation("original", prompt, answer),
+        # Same text, different case and spacing
+        conversation("copy", prompt.upper(), "  " + answer.replace(" ", "\n")),
+        conversation(
+            "longer",
+            prompt,
+            answer,
+            "one more question",
+            created_at="2024-03-02T00:00:00Z",
+        ),
+        conversation("retry", prompt, " ".join(edited)),
+        conversation("other", " ".join(_words(3, 40)), " ".join(_words(4))),
+        conversation("unnamed", prompt, answer, name=""),
+        {"uuid": "empty", "name": "Empty", "chat_messages": [{"text": " "}]},
+    ]
+
+
+def _source(convs):
+    return json.dumps(convs).encode()
+
+
+def test_exact_duplicates_without_numpy(monkeypatch):
+    monkeypatch.setattr(dedup, "_numpy", pytest.fail)
+    report = find_duplicates(_source(_export()), near=False)
+
+    # Unnamed and empty conversations are never converted, so not compared
+    assert report.conversations == 5
+    assert len(report.groups) == 1
+    group = report.groups[0]
+    assert group.kept.uuid == "original"
+    assert [(d.conversation.uuid, d.kind, d.similarity) for d in group.duplicates] == [
+        ("copy", EXACT, 1.0)
+    ]
+
+
+def test_near_duplicates():
+    pytest.importorskip("numpy")
+    report = find_duplicates(_source(_export()))
+
+    assert len(report.groups) == 1
+    group = report.groups[0]
+    # The most messages wins
+    assert group.kept.uuid == "longer"
+    kinds = {d.conversation.uuid: d.kind for d in group.duplicates}
+    assert kinds == {"original": NEAR, "copy": NEAR, "retry": NEAR}
+    assert all(0.8 <= d.similarity < 1 for d in group.duplicates)
+    assert report.duplicate_uuids() == {"original", "copy", "retry"}
+
+
+def test_threshold_separates_near_duplicates():
+    pytest.importorskip("numpy")
+    convs = [c for c in _export() if c["uuid"] in ("original", "retry")]
+
+    assert len(find_duplicates(_source(convs), threshold=0.5).groups) == 1
+    assert find_duplicates(_source(convs), threshold=1.0).groups == []
+    with pytest.raises(ValueError):
+        find_duplicates(_source(convs), threshold=0)
+
+
+def test_signatures_independent_of_chunking(monkeypatch):
+    np = pytest.importorskip("numpy")
+    texts = [b"short", b"", "ünïcode text".encode(), " ".join(_words(5)).encode()]
+
+    def signatures():
+        collected = dedup._Signatures(np)
+        for text in texts:
+            collected.add(text)
+        return collected.matrix()
+
+    whole = signatures()
+    monkeypatch.setattr(dedup, "CHUNK_BYTES", 1)
+    assert np.array_equal(signatures(), whole)
+    assert whole.shape == (len(texts), dedup.NUM_PERM)
+    # Every row is filled, even for texts shorter than a shingle
+    assert not (whole == np.iinfo(np.uint32).max).any()
+
+
+def test_markdown_report():
+    report = find_duplicates(_source(_export()), near=False)
+    markdown = render_dedup_markdown(report)
+
+    assert "1 duplicates in 1 groups (1 exact, 0 near)" in markdown
+    assert "| Conversation copy | `copy` | 2024-03-01 | 2 | exact copy |" in markdown
+
+
+def test_convert_skips_duplicates(tmp_path):
+    source = write_export(tmp_path, _export())
+    report = find_duplicates(source, near=False)
+
+    json_to_markdown(
+        source, tmp_path / "out", duplicates=report, duplicate_mode=DuplicateMode.skip
+    )
+
+    written = sorted(p.name for p in (tmp_path / "out").glob("*.md"))
+    assert not any(name.endswith("_copy.md") for name in written)
+    assert any(name.endswith("_original.md") for name in written)
+
+
+def test_convert_links_duplicates(tmp_path):
+    source = write_export(tmp_path, _export())
+    report = find_duplicates(source, near=False)
+
+    json_to_markdown(
+        source, tmp_path / "out", duplicates=report, duplicate_mode=DuplicateMode.link
+    )
+
+    out = tmp_path / "out"
+    copy = (out / "2024-03-01_conversation-copy_copy.md").read_text()
+    original = (out / "2024-03-01_conversation-original_original.md").read_text()
+    assert copy.startswith(
+        "> **Duplicate of:** [Conversation original]"
+        "(2024-03-01_conversation-original_original.md) (exact copy)\n\n# Conversation"
+    )
+    assert original.startswith(
+        "> **Duplicates:** [Conversation copy]"
+        "(2024-03-01_conversation-copy_copy.md) (exact copy)\n"
+    )
+
+
+def test_cli_dedup(tmp_path):
+    source = write_export(tmp_path, _export())
+
+    result = CliRunner().invoke(
+        app,
+        [
+            "dedup",
+            str(source),
+            "--exact-only",
+            "--json",
+            "-o",
+            str(tmp_path / "report"),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    # Log lines on stderr are mixed into the output
+    start = result.output.index("{\n")
+    report, _ = json.JSONDecoder().raw_decode(result.output[start:])
+    assert report["duplicates"] == report["exact_duplicates"] == 1
+    assert report["duplicate_groups"][0]["kept"]["uuid"] == "original"
+    assert (tmp_path / "report" / "duplicates.md").exists()
+
+
+def test_cli_duplicates_need_a_single_export(tmp_path):
+    source = tmp_path / "export.json"
+    source.write_text("[]")
+
+    result = CliRunner().invoke(
+        app, ["convert", str(source), "-", "--duplicates", "skip"]
+    )
+
+    assert result.exit_code != 0
+    assert "--duplicates" in result.output
+
+
+@pytest.mark.parametrize("command", ["dedup", "convert"])
+def test_cli_rejects_a_zero_threshold(tmp_path, command):
+    source = write_export(tmp_path, _export())
+    option = "--threshold" if command == "dedup" else "--duplicate-threshold"
+
+    result = CliRunner().invoke(app, [command, str(source), option, "0"])
+
+    assert result.exit_code == 2
+    assert option in result.output
+
+    result = CliRunner().invoke(app, [command, str(source), option, "1.5"])
+    assert result.exit_code == 2
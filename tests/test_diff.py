@@ -0,0 +1,86 @@
+"""Tests for comparing two exports."""
+
+import gzip
+import json
+
+from typer.testing import CliRunner
+
+from claude_json2md.cli import app
+from claude_json2md.diff import content_digest, diff_exports, render_changed
+from conftest import CREATED_AT, conversation
+
+
+OLD = [
+    conversation("kept", "same"),
+    conversation("edited", "before"),
+    conversation("gone", "bye"),
+]
+NEW = [
+    conversation("kept", "same"),
+    conversation("edited", "after", updated_at="2024-04-01T00:00:00Z"),
+    conversation("fresh", "hello"),
+]
+
+
+def test_content_digest_ignores_key_order():
+    a = {"uuid": "x", "name": "n"}
+    b = {"name": "n", "uuid": "x"}
+    assert content_digest(a) == content_digest(b)
+    assert content_digest(a) != content_digest({"uuid": "x", "name": "m"})
+
+
+def test_diff_exports_classifies_changes():
+    result = diff_exports(json.dumps(OLD).encode(), json.dumps(NEW, indent=2).encode())
+    assert [e.uuid for e in result.added] == ["fresh"]
+    assert [e.uuid for e in result.removed] == ["gone"]
+    assert [e.uuid for e in result.modified] == ["edited"]
+    assert result.unchanged == 1
+    modified = result.modified[0]
+    assert modified.old_updated_at == CREATED_AT
+    assert modified.new_updated_at == "2024-04-01T00:00:00Z"
+    assert result.changed_uuids == {"fresh", "edited"}
+
+
+def test_diff_exports_reads_compressed_exports():
+    old = gzip.compress(json.dumps(OLD).encode())
+    result = diff_exports(old, json.dumps(OLD).encode())
+    assert result.entries() == []
+    assert result.unchanged == 3
+
+
+def test_conversations_without_uuid_are_ignored():
+    result = diff_exports(b"[]", json.dumps([{"name": "no uuid"}]).encode())
+    assert result.entries() == []
+
+
+def test_render_changed_writes_only_changed(tmp_path):
+    result = diff_exports(json.dumps(OLD).encode(), json.dumps(NEW).encode())
+    written = render_changed(
+        json.dumps(NEW).encode(), result.changed_uuids, tmp_path / "out"
+    )
+    assert written == 2
+    names = sorted(p.name for p in (tmp_path / "out").glob("*.md"))
+    assert names == [
+        "2024-03-01_conversation-edited_edited.md",
+        "2024-03-01_conversation-fresh_fresh.md",
+    ]
+
+
+def test_cli_render_takes_the_render_options(tmp_path):
+    content = [
+        {"type": "thinking", "thinking": "Private thoughts"},
+        {"type": "text", "text": "Hi"},
+    ]
+    message = {"sender": "assistant", "content": content}
+    old = tmp_path / "old.json"
+    new = tmp_path / "new.json"
+    old.write_text(json.dumps(OLD))
+    new.write_text(json.dumps(NEW + [conversation("deep", messages=[message])]))
+    output_dir = tmp_path / "out"
+    args = ["diff", str(old), str(new), "--render", str(output_dir)]
+
+    result = CliRunner().invoke(app, args + ["--no-thinking"])
+    assert result.exit_code == 0, result.output
+    (page,) = output_dir.glob("*_deep.md")
+    assert "Hi" in page.read_text()
+    assert "Private thoughts" not in page.read_text()
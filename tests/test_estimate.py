@@ -0,0 +1,139 @@
+"""Tests for `cj2md inspect` and `--dry-run` estimates."""
+
+import json
+import logging
+import re
+
+from typer.testing import CliRunner
+
+from claude_json2md import estimate
+from claude_json2md.cli import app
+from claude_json2md.converter import json_to_markdown
+from claude_json2md.estimate import inspect_export, render_inspect_text
+from claude_json2md.guards import ConversationLimits
+from claude_json2md.output import OutputCompression, OutputOptions
+from claude_json2md.renderers import RenderOptions
+from conftest import conversation, write_export
+
+
+def _conv(i, **fields):
+    return conversation(f"{i:08x}-conv", f"Question {i}", "Answer", **fields)
+
+
+def _export():
+    return [
+        _conv(0),
+        _conv(1, name=""),
+        {**_conv(2), "name": None},
+        _conv(3, chat_messages=[]),
+        _conv(4, chat_messages=[{"sender": "human", "text": "  "}, "not a message"]),
+        _conv(5, chat_messages=[{"content": [{"type": "thinking", "thinking": "\n"}]}]),
+        _conv(
+            6,
+            chat_messages=[
+                {"sender": "human", "text": ""},
+                {"sender": "assistant", "content": [{"type": "tool_use"}]},
+            ],
+        ),
+        _conv(7, chat_messages=[{"sender": "human", "text": "x" * 5000}] * 3),
+    ]
+
+
+def _summary_counts(text):
+    found = re.search(
+        r"Processed: (\d+)\. Skipped \(empty name\): (\d+)\. "
+        r"Skipped \(no content\): (\d+)\.",
+        text,
+    )
+    return tuple(int(n) for n in found.groups())
+
+
+def test_counts_match_the_conversion(tmp_path, caplog):
+    export = write_export(tmp_path, _export())
+    report = inspect_export(export)
+
+    with caplog.at_level(logging.INFO, logger="converter_app"):
+        json_to_markdown(export, tmp_path / "out")
+
+    counts = (report.processed, report.skipped_empty_name, report.skipped_no_content)
+    assert counts == _summary_counts(caplog.text) == (3, 2, 3)
+    assert report.conversations == 8
+    assert report.input_bytes == sum(len(json.dumps(conv)) for conv in _export())
+
+
+def test_fully_sampled_export_estimates_exact_output(tmp_path):
+    export = write_export(tmp_path, _export())
+    options = RenderOptions(include_summary=False)
+    output = OutputOptions(OutputCompression.gzip)
+    report = inspect_export(export, options=options, output=output)
+
+    out = tmp_path / "out"
+    json_to_markdown(export, out, options=options, manifest=False, output=output)
+    written = sum(path.stat().st_size for path in out.iterdir())
+
+    assert report.sampled == report.processed
+    assert report.estimated_output_bytes == written
+    assert report.estimated_seconds > report.scan_seconds > 0
+
+
+def test_estimates_extrapolate_from_the_sample(tmp_path, mocker):
+    mocker.patch.object(estimate, "SAMPLE_FIRST", 1)
+    mocker.patch.object(estimate, "SAMPLE_EVERY", 3)
+    export = write_export(tmp_path, [_conv(i) for i in range(10)])
+
+    report = inspect_export(export)
+
+    assert (report.processed, report.sampled) == (10, 4)
+    ratio = report.sampled_output_bytes / report.sampled_input_bytes
+    assert report.estimated_output_bytes == round(report.converted_input_bytes * ratio)
+
+
+def test_limit_and_oversized(tmp_path):
+    export = write_export(tmp_path, _export())
+    assert inspect_export(export, limit=2).conversations == 2
+    assert inspect_export(export, limit=0).conversations == 0
+
+    report = inspect_export(export, limits=ConversationLimits(max_bytes=2000))
+    assert (report.processed, report.skipped_oversized) == (2, 1)
+    assert "Skipped (oversized): 1" in render_inspect_text(report)
+
+
+def test_cli_inspect_and_dry_run(tmp_path):
+    export = write_export(tmp_path, _export())
+    runner = CliRunner(mix_stderr=False)
+
+    result = runner.invoke(app, ["inspect", str(export)])
+    assert result.exit_code == 0, result.stderr
+    assert "  Processed: 3\n" in result.stdout
+    assert "Estimated output:" in result.stdout
+
+    result = runner.invoke(app, ["inspect", str(export), "--json"])
+    report = json.loads(result.stdout)
+    assert report["skipped_no_content"] == 3
+    assert report["estimated_output_bytes"] > 0
+
+    output_dir = tmp_path / "out"
+    result = runner.invoke(
+        app, ["convert", str(export), "-o", str(output_dir), "--dry-run"]
+    )
+    assert result.exit_code == 0, result.stderr
+    assert "Skipped (empty name): 2" in result.stdout
+    assert not output_dir.exists()
+
+
+def test_cli_survives_fields_of_the_wrong_type(tmp_path):
+    null_text = {"sender": "human", "content": [{"type": "text", "text": None}]}
+    export = write_export(
+        tmp_path, [_conv(0, chat_messages=[null_text, {"text": 3}]), _conv(1)]
+    )
+    runner = CliRunner(mix_stderr=False)
+
+    result = runner.invoke(app, ["inspect", str(export), "--json"])
+    assert result.exit_code == 0, result.stderr
+    assert json.loads(result.stdout)["skipped_no_content"] == 1
+
+    output_dir = tmp_path / "out"
+    args = ["convert", str(export), "-o", str(output_dir), "--progress", "none"]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0, result.stderr
+    assert len(list(output_dir.glob("*.md"))) == 1
@@ -0,0 +1,171 @@
+"""Tests for the sidecar export index and `cj2md get`."""
+
+import gzip
+import json
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+from claude_json2md import export_index
+from claude_json2md.cli import app
+from claude_json2md.export_index import (
+    build_index,
+    index_path_for,
+    open_index,
+    read_conversations,
+)
+from conftest import conversation, write_export
+
+
+def _conv(i, created_at):
+    return conversation(
+        f"{i:08x}-aaaa-4000-8000-{i:012x}",
+        f"Hello number {i} ✓",
+        name=f"Indexed conversation {i}",
+        created_at=created_at,
+    )
+
+
+def _export():
+    return [
+        _conv(1, "2024-01-05T10:00:00Z"),
+        _conv(2, "2024-02-10T10:00:00Z"),
+        "not a conversation",
+        _conv(3, "2024-02-29T23:59:00Z"),
+    ]
+
+
+@pytest.fixture
+def export(tmp_path):
+    return write_export(tmp_path, _export(), indent=1, ensure_ascii=False)
+
+
+def test_index_reads_single_conversations(export):
+    with build_index(export) as index:
+        assert len(index) == 4
+        (entry,) = index.select("00000002")
+
+    assert entry.name == "Indexed conversation 2"
+    assert entry.position == 1
+    ((_, conv),) = read_conversations(export, [entry])
+    assert conv == _export()[1]
+
+
+def test_select_filters(export):
+    with build_index(export) as index:
+        by_name = index.select(name="CONVERSATION 3")
+        february = index.select(since="2024-02", until="2024-02-29")
+        full_uuid = index.select(_export()[0]["uuid"])
+
+    assert [e.position for e in by_name] == [3]
+    assert [e.position for e in february] == [1, 3]
+    assert [e.position for e in full_uuid] == [0]
+
+
+def test_compressed_export(tmp_path):
+    path = tmp_path / "export.json.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(_export(), f)
+
+    with build_index(path) as index:
+        entries = index.select(since="2024-02")
+
+    convs = [conv for _, conv in read_conversations(path, entries)]
+    assert convs == [_export()[1], _export()[3]]
+
+
+def test_open_index_reuses_current_index(export, mocker):
+    build_index(export).close()
+    build = mocker.patch.object(export_index, "build_index")
+
+    with open_index(export) as index:
+        assert len(index) == 4
+    build.assert_not_called()
+
+
+def test_touched_export_is_rehashed_not_reindexed(export, mocker):
+    build_index(export).close()
+    stat = export.stat()
+    os.utime(export, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    build = mocker.patch.object(export_index, "build_index")
+
+    with open_index(export) as index:
+        assert index.meta["mtime_ns"] == stat.st_mtime_ns + 10**9
+    build.assert_not_called()
+
+
+def test_changed_export_is_reindexed(export):
+    build_index(export).close()
+    stat = export.stat()
+    # Same size and a new mtime, but different content
+    export.write_text(export.read_text().replace("number 1", "number 9"))
+    os.utime(export, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    with open_index(export) as index:
+        (entry,) = index.select("00000001")
+    ((_, conv),) = read_conversations(export, [entry])
+    assert conv["chat_messages"][0]["text"] == "Hello number 9 ✓"
+
+
+def test_unreadable_index_is_rebuilt(export):
+    index_path_for(export).write_text("not a database")
+
+    with open_index(export) as index:
+        assert len(index) == 4
+
+
+def test_cli_get_renders_one_conversation(export):
+    result = CliRunner().invoke(app, ["get", str(export), "00000002"])
+
+    assert result.exit_code == 0, result.output
+    assert "# Conversation: Indexed conversation 2" in result.output
+    assert "Hello number 2 ✓" in result.output
+    assert "cj2md:" not in result.output
+    assert index_path_for(export).exists()
+
+
+def test_cli_get_writes_files(export, tmp_path):
+    result = CliRunner().invoke(
+        app, ["get", str(export), "--since", "2024-02", "-o", str(tmp_path / "out")]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [
+        "2024-02-10_indexed-conversation-2_00000002.md",
+        "2024-02-29_indexed-conversation-3_00000003.md",
+    ]
+
+
+def test_cli_get_renders_like_convert(tmp_path):
+    conv = conversation(
+        "4a4a4a4a-conv",
+        messages=[
+            {
+                "sender": "assistant",
+                "content": [
+                    {"type": "thinking", "thinking": "Private thoughts"},
+                    {"type": "text", "text": "Public answer"},
+                ],
+            }
+        ],
+    )
+    export = write_export(tmp_path, [conv])
+    flags = ["--no-thinking", "--verbose-tools"]
+    runner = CliRunner(mix_stderr=False)
+
+    result = runner.invoke(app, ["get", str(export), "4a4a4a4a"] + flags)
+    assert result.exit_code == 0, result.stderr
+    out = tmp_path / "out"
+    args = ["convert", str(export), "-o", str(out), "--progress", "none"]
+    runner.invoke(app, args + flags)
+
+    (converted,) = out.glob("*.md")
+    assert "Private thoughts" not in result.stdout
+    assert result.stdout == converted.read_text(encoding="utf-8") + "\n"
+
+
+def test_cli_get_without_match(export):
+    result = CliRunner().invoke(app, ["get", str(export), "ffffffff"])
+
+    assert result.exit_code == 1
@@ -0,0 +1,271 @@
+"""Tests for rendering HTML and plain text next to Markdown."""
+
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from claude_json2md import converter
+from claude_json2md.batch import batch_to_markdown
+from claude_json2md.cache import RenderCache
+from claude_json2md.cli import app
+from claude_json2md.converter import (
+    convert_conversation,
+    generate_markdown_content,
+    iter_format_blocks,
+    json_to_markdown,
+)
+from claude_json2md.manifest import read_manifest
+from claude_json2md.output import OutputCompression, OutputOptions
+from claude_json2md.renderers import (
+    FormatRenderer,
+    OutputFormat,
+    RenderOptions,
+    format_filename,
+)
+from conftest import conversation
+
+ALL_FORMATS = (OutputFormat.markdown, OutputFormat.html, OutputFormat.text)
+STEM = "2024-03-01_formats-a-b_fmt"
+
+
+def _conv(uuid="fmt"):
+    return {
+        "uuid": uuid,
+        "name": "Formats <a & b>",
+        "created_at": "2024-03-01T10:00:00Z",
+        "summary": "Rendered <three> ways",
+        "chat_messages": [
+            {"sender": "human", "text": "Is 1 < 2?", "content": []},
+            {
+                "sender": "assistant",
+                "content": [
+                    {"type": "thinking", "thinking": "Compare them"},
+                    {
+                        "type": "text",
+                        "text": "Yes",
+                        "citations": [{"url": "https://example.com/?a=1&b=2"}],
+                    },
+                    {
+                        "type": "tool_use",
+                        "name": "artifacts",
+                        "input": {
+                            "command": "create",
+                            "id": "demo",
+                            "language": "html",
+                            "content": "<p>hi</p>",
+                        },
+                    },
+                ],
+            },
+        ],
+    }
+
+
+def _documents(conv, options=None):
+    walk = iter_format_blocks(conv, conv["name"], options, ALL_FORMATS)
+    blocks = list(walk)
+    return [
+        "\n".join(line for step in blocks for line in step[i])
+        for i in range(len(ALL_FORMATS))
+    ]
+
+
+def test_format_filename():
+    assert format_filename("a_b.md", OutputFormat.markdown) == "a_b.md"
+    assert format_filename("a_b.md", OutputFormat.html) == "a_b.html"
+    assert format_filename("a_b.md", "text") == "a_b.txt"
+
+
+def test_renderer_must_render_every_block():
+    class Headless(FormatRenderer):
+        def message_start(self, msg):
+            return []
+
+        def message_text(self, text):
+            return [text]
+
+    with pytest.raises(TypeError, match="footer"):
+        Headless()
+
+
+def test_fields_of_the_wrong_type_are_treated_as_missing():
+    conv = conversation(
+        "nulls",
+        messages=[
+            {
+                "sender": None,
+                "text": None,
+                "files": [{"file_name": None}],
+                "content": [
+                    {"type": "text", "text": None, "citations": [{"details": None}]},
+                    {"type": "thinking", "thinking": 5},
+                    {"type": "voice_note", "text": None, "title": None},
+                    {"type": "tool_use", "name": None, "input": None},
+                    {"type": "tool_use", "name": "str_replace", "input": {"path": 3}},
+                    {"type": "text", "text": "Still here", "citations": None},
+                ],
+            },
+            {"sender": "human", "text": ["not", "text"], "content": None},
+        ],
+        summary=7,
+    )
+    conv["created_at"] = None
+
+    markdown, html, text = _documents(conv, RenderOptions(verbose_tools=True))
+    assert "**Sender:** Unknown sender" in markdown
+    assert "Still here" in markdown and "Still here" in html and "Still here" in text
+    assert "**Tool: unknown_tool**" in markdown
+    assert converter.generate_filename(conv, "Nulls") == "unknown-date_nulls_nulls.md"
+    assert not converter.has_meaningful_content(conv["chat_messages"][1:])
+
+
+def test_markdown_from_the_shared_walk_is_unchanged():
+    conv = _conv()
+    markdown, _, _ = _documents(conv, RenderOptions(verbose_tools=True))
+    assert markdown == "\n".join(
+        generate_markdown_content(conv, conv["name"], RenderOptions(verbose_tools=True))
+    )
+
+
+def test_html_escapes_text_and_code():
+    _, html, _ = _documents(_conv(), RenderOptions(verbose_tools=True))
+
+    assert html.startswith("<!DOCTYPE html>")
+    assert html.endswith("</body>\n</html>")
+    assert "<title>Formats &lt;a &amp; b&gt;</title>" in html
+    assert "Is 1 &lt; 2?" in html
+    assert '<details class="thinking">\n<summary>Thinking</summary>' in html
+    assert '<pre><code class="language-html">&lt;p&gt;hi&lt;/p&gt;</code></pre>' in html
+    assert "<li>ID: <code>demo</code></li>" in html
+    assert '<a href="https://example.com/?a=1&amp;b=2">' in html
+    assert "<p>hi</p>" not in html
+
+
+def test_html_leaves_out_disabled_content():
+    options = RenderOptions(include_thinking=False, include_tools=False)
+    _, html, _ = _documents(_conv(), options)
+    assert "Thinking" not in html
+    assert "artifacts" not in html
+
+
+def test_plain_text_has_no_markup():
+    _, _, text = _documents(_conv(), RenderOptions(verbose_tools=True))
+
+    assert text.startswith("Conversation: Formats <a & b>\n")
+    assert "Summary:\n  Rendered <three> ways" in text
+    assert "Thinking:\n    Compare them" in text
+    assert "    <p>hi</p>" in text
+    assert "1. https://example.com/?a=1&b=2" in text
+    assert "**" not in text and "```" not in text
+
+
+def test_conversation_is_walked_once_for_all_formats(mocker):
+    spy = mocker.spy(converter, "iter_format_blocks")
+    record = convert_conversation(_conv(), RenderOptions(), formats=ALL_FORMATS)
+
+    assert list(record.documents) == list(ALL_FORMATS)
+    rendered = {fmt: list(blocks) for fmt, blocks in record.documents.items()}
+    assert spy.call_count == 1
+    assert all(rendered.values())
+
+
+@pytest.mark.parametrize("fmt", ALL_FORMATS)
+def test_single_format_skips_the_fan_out(mocker, fmt):
+    spy = mocker.spy(converter, "iter_format_blocks")
+    options = RenderOptions(verbose_tools=True)
+    record = convert_conversation(_conv(), options, formats=(fmt,))
+
+    assert spy.call_count == 0
+    single = "\n".join(record.lines)
+    assert single == _documents(_conv(), options)[ALL_FORMATS.index(fmt)]
+
+
+def test_skipped_conversation_has_no_documents():
+    conv = _conv()
+    conv["chat_messages"] = [{"sender": "human", "text": " "}]
+    record = convert_conversation(conv, RenderOptions(), formats=ALL_FORMATS)
+    assert record.status == converter.STATUS_SKIPPED_NO_CONTENT
+    assert record.documents == {}
+
+
+def test_json_to_markdown_writes_every_format(tmp_path):
+    export = tmp_path / "export.json"
+    export.write_text(json.dumps([_conv()]))
+    output_dir = tmp_path / "out"
+
+    output = OutputOptions(formats=(OutputFormat.html, OutputFormat.markdown))
+    json_to_markdown(export, output_dir, output=output)
+
+    html = (output_dir / f"{STEM}.html").read_text()
+    assert "<h1>Conversation: Formats &lt;a &amp; b&gt;</h1>" in html
+    assert (output_dir / f"{STEM}.md").read_text().startswith("# Conversation")
+    assert not (output_dir / f"{STEM}.txt").exists()
+    # The manifest points at the first format and counts every file
+    entry = read_manifest(output_dir)["fmt"]
+    assert entry["path"] == f"{STEM}.html"
+    assert entry["bytes"] == sum(
+        (output_dir / f"{STEM}{suffix}").stat().st_size for suffix in (".html", ".md")
+    )
+
+
+def test_only_markdown_is_paged(tmp_path):
+    export = tmp_path / "export.json"
+    export.write_text(json.dumps([_conv()]))
+    output_dir = tmp_path / "out"
+
+    output = OutputOptions(max_file_bytes=200, formats=ALL_FORMATS)
+    json_to_markdown(export, output_dir, output=output)
+
+    assert (output_dir / f"{STEM}_part001.md").exists()
+    assert (output_dir / f"{STEM}.html").exists()
+    assert (output_dir / f"{STEM}.txt").exists()
+
+
+def test_batch_writes_compressed_formats(tmp_path):
+    export = tmp_path / "export.json"
+    export.write_text(json.dumps([_conv()]))
+    output_dir = tmp_path / "out"
+
+    output = OutputOptions(OutputCompression.gzip, formats=ALL_FORMATS)
+    batch_to_markdown([export], output_dir, workers=1, output=output)
+
+    for suffix in (".md.gz", ".html.gz", ".txt.gz"):
+        assert (output_dir / f"{STEM}{suffix}").exists()
+
+
+def test_cached_markdown_with_other_formats(tmp_path):
+    cache = RenderCache(tmp_path / "cache")
+    digest = b"\x01" * 16
+    first = convert_conversation(_conv(), RenderOptions(), digest=digest, cache=cache)
+    markdown = first.text()
+
+    record = convert_conversation(
+        _conv(), RenderOptions(), digest=digest, cache=cache, formats=ALL_FORMATS
+    )
+    assert record.cached
+    documents = {
+        fmt: "\n".join(line for block in blocks for line in block)
+        for fmt, blocks in record.documents.items()
+    }
+    assert documents[OutputFormat.markdown] == markdown
+    assert documents[OutputFormat.html].startswith("<!DOCTYPE html>")
+
+
+def test_cli_format_option(tmp_path):
+    export = tmp_path / "export.json"
+    export.write_text(json.dumps([_conv()]))
+    output_dir = tmp_path / "out"
+    runner = CliRunner()
+    args = ["convert", str(export), "-o", str(output_dir), "--progress", "none"]
+
+    result = runner.invoke(app, args + ["--format", "text", "--format", "html"])
+    assert result.exit_code == 0, result.output
+    assert (output_dir / f"{STEM}.txt").exists()
+    assert (output_dir / f"{STEM}.html").exists()
+    assert not (output_dir / f"{STEM}.md").exists()
+
+    result = runner.invoke(
+        app, ["convert", str(export), "-o", "-", "--format", "html"]
+    )
+    assert result.exit_code != 0
@@ -0,0 +1,170 @@
+"""Tests for searching exports with `cj2md grep`."""
+
+import gzip
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from claude_json2md import grep
+from claude_json2md.cli import app
+from claude_json2md.export_index import build_index
+from claude_json2md.grep import Matcher, grep_export, search_conversation, snippet
+from conftest import conversation, write_export
+
+
+def _conv(i, *messages):
+    return conversation(
+        f"conv-{i}",
+        messages=list(messages),
+        name=f"Conversation {i}",
+        created_at=f"2024-05-0{i}T10:00:00Z",
+    )
+
+
+def _export():
+    return [
+        _conv(
+            1,
+            {"sender": "human", "text": "Where is the Needle?"},
+            {
+                "sender": "assistant",
+                "content": [
+                    {"type": "thinking", "thinking": "Look for a needle, café"},
+                    {"type": "text", "text": "In the haystack."},
+                    {
+                        "type": "tool_use",
+                        "name": "web_search",
+                        "input": {"query": "needle \"quoted\""},
+                    },
+                    {
+                        "type": "tool_result",
+                        "name": "web_search",
+                        "content": [{"type": "text", "text": "A needle result"}],
+                    },
+                ],
+            },
+        ),
+        _conv(2, {"sender": "human", "text": "Nothing to see"}),
+        "not a conversation",
+        _conv(3, {"sender": "human", "text": "Another needle"}),
+    ]
+
+
+@pytest.fixture
+def export(tmp_path):
+    # Escape non-ASCII text, as some exports do
+    return write_export(tmp_path, _export(), indent=1)
+
+
+def test_matcher_literal_and_regex():
+    literal = Matcher("a.b", fixed_strings=True)
+    assert literal.literal == "a.b"
+    assert literal.search("xa.by") == (1, 4)
+    assert literal.search("axb") is None
+
+    regex = Matcher(r"ne+dle\b", ignore_case=True)
+    assert regex.literal is None
+    assert regex.search("a NEEDLE here") == (2, 8)
+
+    with pytest.raises(ValueError):
+        Matcher("")
+
+
+def test_raw_precheck_only_for_safe_literals():
+    assert not Matcher("needle").may_match_raw(b'{"text": "haystack"}')
+    assert Matcher("needle").may_match_raw(b'{"text": "a needle"}')
+    assert not Matcher("NEEDLE", ignore_case=True).may_match_raw(b'"hay"')
+    assert Matcher("NEEDLE", ignore_case=True).may_match_raw(b'"a needle"')
+    # Could be escaped in the JSON text, so never ruled out
+    assert Matcher("café").may_match_raw(b'"caf\\u00e9"')
+    assert Matcher('"quoted"').may_match_raw(b'"\\"quoted\\""')
+    assert Matcher("ne+dle").may_match_raw(b"")
+
+
+def test_snippet_is_one_line_with_context():
+    text = "a" * 100 + "\nneedle\n" + "b" * 100
+    shown = snippet(text, 101, 107, context=5)
+    assert shown == "…aaaa needle bbbb…"
+    assert snippet("needle", 0, 6) == "needle"
+
+
+def test_search_conversation_fields():
+    matches = search_conversation(_export()[0], Matcher("needle"), position=0)
+
+    assert [(m.message_index, m.sender, m.field) for m in matches] == [
+        (1, "assistant", "thinking"),
+        (1, "assistant", "tool_use"),
+        (1, "assistant", "tool_result"),
+    ]
+    assert matches[0].snippet == "Look for a needle, café"
+    assert matches[0].uuid == "conv-1"
+
+    limited = search_conversation(_export()[0], Matcher("needle"), max_count=1)
+    assert len(limited) == 1
+    assert search_conversation("not a conversation", Matcher("x")) == []
+
+
+def test_grep_streams_unindexed_export(export):
+    matches = list(grep_export(export, Matcher("needle", ignore_case=True)))
+
+    assert [m.uuid for m in matches] == ["conv-1"] * 4 + ["conv-3"]
+    assert [m.position for m in matches][-1] == 3
+    assert list(grep_export(export, Matcher("needle"), limit=2)) == matches[1:4]
+    assert list(grep_export(export, Matcher("café"))) == [matches[1]]
+
+
+def test_grep_compressed_stdin_like_stream(tmp_path):
+    path = tmp_path / "export.json.gz"
+    path.write_bytes(gzip.compress(json.dumps(_export()).encode()))
+    with open(path, "rb") as f:
+        matches = list(grep_export(f, Matcher("Another")))
+    assert [m.uuid for m in matches] == ["conv-3"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_grep_indexed_export_matches_streaming(export, workers, mocker):
+    expected = list(grep_export(export, Matcher("needle|quoted")))
+    build_index(export).close()
+    mocker.patch.object(grep, "BATCH_CONVERSATIONS", 1)
+    spy = mocker.spy(grep, "iter_json_array")
+
+    found = list(grep_export(export, Matcher("needle|quoted"), workers=workers))
+
+    assert found == expected
+    spy.assert_not_called()
+
+
+def test_indexed_search_skips_decoding_without_the_literal(export, mocker):
+    build_index(export).close()
+    loads = mocker.spy(grep.json, "loads")
+    matches = list(grep_export(export, Matcher("Another"), workers=1))
+    assert [m.uuid for m in matches] == ["conv-3"]
+    assert loads.call_count == 1
+
+
+def test_cli_grep(export):
+    # Logs go to stderr, matches to stdout
+    runner = CliRunner(mix_stderr=False)
+
+    result = runner.invoke(app, ["grep", "-i", "needle", str(export)])
+    assert result.exit_code == 0, result.output
+    lines = result.stdout.splitlines()
+    assert lines[0] == (
+        "conv-1  2024-05-01  Conversation 1  [human text] Where is the Needle?"
+    )
+    assert len(lines) == 5
+
+    result = runner.invoke(app, ["grep", "-l", "needle", str(export)])
+    assert result.stdout.splitlines() == [
+        "conv-1  2024-05-01  Conversation 1",
+        "conv-3  2024-05-03  Conversation 3",
+    ]
+
+    result = runner.invoke(app, ["grep", "--json", "-F", '"quoted"', str(export)])
+    assert json.loads(result.stdout)["field"] == "tool_use"
+
+    assert runner.invoke(app, ["grep", "absent", str(export)]).exit_code == 1
+    result = runner.invoke(app, ["grep", "(", str(export)])
+    assert result.exit_code == 2
+    assert "PATTERN" in result.stderr
@@ -0,0 +1,194 @@
+"""Tests for the per-conversation size and time limits."""
+
+import itertools
+import json
+import logging
+
+import pytest
+from typer.testing import CliRunner
+
+from claude_json2md import guards
+from claude_json2md.batch import batch_to_markdown
+from claude_json2md.cli import app
+from claude_json2md.converter import (
+    STATUS_CONVERTED,
+    STATUS_SKIPPED_OVERSIZED,
+    convert_conversation,
+    json_to_markdown,
+)
+from claude_json2md.guards import (
+    OVERSIZED_FILENAME,
+    ConversationLimits,
+    OversizedAction,
+    RenderTimeout,
+    apply_limits,
+    json_size,
+    with_deadline,
+)
+from claude_json2md.renderers import RenderOptions
+from conftest import conversation, write_export
+
+
+def _conv(uuid="big", messages=4, text="x" * 100, **fields):
+    return conversation(uuid, *(f"{i} {text}" for i in range(messages)), **fields)
+
+
+def _report(output_dir):
+    lines = (output_dir / OVERSIZED_FILENAME).read_text().splitlines()
+    return [json.loads(line) for line in lines]
+
+
+@pytest.fixture
+def slow_clock(mocker):
+    """Every reading of the clock is one second after the previous."""
+    ticks = itertools.count()
+    mocker.patch.object(guards.time, "monotonic", side_effect=lambda: next(ticks))
+
+
+def test_limits_must_be_positive():
+    with pytest.raises(ValueError):
+        ConversationLimits(max_messages=0)
+    assert ConversationLimits(action="truncate").action == OversizedAction.truncate
+
+
+def test_json_size_stops_past_the_budget():
+    value = {"a": ["x" * 100] * 1000}
+    full = json_size(value, 10**9)
+    assert full >= len(json.dumps(value)) * 0.9
+    assert json_size(value, 100) < 2000
+
+
+def test_conversation_within_limits_is_unchanged():
+    conv = _conv()
+    limits = ConversationLimits(max_bytes=10**6, max_messages=4)
+    assert apply_limits(conv, limits) == (conv, None)
+
+
+def test_too_many_messages_skipped_or_truncated():
+    conv = _conv(messages=5)
+    kept, entry = apply_limits(conv, ConversationLimits(max_messages=2))
+    assert kept is None
+    assert (entry.reason, entry.action, entry.messages) == ("messages", "skipped", 5)
+
+    limits = ConversationLimits(max_messages=2, action=OversizedAction.truncate)
+    kept, entry = apply_limits(conv, limits)
+    assert len(kept["chat_messages"]) == 2
+    assert len(conv["chat_messages"]) == 5
+    assert (entry.action, entry.kept_messages) == ("truncated", 2)
+
+
+def test_truncation_keeps_the_messages_within_the_byte_limit():
+    conv = _conv(messages=10, text="y" * 1000)
+    limits = ConversationLimits(max_bytes=3500, action=OversizedAction.truncate)
+    kept, entry = apply_limits(conv, limits, length=len(json.dumps(conv)))
+    assert entry.reason == "bytes"
+    assert 1 <= len(kept["chat_messages"]) <= 3
+
+    # Not even the first message fits: nothing left to truncate to
+    kept, entry = apply_limits(conv, ConversationLimits(max_bytes=10, action="truncate"))
+    assert kept is None
+    assert entry.action == "skipped"
+
+
+def test_truncation_that_keeps_every_message_is_not_reported():
+    conv = _conv(messages=2, summary="z" * 1000)
+    limits = ConversationLimits(max_bytes=800, action=OversizedAction.truncate)
+    assert apply_limits(conv, limits) == (conv, None)
+
+    record = convert_conversation(conv, RenderOptions(), limits=limits)
+    assert record.oversized is None
+    assert "Truncated" not in record.text()
+
+
+def test_truncated_conversation_shows_a_notice():
+    limits = ConversationLimits(max_messages=2, action=OversizedAction.truncate)
+    record = convert_conversation(_conv(messages=6), RenderOptions(), limits=limits)
+
+    assert record.status == STATUS_CONVERTED
+    text = record.text()
+    assert "> **Note:** Truncated: showing 2 of 6 messages" in text
+    assert "1 xxx" in text and "2 xxx" not in text
+
+
+def test_with_deadline(slow_clock):
+    assert list(with_deadline([1, 2], seconds=5)) == [1, 2]
+    with pytest.raises(RenderTimeout):
+        list(with_deadline([1, 2, 3], seconds=1.5))
+
+
+def test_render_timeout_skips_the_conversation(slow_clock):
+    limits = ConversationLimits(render_seconds=0.5)
+    record = convert_conversation(_conv(), RenderOptions(), limits=limits)
+
+    assert record.status == STATUS_SKIPPED_OVERSIZED
+    assert (record.oversized.reason, record.oversized.action) == (
+        "render_time",
+        "skipped",
+    )
+
+
+def test_json_to_markdown_counts_and_lists_oversized(tmp_path, caplog):
+    export = write_export(
+        tmp_path, [_conv("small", 2), _conv("long", 8), _conv("cut", 6)]
+    )
+    output_dir = tmp_path / "out"
+    limits = ConversationLimits(max_messages=4)
+
+    with caplog.at_level(logging.INFO, logger="converter_app"):
+        json_to_markdown(export, output_dir, limits=limits)
+
+    assert "Processed: 1." in caplog.text
+    assert "Skipped (oversized): 2. Truncated: 0." in caplog.text
+    assert [e["uuid"] for e in _report(output_dir)] == ["long", "cut"]
+    assert len(list(output_dir.glob("*.md"))) == 1
+
+    # A later run within the limits drops the stale list
+    json_to_markdown(export, output_dir, limits=ConversationLimits(max_messages=10))
+    assert not (output_dir / OVERSIZED_FILENAME).exists()
+
+
+def test_timeout_while_writing_removes_partial_files(tmp_path, slow_clock):
+    export = write_export(tmp_path, [_conv(messages=6)])
+    output_dir = tmp_path / "out"
+
+    # The first block is rendered in time, a later one is not
+    json_to_markdown(export, output_dir, limits=ConversationLimits(render_seconds=2.5))
+
+    assert list(output_dir.glob("*.md")) == []
+    assert list(output_dir.glob("*.tmp")) == []
+    (entry,) = _report(output_dir)
+    assert entry["reason"] == "render_time"
+
+
+def test_batch_applies_limits_in_workers(tmp_path, caplog):
+    export = write_export(tmp_path, [_conv("small", 2), _conv("long", 8)])
+    output_dir = tmp_path / "out"
+    limits = ConversationLimits(max_messages=4, action=OversizedAction.truncate)
+
+    with caplog.at_level(logging.INFO, logger="converter_app"):
+        batch_to_markdown([export], output_dir, workers=2, limits=limits)
+
+    assert "Skipped (oversized): 0. Truncated: 1." in caplog.text
+    (entry,) = _report(output_dir)
+    assert (entry["uuid"], entry["kept_messages"]) == ("long", 4)
+    (page,) = output_dir.glob("*_long.md")
+    assert "showing 4 of 8 messages" in page.read_text()
+
+
+def test_cli_limit_options(tmp_path):
+    export = write_export(tmp_path, [_conv("long", 8)])
+    output_dir = tmp_path / "out"
+    runner = CliRunner()
+    args = ["convert", str(export), "-o", str(output_dir), "--progress", "none"]
+
+    result = runner.invoke(app, args + ["--max-messages", "3"])
+    assert result.exit_code == 0, result.output
+    assert list(output_dir.glob("*.md")) == []
+    assert _report(output_dir)[0]["action"] == "skipped"
+
+    result = runner.invoke(
+        app, args + ["--max-conversation-bytes", "100000", "--oversized", "truncate"]
+    )
+    assert result.exit_code == 0, result.output
+    assert len(list(output_dir.glob("*.md"))) == 1
+    assert not (output_dir / OVERSIZED_FILENAME).exists()
@@ -0,0 +1,153 @@
+"""Tests for the year/month index pages."""
+
+from typer.testing import CliRunner
+
+from claude_json2md.batch import batch_to_markdown
+from claude_json2md.cli import app
+from claude_json2md.converter import json_to_markdown
+from claude_json2md.index_pages import (
+    INDEX_DIR,
+    INDEX_FILENAME,
+    UNDATED,
+    month_key,
+    update_index_pages,
+)
+from conftest import conversation, write_export
+
+
+def _entry(uuid, created_at, name=None, messages=2):
+    return {
+        "uuid": uuid,
+        "name": name if name is not None else f"Talk {uuid}",
+        "created_at": created_at,
+        "message_count": messages,
+        "path": f"{uuid}.md",
+    }
+
+
+def test_month_key():
+    assert month_key({"created_at": "2024-03-01T10:00:00Z"}) == "2024-03"
+    assert month_key({"created_at": None}) == UNDATED
+    assert month_key({"created_at": "2024-13-01"}) == UNDATED
+    assert month_key({}) == UNDATED
+
+
+def test_json_to_markdown_writes_index_pages(tmp_path):
+    export = write_export(
+        tmp_path,
+        [
+            conversation(
+                "a", created_at="2024-03-05T10:00:00Z", name="Pipes | and [brackets]"
+            ),
+            conversation("b", "Hi", "Hi", "Hi", created_at="2024-03-01T10:00:00Z"),
+            conversation("c", created_at="2023-12-24T10:00:00Z"),
+            conversation("d", created_at=None),
+        ],
+    )
+    output_dir = tmp_path / "out"
+
+    json_to_markdown(export, output_dir, index_pages=True)
+
+    top = (output_dir / INDEX_FILENAME).read_text()
+    assert top.index("## 2024") < top.index("## 2023") < top.index("## Undated")
+    assert "- [March 2024](index/2024-03.md) (2 conversations)" in top
+    assert "- [December 2023](index/2023-12.md) (1 conversations)" in top
+
+    march = (output_dir / INDEX_DIR / "2024-03.md").read_text()
+    assert march.startswith("# March 2024\n")
+    assert f"[All conversations](../{INDEX_FILENAME})" in march
+    # Sorted by date, names escaped, links relative to the index directory
+    assert march.index("2024-03-01") < march.index("2024-03-05")
+    assert "| 2024-03-01 | [Conversation b](../" in march
+    assert " | 3 |" in march
+    assert r"[Pipes \| and \[brackets\]](../" in march
+    for link in march.split("](../")[2:]:
+        assert (output_dir / link.split(")")[0]).is_file()
+    assert (output_dir / INDEX_DIR / f"{UNDATED}.md").is_file()
+
+
+def test_index_pages_are_off_by_default(tmp_path):
+    export = write_export(tmp_path, [conversation("a")])
+    json_to_markdown(export, tmp_path / "out")
+    assert not (tmp_path / "out" / INDEX_FILENAME).exists()
+    assert not (tmp_path / "out" / INDEX_DIR).exists()
+
+
+def test_only_changed_months_are_rewritten(tmp_path):
+    previous = {
+        "a": _entry("a", "2024-03-05T10:00:00Z"),
+        "b": _entry("b", "2024-02-01T10:00:00Z"),
+    }
+    assert update_index_pages(tmp_path, {}, previous) == 3
+
+    february = tmp_path / INDEX_DIR / "2024-02.md"
+    march = tmp_path / INDEX_DIR / "2024-03.md"
+    february.write_text("untouched")
+
+    # Same listing: nothing is written
+    assert update_index_pages(tmp_path, previous, dict(previous)) == 0
+
+    # A renamed March conversation rewrites March and the top index only
+    entries = dict(previous, a=_entry("a", "2024-03-05T10:00:00Z", name="Renamed"))
+    assert update_index_pages(tmp_path, previous, entries) == 2
+    assert "Renamed" in march.read_text()
+    assert february.read_text() == "untouched"
+
+
+def test_missing_pages_are_restored(tmp_path):
+    entries = {"a": _entry("a", "2024-03-05T10:00:00Z")}
+    update_index_pages(tmp_path, {}, entries)
+    (tmp_path / INDEX_DIR / "2024-03.md").unlink()
+    (tmp_path / INDEX_FILENAME).unlink()
+    assert update_index_pages(tmp_path, entries, entries) == 2
+    assert (tmp_path / INDEX_DIR / "2024-03.md").is_file()
+
+
+def test_empty_months_are_removed(tmp_path):
+    previous = {
+        "a": _entry("a", "2024-03-05T10:00:00Z"),
+        "b": _entry("b", "2024-02-01T10:00:00Z"),
+    }
+    update_index_pages(tmp_path, {}, previous)
+    entries = {
+        "a": previous["a"],
+        "b": _entry("b", "2024-04-01T10:00:00Z"),  # Moved to another month
+    }
+    update_index_pages(tmp_path, previous, entries)
+    assert not (tmp_path / INDEX_DIR / "2024-02.md").exists()
+    assert (tmp_path / INDEX_DIR / "2024-04.md").is_file()
+    assert "February" not in (tmp_path / INDEX_FILENAME).read_text()
+
+
+def test_batch_to_markdown_writes_index_pages(tmp_path):
+    first = write_export(tmp_path, [conversation("a")], name="first.json")
+    second = write_export(
+        tmp_path,
+        [conversation("b", created_at="2024-05-01T10:00:00Z")],
+        name="second.json",
+    )
+    output_dir = tmp_path / "out"
+
+    batch_to_markdown([first, second], output_dir, workers=1, index_pages=True)
+
+    top = (output_dir / INDEX_FILENAME).read_text()
+    assert "March 2024" in top and "May 2024" in top
+
+
+def test_cli_index_pages_requires_manifest(tmp_path):
+    export = write_export(tmp_path, [conversation("a")])
+    result = CliRunner().invoke(
+        app,
+        [
+            "convert",
+            str(export),
+            "-o",
+            str(tmp_path / "out"),
+            "--index-pages",
+            "--no-manifest",
+            "--progress",
+            "none",
+        ],
+    )
+    assert result.exit_code != 0
+    assert not (tmp_path / "out" / INDEX_FILENAME).exists()
@@ -0,0 +1,89 @@
+"""Tests for the logging setup."""
+
+import gc
+import logging
+import logging.handlers
+import os
+import warnings
+
+import pytest
+
+from claude_json2md import log_setup
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    log_setup._stop_queue_listener()
+    for handler in root.handlers:
+        if handler not in handlers:
+            root.removeHandler(handler)
+            handler.close()
+    for handler in handlers:
+        if handler not in root.handlers:
+            root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_file_logging_goes_through_a_queue(tmp_path, restore_logging):
+    log_file = tmp_path / "app.log"
+    log_setup.setup_logging(log_file)
+
+    root = logging.getLogger()
+    assert any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers)
+    assert not any(isinstance(h, logging.FileHandler) for h in root.handlers)
+
+    logging.getLogger("converter_app").debug("Deferred %s message", "debug")
+    log_setup._stop_queue_listener()  # Flushes the queue
+    assert "Deferred debug message" in log_file.read_text()
+
+
+def test_stopping_closes_the_log_file(tmp_path, restore_logging):
+    log_setup.setup_logging(tmp_path / "app.log")
+    (handler,) = log_setup._queue_listener.handlers
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ResourceWarning)
+        log_setup._stop_queue_listener()
+        del handler
+        gc.collect()
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+    root = logging.getLogger()
+    assert not any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers)
+
+
+def test_setting_up_twice_keeps_one_listener(tmp_path, restore_logging):
+    log_setup.setup_logging(tmp_path / "first.log")
+    first = log_setup._queue_listener
+    log_setup.setup_logging(tmp_path / "second.log")
+    assert log_setup._queue_listener is not first
+    queue_handlers = [
+        h
+        for h in logging.getLogger().handlers
+        if isinstance(h, logging.handlers.QueueHandler)
+    ]
+    assert len(queue_handlers) == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_forked_children_write_to_the_file_directly(tmp_path, restore_logging):
+    log_file = tmp_path / "app.log"
+    log_setup.setup_logging(log_file)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        pid = os.fork()
+        if pid == 0:  # Child: no listener thread survives the fork
+            try:
+                logging.getLogger("converter_app").warning("From the child")
+            finally:
+                os._exit(0)
+    os.waitpid(pid, 0)
+    # The listener thread is stopped around the fork (Python 3.12+ warns
+    # about forking a multi-threaded process)
+    assert not [w for w in caught if "multi-threaded" in str(w.message)]
+    logging.getLogger("converter_app").warning("From the parent")
+    log_setup._stop_queue_listener()
+    text = log_file.read_text()
+    assert "From the child" in text
+    assert "From the parent" in text
@@ -0,0 +1,85 @@
+"""Tests for the output directory manifest."""
+
+import json
+from hashlib import blake2b
+
+from claude_json2md.batch import batch_to_markdown
+from claude_json2md.converter import json_to_markdown
+from claude_json2md.manifest import (
+    MANIFEST_FILENAME,
+    ManifestEntry,
+    ManifestWriter,
+    read_manifest,
+)
+from claude_json2md.reader import DIGEST_SIZE
+from conftest import conversation, write_export
+
+
+def test_json_to_markdown_writes_manifest(tmp_path):
+    conv = conversation("a", updated_at="2024-03-02T10:00:00Z")
+    export = write_export(
+        tmp_path, [conv, conversation("skipped", name=""), conversation("b")]
+    )
+    output_dir = tmp_path / "out"
+
+    json_to_markdown(export, output_dir)
+
+    entries = read_manifest(output_dir)
+    assert sorted(entries) == ["a", "b"]
+    entry = entries["a"]
+    md_file = output_dir / entry["path"]
+    assert md_file.is_file()
+    assert entry["bytes"] == md_file.stat().st_size
+    assert entry["name"] == "Conversation a"
+    assert entry["message_count"] == 2
+    assert entry["created_at"] == "2024-03-01T10:00:00Z"
+    assert entry["updated_at"] == "2024-03-02T10:00:00Z"
+    first = json.dumps(conv).encode()
+    assert entry["digest"] == blake2b(first, digest_size=DIGEST_SIZE).hexdigest()
+
+
+def test_manifest_can_be_disabled(tmp_path):
+    export = write_export(tmp_path, [conversation("a")])
+    json_to_markdown(export, tmp_path / "out", manifest=False)
+    assert not (tmp_path / "out" / MANIFEST_FILENAME).exists()
+
+
+def test_reruns_update_entries_in_place(tmp_path):
+    output_dir = tmp_path / "out"
+    export = write_export(tmp_path, [conversation("a"), conversation("b")])
+    json_to_markdown(export, output_dir)
+    write_export(tmp_path, [conversation("a", "Changed")])
+    json_to_markdown(export, output_dir)
+
+    lines = (output_dir / MANIFEST_FILENAME).read_text().splitlines()
+    assert len(lines) == 2  # Compacted: one line per uuid
+    entries = read_manifest(output_dir)
+    assert sorted(entries) == ["a", "b"]
+
+
+def test_interrupted_manifest_stays_readable(tmp_path):
+    entry = ManifestEntry("a", "A", None, None, 1, 10, None, "a.md")
+    with ManifestWriter(tmp_path) as writer:
+        writer.add(entry)
+    with open(tmp_path / MANIFEST_FILENAME, "a") as f:
+        f.write('{"uuid": "cut-off", "na')  # Killed mid-line
+
+    assert sorted(read_manifest(tmp_path)) == ["a"]
+    with ManifestWriter(tmp_path) as writer:
+        writer.add(ManifestEntry("b", "B", None, None, 1, 10, None, "b.md"))
+    assert sorted(read_manifest(tmp_path)) == ["a", "b"]
+
+
+def test_batch_writes_manifest(tmp_path):
+    exports = []
+    for n in range(2):
+        convs = [conversation("shared", f"v{n}"), conversation(f"own{n}")]
+        exports.append(write_export(tmp_path, convs, name=f"export{n}.json"))
+    output_dir = tmp_path / "out"
+
+    batch_to_markdown(exports, output_dir, workers=1)
+
+    entries = read_manifest(output_dir)
+    assert sorted(entries) == ["own0", "own1", "shared"]
+    assert "v1" in (output_dir / entries["shared"]["path"]).read_text()
+    assert all(entry["digest"] for entry in entries.values())
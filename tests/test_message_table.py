@@ -0,0 +1,136 @@
+"""Tests for the columnar message table export."""
+
+import csv
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from claude_json2md import message_table
+from claude_json2md.cli import app
+from claude_json2md.message_table import (
+    COLUMNS,
+    TableFormat,
+    iter_message_rows,
+    pyarrow_available,
+    resolve_format,
+    write_message_table,
+)
+from conftest import conversation, write_export
+
+
+MESSAGES = [
+    {"sender": "human", "created_at": "2024-03-01T10:00:00Z", "text": "Hi!"},
+    {
+        "sender": "assistant",
+        "created_at": "2024-03-01T10:00:05Z",
+        "content": [
+            {"type": "thinking", "thinking": "Hmm"},
+            {"type": "tool_use", "name": "web_search", "input": {"q": "x"}},
+            {
+                "type": "tool_result",
+                "name": "web_search",
+                "is_error": True,
+                "content": [{"type": "text", "text": "failed"}],
+            },
+            {
+                "type": "text",
+                "text": "Answer",
+                "citations": [{"url": "a"}, {"url": "b"}],
+            },
+        ],
+    },
+]
+
+
+def _export(tmp_path, count):
+    convs = [conversation(f"c{i}", messages=MESSAGES) for i in range(count)]
+    return write_export(tmp_path, convs)
+
+
+def test_iter_message_rows():
+    conv = conversation("c1", messages=MESSAGES)
+    rows = [dict(zip(COLUMNS, row)) for row in iter_message_rows(conv)]
+    assert [(r["message_index"], r["item_index"], r["content_type"]) for r in rows] == [
+        (0, 0, "text"),
+        (1, 0, "thinking"),
+        (1, 1, "tool_use"),
+        (1, 2, "tool_result"),
+        (1, 3, "text"),
+    ]
+    assert rows[0]["sender"] == "human" and rows[0]["text_length"] == 3
+    assert rows[2]["tool_name"] == "web_search" and rows[2]["is_error"] is None
+    assert rows[2]["text_length"] == len('{"q": "x"}')
+    assert rows[3]["is_error"] is True and rows[3]["text_length"] == len("failed")
+    assert rows[4]["citation_count"] == 2 and rows[4]["tool_name"] is None
+    assert all(r["conversation_uuid"] == "c1" for r in rows)
+
+
+def test_rows_skip_malformed_messages():
+    conv = {"uuid": "x", "chat_messages": ["not a message", {"content": "text"}]}
+    assert list(iter_message_rows(conv)) == [
+        ("x", 1, 0, None, None, "text", 0, None, None, 0)
+    ]
+    assert list(iter_message_rows({"uuid": "y"})) == []
+
+
+def test_resolve_format(monkeypatch):
+    monkeypatch.setattr(message_table, "pyarrow_available", lambda: False)
+    assert resolve_format(TableFormat.auto, Path("t")) == "csv"
+    assert resolve_format(TableFormat.auto, Path("t.parquet")) == "parquet"
+    assert resolve_format(TableFormat.csv, Path("t.parquet")) == "csv"
+    monkeypatch.setattr(message_table, "pyarrow_available", lambda: True)
+    assert resolve_format(TableFormat.auto, Path("t")) == "parquet"
+    assert resolve_format(TableFormat.auto, Path("t.CSV")) == "csv"
+
+
+def test_csv_table_is_written_in_fixed_batches(tmp_path, mocker):
+    export = _export(tmp_path, 5)
+    path = tmp_path / "messages.csv"
+    write = mocker.spy(message_table._CsvTable, "write")
+
+    assert write_message_table(export, path, batch_rows=4) == 25
+
+    assert [len(call.args[1]) for call in write.call_args_list] == [4] * 6 + [1]
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 25
+    assert rows[3]["is_error"] == "True" and rows[0]["is_error"] == ""
+
+
+def test_limit(tmp_path):
+    export = _export(tmp_path, 5)
+    assert write_message_table(export, tmp_path / "m.csv", limit=2) == 10
+
+
+@pytest.mark.skipif(pyarrow_available(), reason="pyarrow is installed")
+def test_parquet_requires_pyarrow(tmp_path):
+    export = _export(tmp_path, 1)
+    with pytest.raises(ValueError, match="pyarrow"):
+        write_message_table(export, tmp_path / "m.parquet")
+    assert not (tmp_path / "m.parquet").exists()
+
+
+@pytest.mark.skipif(not pyarrow_available(), reason="pyarrow not installed")
+def test_parquet_table(tmp_path):
+    import pyarrow.parquet as pq
+
+    export = _export(tmp_path, 3)
+    path = tmp_path / "messages.parquet"
+
+    assert write_message_table(export, path, batch_rows=4) == 15
+
+    parquet = pq.ParquetFile(path)
+    assert parquet.schema_arrow.names == list(COLUMNS)
+    assert parquet.metadata.num_rows == 15
+    table = parquet.read()
+    assert table.column("citation_count").to_pylist()[4] == 2
+
+
+def test_cli_messages_command(tmp_path):
+    export = _export(tmp_path, 1)
+    path = tmp_path / "messages.csv"
+    result = CliRunner().invoke(app, ["messages", str(export), str(path)])
+    assert result.exit_code == 0, result.output
+    with open(path, newline="", encoding="utf-8") as f:
+        assert next(csv.reader(f)) == list(COLUMNS)
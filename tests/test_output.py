@@ -0,0 +1,181 @@
+"""Tests for compressed Markdown output."""
+
+import gzip
+import io
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+from claude_json2md.batch import batch_to_markdown
+from claude_json2md.cli import app
+from claude_json2md.converter import json_to_markdown, write_markdown_file
+from claude_json2md.manifest import read_manifest
+from claude_json2md.output import (
+    BatchSync,
+    Durability,
+    OutputCompression,
+    OutputOptions,
+    iter_joined,
+    zstd_available,
+)
+from conftest import conversation, write_export
+
+
+@pytest.mark.parametrize("lines", [[], ["one"], ["one", "", "three"]])
+def test_iter_joined_matches_join(lines):
+    assert "".join(iter_joined(lines)) == "\n".join(lines)
+    assert "".join(iter_joined(iter(lines))) == "\n".join(lines)
+
+
+def test_write_gzip_file_streams_lines(tmp_path):
+    path = tmp_path / "out.md.gz"
+    lines = (f"Line {i}" for i in range(1000))  # A generator, consumed once
+    output = OutputOptions(OutputCompression.gzip)
+    assert write_markdown_file(path, lines, "Name", "uuid", output)
+    text = gzip.decompress(path.read_bytes()).decode("utf-8")
+    assert text == "\n".join(f"Line {i}" for i in range(1000))
+
+
+def test_gzip_output_is_reproducible(tmp_path):
+    output = OutputOptions(OutputCompression.gzip, level=9)
+    path = tmp_path / "a.md.gz"
+    write_markdown_file(path, ["Same", "text"], "Name", "uuid", output)
+    first = path.read_bytes()
+    write_markdown_file(path, ["Same", "text"], "Name", "uuid", output)
+    assert path.read_bytes() == first
+
+
+def test_output_options_validate_level():
+    assert OutputOptions("gzip", 0).level == 0
+    with pytest.raises(ValueError, match="between 0 and 9"):
+        OutputOptions(OutputCompression.gzip, level=10)
+    # The level is ignored without compression
+    assert OutputOptions(level=99).suffix == ""
+
+
+@pytest.mark.skipif(not zstd_available(), reason="zstd support not installed")
+def test_write_zstd_file(tmp_path):
+    try:
+        from compression import zstd
+
+        decompress = zstd.decompress
+    except ImportError:
+        import zstandard
+
+        def decompress(data: bytes) -> bytes:
+            # Streamed frames don't record their content size, which
+            # ZstdDecompressor.decompress() needs
+            reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data))
+            return reader.read()
+
+    path = tmp_path / "out.md.zst"
+    output = OutputOptions(OutputCompression.zstd, level=5)
+    assert write_markdown_file(path, ["a", "b"], "Name", "uuid", output)
+    assert decompress(path.read_bytes()).decode("utf-8") == "a\nb"
+
+
+@pytest.mark.skipif(zstd_available(), reason="zstd support is installed")
+def test_zstd_output_requires_support():
+    with pytest.raises(ValueError, match="zstandard"):
+        OutputOptions(OutputCompression.zstd)
+
+
+def test_json_to_markdown_writes_compressed_files(tmp_path):
+    export = write_export(tmp_path, [conversation("a"), conversation("b")])
+    output_dir = tmp_path / "out"
+
+    json_to_markdown(export, output_dir, output=OutputOptions("gzip"))
+
+    assert list(output_dir.glob("*.md")) == []
+    entries = read_manifest(output_dir)
+    for entry in entries.values():
+        assert entry["path"].endswith(".md.gz")
+        path = output_dir / entry["path"]
+        assert entry["bytes"] == path.stat().st_size
+        assert "Conversation" in gzip.decompress(path.read_bytes()).decode("utf-8")
+
+
+def test_batch_writes_compressed_files(tmp_path):
+    first = write_export(tmp_path, [conversation("a")], name="first.json")
+    second = write_export(tmp_path, [conversation("b")], name="second.json")
+    output_dir = tmp_path / "out"
+
+    batch_to_markdown(
+        [first, second], output_dir, workers=2, output=OutputOptions("gzip", 1)
+    )
+
+    assert len(list(output_dir.glob("*.md.gz"))) == 2
+
+
+def test_cli_compress_option(tmp_path):
+    export = write_export(tmp_path, [conversation("a")])
+    output_dir = tmp_path / "out"
+    runner = CliRunner()
+    args = ["convert", str(export), "-o", str(output_dir), "--progress", "none"]
+
+    result = runner.invoke(app, args + ["--compress", "gzip"])
+    assert result.exit_code == 0, result.output
+    assert len(list(output_dir.glob("*.md.gz"))) == 1
+
+    result = runner.invoke(app, args + ["--compress", "gzip", "--compress-level", "12"])
+    assert result.exit_code != 0
+
+
+def test_interrupted_write_keeps_previous_file(tmp_path):
+    path = tmp_path / "out.md"
+    path.write_text("previous")
+
+    def lines():
+        yield "partial"
+        raise RuntimeError("renderer failed")
+
+    assert not write_markdown_file(path, lines(), "Name", "uuid")
+    assert path.read_text() == "previous"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_file_durability_syncs_each_file(tmp_path, mocker, compression):
+    fsync = mocker.spy(os, "fsync")
+    output = OutputOptions(compression, durability=Durability.file)
+    path = tmp_path / output.filename("out.md")
+    assert write_markdown_file(path, ["a"], "Name", "uuid", output)
+    assert fsync.call_count == 2  # The file, then its directory
+
+
+def test_no_durability_does_not_sync(tmp_path, mocker):
+    fsync = mocker.spy(os, "fsync")
+    path = tmp_path / "out.md"
+    assert write_markdown_file(path, ["a"], "Name", "uuid", OutputOptions())
+    fsync.assert_not_called()
+
+
+def test_batch_sync_groups_files(tmp_path, mocker):
+    fsync = mocker.spy(os, "fsync")
+    syncer = BatchSync(tmp_path, every=2)
+    paths = [tmp_path / f"{i}.md" for i in range(3)]
+    for path in paths:
+        path.write_text("x")
+        syncer.add(path)
+    assert syncer.syncs == 1
+    assert fsync.call_count == 3  # Two files and the directory
+    syncer.sync()
+    assert syncer.syncs == 2
+    assert fsync.call_count == 5
+
+
+def test_json_to_markdown_batch_durability(tmp_path, mocker):
+    sync = mocker.spy(BatchSync, "sync")
+    export = write_export(tmp_path, [conversation(str(i)) for i in range(5)])
+    output = OutputOptions(durability=Durability.batch, sync_every=2)
+
+    json_to_markdown(export, tmp_path / "out", output=output)
+
+    assert sync.call_count == 3  # After files 2 and 4, and at the end
+    assert not list((tmp_path / "out").glob(".*.tmp"))
+
+
+def test_sync_every_must_be_positive():
+    with pytest.raises(ValueError, match="sync_every"):
+        OutputOptions(durability=Durability.batch, sync_every=0)
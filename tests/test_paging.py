@@ -0,0 +1,145 @@
+"""Tests for paging oversized conversations into several Markdown files."""
+
+import gzip
+
+from typer.testing import CliRunner
+
+from claude_json2md.batch import batch_to_markdown
+from claude_json2md.cache import RenderCache
+from claude_json2md.cli import app
+from claude_json2md.converter import json_to_markdown
+from claude_json2md.manifest import read_manifest
+from claude_json2md.output import OutputCompression, OutputOptions
+from claude_json2md.paging import Pager, part_filename
+from conftest import conversation, write_export
+
+STEM = "2024-03-01_paged-conversation_big"
+
+
+def _conv(uuid="big", messages=6, size=1000):
+    """A conversation of ``messages`` cited messages of ``size`` bytes."""
+    return conversation(
+        uuid,
+        name="Paged conversation" if uuid == "big" else f"Small {uuid}",
+        messages=[
+            {
+                "sender": "human" if i % 2 == 0 else "assistant",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": f"Message {i} " + "x" * size,
+                        "citations": [{"url": f"https://example.com/{i}"}],
+                    }
+                ],
+            }
+            for i in range(messages)
+        ],
+    )
+
+
+def _pages(pager):
+    pages = []
+    while not pager.done:
+        pages.append(list(pager.page()))
+    return pages
+
+
+def test_part_filename():
+    name = part_filename("2024-03-01_name_abcd.md", 2)
+    assert name == "2024-03-01_name_abcd_part002.md"
+
+
+def test_pager_breaks_between_blocks():
+    blocks = [["header"], ["a" * 5], ["b" * 20], ["c" * 5, "refs"]]
+    pager = Pager(blocks, 14, "Title", lambda number: f"p{number}.md")
+
+    pages = _pages(pager)
+
+    assert pager.page_count == len(pages) == 3
+    assert pages[0] == ["header", "aaaaa", "", "---", "", "[Part 2 →](p2.md)"]
+    # A block over the limit gets a page of its own
+    assert pages[1][:3] == ["# Title (part 2)\n", "[← Part 1](p1.md)", ""]
+    assert pages[1][3:-1] == ["b" * 20, "", "---", ""]
+    assert pages[1][-1] == "[← Part 1](p1.md) · [Part 3 →](p3.md)"
+    assert pages[2][3:] == ["ccccc", "refs", "", "---", "", "[← Part 2](p2.md)"]
+
+
+def test_pager_single_page_has_no_links():
+    pager = Pager([["header"], ["body"]], 100, "Title", str)
+
+    assert _pages(pager) == [["header", "body"]]
+
+
+def test_json_to_markdown_pages_large_conversations(tmp_path):
+    source = write_export(tmp_path, [_conv(), _conv("small", messages=1, size=10)])
+    out = tmp_path / "out"
+
+    json_to_markdown(source, out, output=OutputOptions(max_file_bytes=2500))
+
+    pages = sorted(p.name for p in out.glob(f"{STEM}*"))
+    assert pages == [f"{STEM}_part00{n}.md" for n in (1, 2, 3)]
+    first, second, last = ((out / name).read_text(encoding="utf-8") for name in pages)
+    assert first.startswith("# Conversation: Paged conversation")
+    assert f"[Part 2 →]({STEM}_part002.md)" in first
+    assert second.startswith("# Conversation: Paged conversation (part 2)")
+    assert "Message 2 " in second and "Message 3 " in second
+    assert "## References" not in first + second
+    assert "https://example.com/5" in last.split("## References")[1]
+    # Small conversations keep their usual name
+    assert (out / "2024-03-01_small-small_small.md").exists()
+
+    entry = read_manifest(out)["big"]
+    assert entry["path"] == f"{STEM}_part001.md"
+    assert entry["bytes"] == sum((out / name).stat().st_size for name in pages)
+
+
+def test_rerun_removes_stale_pages(tmp_path):
+    source = write_export(tmp_path, [_conv()])
+    out = tmp_path / "out"
+
+    json_to_markdown(source, out, output=OutputOptions(max_file_bytes=1500))
+    assert len(list(out.glob(f"{STEM}_part*.md"))) == 6
+    json_to_markdown(source, out, output=OutputOptions(max_file_bytes=2500))
+    assert len(list(out.glob(f"{STEM}_part*.md"))) == 3
+    json_to_markdown(source, out, output=OutputOptions(max_file_bytes=10**6))
+    assert [p.name for p in out.glob(f"{STEM}*")] == [f"{STEM}.md"]
+    json_to_markdown(source, out, output=OutputOptions(max_file_bytes=2500))
+    assert not (out / f"{STEM}.md").exists()
+
+
+def test_cached_documents_are_paged(tmp_path):
+    source = write_export(tmp_path, [_conv()])
+    cache = RenderCache(tmp_path / "cache")
+    json_to_markdown(source, tmp_path / "plain", cache=cache)
+
+    out = tmp_path / "out"
+    json_to_markdown(
+        source, out, cache=cache, output=OutputOptions(max_file_bytes=2500)
+    )
+
+    assert cache.hits == 1
+    assert len(list(out.glob(f"{STEM}_part*.md"))) == 3
+
+
+def test_batch_pages_compressed_files(tmp_path):
+    source = write_export(tmp_path, [_conv()])
+    out = tmp_path / "out"
+    output = OutputOptions(OutputCompression.gzip, max_file_bytes=2500)
+
+    batch_to_markdown([source, source], out, workers=1, output=output)
+
+    with gzip.open(out / f"{STEM}_part002.md.gz", "rt", encoding="utf-8") as f:
+        assert f"[Part 3 →]({STEM}_part003.md.gz)" in f.read()
+    assert read_manifest(out)["big"]["path"] == f"{STEM}_part001.md.gz"
+
+
+def test_cli_max_file_bytes(tmp_path):
+    source = write_export(tmp_path, [_conv()])
+
+    result = CliRunner().invoke(
+        app,
+        ["convert", str(source), str(tmp_path / "out"), "--max-file-bytes", "2500"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "out" / f"{STEM}_part003.md").exists()
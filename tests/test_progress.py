@@ -0,0 +1,104 @@
+"""Tests for live progress reporting."""
+
+import io
+import json
+
+import pytest
+
+from claude_json2md.batch import batch_to_markdown
+from claude_json2md.converter import json_to_markdown
+from claude_json2md.progress import (
+    JsonProgress,
+    ProgressMode,
+    ProgressReporter,
+    create_progress,
+)
+
+
+def _lines(buf):
+    return [json.loads(line) for line in buf.getvalue().splitlines()]
+
+
+def _export(n):
+    return [
+        {
+            "uuid": f"p-{i}",
+            "name": f"Progress {i}" if i else "",
+            "created_at": "2024-01-01T10:00:00Z",
+            "chat_messages": [{"sender": "human", "text": f"Message {i}"}],
+        }
+        for i in range(n)
+    ]
+
+
+def test_updates_are_throttled():
+    buf = io.StringIO()
+    progress = JsonProgress(interval=3600, out=buf)
+    for i in range(1000):
+        progress.update(i, i * 10)
+    assert buf.getvalue() == ""
+    progress.close(1000, 10_000, skipped=2, failed=1)
+    (done,) = _lines(buf)
+    assert done["event"] == "done"
+    assert (done["conversations"], done["skipped"], done["failed"]) == (1000, 2, 1)
+
+
+def test_reporter_without_report_cannot_be_created():
+    class Silent(ProgressReporter):
+        pass
+
+    with pytest.raises(TypeError):
+        Silent()
+
+
+def test_eta_from_total_bytes():
+    buf = io.StringIO()
+    progress = JsonProgress(total_bytes=1000, interval=0, out=buf)
+    progress.update(5, 250)
+    (report,) = _lines(buf)
+    assert report["event"] == "progress"
+    assert report["total_bytes"] == 1000
+    assert report["eta_s"] is not None and report["eta_s"] >= 0
+    assert report["conversations_per_s"] > 0
+
+
+def test_json_to_markdown_reports_input_position(tmp_path):
+    export = tmp_path / "export.json"
+    export.write_text(json.dumps(_export(4)))
+    buf = io.StringIO()
+
+    json_to_markdown(
+        export, tmp_path / "out", progress=JsonProgress(interval=0, out=buf)
+    )
+
+    reports = _lines(buf)
+    assert len(reports) == 5  # One per conversation, then the final report
+    done = reports[-1]
+    assert done["event"] == "done"
+    assert done["conversations"] == 4
+    assert done["skipped"] == 1
+    assert done["bytes_read"] == done["total_bytes"] == export.stat().st_size
+
+
+def test_batch_reports_against_the_unique_conversation_count(tmp_path):
+    exports = []
+    for n in range(2):
+        export = tmp_path / f"export{n}.json"
+        export.write_text(json.dumps(_export(3)))
+        exports.append(export)
+    buf = io.StringIO()
+
+    batch_to_markdown(
+        exports, tmp_path / "out", workers=1, progress=JsonProgress(out=buf)
+    )
+
+    (done,) = _lines(buf)
+    assert done["total_conversations"] == 3
+    assert done["conversations"] == 3
+
+
+def test_create_progress_modes(monkeypatch):
+    assert create_progress(ProgressMode.none) is None
+    assert isinstance(create_progress(ProgressMode.json), JsonProgress)
+    monkeypatch.setattr("sys.stderr", io.StringIO())  # Not a terminal
+    assert isinstance(create_progress(ProgressMode.auto), JsonProgress)
@@ -0,0 +1,146 @@
+"""Tests for the streaming export reader."""
+
+import bz2
+import gzip
+import io
+import json
+import lzma
+from hashlib import blake2b
+
+import pytest
+
+from claude_json2md.reader import (
+    DIGEST_SIZE,
+    ExportFormatError,
+    decompress_stream,
+    iter_json_array,
+    open_export,
+)
+
+SAMPLE = json.dumps([{"name": "compressed"}, {"name": "export"}]).encode()
+
+
+class _PipeStream(io.RawIOBase):
+    """An unseekable stream, like stdin attached to a pipe."""
+
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._data.read(min(len(buffer), 5))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _elements(raw: bytes, chunk_size: int = 4):
+    return list(iter_json_array(io.BytesIO(raw), chunk_size=chunk_size))
+
+
+class TestIterJsonArray:
+    def test_yields_values_across_chunk_boundaries(self):
+        data = [{"name": f"conv {i}", "text": "x" * i} for i in range(50)]
+        raw = json.dumps(data, indent=2).encode()
+        assert [e.value for e in _elements(raw)] == data
+
+    def test_offsets_cover_element_bytes(self):
+        data = [{"name": "café"}, {"name": "naïve ☃"}, [1, 2], 12345]
+        raw = json.dumps(data, ensure_ascii=False).encode()
+        for element in _elements(raw, chunk_size=3):
+            chunk = raw[element.offset : element.offset + element.length]
+            assert json.loads(chunk) == element.value
+
+    def test_digest_covers_raw_element_bytes(self):
+        raw = json.dumps([{"name": "café"}, {"name": "café"}, {"name": "cafe"}]).encode()
+        elements = list(iter_json_array(io.BytesIO(raw), chunk_size=3, with_digest=True))
+        first = raw[elements[0].offset : elements[0].offset + elements[0].length]
+        assert elements[0].digest == blake2b(first, digest_size=DIGEST_SIZE).digest()
+        assert elements[0].digest == elements[1].digest != elements[2].digest
+        assert _elements(raw)[0].digest is None
+
+    def test_empty_array(self):
+        assert _elements(b"  [ ]  ") == []
+
+    def test_skips_byte_order_mark(self):
+        elements = _elements(b'\xef\xbb\xbf[{"a": 1}]', chunk_size=1)
+        assert [e.value for e in elements] == [{"a": 1}]
+        assert elements[0].offset == 4
+
+    def test_number_split_at_chunk_edge(self):
+        assert [e.value for e in _elements(b"[1234567, 89]", chunk_size=3)] == [
+            1234567,
+            89,
+        ]
+
+    def test_top_level_object_raises_format_error(self):
+        with pytest.raises(ExportFormatError):
+            _elements(b'{"name": "Not a list"}')
+
+    @pytest.mark.parametrize("raw", [b"", b"[1, 2", b"[1 2]", b"[1,]", b"[1] x"])
+    def test_malformed_json_raises_decode_error(self, raw):
+        with pytest.raises(json.JSONDecodeError):
+            _elements(raw)
+
+    def test_stops_reading_early(self):
+        raw = b'[{"a": 1}, {"b": 2}, this is not json'
+        elements = iter_json_array(io.BytesIO(raw), chunk_size=4)
+        assert next(elements).value == {"a": 1}
+
+
+class TestOpenExport:
+    def test_bytes_source(self):
+        with open_export(b"[1]") as stream:
+            assert stream.read() == b"[1]"
+
+    def test_path_source(self, tmp_path):
+        path = tmp_path / "export.json"
+        path.write_bytes(b"[]")
+        with open_export(path) as stream:
+            assert stream.read() == b"[]"
+        with open_export(str(path)) as stream:
+            assert stream.read() == b"[]"
+
+    def test_stream_source_left_open(self):
+        stream = io.BytesIO(b"[]")
+        with open_export(stream) as opened:
+            assert opened is stream
+        assert not stream.closed
+
+    def test_unsupported_source(self):
+        with pytest.raises(TypeError):
+            with open_export(42):
+                pass
+
+
+class TestDecompressStream:
+    @pytest.mark.parametrize(
+        "compress", [gzip.compress, bz2.compress, lzma.compress, lambda b: b]
+    )
+    def test_detects_format_by_magic_bytes(self, compress):
+        stream = decompress_stream(io.BytesIO(compress(SAMPLE)))
+        assert stream.read() == SAMPLE
+
+    @pytest.mark.parametrize("compress", [gzip.compress, lambda b: b])
+    def test_unseekable_stream(self, compress):
+        stream = decompress_stream(io.BufferedReader(_PipeStream(compress(SAMPLE))))
+        assert stream.read() == SAMPLE
+
+    def test_zstd(self):
+        zstandard = pytest.importorskip("zstandard")
+        data = zstandard.ZstdCompressor().compress(SAMPLE)
+        assert decompress_stream(io.BytesIO(data)).read() == SAMPLE
+
+    def test_open_export_decompresses_paths(self, tmp_path):
+        path = tmp_path / "export.json.xz"
+        path.write_bytes(lzma.compress(SAMPLE))
+        with open_export(path) as stream:
+            names = [e.value["name"] for e in iter_json_array(stream)]
+        assert names == ["compressed", "export"]
+
+    def test_open_export_dash_reads_stdin(self, monkeypatch):
+        fake_stdin = io.TextIOWrapper(io.BytesIO(gzip.compress(SAMPLE)))
+        monkeypatch.setattr("sys.stdin", fake_stdin)
+        with open_export("-") as stream:
+            assert stream.read() == SAMPLE
@@ -0,0 +1,154 @@
+"""Tests for the local HTTP conversion service, run against localhost."""
+
+import asyncio
+import gzip
+import io
+import json
+import urllib.error
+import urllib.request
+import zipfile
+
+import pytest
+
+from claude_json2md import server
+from claude_json2md.server import create_executor, start_server
+
+SAMPLE_EXPORT = [
+    {
+        "uuid": "aaaa-1111",
+        "name": "First Chat",
+        "created_at": "2024-01-01T10:00:00Z",
+        "updated_at": "2024-01-01T11:00:00Z",
+        "chat_messages": [
+            {
+                "sender": "human",
+                "content": [
+                    {"type": "thinking", "thinking": "Private"},
+                    {"type": "text", "text": "Hello server"},
+                ],
+            }
+        ],
+    },
+    {"uuid": "bbbb-2222", "name": "", "chat_messages": [{"text": "Skipped"}]},
+]
+
+
+def _post(url: str, body: bytes):
+    request = urllib.request.Request(url, data=body, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def _request(path: str, body: bytes):
+    """Starts a server on an ephemeral port, sends one request, stops it."""
+
+    async def run():
+        with create_executor(workers=0) as executor:
+            server = await start_server(executor, port=0, max_concurrency=2)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                return await asyncio.to_thread(
+                    _post, f"http://127.0.0.1:{port}{path}", body
+                )
+
+    return asyncio.run(run())
+
+
+def test_convert_streams_jsonl():
+    status, headers, body = _request("/convert", json.dumps(SAMPLE_EXPORT).encode())
+    assert status == 200
+    assert headers["Content-Type"] == "application/x-ndjson"
+    results = [json.loads(line) for line in body.splitlines()]
+    assert [r["status"] for r in results] == ["converted", "skipped_empty_name"]
+    assert results[0]["filename"] == "2024-01-01_first-chat_aaaa.md"
+    assert "Hello server" in results[0]["markdown"]
+    assert "Private" in results[0]["markdown"]
+
+
+def test_query_parameters_set_render_options():
+    status, _, body = _request(
+        "/convert?no_thinking=1", json.dumps(SAMPLE_EXPORT).encode()
+    )
+    assert status == 200
+    first = json.loads(body.splitlines()[0])
+    assert "Private" not in first["markdown"]
+
+
+def test_zip_upload_and_zip_response():
+    upload = io.BytesIO()
+    with zipfile.ZipFile(upload, "w") as archive:
+        archive.writestr("export/conversations.json", json.dumps(SAMPLE_EXPORT))
+        archive.writestr("export/projects.json", "[]")
+
+    status, headers, body = _request("/convert?format=zip", upload.getvalue())
+    assert status == 200
+    assert headers["Content-Type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.namelist() == ["2024-01-01_first-chat_aaaa.md"]
+        assert "Hello server" in archive.read(archive.namelist()[0]).decode()
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"not": "a list"}',
+        b"[{",
+        b"PK\x03\x04 not really a zip",
+        b"\x1f\x8b\x08\x00 not really gzip",
+        gzip.compress(json.dumps(SAMPLE_EXPORT).encode())[:-12],
+    ],
+    ids=["object", "truncated-json", "bad-zip", "bad-gzip", "truncated-gzip"],
+)
+def test_invalid_upload_is_rejected(body):
+    status, _, message = _request("/convert", body)
+    assert status == 400
+
+
+def _big_export() -> bytes:
+    """An export whose decompressed size spans several reads."""
+    filler = {"uuid": "cccc-3333", "name": "Filler", "chat_messages": []}
+    filler["padding"] = "x" * 200_000
+    return json.dumps(SAMPLE_EXPORT + [filler] * 20).encode()
+
+
+def test_read_error_after_headers_is_reported_in_band():
+    status, _, body = _request("/convert", gzip.compress(_big_export())[:-12])
+    assert status == 200
+    results = [json.loads(line) for line in body.splitlines()]
+    assert results[0]["status"] == "converted"
+    assert results[-1]["error"].startswith("Invalid export after")
+
+
+def test_non_object_elements_fail_individually():
+    body = json.dumps([1, SAMPLE_EXPORT[0], [2]]).encode()
+    status, _, body = _request("/convert", body)
+    assert status == 200
+    results = [json.loads(line) for line in body.splitlines()]
+    assert [r["status"] for r in results] == ["failed", "converted", "failed"]
+    assert [r.get("index") for r in results] == [0, None, 2]
+    assert "not a conversation object" in results[0]["error"]
+
+
+def test_render_failure_is_reported_and_the_rest_delivered(monkeypatch):
+    render = server.render_conversation
+
+    def flaky(conv, index, options):
+        if index == 0:
+            raise RuntimeError("boom")
+        return render(conv, index, options)
+
+    monkeypatch.setattr(server, "render_conversation", flaky)
+    upload = json.dumps(SAMPLE_EXPORT * 2).encode()
+    status, _, body = _request("/convert?format=zip", upload)
+    assert status == 200
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.namelist() == ["2024-01-01_first-chat_aaaa.md", "ERROR.txt"]
+        assert archive.read("ERROR.txt") == b"Conversation 0: RuntimeError: boom\n"
+
+
+def test_unknown_path_is_not_found():
+    status, _, _ = _request("/nope", b"[]")
+    assert status == 404
@@ -0,0 +1,151 @@
+"""Tests for the SQLite output backend."""
+
+import sqlite3
+
+from typer.testing import CliRunner
+
+from claude_json2md.cli import app
+from claude_json2md.converter import convert_iter, json_to_sqlite
+from claude_json2md.sqlite_store import SqliteWriter, message_text
+from conftest import CREATED_AT, conversation, write_export
+
+
+def _conv(uuid, text="Hello", **fields):
+    """A conversation whose reply mixes text and tool use."""
+    messages = [
+        {"uuid": f"{uuid}-1", "sender": "human", "text": text},
+        {
+            "uuid": f"{uuid}-2",
+            "sender": "assistant",
+            "content": [
+                {"type": "text", "text": "Part one"},
+                {"type": "tool_use", "name": "web_search", "input": {}},
+                {"type": "text", "text": "Part two"},
+            ],
+        },
+    ]
+    return conversation(uuid, messages=messages, **fields)
+
+
+def _rows(db_path, query, *params):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(query, params).fetchall()
+
+
+def test_message_text():
+    assert message_text({"text": "plain"}) == "plain"
+    text_item = {"type": "text", "text": "a"}
+    assert message_text({"content": [text_item], "text": "b"}) == "a"
+    assert message_text({"content": [{"type": "thinking", "thinking": "x"}]}) == ""
+    assert message_text({"content": [], "text": "fallback"}) == "fallback"
+
+
+def test_json_to_sqlite_writes_conversations_and_messages(tmp_path):
+    export = write_export(tmp_path, [_conv("a"), _conv("skipped", name=""), _conv("b")])
+    db_path = tmp_path / "out" / "conversations.db"
+
+    json_to_sqlite(export, db_path)
+
+    assert _rows(db_path, "PRAGMA journal_mode") == [("wal",)]
+    rows = _rows(
+        db_path,
+        "SELECT uuid, name, message_count, markdown FROM conversations ORDER BY uuid",
+    )
+    expected = {r.uuid: r.text() for r in convert_iter(export) if r.lines}
+    assert [(uuid, name, count) for uuid, name, count, _ in rows] == [
+        ("a", "Conversation a", 2),
+        ("b", "Conversation b", 2),
+    ]
+    assert {uuid: markdown for uuid, _, _, markdown in rows} == expected
+    messages = _rows(
+        db_path,
+        "SELECT position, uuid, sender, text FROM messages "
+        "WHERE conversation_uuid = 'a' ORDER BY position",
+    )
+    assert messages == [
+        (0, "a-1", "human", "Hello"),
+        (1, "a-2", "assistant", "Part one\n\nPart two"),
+    ]
+
+
+def test_rerun_upserts_only_changes(tmp_path):
+    export = write_export(tmp_path, [_conv("a"), _conv("b")])
+    db_path = tmp_path / "conversations.db"
+    json_to_sqlite(export, db_path)
+
+    with SqliteWriter(db_path) as writer:
+        for record in convert_iter(export, with_digest=True):
+            writer.add(
+                record.conversation, record.text(), record.filename, record.digest
+            )
+    assert (writer.written, writer.unchanged) == (0, 2)
+
+    edited = _conv("a", "Edited", updated_at="2024-03-03T10:00:00Z")
+    write_export(tmp_path, [edited, _conv("b")])
+    json_to_sqlite(export, db_path)
+    assert _rows(db_path, "SELECT count(*) FROM conversations") == [(2,)]
+    assert _rows(
+        db_path,
+        "SELECT text FROM messages WHERE conversation_uuid = 'a' AND position = 0",
+    ) == [("Edited",)]
+    assert _rows(db_path, "SELECT count(*) FROM messages") == [(4,)]
+
+
+def test_older_versions_do_not_replace_newer(tmp_path):
+    newer = _conv("a", "New", updated_at="2024-05-01T00:00:00Z")
+    older = _conv("a", "Old", updated_at="2024-04-01T00:00:00Z")
+    newer = write_export(tmp_path, [newer], name="newer.json")
+    older = write_export(tmp_path, [older], name="older.json")
+    db_path = tmp_path / "conversations.db"
+
+    json_to_sqlite(newer, db_path)
+    json_to_sqlite(older, db_path)
+
+    assert _rows(db_path, "SELECT updated_at FROM conversations") == [
+        ("2024-05-01T00:00:00Z",)
+    ]
+    assert ("New",) in _rows(db_path, "SELECT text FROM messages")
+
+
+def test_writer_commits_in_batches(tmp_path):
+    db_path = tmp_path / "conversations.db"
+    with SqliteWriter(db_path, batch_size=2) as writer:
+        writer.add(_conv("a"), "# a")
+        assert _rows(db_path, "SELECT count(*) FROM conversations") == [(0,)]
+        writer.add(_conv("b"), "# b")
+        assert _rows(db_path, "SELECT count(*) FROM conversations") == [(2,)]
+        writer.add(_conv("c"), "# c")
+    assert _rows(db_path, "SELECT count(*) FROM conversations") == [(3,)]
+
+
+def test_writer_rolls_back_open_batch_on_error(tmp_path):
+    db_path = tmp_path / "conversations.db"
+    try:
+        with SqliteWriter(db_path, batch_size=10) as writer:
+            writer.add(_conv("a"), "# a")
+            raise RuntimeError("interrupted")
+    except RuntimeError:
+        pass
+    assert _rows(db_path, "SELECT count(*) FROM conversations") == [(0,)]
+
+
+def test_cli_sqlite_option(tmp_path):
+    newer = _conv("a", updated_at="2024-05-01T00:00:00Z")
+    first = write_export(tmp_path, [newer], name="first.json")
+    second = write_export(tmp_path, [_conv("a"), _conv("b")], name="second.json")
+    db_path = tmp_path / "conversations.db"
+    runner = CliRunner()
+    base = ["convert", str(first), str(second), "--progress", "none"]
+
+    result = runner.invoke(app, base + ["--sqlite", str(db_path)])
+    assert result.exit_code == 0, result.output
+    query = "SELECT uuid, updated_at FROM conversations ORDER BY uuid"
+    assert _rows(db_path, query) == [
+        ("a", "2024-05-01T00:00:00Z"),
+        ("b", CREATED_AT),
+    ]
+
+    result = runner.invoke(
+        app, base + ["--sqlite", str(db_path), "-o", str(tmp_path / "out")]
+    )
+    assert result.exit_code != 0
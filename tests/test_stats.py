@@ -0,0 +1,157 @@
+"""Tests for the export statistics report."""
+
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from claude_json2md.cli import app
+
+pytest.importorskip("numpy")
+
+from claude_json2md.stats import collect_stats, render_stats_markdown  # noqa: E402
+
+
+def _message(sender, created_at, text="", content=None):
+    msg = {"sender": sender, "created_at": created_at, "text": text}
+    if content is not None:
+        msg["content"] = content
+    return msg
+
+
+def _export():
+    return [
+        {
+            "uuid": "a",
+            "created_at": "2024-01-31T23:00:00Z",
+            "chat_messages": [
+                _message("human", "2024-01-31T23:00:00Z", "x" * 8),
+                _message(
+                    "assistant",
+                    "2024-02-01T00:10:00Z",
+                    content=[
+                        {"type": "thinking", "thinking": "t" * 40},
+                        {"type": "tool_use", "name": "web_search", "input": {}},
+                        {"type": "tool_result", "name": "web_search", "is_error": True},
+                        {"type": "tool_use", "name": "artifacts", "input": {}},
+                        {"type": "tool_use", "name": "web_search", "input": {}},
+                        {
+                            "type": "text",
+                            "text": "y" * 400,
+                            "citations": [{"url": "u1"}, {"url": "u2"}],
+                        },
+                    ],
+                ),
+            ],
+        },
+        {
+            "uuid": "b",
+            "created_at": "2024-02-10T00:00:00Z",
+            "chat_messages": [_message("system", None, "z" * 20)],
+        },
+        {"uuid": "c", "created_at": "not a date", "chat_messages": []},
+    ]
+
+
+def test_collect_stats():
+    report = collect_stats(json.dumps(_export()).encode())
+
+    assert report["conversations"] == 3
+    assert report["messages"] == 3
+    assert report["empty_conversations"] == 1
+    assert report["thinking"] == {"blocks": 1, "messages_with_thinking": 1, "chars": 40}
+    assert report["tools"] == {
+        "calls": 3,
+        "errors": 1,
+        "calls_by_name": {"web_search": 2, "artifacts": 1},
+    }
+    assert report["citations"] == 2
+    assert report["message_chars"]["max"] == 400
+    assert report["message_chars"]["p50"] == 20.0
+    assert report["messages_per_conversation"]["max"] == 2
+    # Thinking counts towards tokens: (8 + 440 + 20) characters
+    assert report["estimated_tokens"]["total"] == 8 // 4 + 440 // 4 + 20 // 4
+
+    histogram = {
+        bucket["min_chars"]: bucket["messages"]
+        for bucket in report["message_chars_histogram"]
+    }
+    assert histogram[1] == 1 and histogram[10] == 1 and histogram[100] == 1
+
+    assert report["by_sender"]["human"]["messages"] == 1
+    assert report["by_sender"]["assistant"]["chars"] == 440
+    assert report["by_sender"]["other"]["messages"] == 1
+
+    # Messages by their own month (falling back to the conversation's),
+    # conversations by the month they were created
+    assert report["by_month"] == {
+        "unknown": {
+            "conversations": 1,
+            "messages": 0,
+            "chars": 0,
+            "estimated_tokens": 0,
+        },
+        "2024-01": {
+            "conversations": 1,
+            "messages": 1,
+            "chars": 8,
+            "estimated_tokens": 2,
+        },
+        "2024-02": {
+            "conversations": 1,
+            "messages": 2,
+            "chars": 460,
+            "estimated_tokens": 115,
+        },
+    }
+
+
+def test_stats_span_several_chunks(monkeypatch):
+    from claude_json2md import stats
+
+    monkeypatch.setattr(stats, "CHUNK_ROWS", 2)
+    export = [
+        {
+            "uuid": str(i),
+            "created_at": "2024-03-01T00:00:00Z",
+            "chat_messages": [_message("human", None, "x" * i)],
+        }
+        for i in range(7)
+    ]
+    report = collect_stats(json.dumps(export).encode())
+    assert report["messages"] == 7
+    assert report["message_chars"]["max"] == 6
+    assert report["by_month"]["2024-03"]["chars"] == sum(range(7))
+
+
+def test_empty_export():
+    report = collect_stats(b"[]")
+    assert report["messages"] == 0
+    assert report["by_month"] == {}
+    assert "# Export Statistics" in render_stats_markdown(report)
+
+
+def test_markdown_report():
+    markdown = render_stats_markdown(collect_stats(json.dumps(_export()).encode()))
+    assert "- Tool calls: 3 (1 errors)" in markdown
+    assert "| web_search | 2 |" in markdown
+    assert "| 2024-02 | 1 | 2 | 460 | 115 |" in markdown
+
+
+def test_cli_stats(tmp_path):
+    export = tmp_path / "export.json"
+    export.write_text(json.dumps(_export()))
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["stats", str(export), "--json"])
+    assert result.exit_code == 0, result.output
+    # Log lines on stderr may precede the report in the captured output
+    report = json.loads(result.output[result.output.index("{\n") :])
+    assert report["conversations"] == 3
+
+    out = tmp_path / "report"
+    result = runner.invoke(app, ["stats", str(export), "-o", str(out)])
+    assert result.exit_code == 0, result.output
+    assert "# Export Statistics" in result.output
+    assert json.loads((out / "stats.json").read_text())["messages"] == 3
+    assert (out / "stats.md").read_text().startswith("# Export Statistics")
@@ -0,0 +1,102 @@
+"""Tests for the bounded unified diff."""
+
+import difflib
+import random
+
+from claude_json2md.renderers import CitationCollector, RenderOptions, render_tool_use
+from claude_json2md.textdiff import unified_diff
+
+
+def _apply(old_text, diff):
+    """Applies a unified diff without file headers to ``old_text``."""
+    old = old_text.split("\n")
+    out, pos = [], 0
+    for line in diff:
+        if line.startswith("@@"):
+            start, _, count = line.split()[1][1:].partition(",")
+            start = int(start) - (0 if count == "0" else 1)
+            out += old[pos:start]
+            pos = start
+        elif line[0] == "+":
+            out.append(line[1:])
+        else:
+            assert old[pos] == line[1:]
+            if line[0] == " ":
+                out.append(line[1:])
+            pos += 1
+    return "\n".join(out + old[pos:])
+
+
+def test_matches_difflib():
+    old = "\n".join("abcdefghij")
+    new = "\n".join("abCdefghiJk")
+    expected = list(
+        difflib.unified_diff(old.split("\n"), new.split("\n"), "f", "f", lineterm="")
+    )
+    assert unified_diff(old, new, "f") == expected
+
+
+def test_random_edits_apply_and_are_minimal():
+    rng = random.Random(7)
+    for _ in range(500):
+        old = [rng.choice("abcde") for _ in range(rng.randint(1, 20))]
+        new = [rng.choice("abcde") for _ in range(rng.randint(1, 20))]
+        diff = unified_diff("\n".join(old), "\n".join(new), context=rng.randint(0, 3))
+        assert _apply("\n".join(old), diff) == "\n".join(new)
+        matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+        common = sum(block.size for block in matcher.get_matching_blocks())
+        assert sum(line[0] in "+-" for line in diff if not line.startswith("@@")) <= (
+            len(old) + len(new) - 2 * common
+        )
+
+
+def test_identical_texts_have_an_empty_diff():
+    assert unified_diff("same\ntext", "same\ntext") == []
+
+
+def test_over_budget_returns_none():
+    old = "\n".join(str(i) for i in range(1000))
+    new = "\n".join(str(-i) for i in range(1000))
+    assert unified_diff(old, new) is None
+    assert unified_diff(old, new, max_edits=10_000, max_work=100) is None
+    assert unified_diff("a" * 10, "b", max_bytes=5) is None
+    # A small edit in a long text stays within the budget
+    assert unified_diff(old, old.replace("\n500\n", "\nfive hundred\n")) is not None
+
+
+def test_str_replace_shows_a_unified_diff():
+    item = {
+        "type": "tool_use",
+        "name": "str_replace",
+        "input": {
+            "path": "app.py",
+            "old_str": "def f():\n    return 1\n",
+            "new_str": "def f():\n    return 2\n",
+        },
+    }
+    lines = render_tool_use(item, RenderOptions(verbose_tools=True), CitationCollector())
+    assert lines[lines.index("```diff") :] == [
+        "```diff",
+        "--- app.py",
+        "+++ app.py",
+        "@@ -1,3 +1,3 @@",
+        " def f():",
+        "-    return 1",
+        "+    return 2",
+        " ",
+        "```",
+        "",
+    ]
+
+
+def test_oversized_update_falls_back_to_truncated_sides():
+    old = "\n".join(f"old {i}" for i in range(1000))
+    new = "\n".join(f"new {i}" for i in range(1000))
+    item = {
+        "type": "tool_use",
+        "name": "artifacts",
+        "input": {"command": "update", "id": "doc", "old_str": old, "new_str": new},
+    }
+    lines = render_tool_use(item, RenderOptions(verbose_tools=True), CitationCollector())
+    diff = lines[lines.index("```diff") + 1 : -2]
+    assert diff == [f"- old {i}" for i in range(10)] + [f"+ new {i}" for i in range(10)]